@@ -0,0 +1,12 @@
+"""
+Benchmarks of the execution and pricing hot paths
+"""
+
+__all__ = [
+    "benchmark",
+    "compare",
+    "load_results",
+    "measure",
+    "run_benchmarks",
+    "save_results"
+]
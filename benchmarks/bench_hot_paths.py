@@ -0,0 +1,137 @@
+"""
+Casos de los caminos calientes de ejecución y precios.
+
+Todo corre contra el simulador local (``src.simulator``), con los clientes
+reales de Binance y Hyperliquid apuntados a él: lo medido es el coste del
+código del bot más un round-trip por loopback, sin red ni rate limits reales.
+El parseo de ``get_funding_rate`` usa un payload ``metaAndAssetCtxs`` de 200
+activos guardado en ``data/``.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from eth_account import Account
+from benchmarks.harness import benchmark
+from src.simulator.engine import SimConfig
+from src.simulator.server import SimulatorServer
+from src.core import api_utils
+from src.core import trading_operations
+from src.core.endpoints import binance_futures_url
+from src.exchanges import hyperliquid_operations
+
+DATA_DIR = Path(__file__).parent / 'data'
+META_AND_ASSET_CTXS_FILE = DATA_DIR / 'meta_and_asset_ctxs_200.json'
+FUNDING_LOOKUP_COIN = 'ALT199'  # Último activo del payload: recorre el universo completo
+
+SYMBOL = 'BTCUSDT'
+COIN = 'BTC'
+CAPITAL = 100
+LEVERAGE = 5
+CLOSE_QTY = 0.002
+SIM_WEIGHT_LIMIT = 10_000_000  # El simulador no debe responder 429 durante la corrida
+NETWORK_TOLERANCE = 1.0  # Los casos con round-trip al simulador dependen del planificador de hilos
+
+
+class HotPathContext:
+    """
+    Simulador en marcha y clientes reales apuntados a él, compartidos por todos los casos.
+    Se usa como context manager; restaura el entorno al salir.
+    """
+
+    def __init__(self, seed=0):
+        self.config = SimConfig(seed=seed, binance_weight_limit=SIM_WEIGHT_LIMIT,
+                                hyperliquid_weight_limit=SIM_WEIGHT_LIMIT)
+        self.server = SimulatorServer(self.config)
+        self.payload = json.loads(META_AND_ASSET_CTXS_FILE.read_text())
+        self.session = SimpleNamespace(positions={'binance': {}, 'hyperliquid': {}})
+        self._saved_env = {}
+        self._direction = 'long'
+
+    def __enter__(self):
+        self.server.start()
+        for name, value in self.server.env().items():
+            self._saved_env[name] = os.environ.get(name)
+            os.environ[name] = value
+        self.client = api_utils.create_binance_client('bench-key', 'bench-secret')
+        wallet, self.hl_info, self.hl_exchange = api_utils.init_hyperliquid_clients(
+            Account.create().key.hex(), streaming=False)
+        self.address = wallet.address
+        self.exchange_info_url = binance_futures_url('/fapi/v1/exchangeInfo')
+        self.invalidate()
+        return self
+
+    def __exit__(self, *exc):
+        api_utils.run_background(api_utils.get_api_client().close()).result(timeout=5)
+        self.server.stop()
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self.invalidate()
+
+    def invalidate(self):
+        """Descarta el snapshot de cartera del módulo que usa ``cerrar_posiciones``."""
+        trading_operations.get_portfolio_store().invalidate()
+
+    def next_direction(self):
+        """Alterna long/short para que las órdenes repetidas no acumulen posición."""
+        self._direction = 'short' if self._direction == 'long' else 'long'
+        return self._direction
+
+
+@benchmark('verify_orders', rounds=100, tolerance=NETWORK_TOLERANCE)
+def bench_verify_orders(ctx, _):
+    trading_operations.verify_orders(ctx.client, ctx.hl_info, SYMBOL, 'BUY', CAPITAL, LEVERAGE, 'long')
+
+
+@benchmark('ejecutar_hyper_order', rounds=100, tolerance=NETWORK_TOLERANCE)
+def bench_ejecutar_hyper_order(ctx, _):
+    best_price = ctx.server.engine.mids[COIN]
+    trading_operations.ejecutar_hyper_order(ctx.hl_info, ctx.hl_exchange, ctx.address, SYMBOL,
+                                            ctx.next_direction(), CAPITAL, LEVERAGE, best_price)
+
+
+@benchmark('adjust_hyperliquid_price', rounds=2000)
+def bench_adjust_hyperliquid_price(ctx, _):
+    hyperliquid_operations.adjust_hyperliquid_price(ctx.hl_info, 65033.37, COIN, True)
+
+
+@contextmanager
+def _recorded_meta_and_asset_ctxs(ctx):
+    with mock.patch.object(hyperliquid_operations, 'api_request', return_value=ctx.payload):
+        yield
+
+
+@benchmark('get_funding_rate_parse_200', rounds=1000, wrap=_recorded_meta_and_asset_ctxs)
+def bench_get_funding_rate_parse(ctx, _):
+    hyperliquid_operations.get_funding_rate(FUNDING_LOOKUP_COIN)
+
+
+@benchmark('api_request_cache_hit', rounds=2000)
+def bench_api_request_cache_hit(ctx, _):
+    api_utils.api_request(ctx.exchange_info_url)
+
+
+@benchmark('api_request_cache_miss', rounds=200, tolerance=NETWORK_TOLERANCE)
+def bench_api_request_cache_miss(ctx, _):
+    api_utils.api_request(ctx.exchange_info_url, use_cache=False)
+
+
+def _open_hedge(ctx):
+    """Abre una posición cubierta BTC en ambos venues directamente en el motor."""
+    engine = ctx.server.engine
+    ctx.server.call(engine.submit, 'binance', COIN, 'BUY', CLOSE_QTY, 'MARKET')
+    ctx.server.call(engine.submit, 'hyperliquid', COIN, 'SELL', CLOSE_QTY, 'MARKET')
+    ctx.invalidate()
+
+
+@benchmark('cerrar_posiciones', rounds=50, setup=_open_hedge, tolerance=NETWORK_TOLERANCE)
+def bench_cerrar_posiciones(ctx, _):
+    if not trading_operations.cerrar_posiciones(ctx.client, ctx.hl_info, ctx.hl_exchange, ctx.address, SYMBOL,
+                                                'long', ctx.session):
+        raise RuntimeError("cerrar_posiciones no cerró ambas patas")
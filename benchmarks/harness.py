@@ -0,0 +1,174 @@
+"""
+Arnés de benchmarks de los caminos calientes.
+
+Cada caso se registra con ``@benchmark`` y recibe el contexto compartido de la
+corrida. ``measure`` cronometra cada ronda por separado (ops/seg, media, p50 y
+p99) y mide con ``tracemalloc`` el pico de memoria de una llamada. Los
+resultados se guardan en JSON y ``compare`` los contrasta con una corrida de
+referencia: un p50 o un pico de memoria por encima de la tolerancia del caso, y
+además peor que la referencia en al menos ``MIN_DELTA``, cuenta como regresión.
+El umbral absoluto evita que el ruido de los casos de pocos microsegundos (un
+1.3 µs que sale 2.8 µs en otra corrida) se lea como regresión.
+"""
+
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import nullcontext
+from pathlib import Path
+import numpy as np
+
+DEFAULT_ROUNDS = 200
+DEFAULT_WARMUP = 5
+DEFAULT_TOLERANCE = 0.5  # Empeoramiento relativo admitido frente a la referencia (p50 y memoria)
+ALLOC_ROUNDS = 5  # Rondas medidas con tracemalloc (fuera del cronometraje)
+DEFAULT_REPEATS = 3  # Mediciones por caso; se conserva la de p50 mediano
+GATED_METRICS = ('p50_us', 'peak_kib')
+MIN_DELTA = {'p50_us': 5.0, 'peak_kib': 1.0}  # Empeoramiento absoluto mínimo para contar como regresión
+
+BenchmarkCase = namedtuple('BenchmarkCase', ['name', 'func', 'setup', 'wrap', 'rounds', 'tolerance'])
+BenchmarkResult = namedtuple('BenchmarkResult', ['name', 'rounds', 'ops_per_sec', 'mean_us', 'p50_us', 'p99_us',
+                                                 'peak_kib'])
+Regression = namedtuple('Regression', ['name', 'metric', 'baseline', 'current', 'ratio'])
+
+_cases = {}
+
+
+def benchmark(name, rounds=DEFAULT_ROUNDS, setup=None, wrap=None, tolerance=DEFAULT_TOLERANCE):
+    """
+    Registra un caso.
+    :param rounds: Rondas cronometradas por defecto
+    :param setup: ``setup(ctx)`` por ronda, fuera del cronometraje; su resultado se pasa al caso
+    :param wrap: ``wrap(ctx)`` devuelve un context manager activo durante todas las rondas
+    :param tolerance: Empeoramiento relativo admitido por ``compare``
+    """
+    def register(func):
+        _cases[name] = BenchmarkCase(name, func, setup, wrap, rounds, tolerance)
+        return func
+    return register
+
+
+def get_benchmarks(pattern=None):
+    """Casos registrados cuyo nombre contiene ``pattern`` (expresión regular)."""
+    return [case for name, case in _cases.items() if pattern is None or re.search(pattern, name)]
+
+
+def _peak_kib(case, ctx):
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOC_ROUNDS):
+            arg = case.setup(ctx) if case.setup else None
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            case.func(ctx, arg)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return float(np.median(peaks)) / 1024
+
+
+def measure(case, ctx, rounds=None, warmup=DEFAULT_WARMUP):
+    """
+    Ejecuta un caso y resume sus tiempos.
+    :param rounds: Rondas cronometradas (por defecto las del caso)
+    :return: BenchmarkResult (tiempos en microsegundos)
+    """
+    rounds = rounds or case.rounds
+    timings = np.empty(rounds, dtype=np.float64)
+    with (case.wrap(ctx) if case.wrap else nullcontext()):
+        for _ in range(warmup):
+            case.func(ctx, case.setup(ctx) if case.setup else None)
+        for i in range(rounds):
+            arg = case.setup(ctx) if case.setup else None
+            start = time.perf_counter_ns()
+            case.func(ctx, arg)
+            timings[i] = (time.perf_counter_ns() - start) / 1000
+        peak_kib = _peak_kib(case, ctx)
+    mean = float(timings.mean())
+    return BenchmarkResult(
+        name=case.name,
+        rounds=rounds,
+        ops_per_sec=1e6 / mean if mean else float('inf'),
+        mean_us=mean,
+        p50_us=float(np.percentile(timings, 50)),
+        p99_us=float(np.percentile(timings, 99)),
+        peak_kib=peak_kib,
+    )
+
+
+def measure_median(case, ctx, rounds=None, repeats=DEFAULT_REPEATS):
+    """
+    Mide un caso ``repeats`` veces.
+    :return: BenchmarkResult de la medición con el p50 mediano
+    """
+    results = sorted((measure(case, ctx, rounds=rounds) for _ in range(max(1, repeats))),
+                     key=lambda result: result.p50_us)
+    return results[len(results) // 2]
+
+
+def run_benchmarks(ctx, pattern=None, rounds=None, repeats=DEFAULT_REPEATS):
+    """Mide todos los casos seleccionados con el mismo contexto."""
+    return [measure_median(case, ctx, rounds=rounds, repeats=repeats) for case in get_benchmarks(pattern)]
+
+
+def save_results(results, path):
+    """Guarda los resultados en JSON junto con la plataforma de la corrida."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'metadata': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': {result.name: result._asdict() for result in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+    return path
+
+
+def load_results(path):
+    """:return: Diccionario nombre -> métricas de una corrida guardada"""
+    return json.loads(Path(path).read_text())['results']
+
+
+def compare(results, baseline, tolerance=None, min_delta=None):
+    """
+    Contrasta una corrida con la referencia.
+    :param baseline: Diccionario de ``load_results``
+    :param tolerance: Tolerancia común; por defecto la de cada caso
+    :param min_delta: Empeoramiento absoluto mínimo por métrica; por defecto ``MIN_DELTA``
+    :return: Lista de Regression (vacía si no hay regresiones)
+    """
+    min_delta = MIN_DELTA if min_delta is None else min_delta
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        case = _cases.get(result.name)
+        limit = 1 + (tolerance if tolerance is not None else case.tolerance if case else DEFAULT_TOLERANCE)
+        for metric in GATED_METRICS:
+            before, after = reference.get(metric), getattr(result, metric)
+            if before and after > before * limit and after - before >= min_delta.get(metric, 0):
+                regressions.append(Regression(result.name, metric, before, after, after / before))
+    return regressions
+
+
+def format_table(results, baseline=None):
+    """Tabla de texto con las métricas y, si hay referencia, la variación del p50."""
+    header = f"{'benchmark':<32}{'ops/s':>12}{'p50 µs':>12}{'p99 µs':>12}{'peak KiB':>11}"
+    lines = [header + ('  Δp50' if baseline else ''), '-' * (len(header) + (6 if baseline else 0))]
+    for r in results:
+        line = f"{r.name:<32}{r.ops_per_sec:>12.1f}{r.p50_us:>12.1f}{r.p99_us:>12.1f}{r.peak_kib:>11.1f}"
+        reference = (baseline or {}).get(r.name)
+        if reference and reference.get('p50_us'):
+            line += f"  {(r.p50_us / reference['p50_us'] - 1) * 100:+.0f}%"
+        lines.append(line)
+    return '\n'.join(lines)
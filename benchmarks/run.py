@@ -0,0 +1,71 @@
+"""
+Ejecuta los benchmarks de los caminos calientes.
+
+    python -m benchmarks.run                      # medir y mostrar la tabla
+    python -m benchmarks.run --compare            # contrastar con benchmarks/baseline.json
+    python -m benchmarks.run --save               # guardar en benchmarks/results/<fecha>.json
+    python -m benchmarks.run --save benchmarks/baseline.json   # actualizar la referencia
+
+Sale con código 1 si ``--compare`` detecta una regresión. La referencia depende de la
+máquina donde se generó, así que la comparación es una verificación local antes de
+fusionar cambios en los caminos calientes y no forma parte del CI: para usarla en otra
+máquina, generar primero su propia referencia con ``--save``.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from benchmarks.harness import DEFAULT_REPEATS, run_benchmarks, save_results, load_results, compare, format_table
+from src.core.logger import configure_logging
+
+BENCH_DIR = Path(__file__).parent
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+RESULTS_DIR = BENCH_DIR / 'results'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de ejecución y precios contra el simulador local")
+    parser.add_argument('-k', dest='pattern', help="Solo los casos cuyo nombre coincide con la expresión regular")
+    parser.add_argument('--rounds', type=int, help="Rondas por caso (por defecto las de cada caso)")
+    parser.add_argument('--save', nargs='?', const='', metavar='PATH',
+                        help="Guardar los resultados (por defecto en benchmarks/results/)")
+    parser.add_argument('--compare', nargs='?', const=str(BASELINE_FILE), metavar='PATH',
+                        help="Comparar con una corrida guardada (por defecto benchmarks/baseline.json)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help="Mediciones por caso; se informa la de p50 mediano")
+    parser.add_argument('--tolerance', type=float, help="Empeoramiento relativo admitido (ej. 0.5 = 50%%)")
+    parser.add_argument('--log-level', default='WARNING', help="Nivel de log durante la corrida")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(level=args.log_level)
+    from benchmarks.bench_hot_paths import HotPathContext
+
+    with HotPathContext() as ctx:
+        results = run_benchmarks(ctx, pattern=args.pattern, rounds=args.rounds, repeats=args.repeats)
+    if not results:
+        print("Ningún benchmark coincide con el filtro.", file=sys.stderr)
+        return 2
+
+    baseline = load_results(args.compare) if args.compare else None
+    print(format_table(results, baseline))
+
+    if args.save is not None:
+        path = args.save or RESULTS_DIR / time.strftime('%Y%m%d-%H%M%S.json')
+        print(f"\nResultados guardados en {save_results(results, path)}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for r in regressions:
+            print(f"REGRESIÓN {r.name}: {r.metric} {r.baseline:.1f} -> {r.current:.1f} (x{r.ratio:.2f})",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
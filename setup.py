@@ -56,6 +56,8 @@ setup(
     entry_points={
         "console_scripts": [
             "pro-hedge=ui.app:main",
+            "pro-hedge-daemon=service.daemon:main",
+            "pro-hedge-simulator=simulator.server:main",
         ],
     },
 ) 
\ No newline at end of file
@@ -10,6 +10,15 @@ __all__ = [
     "init_hyperliquid_clients",
     "verify_orders",
     "ejecutar_hyper_order",
+    "ejecutar_hedge",
+    "ejecutar_hedge_twap",
     "cerrar_posiciones",
-    "evaluate_funding_opportunity"
+    "close_all_hedges",
+    "evaluate_funding_opportunity",
+    "scan_funding_opportunities",
+    "sync_funding_history",
+    "get_funding_history",
+    "get_portfolio_snapshot",
+    "run_backtest",
+    "sweep_thresholds"
 ] 
\ No newline at end of file
@@ -1,109 +1,172 @@
 import requests
 import time
 import math
-import traceback
+import os
+import sys
+import threading
+import numpy as np
+from pathlib import Path
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from eth_account import Account
-from hyperliquid.utils import constants
 import hyperliquid.info as hyperliquid_info
 import hyperliquid.exchange as hyperliquid_exchange
 import requests
 import time
-from ratelimit import limits, sleep_and_retry
 
-# Configuración de límites de tasa y caché
-CALLS_PER_MINUTE = 1200
-PERIOD = 60
-CACHE_TTL = 60  # Tiempo de vida del caché en segundos
-api_cache = {}
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
 
-@sleep_and_retry
-@limits(calls=CALLS_PER_MINUTE, period=PERIOD)
-def api_request(url, method='GET', payload=None, retries=3, delay=5, use_cache=True):
+from core.hyperliquid_universe import get_hyperliquid_universe
+from core.binance_filters import get_binance_filter_index, start_binance_filter_index, DEFAULT_FILTERS
+from core.binance_user_stream import get_binance_order_tracker, start_binance_order_tracker, TERMINAL_STATUSES
+from core.http_client import request_sync, request_key, get_api_client, run_background
+from core.cache import TTLCache, cache_policy, FRESH, STALE, CACHE_MAX_SIZE
+from core.clock_sync import get_binance_clock, start_binance_clock_sync
+from core.binance_depth import get_binance_order_book, start_binance_order_book, vwap_for_quantity, SNAPSHOT_LIMIT
+from core.metrics import API_CACHE, observe_api
+from core.rate_limiter import install_binance_limiter, install_hyperliquid_limiter
+from core.endpoints import binance_futures_override, hyperliquid_api_url
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración de caché (los límites de tasa por peso viven en core.rate_limiter)
+CACHE_TTL = 60  # Tiempo de vida del caché por defecto en segundos
+CLOCK_SYNC_WAIT = 2  # Espera máxima de la primera sincronización del reloj (segundos)
+STREAM_REST_CHECK_POLLS = 5  # Con el user stream conectado, confirmar por REST cada poll_interval * N segundos
+api_cache = TTLCache(max_size=CACHE_MAX_SIZE, default_ttl=CACHE_TTL)
+_revalidating = set()  # Claves con revalidación en curso; se consultan desde hilos llamantes y el loop de fondo
+_revalidating_lock = threading.Lock()
+
+HYPERLIQUID_STREAMING_ENV = "HYPERLIQUID_STREAMING"  # Activa el websocket de mercado de Hyperliquid
+
+def set_api_cache(cache):
+    """
+    Reemplaza la capa de caché de ``api_request``.
+    :param cache: Objeto con la interfaz de TTLCache (lookup, set, clear, stats)
+    """
+    global api_cache
+    api_cache = cache
+
+def get_cache_stats():
+    """Contadores de la caché de ``api_request``."""
+    return api_cache.stats()
+
+def _revalidate(cache_key, url, method, payload, policy):
+    """Refresca en segundo plano una entrada servida vencida (una sola revalidación por clave)."""
+    with _revalidating_lock:
+        if cache_key in _revalidating:
+            return
+        _revalidating.add(cache_key)
+
+    async def refresh():
+        try:
+            data = await get_api_client().request(url, method=method, payload=payload)
+            api_cache.set(cache_key, data, policy.ttl, policy.stale_ttl)
+        except Exception as e:
+            logger.warning("Error al revalidar la caché", url=url, error=str(e))
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(cache_key)
+
+    run_background(refresh())
+
+def api_request(url, method='GET', payload=None, retries=3, delay=0.5, use_cache=True):
     """
     Realiza una solicitud HTTP con reintentos, control de límites de tasa y caché.
+    La solicitud viaja por el cliente asíncrono compartido (pool keep-alive por host).
+    El TTL de la caché depende del endpoint (ver ``core.cache.cache_policy``); los POST
+    de solo lectura a /info también se cachean.
     :param url: URL de la API
     :param method: Método HTTP ('GET' o 'POST')
     :param payload: Datos para solicitudes POST
     :param retries: Número de reintentos
-    :param delay: Retraso entre reintentos (segundos)
+    :param delay: Base del backoff exponencial con jitter entre reintentos (segundos)
     :param use_cache: Si se debe usar el caché para esta solicitud
     :return: Respuesta JSON
     """
-    cache_key = f"{method}:{url}:{str(payload)}"
-    current_time = time.time()
+    policy = cache_policy(method, url, payload) if use_cache else None
+    cache_key = request_key(method, url, payload)
 
     # Verificar caché si está habilitado
-    if use_cache and method.upper() == 'GET':
-        if cache_key in api_cache:
-            cached_data, timestamp = api_cache[cache_key]
-            if current_time - timestamp < CACHE_TTL:
-                return cached_data
+    if policy is not None:
+        state, cached_data = api_cache.lookup(cache_key)
+        API_CACHE.labels(state or 'miss').inc()
+        if state == FRESH:
+            return cached_data
+        if state == STALE:
+            _revalidate(cache_key, url, method, payload, policy)
+            return cached_data
 
     # Realizar solicitud con reintentos
-    for attempt in range(retries):
-        try:
-            if method.upper() == 'POST':
-                response = requests.post(url, json=payload, timeout=10)
-            else:
-                response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Actualizar caché si está habilitado
-            if use_cache and method.upper() == 'GET':
-                api_cache[cache_key] = (data, current_time)
-            
-            return data
-        except requests.exceptions.RequestException as e:
-            if attempt < retries - 1:
-                time.sleep(delay)
-                continue
-            raise Exception(f"Fallo tras {retries} intentos: {e}")
-        except Exception as e:
-            raise Exception(f"Error inesperado: {e}")
+    try:
+        with observe_api(url, method, payload):
+            data = request_sync(url, method=method, payload=payload, retries=retries, backoff_base=delay)
+    except Exception as e:
+        raise Exception(f"Error en la solicitud a {url}: {e}")
+
+    # Actualizar caché si está habilitado
+    if policy is not None:
+        api_cache.set(cache_key, data, policy.ttl, policy.stale_ttl)
+
+    return data
+
 def round_down_by_step(value, step):
     return math.floor(value / step) * step
 
 # Binance utilities
 def sync_binance_time():
-    try:
-        url = 'https://fapi.binance.com/fapi/v1/time'
-        response = requests.get(url)
-        response.raise_for_status()
-        server_time = response.json()['serverTime']
-        local_time = int(time.time() * 1000)
-        offset = server_time - local_time
-        Client.FUTURES_TIME_OFFSET = offset
-        # Agregar un pequeño retraso para asegurar la sincronización
-        time.sleep(0.5)
-        return offset
-    except Exception as e:
-        print(f"Error al sincronizar tiempo con Binance: {e}")
-        return None
+    """
+    Sincroniza el reloj con Binance de inmediato (varias muestras, sin esperas).
+    :return: Offset en ms o None si falló
+    """
+    return get_binance_clock().sync()
+
+def create_binance_client(api_key, api_secret):
+    """
+    Crea el cliente de Binance apuntando a ``BINANCE_FUTURES_URL`` si está definida
+    (ej. el simulador local); sin ella, a producción.
+    """
+    base_url = binance_futures_override()
+    if base_url is None:
+        return Client(api_key, api_secret)
+    client = Client(api_key, api_secret, ping=False)
+    client.API_URL = base_url + '/api'
+    client.FUTURES_URL = base_url + '/fapi'
+    return client
 
 def init_binance_client(api_key, api_secret, max_retries=3):
     for attempt in range(max_retries):
         try:
-            # Sincronizar tiempo primero
-            offset = sync_binance_time()
-            if offset is None:
-                raise Exception("No se pudo sincronizar el tiempo con Binance")
-                
-            # Inicializar el cliente con el offset de tiempo
-            client = Client(api_key, api_secret)
-            client.timestamp_offset = offset
+            client = install_binance_limiter(create_binance_client(api_key, api_secret))
+            # El offset lo mantiene el sincronizador en segundo plano; solo se espera
+            # la primera medición del proceso antes de la llamada firmada
+            clock = start_binance_clock_sync(client)
+            if not clock.wait_synced(CLOCK_SYNC_WAIT):
+                logger.warning("Reloj de Binance aún sin sincronizar", timeout=CLOCK_SYNC_WAIT)
             
             # Verificar conectividad
             client.get_account()
-            print("✅ Cliente de Binance inicializado correctamente")
+            # Construir el índice de filtros fuera del camino crítico de las órdenes
+            try:
+                start_binance_filter_index(client)
+            except Exception as e:
+                logger.warning("No se pudo construir el índice de filtros de Binance", error=str(e))
+            # Seguimiento de llenados vía user data stream (el polling REST queda como respaldo)
+            try:
+                start_binance_order_tracker(client)
+            except Exception as e:
+                logger.warning("No se pudo iniciar el user data stream de Binance", error=str(e))
+            logger.info("Cliente de Binance inicializado correctamente")
             return client
         except Exception as e:
             if attempt == max_retries - 1:
-                print(f"Fallo al inicializar el cliente de Binance después de {max_retries} intentos: {e}")
+                logger.error("Fallo al inicializar el cliente de Binance", attempts=max_retries, error=str(e))
                 return None
-            print(f"Intento {attempt + 1} fallido, reintentando...")
+            logger.warning("Intento fallido al inicializar el cliente de Binance; reintentando", attempt=attempt + 1, error=str(e))
             time.sleep(2 ** attempt)  # Backoff exponencial
 
 def check_binance_api(client):
@@ -111,45 +174,96 @@ def check_binance_api(client):
         client.get_account()
         return True
     except Exception as e:
-        print(f"Fallo en la verificación de la API de Binance: {e}")
+        logger.error("Fallo en la verificación de la API de Binance", error=str(e))
         return False
 
 def get_binance_filters(client, symbol):
     try:
-        info = client.futures_exchange_info()
-        for s in info['symbols']:
-            if s['symbol'] == symbol:
-                filters = {}
-                for f in s['filters']:
-                    if f['filterType'] == 'PRICE_FILTER':
-                        filters['tickSize'] = float(f['tickSize'])
-                    if f['filterType'] == 'LOT_SIZE':
-                        filters['stepSize'] = float(f['stepSize'])
-                return filters
-        return {'tickSize': 0.01, 'stepSize': 0.001}
+        index = get_binance_filter_index()
+        if not index.loaded:
+            index.refresh(client)
+        filters = index.get(symbol)
+        if filters:
+            return filters
+        return dict(DEFAULT_FILTERS)
     except:
-        return {'tickSize': 0.01, 'stepSize': 0.001}
+        return dict(DEFAULT_FILTERS)
 
 def round_by_step(value, step):
     return round(round(value / step) * step, 8)
 
 def get_binance_best_price(client, symbol, side):
+    """
+    Mejor precio pasivo de Binance: bid para BUY, ask para SELL.
+    Lee el libro local (diff-depth) si está sincronizado y fresco; si no, consulta
+    el libro por REST y arranca el libro local para las siguientes llamadas.
+    """
+    book = get_binance_order_book(symbol)
+    if book is not None and book.is_fresh():
+        bid, ask = book.best_bid_ask()
+        best_price = bid if side == 'BUY' else ask
+        if best_price is not None:
+            return best_price
+    try:
+        if book is None:
+            start_binance_order_book(client, symbol)
+    except Exception as e:
+        logger.warning("No se pudo iniciar el libro local de Binance", symbol=symbol, error=str(e))
     try:
         order_book = client.futures_order_book(symbol=symbol, limit=5)
         best_price = float(order_book['bids'][0][0]) if side == 'BUY' else float(order_book['asks'][0][0])
         return best_price
     except Exception as e:
-        print(f"Error al obtener el libro de órdenes de Binance: {e}")
+        logger.error("Error al obtener el libro de órdenes de Binance", symbol=symbol, error=str(e))
         raise Exception("No se puede obtener el mejor precio de Binance")
 
-def wait_for_binance_order(client, symbol, order_id, timeout=30):
+def get_binance_vwap(client, symbol, side, qty):
+    """
+    Precio medio de ejecutar ``qty`` agresivamente (BUY recorre asks, SELL bids).
+    :return: VWAP, o None si no hay profundidad suficiente
+    """
+    book = get_binance_order_book(symbol)
+    if book is not None and book.is_fresh():
+        return book.vwap(side, qty)
+    order_book = client.futures_order_book(symbol=symbol, limit=SNAPSHOT_LIMIT)
+    levels = np.array(order_book['asks'] if side == 'BUY' else order_book['bids'], dtype=np.float64).reshape(-1, 2)
+    return vwap_for_quantity(levels[:, 0], levels[:, 1], qty)
+
+def wait_for_binance_order(client, symbol, order_id, timeout=30, poll_interval=1):
+    """
+    Espera a que una orden de Binance alcance un estado terminal.
+    Usa el user data stream si está conectado, con una consulta REST cada
+    ``poll_interval * STREAM_REST_CHECK_POLLS`` segundos por si el stream perdió el evento,
+    y recurre al polling REST si no lo está o si se desconecta durante la espera.
+    :param poll_interval: Intervalo del polling REST de respaldo (segundos)
+    :return: Orden final
+    """
     start_time = time.time()
-    while time.time() - start_time < timeout:
+    tracker = get_binance_order_tracker(client)
+    if tracker is not None and tracker.connected:
+        check_every = poll_interval * STREAM_REST_CHECK_POLLS
+        while tracker.connected:
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                break
+            order = tracker.wait(order_id, min(check_every, remaining))
+            if order is not None:
+                return order
+            order = client.futures_get_order(symbol=symbol, orderId=order_id)
+            if order['status'] in TERMINAL_STATUSES:
+                logger.debug("Orden resuelta por REST con el stream conectado", order_id=order_id, status=order['status'])
+                return order
+    last_status = None
+    while True:
         order = client.futures_get_order(symbol=symbol, orderId=order_id)
-        print(f"Verificación de estado de la orden: {order}")
-        if order['status'] in ['FILLED', 'CANCELED', 'REJECTED', 'EXPIRED']:
+        if order['status'] != last_status:
+            logger.debug("Estado de la orden de Binance", order_id=order_id, status=order['status'])
+            last_status = order['status']
+        if order['status'] in TERMINAL_STATUSES:
             return order
-        time.sleep(1)
+        if time.time() - start_time >= timeout:
+            break
+        time.sleep(poll_interval)
     raise Exception(f"La orden {order_id} no se completó en {timeout} segundos")
 
 def get_binance_leverage(client, symbol):
@@ -209,37 +323,48 @@ def validate_hyperliquid_credentials(hyper_address, hyper_private_key):
     except Exception as e:
         return False, f"Error inesperado al validar las credenciales de Hyperliquid: {str(e)}"
 
-def init_hyperliquid_clients(hyper_private_key):
+def init_hyperliquid_clients(hyper_private_key, streaming=None):
+    """
+    Inicializa los clientes de Hyperliquid.
+    :param streaming: Activar el websocket de mercado (l2Book/allMids); por defecto HYPERLIQUID_STREAMING
+    :return: Tupla (wallet, hl_info, hl_exchange)
+    """
     try:
+        if streaming is None:
+            streaming = os.getenv(HYPERLIQUID_STREAMING_ENV, '').lower() in ('1', 'true', 'yes')
         wallet = Account.from_key(hyper_private_key)
-        hl_info = hyperliquid_info.Info(base_url=constants.MAINNET_API_URL, skip_ws=True)
+        base_url = hyperliquid_api_url()
+        hl_info = hyperliquid_info.Info(base_url=base_url, skip_ws=not streaming)
         hl_exchange = hyperliquid_exchange.Exchange(
             wallet=wallet,
-            base_url=constants.MAINNET_API_URL
+            base_url=base_url
         )
+        install_hyperliquid_limiter(hl_info)
+        install_hyperliquid_limiter(hl_exchange)
         return wallet, hl_info, hl_exchange
     except Exception as e:
-        print(f"Error al inicializar clientes de Hyperliquid: {e}")
+        logger.error("Error al inicializar clientes de Hyperliquid", error=str(e))
         return None, None, None
 
 def check_hyperliquid_api(hl_info, hyper_address):
     try:
-        meta = hl_info.meta()
-        if not meta:
-            print("Fallo al obtener metadatos de Hyperliquid.")
+        universe = get_hyperliquid_universe(hl_info)
+        universe.refresh(hl_info)
+        if not universe.names(hl_info):
+            logger.error("Fallo al obtener metadatos de Hyperliquid")
             return False
         user_state = hl_info.user_state(hyper_address)
         if not user_state:
-            print("Fallo al obtener el estado del usuario de Hyperliquid.")
+            logger.error("Fallo al obtener el estado del usuario de Hyperliquid")
             return False
         return True
     except Exception as e:
-        print(f"Fallo en la verificación de la API de Hyperliquid: {e}")
+        logger.error("Fallo en la verificación de la API de Hyperliquid", error=str(e))
         return False
 
 def get_hyperliquid_pairs(hl_info):
     try:
-        data = hl_info.meta()
-        return sorted([coin['name'] + 'USDT' for coin in data['universe']])
+        names = get_hyperliquid_universe(hl_info).names(hl_info)
+        return sorted([name + 'USDT' for name in names])
     except:
         return ['BTCUSDT']
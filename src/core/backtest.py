@@ -0,0 +1,177 @@
+"""
+Backtester vectorizado de arbitraje de funding Binance/Hyperliquid.
+
+Reproduce la regla de ``evaluate_funding_opportunity`` sobre series alineadas
+(tiempo × símbolo): abre cuando la diferencia entre la última tasa conocida de
+cada exchange supera el umbral y simula comisiones, slippage, pagos de funding
+y deriva de precios con operaciones de arrays de NumPy, sin bucles por fila.
+``sweep_thresholds`` evalúa una rejilla de umbrales en paralelo entre núcleos.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+HOUR_MS = 3600 * 1000
+DEFAULT_FEE_RATE = 0.0004  # Comisión por pata y operación (fracción del nocional)
+DEFAULT_SLIPPAGE = 0.0002  # Slippage por pata y operación (fracción del nocional)
+
+
+def forward_fill(values):
+    """
+    Rellena hacia delante los NaN de cada columna (última tasa conocida).
+    :param values: Array (T, N)
+    :return: Array (T, N); los NaN iniciales se mantienen
+    """
+    values = np.asarray(values, dtype=np.float64)
+    idx = np.where(np.isnan(values), 0, np.arange(values.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = values[idx, np.arange(values.shape[1])]
+    # Filas anteriores al primer valor de la columna
+    filled[np.isnan(values[0]) & (idx == 0)] = np.nan
+    return filled
+
+
+def positions_from_signal(diff, threshold, exit_threshold=None):
+    """
+    Posición objetivo por paso: +1 = Long Binance / Short Hyperliquid, -1 = al revés.
+    Misma regla que ``evaluate_funding_opportunity``: cuando |diff| > threshold abre
+    short en el exchange con la tasa más alta (el lado que cobra el spread), es decir,
+    en sentido contrario a la diferencia. Con ``exit_threshold`` la posición se
+    mantiene hasta que |diff| cae por debajo de él (histéresis).
+    :param diff: Diferencia de tasas Binance - Hyperliquid (T, N)
+    :return: Array (T, N) con valores -1, 0 o 1
+    """
+    exit_threshold = threshold if exit_threshold is None else exit_threshold
+    magnitude = np.abs(diff)
+    events = np.full(diff.shape, np.nan)
+    events[magnitude < exit_threshold] = 0.0
+    entries = magnitude > threshold
+    events[entries] = -np.sign(diff[entries])
+    events[np.isnan(diff)] = 0.0
+    return np.nan_to_num(forward_fill(events), nan=0.0)
+
+
+def run_backtest(binance_rate, hyperliquid_rate, threshold=0.001, binance_price=None, hyperliquid_price=None,
+                 notional=1.0, fee_rate=DEFAULT_FEE_RATE, slippage=DEFAULT_SLIPPAGE, exit_threshold=None):
+    """
+    Simula la estrategia sobre series alineadas en una rejilla temporal común.
+    :param binance_rate: Funding liquidado por Binance en cada paso, NaN si no hubo liquidación (T, N)
+    :param hyperliquid_rate: Funding liquidado por Hyperliquid en cada paso (T, N)
+    :param threshold: Umbral de apertura, igual que en evaluate_funding_opportunity
+    :param binance_price: Precios de Binance (T, N), opcional para la deriva de la base
+    :param hyperliquid_price: Precios de Hyperliquid (T, N), opcional
+    :param notional: Nocional por pata (USDT)
+    :param fee_rate: Comisión por pata y operación
+    :param slippage: Slippage por pata y operación
+    :param exit_threshold: Umbral de cierre (por defecto el de apertura)
+    :return: Diccionario con curvas de PnL (T, N) y totales por símbolo (N)
+    """
+    binance_rate = np.atleast_2d(np.asarray(binance_rate, dtype=np.float64).T).T
+    hyperliquid_rate = np.atleast_2d(np.asarray(hyperliquid_rate, dtype=np.float64).T).T
+
+    # Decisión con la última tasa conocida en t; la posición rige desde t+1
+    diff = forward_fill(binance_rate) - forward_fill(hyperliquid_rate)
+    target = positions_from_signal(diff, threshold, exit_threshold)
+    held = np.zeros_like(target)
+    held[1:] = target[:-1]
+
+    # Long en Binance paga su funding; short en Hyperliquid lo cobra (y viceversa)
+    funding_pnl = held * (np.nan_to_num(hyperliquid_rate) - np.nan_to_num(binance_rate)) * notional
+
+    price_pnl = np.zeros_like(held)
+    if binance_price is not None and hyperliquid_price is not None:
+        binance_price = np.asarray(binance_price, dtype=np.float64).reshape(held.shape)
+        hyperliquid_price = np.asarray(hyperliquid_price, dtype=np.float64).reshape(held.shape)
+        binance_ret = np.zeros_like(held)
+        hyperliquid_ret = np.zeros_like(held)
+        binance_ret[1:] = binance_price[1:] / binance_price[:-1] - 1
+        hyperliquid_ret[1:] = hyperliquid_price[1:] / hyperliquid_price[:-1] - 1
+        price_pnl = np.nan_to_num(held * (binance_ret - hyperliquid_ret) * notional)
+
+    # Cada unidad de cambio de posición mueve ambas patas
+    changes = np.abs(np.diff(held, axis=0, prepend=0.0, append=0.0))[1:]
+    turnover = changes * 2 * notional
+    costs = turnover * (fee_rate + slippage)
+
+    pnl = funding_pnl + price_pnl - costs
+    return {
+        'position': held,
+        'pnl': pnl,
+        'equity': np.cumsum(pnl, axis=0),
+        'total_pnl': pnl.sum(axis=0),
+        'funding_pnl': funding_pnl.sum(axis=0),
+        'price_pnl': price_pnl.sum(axis=0),
+        'costs': costs.sum(axis=0),
+        'turnover': turnover.sum(axis=0),
+        'trades': np.count_nonzero(changes, axis=0),
+        'time_in_market': np.count_nonzero(held, axis=0) / held.shape[0],
+    }
+
+
+def _summarize_threshold(threshold, binance_rate, hyperliquid_rate, kwargs):
+    result = run_backtest(binance_rate, hyperliquid_rate, threshold=threshold, **kwargs)
+    return {
+        'threshold': threshold,
+        'total_pnl': float(result['total_pnl'].sum()),
+        'funding_pnl': float(result['funding_pnl'].sum()),
+        'price_pnl': float(result['price_pnl'].sum()),
+        'costs': float(result['costs'].sum()),
+        'turnover': float(result['turnover'].sum()),
+        'trades': int(result['trades'].sum()),
+        'time_in_market': float(result['time_in_market'].mean()),
+        'max_drawdown': float(np.max(np.maximum.accumulate(result['equity'].sum(axis=1)) - result['equity'].sum(axis=1))),
+    }
+
+
+def sweep_thresholds(binance_rate, hyperliquid_rate, thresholds, max_workers=None, **kwargs):
+    """
+    Ejecuta el backtest para una rejilla de umbrales en paralelo (un proceso por núcleo).
+    :param thresholds: Iterable de umbrales a evaluar
+    :param max_workers: Procesos del pool (1 = en el proceso actual)
+    :param kwargs: Parámetros adicionales de ``run_backtest``
+    :return: DataFrame con una fila por umbral, ordenado por PnL total descendente
+    """
+    task = partial(_summarize_threshold, binance_rate=binance_rate, hyperliquid_rate=hyperliquid_rate, kwargs=kwargs)
+    thresholds = list(thresholds)
+    if max_workers == 1:
+        rows = [task(t) for t in thresholds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(task, thresholds))
+    return pd.DataFrame(rows).sort_values('total_pnl', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def load_funding_panel(symbols, start, end, store=None, step_ms=HOUR_MS):
+    """
+    Alinea el historial guardado de varios símbolos en una rejilla temporal común.
+    :param symbols: Símbolos de Binance (ej. ['BTCUSDT', 'ETHUSDT'])
+    :param start: Marca temporal inicial en ms
+    :param end: Marca temporal final en ms
+    :param store: FundingHistoryStore (por defecto el compartido)
+    :param step_ms: Paso de la rejilla (1 hora)
+    :return: Tupla (times, binance_rate, hyperliquid_rate) con arrays (T,) y (T, N)
+    """
+    if store is None:
+        from core.funding_history import get_funding_history_store
+        store = get_funding_history_store()
+    start = int(start) // step_ms * step_ms
+    times = np.arange(start, int(end) + 1, step_ms, dtype=np.int64)
+    panels = {}
+    for exchange in ('binance', 'hyperliquid'):
+        panel = np.full((len(times), len(symbols)), np.nan)
+        for col, symbol in enumerate(symbols):
+            name = symbol if exchange == 'binance' else symbol.replace('USDT', '')
+            series = store.query(exchange, name, start=start, end=end)
+            rows = (series.time - start) // step_ms
+            panel[rows, col] = series.rate
+        panels[exchange] = panel
+    return times, panels['binance'], panels['hyperliquid']
@@ -0,0 +1,292 @@
+"""
+Libro de órdenes local de Binance Futures a partir del stream diff-depth.
+
+Un hilo por símbolo mantiene el libro L2 siguiendo el procedimiento de Binance:
+snapshot REST + deltas ``depthUpdate`` verificados por secuencia (U/u/pu), con
+resincronización ante huecos. El snapshot de resincronización se descarga en un
+hilo aparte (uno a la vez y con backoff) mientras el stream sigue acumulando
+deltas, así que un hueco no bloquea la recepción. Cada actualización publica un
+``BookSnapshot`` inmutable que reemplaza al anterior con una sola asignación, de
+modo que las lecturas (mejor bid/ask, VWAP para una cantidad) no toman ningún lock.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from pathlib import Path
+import numpy as np
+from websockets.sync.client import connect
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.endpoints import binance_stream_url
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_LIMIT = 1000  # Niveles del snapshot REST inicial
+PUBLISHED_LEVELS = 100  # Niveles por lado expuestos en cada snapshot
+BOOK_MAX_AGE = 2.0  # Antigüedad máxima para usar el libro local (segundos)
+RECONNECT_DELAY = 5  # Espera antes de reconectar el stream (segundos)
+RESYNC_BACKOFF = 0.5  # Espera mínima entre snapshots de resincronización (segundos)
+RESYNC_BACKOFF_MAX = 30  # Techo del backoff tras snapshots fallidos o inservibles (segundos)
+MAX_BUFFERED_EVENTS = 5000  # Deltas retenidos mientras llega el snapshot (se descartan los más viejos)
+
+BookSnapshot = namedtuple('BookSnapshot', ['bid_px', 'bid_qty', 'ask_px', 'ask_qty', 'last_update_id', 'updated_at'])
+
+_EMPTY = np.empty(0, dtype=np.float64)
+EMPTY_BOOK = BookSnapshot(_EMPTY, _EMPTY, _EMPTY, _EMPTY, 0, 0.0)
+
+
+def vwap_for_quantity(prices, quantities, qty):
+    """
+    Precio medio ponderado de ejecutar ``qty`` recorriendo los niveles dados.
+    :param prices: Precios ordenados del mejor al peor
+    :param quantities: Cantidades de cada nivel
+    :param qty: Cantidad objetivo
+    :return: VWAP, o None si la profundidad no alcanza
+    """
+    if qty <= 0 or not len(prices):
+        return None
+    cum_qty = np.cumsum(quantities)
+    if cum_qty[-1] < qty:
+        return None
+    last = int(np.searchsorted(cum_qty, qty))
+    filled = quantities[:last + 1].copy()
+    filled[-1] = qty - (cum_qty[last - 1] if last else 0.0)
+    return float(np.dot(prices[:last + 1], filled) / qty)
+
+
+class BinanceOrderBook:
+    """
+    Libro L2 local de un símbolo de Binance Futures.
+    :param client: Cliente de Binance (para el snapshot REST)
+    :param symbol: Símbolo del par (ej. BTCUSDT)
+    :param ws_url: URL base del stream; por defecto ``binance_stream_url()``
+    """
+
+    def __init__(self, client, symbol, ws_url=None):
+        self.client = client
+        self.symbol = symbol.upper()
+        self.ws_url = (ws_url or binance_stream_url()).rstrip('/')
+        self.snapshot = EMPTY_BOOK
+        self.synced = False
+        self.resyncs = 0
+        self._bids = {}
+        self._asks = {}
+        self._last_update_id = None
+        self._buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self._lock = threading.Lock()  # Serializa la mutación del libro entre el stream y la resincronización
+        self._resync_thread = None
+        self._resync_delay = RESYNC_BACKOFF
+        self._next_resync = 0.0
+        self._stop = threading.Event()
+        self._ws = None
+        self._thread = None
+
+    # --- Lectura sin locks -------------------------------------------------
+
+    def age(self, now=None):
+        """Segundos desde la última actualización publicada."""
+        updated_at = self.snapshot.updated_at
+        return float('inf') if not updated_at else (time.time() if now is None else now) - updated_at
+
+    def is_fresh(self, max_age=BOOK_MAX_AGE):
+        return self.synced and self.age() <= max_age
+
+    def best_bid_ask(self):
+        """:return: Tupla (mejor bid, mejor ask); None en el lado vacío"""
+        book = self.snapshot
+        bid = float(book.bid_px[0]) if len(book.bid_px) else None
+        ask = float(book.ask_px[0]) if len(book.ask_px) else None
+        return bid, ask
+
+    def vwap(self, side, qty):
+        """
+        VWAP de una orden agresiva de ``qty``: BUY recorre asks, SELL recorre bids.
+        :return: Precio medio, o None si la profundidad publicada no alcanza
+        """
+        book = self.snapshot
+        if side == 'BUY':
+            return vwap_for_quantity(book.ask_px, book.ask_qty, qty)
+        return vwap_for_quantity(book.bid_px, book.bid_qty, qty)
+
+    # --- Mantenimiento del libro ------------------------------------------
+
+    def apply_snapshot(self, depth):
+        """
+        Carga un snapshot REST (``futures_order_book``) y reaplica los eventos en buffer.
+        :param depth: Respuesta con lastUpdateId, bids y asks
+        """
+        self._bids = {float(p): float(q) for p, q in depth['bids']}
+        self._asks = {float(p): float(q) for p, q in depth['asks']}
+        self._last_update_id = depth['lastUpdateId']
+        self.synced = False
+        buffered, self._buffer = self._buffer, deque(maxlen=MAX_BUFFERED_EVENTS)
+        for event in buffered:
+            if not self.apply_event(event):
+                return False
+        return True
+
+    def apply_event(self, event):
+        """
+        Aplica un evento depthUpdate respetando la secuencia de Binance Futures.
+        :param event: Evento decodificado (U, u, pu, b, a)
+        :return: False si se detectó un hueco y hace falta un nuevo snapshot
+        """
+        if self._last_update_id is None:
+            self._buffer.append(event)
+            return True
+        if event['u'] < self._last_update_id:
+            return True  # Anterior al snapshot
+        if not self.synced:
+            # El primer evento debe cubrir lastUpdateId del snapshot
+            if event['U'] > self._last_update_id:
+                return self._gap(event)
+        elif event['pu'] != self._last_update_id:
+            return self._gap(event)
+
+        for levels, side in ((event['b'], self._bids), (event['a'], self._asks)):
+            for p, q in levels:
+                price, qty = float(p), float(q)
+                if qty == 0:
+                    side.pop(price, None)
+                else:
+                    side[price] = qty
+        self._last_update_id = event['u']
+        self.synced = True
+        self._publish(event.get('E'))
+        return True
+
+    def _gap(self, event):
+        logger.warning("Hueco en el stream de profundidad de Binance; resincronizando", symbol=self.symbol,
+                       expected=self._last_update_id, first=event['U'], previous=event.get('pu'))
+        self.synced = False
+        self.resyncs += 1
+        self._last_update_id = None
+        self._buffer = deque([event], maxlen=MAX_BUFFERED_EVENTS)
+        return False
+
+    def _publish(self, event_time=None):
+        bids = sorted(self._bids.items(), reverse=True)[:PUBLISHED_LEVELS]
+        asks = sorted(self._asks.items())[:PUBLISHED_LEVELS]
+        bid = np.array(bids, dtype=np.float64).reshape(-1, 2)
+        ask = np.array(asks, dtype=np.float64).reshape(-1, 2)
+        # Una sola asignación: los lectores ven el snapshot anterior o el nuevo, nunca uno a medias
+        self.snapshot = BookSnapshot(
+            np.ascontiguousarray(bid[:, 0]), np.ascontiguousarray(bid[:, 1]),
+            np.ascontiguousarray(ask[:, 0]), np.ascontiguousarray(ask[:, 1]),
+            self._last_update_id, time.time(),
+        )
+
+    def resync(self):
+        """Descarga un snapshot REST y reaplica los eventos en buffer."""
+        depth = self.client.futures_order_book(symbol=self.symbol, limit=SNAPSHOT_LIMIT)
+        with self._lock:
+            return self.apply_snapshot(depth)
+
+    def request_resync(self):
+        """
+        Lanza la resincronización en un hilo aparte si no hay otra en curso y venció el backoff.
+        :return: True si se lanzó
+        """
+        with self._lock:
+            running = self._resync_thread is not None and self._resync_thread.is_alive()
+            if running or time.monotonic() < self._next_resync:
+                return False
+            self._next_resync = time.monotonic() + self._resync_delay
+            self._resync_thread = threading.Thread(target=self._resync_worker,
+                                                   name=f"binance-depth-resync-{self.symbol}", daemon=True)
+            self._resync_thread.start()
+        return True
+
+    def wait_resync(self, timeout=None):
+        """Espera a que termine la resincronización en curso, si la hay."""
+        thread = self._resync_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _resync_worker(self):
+        try:
+            synced = self.resync()
+        except Exception as e:
+            synced = False
+            logger.warning("Fallo al descargar el snapshot de profundidad de Binance", symbol=self.symbol,
+                           error=str(e), retry_in=self._resync_delay)
+        # Un snapshot fallido o anterior a los deltas en buffer alarga la espera del siguiente
+        self._resync_delay = RESYNC_BACKOFF if synced else min(self._resync_delay * 2, RESYNC_BACKOFF_MAX)
+
+    def handle_message(self, message):
+        """
+        Procesa un mensaje crudo del stream. Nunca bloquea en REST: sin libro sincronizado,
+        los deltas se acumulan mientras ``request_resync`` descarga el snapshot.
+        :param message: Texto JSON recibido
+        """
+        event = json.loads(message)
+        if event.get('e') != 'depthUpdate':
+            return
+        with self._lock:
+            needs_snapshot = not self.apply_event(event) or self._last_update_id is None
+        if needs_snapshot:
+            self.request_resync()
+
+    # --- Hilo del stream --------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"binance-depth-{self.symbol}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with connect(f"{self.ws_url}/{self.symbol.lower()}@depth@100ms") as ws:
+                    self._ws = ws
+                    for message in ws:
+                        self.handle_message(message)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning("Stream de profundidad de Binance desconectado", symbol=self.symbol, error=str(e))
+            finally:
+                self._ws = None
+                with self._lock:
+                    self.synced = False
+                    self._last_update_id = None
+                    self._buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+            self._stop.wait(RECONNECT_DELAY)
+
+
+_books = {}
+_books_lock = threading.Lock()
+
+
+def start_binance_order_book(client, symbol, ws_url=None):
+    """
+    Arranca (o reutiliza) el libro local de ``symbol``.
+    :return: Instancia de BinanceOrderBook
+    """
+    symbol = symbol.upper()
+    with _books_lock:
+        book = _books.get(symbol)
+        if book is None:
+            book = _books[symbol] = BinanceOrderBook(client, symbol, ws_url=ws_url)
+    return book.start()
+
+
+def get_binance_order_book(symbol):
+    """Libro local de ``symbol`` o None si no se ha arrancado."""
+    return _books.get(symbol.upper())
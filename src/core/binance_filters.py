@@ -0,0 +1,164 @@
+"""
+Índice de filtros de Binance Futures por símbolo.
+
+Descarga ``futures_exchange_info()`` una sola vez, lo indexa por símbolo y lo
+mantiene actualizado en segundo plano, de modo que colocar una orden no tenga
+que bajar el payload completo de exchangeInfo.
+"""
+
+import sys
+import threading
+import time
+from binance.exceptions import BinanceAPIException
+from pathlib import Path
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FILTER_REFRESH_INTERVAL = 3600  # Refresco periódico del índice (segundos)
+DEFAULT_FILTERS = {'tickSize': 0.01, 'stepSize': 0.001}
+
+# Códigos de error de Binance Futures que indican un rechazo por filtros
+FILTER_ERROR_CODES = {
+    -1013,  # Filter failure
+    -4003,  # QTY_LESS_THAN_ZERO
+    -4004,  # QTY_LESS_THAN_MIN_QTY
+    -4005,  # QTY_GREATER_THAN_MAX_QTY
+    -4014,  # PRICE_NOT_INCREASED_BY_TICK_SIZE
+    -4016,  # PRICE_HIGHER_THAN_MULTIPLIER_UP
+    -4023,  # QTY_NOT_INCREASED_BY_STEP_SIZE
+    -4024,  # PRICE_LOWER_THAN_MULTIPLIER_DOWN
+    -4164,  # MIN_NOTIONAL
+}
+
+
+def parse_symbol_filters(symbol_info):
+    """
+    Convierte la lista de filtros de un símbolo en un diccionario plano.
+    :param symbol_info: Entrada de exchangeInfo['symbols']
+    :return: Diccionario con tickSize, stepSize, minQty, maxQty, minNotional, bandas de precio
+    """
+    filters = {}
+    for f in symbol_info.get('filters', []):
+        filter_type = f.get('filterType')
+        if filter_type == 'PRICE_FILTER':
+            filters['tickSize'] = float(f['tickSize'])
+            filters['minPrice'] = float(f.get('minPrice', 0))
+            filters['maxPrice'] = float(f.get('maxPrice', 0))
+        elif filter_type == 'LOT_SIZE':
+            filters['stepSize'] = float(f['stepSize'])
+            filters['minQty'] = float(f.get('minQty', 0))
+            filters['maxQty'] = float(f.get('maxQty', 0))
+        elif filter_type == 'MARKET_LOT_SIZE':
+            filters['marketStepSize'] = float(f.get('stepSize', 0))
+            filters['marketMaxQty'] = float(f.get('maxQty', 0))
+        elif filter_type == 'MIN_NOTIONAL':
+            filters['minNotional'] = float(f.get('notional', f.get('minNotional', 0)))
+        elif filter_type == 'PERCENT_PRICE':
+            filters['multiplierUp'] = float(f.get('multiplierUp', 0))
+            filters['multiplierDown'] = float(f.get('multiplierDown', 0))
+    return filters
+
+
+def is_filter_rejection(error):
+    """
+    Indica si una excepción de Binance corresponde a un rechazo por filtros.
+    :param error: Excepción capturada
+    :return: True si el índice de filtros debería refrescarse
+    """
+    return isinstance(error, BinanceAPIException) and error.code in FILTER_ERROR_CODES
+
+
+class BinanceFilterIndex:
+    """
+    Índice de filtros por símbolo con refresco periódico en segundo plano.
+    :param interval: Intervalo de refresco (segundos)
+    """
+
+    def __init__(self, interval=FILTER_REFRESH_INTERVAL):
+        self.interval = interval
+        self.loaded_at = 0.0
+        self._filters = {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return bool(self.loaded_at)
+
+    def refresh(self, client):
+        """
+        Descarga exchangeInfo y reemplaza el índice completo.
+        :param client: Cliente de Binance
+        """
+        with self._lock:
+            info = client.futures_exchange_info()
+            self._filters = {s['symbol']: parse_symbol_filters(s) for s in info.get('symbols', [])}
+            self.loaded_at = time.time()
+        return self._filters
+
+    def get(self, symbol):
+        """
+        Devuelve los filtros de un símbolo o None si no está en el índice.
+        :param symbol: Símbolo del par (ej. BTCUSDT)
+        """
+        return self._filters.get(symbol)
+
+    def symbols(self):
+        return list(self._filters)
+
+    def start(self, client):
+        """
+        Construye el índice (si hace falta) y arranca el hilo de refresco.
+        :param client: Cliente de Binance usado para los refrescos
+        """
+        self._client = client
+        if not self.loaded:
+            self.refresh(client)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="binance-filter-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh(self._client)
+            except Exception as e:
+                logger.warning("Error al refrescar los filtros de Binance", error=str(e))
+
+
+_filter_index = BinanceFilterIndex()
+
+
+def get_binance_filter_index():
+    """Devuelve el índice de filtros compartido por el proceso."""
+    return _filter_index
+
+
+def start_binance_filter_index(client):
+    """
+    Construye el índice compartido y arranca su refresco en segundo plano.
+    :param client: Cliente de Binance
+    """
+    _filter_index.start(client)
+    return _filter_index
+
+
+def refresh_binance_filters(client):
+    """
+    Fuerza el refresco del índice (ej. tras un rechazo por filtros).
+    :param client: Cliente de Binance
+    """
+    return _filter_index.refresh(client)
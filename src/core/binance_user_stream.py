@@ -0,0 +1,216 @@
+"""
+Seguimiento de órdenes de Binance Futures vía user data stream.
+
+Un hilo mantiene la conexión al stream de usuario (listenKey con keepalive) y
+resuelve por orderId los eventos ``ORDER_TRADE_UPDATE``, de modo que esperar
+el llenado de una orden no requiere consultar ``futures_get_order`` en bucle.
+"""
+
+import sys
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from websockets.sync.client import connect
+from pathlib import Path
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.endpoints import binance_stream_url
+from core.logger import get_logger
+from exchanges.models import Fill
+
+logger = get_logger(__name__)
+
+LISTEN_KEY_KEEPALIVE = 30 * 60  # Binance expira el listenKey a los 60 minutos
+RECONNECT_DELAY = 5  # Espera antes de reconectar el stream (segundos)
+MAX_TRACKED_ORDERS = 1000  # Órdenes recientes retenidas para esperas tardías
+MAX_TRACKED_FILLS = 5000  # Llenados recientes retenidos
+TERMINAL_STATUSES = ('FILLED', 'CANCELED', 'REJECTED', 'EXPIRED')
+
+
+def parse_order_update(event):
+    """
+    Normaliza un evento ORDER_TRADE_UPDATE al formato de ``futures_get_order``.
+    :param event: Evento decodificado del user data stream
+    :return: Diccionario de orden
+    """
+    o = event['o']
+    return {
+        'symbol': o.get('s'),
+        'orderId': o.get('i'),
+        'clientOrderId': o.get('c'),
+        'side': o.get('S'),
+        'type': o.get('o'),
+        'status': o.get('X'),
+        'price': o.get('p'),
+        'avgPrice': o.get('ap'),
+        'origQty': o.get('q'),
+        'executedQty': o.get('z'),
+        'lastFilledQty': o.get('l'),
+        'lastFilledPrice': o.get('L'),
+        'commission': o.get('n'),
+        'commissionAsset': o.get('N'),
+        'isMaker': o.get('m'),
+        'updateTime': event.get('T', event.get('E')),
+    }
+
+
+class BinanceOrderTracker:
+    """
+    Rastreador de órdenes alimentado por el user data stream de Binance Futures.
+    :param client: Cliente de Binance (para obtener y renovar el listenKey)
+    :param ws_url: URL base del stream; por defecto ``binance_stream_url()``
+    :param keepalive_interval: Intervalo de renovación del listenKey (segundos)
+    """
+
+    def __init__(self, client, ws_url=None, keepalive_interval=LISTEN_KEY_KEEPALIVE):
+        self.client = client
+        self.ws_url = (ws_url or binance_stream_url()).rstrip('/')
+        self.keepalive_interval = keepalive_interval
+        self.listen_key = None
+        self.connected = False
+        self.last_event_at = 0.0
+        self._orders = OrderedDict()
+        self._fills = deque(maxlen=MAX_TRACKED_FILLS)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._ws = None
+        self._threads = []
+
+    def start(self):
+        """Arranca los hilos del stream y del keepalive."""
+        if self._threads and any(t.is_alive() for t in self._threads):
+            return self
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run_stream, name="binance-user-stream", daemon=True),
+            threading.Thread(target=self._run_keepalive, name="binance-listen-key", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        with self._cond:
+            self.connected = False
+            self._cond.notify_all()
+
+    def wait_connected(self, timeout):
+        """Espera a que el stream esté conectado. :return: True si se conectó a tiempo"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.connected, timeout=timeout)
+
+    def handle_message(self, message):
+        """
+        Procesa un mensaje crudo del stream.
+        :param message: Texto JSON recibido
+        """
+        event = json.loads(message)
+        event_type = event.get('e')
+        self.last_event_at = time.time()
+        if event_type == 'ORDER_TRADE_UPDATE':
+            order = parse_order_update(event)
+            fill = Fill.from_binance_update(event)
+            if fill is not None:
+                self._fills.append(fill)
+            with self._cond:
+                self._orders[order['orderId']] = order
+                self._orders.move_to_end(order['orderId'])
+                while len(self._orders) > MAX_TRACKED_ORDERS:
+                    self._orders.popitem(last=False)
+                self._cond.notify_all()
+        elif event_type == 'listenKeyExpired':
+            logger.info("listenKey de Binance expirado; reconectando el user data stream")
+            ws = self._ws
+            if ws is not None:
+                ws.close()
+
+    def get(self, order_id):
+        """Último estado conocido de una orden o None."""
+        return self._orders.get(order_id)
+
+    def fills(self, order_id=None):
+        """Llenados recientes (Fill), opcionalmente de una sola orden."""
+        return [f for f in list(self._fills) if order_id is None or f.order_id == order_id]
+
+    def wait(self, order_id, timeout):
+        """
+        Espera a que una orden alcance un estado terminal.
+        :param order_id: orderId de Binance
+        :param timeout: Tiempo máximo de espera (segundos)
+        :return: Orden final, o None si se agotó el tiempo o el stream se desconectó
+        """
+        def resolved():
+            order = self._orders.get(order_id)
+            return (order is not None and order['status'] in TERMINAL_STATUSES) or not self.connected
+
+        with self._cond:
+            self._cond.wait_for(resolved, timeout=timeout)
+            order = self._orders.get(order_id)
+        if order is not None and order['status'] in TERMINAL_STATUSES:
+            return order
+        return None
+
+    def _run_stream(self):
+        while not self._stop.is_set():
+            try:
+                self.listen_key = self.client.futures_stream_get_listen_key()
+                with connect(f"{self.ws_url}/{self.listen_key}") as ws:
+                    self._ws = ws
+                    with self._cond:
+                        self.connected = True
+                        self._cond.notify_all()
+                    for message in ws:
+                        self.handle_message(message)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning("User data stream de Binance desconectado", error=str(e))
+            finally:
+                self._ws = None
+                with self._cond:
+                    self.connected = False
+                    self._cond.notify_all()
+            self._stop.wait(RECONNECT_DELAY)
+
+    def _run_keepalive(self):
+        while not self._stop.wait(self.keepalive_interval):
+            if not self.listen_key:
+                continue
+            try:
+                self.client.futures_stream_keepalive(listenKey=self.listen_key)
+            except Exception as e:
+                logger.warning("Error al renovar el listenKey de Binance", error=str(e))
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def start_binance_order_tracker(client, ws_url=None):
+    """
+    Arranca (o reutiliza) el rastreador de órdenes de la cuenta de ``client``.
+    :param client: Cliente de Binance
+    :param ws_url: URL base del user data stream; por defecto ``binance_stream_url()``
+    :return: Instancia de BinanceOrderTracker
+    """
+    key = getattr(client, 'API_KEY', None)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = BinanceOrderTracker(client, ws_url=ws_url)
+        else:
+            tracker.client = client
+    return tracker.start()
+
+
+def get_binance_order_tracker(client):
+    """Rastreador activo para la cuenta de ``client`` o None."""
+    return _trackers.get(getattr(client, 'API_KEY', None))
@@ -0,0 +1,136 @@
+"""
+Caché LRU con TTL para respuestas de API.
+
+``TTLCache`` es acotado en tamaño, seguro entre hilos y admite servir entradas
+vencidas durante una ventana de revalidación (stale-while-revalidate). Las
+políticas por endpoint (``cache_policy``) definen el TTL de cada tipo de
+consulta, incluidos los POST de solo lectura a ``/info`` de Hyperliquid.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit, parse_qs
+
+CACHE_MAX_SIZE = 1024  # Entradas máximas antes de expulsar por LRU
+DEFAULT_TTL = 60  # TTL por defecto para GET sin política específica (segundos)
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+CachePolicy = namedtuple('CachePolicy', ['ttl', 'stale_ttl'])
+
+# TTL por tipo de consulta /info de Hyperliquid: (ttl, ventana stale)
+HYPERLIQUID_INFO_TTLS = {
+    'metaAndAssetCtxs': CachePolicy(1, 2),
+    'allMids': CachePolicy(1, 1),
+    'l2Book': CachePolicy(0.5, 0),
+    'meta': CachePolicy(300, 300),
+    'fundingHistory': CachePolicy(8 * 3600, 0),
+}
+
+# TTL por ruta de Binance Futures
+BINANCE_TTLS = {
+    '/fapi/v1/premiumIndex': CachePolicy(1, 2),
+    '/fapi/v1/fundingInfo': CachePolicy(3600, 600),  # Intervalos y topes: cambian con poca frecuencia
+    '/fapi/v1/exchangeInfo': CachePolicy(3600, 600),
+    '/fapi/v1/time': None,  # Nunca cachear la hora del servidor
+}
+BINANCE_FUNDING_HISTORY_TTL = CachePolicy(8 * 3600, 0)  # fundingRate con startTime: registros cerrados
+
+
+def cache_policy(method, url, payload=None):
+    """
+    Determina si una solicitud es cacheable y con qué TTL.
+    :param method: Método HTTP
+    :param url: URL de la API
+    :param payload: Datos JSON de la solicitud
+    :return: CachePolicy o None si no debe cachearse
+    """
+    parts = urlsplit(url)
+    if method.upper() == 'POST':
+        # Solo las consultas a /info son de lectura; /exchange envía órdenes
+        if not parts.path.endswith('/info') or not isinstance(payload, dict):
+            return None
+        policy = HYPERLIQUID_INFO_TTLS.get(payload.get('type'))
+        return policy if policy is not None and policy.ttl > 0 else None
+    if parts.path in BINANCE_TTLS:
+        return BINANCE_TTLS[parts.path]
+    if parts.path == '/fapi/v1/fundingRate' and 'startTime' in parse_qs(parts.query):
+        return BINANCE_FUNDING_HISTORY_TTL
+    return CachePolicy(DEFAULT_TTL, 0)
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con TTL por entrada y ventana stale-while-revalidate.
+    :param max_size: Número máximo de entradas
+    :param default_ttl: TTL cuando ``set`` no recibe uno (segundos)
+    """
+
+    def __init__(self, max_size=CACHE_MAX_SIZE, default_ttl=DEFAULT_TTL):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def lookup(self, key, now=None):
+        """
+        Busca una entrada.
+        :return: Tupla (estado, valor) con estado FRESH, STALE o None
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, None
+            value, expires_at, stale_until = entry
+            if now < expires_at:
+                self._data.move_to_end(key)
+                self._stats['hits'] += 1
+                return FRESH, value
+            if now < stale_until:
+                self._data.move_to_end(key)
+                self._stats['stale_hits'] += 1
+                return STALE, value
+            del self._data[key]
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return None, None
+
+    def get(self, key, default=None):
+        """Valor fresco de una entrada o ``default``."""
+        state, value = self.lookup(key)
+        return value if state == FRESH else default
+
+    def set(self, key, value, ttl=None, stale_ttl=0, now=None):
+        """
+        Guarda una entrada, expulsando la menos usada si se supera ``max_size``.
+        :param ttl: Vida de la entrada (segundos)
+        :param stale_ttl: Ventana adicional en la que puede servirse vencida (segundos)
+        """
+        now = time.monotonic() if now is None else now
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, now + ttl, now + ttl + stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        """Contadores de aciertos, fallos, expulsiones y expiraciones."""
+        with self._lock:
+            return dict(self._stats, size=len(self._data), max_size=self.max_size)
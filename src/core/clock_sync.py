@@ -0,0 +1,167 @@
+"""
+Sincronización del reloj local con el servidor de Binance Futures.
+
+Un hilo toma varias muestras de ``/fapi/v1/time`` cada ``interval`` segundos,
+estima el offset al estilo NTP (punto medio del RTT, mediana de las muestras
+con menor RTT) y lo publica en ``timestamp_offset`` de los clientes asociados
+con una sola asignación. Así los procesos de larga duración no acumulan deriva
+ni errores -1021 y crear un cliente no requiere ningún ``sleep``.
+"""
+
+import statistics
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from binance.exceptions import BinanceAPIException
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.http_client import request_sync
+from core.endpoints import binance_futures_url
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+FUTURES_TIME_PATH = "/fapi/v1/time"
+CLOCK_SYNC_INTERVAL = 60  # Resincronización periódica (segundos)
+CLOCK_SAMPLES = 5  # Muestras por sincronización
+TIMESTAMP_ERROR_CODE = -1021  # Timestamp fuera de recvWindow
+
+
+def estimate_offset(samples):
+    """
+    Estima el offset del servidor respecto al reloj local.
+    :param samples: Lista de tuplas (t_envío_ms, hora_servidor_ms, t_recepción_ms)
+    :return: Tupla (offset_ms, rtt_ms) usando la mitad de muestras con menor RTT
+    """
+    measured = sorted((t1 - t0, server - (t0 + t1) / 2) for t0, server, t1 in samples)
+    best = measured[:max(1, (len(measured) + 1) // 2)]
+    return statistics.median(o for _, o in best), statistics.median(r for r, _ in best)
+
+
+def is_timestamp_error(error):
+    """Indica si una excepción de Binance se debe al desfase del reloj (-1021)."""
+    return isinstance(error, BinanceAPIException) and error.code == TIMESTAMP_ERROR_CODE
+
+
+class BinanceClockSync:
+    """
+    Estimador de offset en segundo plano para los clientes de Binance.
+    :param url: Endpoint de hora del servidor; por defecto el de ``binance_futures_url()``
+    :param interval: Intervalo de resincronización (segundos)
+    :param samples: Muestras por sincronización
+    """
+
+    def __init__(self, url=None, interval=CLOCK_SYNC_INTERVAL, samples=CLOCK_SAMPLES):
+        self.url = url
+        self.interval = interval
+        self.samples = samples
+        self.offset = None
+        self.rtt = None
+        self.drift = 0.0  # ms de deriva por hora entre las dos últimas sincronizaciones
+        self.last_sync = 0.0
+        self.sync_count = 0
+        self.failures = 0
+        self._clients = weakref.WeakSet()
+        self._synced = threading.Event()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """Una muestra (t_envío, hora_servidor, t_recepción) en ms."""
+        t0 = time.time() * 1000
+        server_time = request_sync(self.url or binance_futures_url(FUTURES_TIME_PATH), retries=1)['serverTime']
+        t1 = time.time() * 1000
+        return t0, server_time, t1
+
+    def sync(self):
+        """
+        Mide el offset y lo publica en los clientes asociados.
+        :return: Offset en ms (entero), o None si fallaron todas las muestras
+        """
+        with self._lock:
+            samples = []
+            for _ in range(self.samples):
+                try:
+                    samples.append(self.sample())
+                except Exception as e:
+                    logger.debug("Muestra de hora de Binance fallida", error=str(e))
+            if not samples:
+                self.failures += 1
+                logger.error("Error al sincronizar tiempo con Binance", failures=self.failures)
+                return None
+
+            offset, rtt = estimate_offset(samples)
+            now = time.time()
+            if self.offset is not None and self.last_sync:
+                self.drift = (offset - self.offset) / ((now - self.last_sync) / 3600)
+            self.offset, self.rtt, self.last_sync = int(round(offset)), rtt, now
+            self.sync_count += 1
+            for client in list(self._clients):
+                client.timestamp_offset = self.offset
+            self._synced.set()
+            logger.debug("Reloj de Binance sincronizado", offset_ms=self.offset, rtt_ms=rtt, drift_ms_per_hour=self.drift)
+            return self.offset
+
+    def attach(self, client):
+        """Asocia un cliente; recibe el offset actual y los siguientes."""
+        self._clients.add(client)
+        if self.offset is not None:
+            client.timestamp_offset = self.offset
+        return client
+
+    def wait_synced(self, timeout):
+        """Espera la primera sincronización. :return: True si ya hay offset"""
+        return self._synced.wait(timeout)
+
+    def metrics(self):
+        """Offset, RTT, deriva y contadores de la última sincronización."""
+        return {
+            'offset_ms': self.offset,
+            'rtt_ms': self.rtt,
+            'drift_ms_per_hour': self.drift,
+            'last_sync': self.last_sync,
+            'age': time.time() - self.last_sync if self.last_sync else None,
+            'sync_count': self.sync_count,
+            'failures': self.failures,
+            'clients': len(self._clients),
+        }
+
+    def start(self):
+        """Arranca el hilo de sincronización (la primera medición es inmediata)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="binance-clock-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(self.interval)
+
+
+_clock = BinanceClockSync()
+
+
+def get_binance_clock():
+    """Devuelve el sincronizador de reloj compartido por el proceso."""
+    return _clock
+
+
+def start_binance_clock_sync(client):
+    """
+    Asocia ``client`` al sincronizador compartido y lo arranca si hace falta.
+    :param client: Cliente de Binance
+    """
+    _clock.attach(client)
+    return _clock.start()
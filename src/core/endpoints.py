@@ -0,0 +1,49 @@
+"""
+URLs base de los exchanges.
+
+Por defecto apuntan a producción; las variables de entorno permiten dirigir
+todos los clientes (SDKs, ``api_request`` y websockets) a otro servidor, por
+ejemplo al simulador local (``simulator.server``). Se leen en cada llamada, de
+modo que cambiar el entorno no requiere reimportar los módulos.
+"""
+
+import os
+
+BINANCE_FUTURES_URL_ENV = "BINANCE_FUTURES_URL"
+BINANCE_STREAM_URL_ENV = "BINANCE_STREAM_URL"
+HYPERLIQUID_API_URL_ENV = "HYPERLIQUID_API_URL"
+
+DEFAULT_BINANCE_FUTURES_URL = "https://fapi.binance.com"
+DEFAULT_BINANCE_STREAM_URL = "wss://fstream.binance.com/ws"
+DEFAULT_HYPERLIQUID_API_URL = "https://api.hyperliquid.xyz"
+
+
+def _env_url(name, default):
+    return (os.getenv(name) or default).rstrip('/')
+
+
+def binance_futures_url(path=''):
+    """
+    URL de la API REST de Binance Futures.
+    :param path: Ruta a concatenar (ej. '/fapi/v1/time')
+    """
+    return _env_url(BINANCE_FUTURES_URL_ENV, DEFAULT_BINANCE_FUTURES_URL) + path
+
+
+def binance_stream_url():
+    """URL base de los streams de Binance Futures (user data y profundidad)."""
+    return _env_url(BINANCE_STREAM_URL_ENV, DEFAULT_BINANCE_STREAM_URL)
+
+
+def hyperliquid_api_url(path=''):
+    """
+    URL de la API de Hyperliquid (el SDK deriva de ella la del websocket).
+    :param path: Ruta a concatenar (ej. '/info')
+    """
+    return _env_url(HYPERLIQUID_API_URL_ENV, DEFAULT_HYPERLIQUID_API_URL) + path
+
+
+def binance_futures_override():
+    """URL de Binance Futures configurada por entorno, o None si se usa producción."""
+    url = os.getenv(BINANCE_FUTURES_URL_ENV)
+    return url.rstrip('/') if url else None
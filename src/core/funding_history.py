@@ -0,0 +1,186 @@
+"""
+Almacén local del historial de funding con sincronización incremental.
+
+Cada par exchange/símbolo vive en su propio archivo SQLite con la marca
+temporal como clave primaria. ``sync`` solo descarga los registros posteriores
+al último guardado, y ``query`` devuelve rangos como arrays de NumPy para que
+el análisis y los backtests no vuelvan a bajar meses de datos.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import closing
+from pathlib import Path
+import numpy as np
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from exchanges.binance_operations import get_funding_rate as binance_funding_rate
+from exchanges.hyperliquid_operations import get_funding_history as hyperliquid_funding_history
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DATA_DIR_ENV = "PRO_HEDGE_DATA_DIR"
+DEFAULT_DATA_DIR = Path("data") / "funding"
+DEFAULT_BACKFILL_DAYS = 90  # Historial inicial cuando el almacén está vacío
+BINANCE_PAGE_SIZE = 1000  # Máximo de registros por llamada a fundingRate
+HYPERLIQUID_PAGE_SIZE = 500  # Máximo de registros por llamada a fundingHistory
+EXCHANGES = ('binance', 'hyperliquid')
+
+FundingSeries = namedtuple('FundingSeries', ['time', 'rate'])
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS funding (time INTEGER PRIMARY KEY, rate REAL NOT NULL)"
+
+
+def _binance_records(page):
+    return [(int(r['fundingTime']), float(r['fundingRate'])) for r in page]
+
+
+def _hyperliquid_records(page):
+    return [(int(r['time']), float(r['fundingRate'])) for r in page]
+
+
+class FundingHistoryStore:
+    """
+    Historial de funding persistido en SQLite, un archivo por exchange/símbolo.
+    :param base_dir: Directorio de los archivos (por defecto PRO_HEDGE_DATA_DIR o data/funding)
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = Path(base_dir or os.getenv(DATA_DIR_ENV) or DEFAULT_DATA_DIR)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def path(self, exchange, symbol):
+        """Ruta del archivo SQLite de un exchange/símbolo."""
+        if exchange not in EXCHANGES:
+            raise ValueError(f"Exchange no soportado: {exchange}")
+        safe_symbol = re.sub(r'[^A-Za-z0-9]', '_', symbol)
+        return self.base_dir / f"{exchange}_{safe_symbol}.sqlite"
+
+    def _lock(self, path):
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _connect(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute(_SCHEMA)
+        return conn
+
+    def last_timestamp(self, exchange, symbol):
+        """Última marca temporal guardada (ms) o None si no hay datos."""
+        path = self.path(exchange, symbol)
+        if not path.exists():
+            return None
+        with closing(self._connect(path)) as conn:
+            return conn.execute("SELECT MAX(time) FROM funding").fetchone()[0]
+
+    def append(self, exchange, symbol, records):
+        """
+        Guarda registros ignorando los ya existentes.
+        :param records: Iterable de tuplas (time_ms, rate)
+        :return: Número de registros nuevos
+        """
+        records = list(records)
+        if not records:
+            return 0
+        path = self.path(exchange, symbol)
+        with self._lock(path), closing(self._connect(path)) as conn:
+            with conn:
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO funding (time, rate) VALUES (?, ?)", records)
+                return conn.total_changes - before
+
+    def query(self, exchange, symbol, start=None, end=None):
+        """
+        Devuelve el historial de un rango como arrays de NumPy.
+        :param start: Marca temporal inicial en ms (inclusive)
+        :param end: Marca temporal final en ms (inclusive)
+        :return: FundingSeries(time=int64[ms], rate=float64), ordenado por tiempo
+        """
+        path = self.path(exchange, symbol)
+        if not path.exists():
+            return FundingSeries(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        start = -1 if start is None else int(start)
+        end = sys.maxsize if end is None else int(end)
+        with closing(self._connect(path)) as conn:
+            rows = conn.execute(
+                "SELECT time, rate FROM funding WHERE time BETWEEN ? AND ? ORDER BY time", (start, end)
+            ).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        return FundingSeries(data[:, 0].astype(np.int64), np.ascontiguousarray(data[:, 1]))
+
+    def sync(self, exchange, symbol, since=None, now=None):
+        """
+        Descarga solo los registros posteriores al último guardado.
+        :param exchange: 'binance' (símbolo BTCUSDT) o 'hyperliquid' (coin BTC)
+        :param since: Inicio en ms si el almacén está vacío (por defecto DEFAULT_BACKFILL_DAYS atrás)
+        :param now: Marca temporal actual en ms (para pruebas)
+        :return: Número de registros nuevos
+        """
+        now = int(time.time() * 1000) if now is None else now
+        last = self.last_timestamp(exchange, symbol)
+        if last is not None:
+            cursor = last + 1
+        elif since is not None:
+            cursor = int(since)
+        else:
+            cursor = now - DEFAULT_BACKFILL_DAYS * 24 * 3600 * 1000
+
+        added = 0
+        while cursor <= now:
+            # El último tramo cambia con cada pago de funding: sin caché
+            if exchange == 'binance':
+                page = binance_funding_rate(symbol, limit=BINANCE_PAGE_SIZE, start_time=cursor, use_cache=False)
+                records, page_size = _binance_records(page), BINANCE_PAGE_SIZE
+            else:
+                page = hyperliquid_funding_history(symbol, start_time=cursor, use_cache=False)
+                records, page_size = _hyperliquid_records(page), HYPERLIQUID_PAGE_SIZE
+            records = [r for r in records if r[0] >= cursor]
+            if not records:
+                break
+            added += self.append(exchange, symbol, records)
+            cursor = max(r[0] for r in records) + 1
+            if len(page) < page_size:
+                break
+        logger.debug("Historial de funding sincronizado", exchange=exchange, symbol=symbol, added=added)
+        return added
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_funding_history_store():
+    """Devuelve el almacén compartido por el proceso."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FundingHistoryStore()
+        return _store
+
+
+def sync_funding_history(exchange, symbol, since=None):
+    """
+    Sincroniza incrementalmente el historial de un exchange/símbolo.
+    :return: Número de registros nuevos
+    """
+    return get_funding_history_store().sync(exchange, symbol, since=since)
+
+
+def get_funding_history(exchange, symbol, start=None, end=None):
+    """
+    Historial guardado de un exchange/símbolo como arrays de NumPy.
+    :return: FundingSeries(time, rate)
+    """
+    return get_funding_history_store().query(exchange, symbol, start=start, end=end)
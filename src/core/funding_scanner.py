@@ -0,0 +1,136 @@
+"""
+Escáner de funding para todo el universo compartido Binance/Hyperliquid.
+
+Una llamada a ``premiumIndex`` (todos los símbolos de Binance) y otra a
+``metaAndAssetCtxs`` (todo el universo de Hyperliquid) alimentan una tabla
+vectorizada con spreads, rendimiento anualizado y próximos pagos de funding.
+``fundingInfo`` aporta el intervalo de funding de los símbolos de Binance que
+no liquidan cada 8 horas (4h, 1h).
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.api_utils import api_request
+from core.endpoints import binance_futures_url, hyperliquid_api_url
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+BINANCE_PREMIUM_INDEX_PATH = "/fapi/v1/premiumIndex"
+BINANCE_FUNDING_INFO_PATH = "/fapi/v1/fundingInfo"
+BINANCE_FUNDING_INTERVAL_HOURS = 8  # Intervalo por defecto; fundingInfo solo lista los símbolos con otro
+HYPERLIQUID_FUNDING_INTERVAL_HOURS = 1  # Hyperliquid liquida funding cada hora
+HOURS_PER_YEAR = 24 * 365
+LONG_BINANCE = "Abrir Long en Binance, Short en Hyperliquid"
+SHORT_BINANCE = "Abrir Short en Binance, Long en Hyperliquid"
+
+SCAN_COLUMNS = [
+    'symbol', 'coin', 'binance_rate', 'hyperliquid_rate', 'binance_hourly', 'hyperliquid_hourly',
+    'spread_hourly', 'annualized_yield', 'recommendation', 'binance_mark', 'hyperliquid_mark',
+    'basis', 'binance_next_funding', 'hyperliquid_next_funding', 'binance_interval_hours',
+]
+
+
+def funding_recommendation(spread):
+    """
+    Lado que cobra el spread: short en el venue con la tasa más alta (con funding positivo los
+    shorts cobran) y long en el otro.
+    :param spread: Tasa de Binance - tasa de Hyperliquid (escalar o array)
+    :return: LONG_BINANCE o SHORT_BINANCE (array del mismo tamaño si ``spread`` es un array)
+    """
+    return np.where(np.asarray(spread) > 0, SHORT_BINANCE, LONG_BINANCE)
+
+
+def _binance_frame(premium_index):
+    df = pd.DataFrame(premium_index, columns=['symbol', 'markPrice', 'lastFundingRate', 'nextFundingTime'])
+    df = df[df['symbol'].str.endswith('USDT')]
+    return pd.DataFrame({
+        'symbol': df['symbol'].to_numpy(),
+        'binance_rate': pd.to_numeric(df['lastFundingRate'], errors='coerce').to_numpy(),
+        'binance_mark': pd.to_numeric(df['markPrice'], errors='coerce').to_numpy(),
+        'binance_next_funding': pd.to_datetime(pd.to_numeric(df['nextFundingTime'], errors='coerce'), unit='ms', utc=True).to_numpy(),
+    })
+
+
+def binance_funding_intervals(symbols, funding_info):
+    """
+    Intervalo de funding en horas por símbolo de Binance.
+    :param symbols: Símbolos a resolver
+    :param funding_info: Respuesta de /fapi/v1/fundingInfo (puede ser None o vacía)
+    :return: Array de horas; BINANCE_FUNDING_INTERVAL_HOURS si el símbolo no figura o el dato no es válido
+    """
+    hours = {item.get('symbol'): item.get('fundingIntervalHours') for item in funding_info or []}
+    intervals = pd.to_numeric(pd.Series(symbols, dtype=object).map(hours), errors='coerce').to_numpy(dtype=np.float64)
+    return np.where(intervals > 0, intervals, BINANCE_FUNDING_INTERVAL_HOURS)
+
+
+def _hyperliquid_frame(meta_and_ctxs):
+    meta, asset_ctxs = meta_and_ctxs[0], meta_and_ctxs[1]
+    names = [asset['name'] for asset in meta.get('universe', [])][:len(asset_ctxs)]
+    ctxs = pd.DataFrame(asset_ctxs[:len(names)], columns=['funding', 'markPx'])
+    return pd.DataFrame({
+        'symbol': np.char.add(np.array(names, dtype=str), 'USDT') if names else np.array([], dtype=str),
+        'coin': names,
+        'hyperliquid_rate': pd.to_numeric(ctxs['funding'], errors='coerce').to_numpy(),
+        'hyperliquid_mark': pd.to_numeric(ctxs['markPx'], errors='coerce').to_numpy(),
+    })
+
+
+def build_funding_table(premium_index, meta_and_ctxs, min_spread=0.0, now=None, funding_info=None):
+    """
+    Une ambos universos por símbolo y calcula spreads normalizados por hora.
+    :param premium_index: Respuesta de /fapi/v1/premiumIndex (lista de símbolos)
+    :param meta_and_ctxs: Respuesta de metaAndAssetCtxs ([meta, asset_ctxs])
+    :param funding_info: Respuesta de /fapi/v1/fundingInfo; sin ella todos los símbolos liquidan cada 8 horas
+    :param min_spread: Spread horario absoluto mínimo para incluir un par
+    :param now: Marca temporal de referencia (pd.Timestamp UTC)
+    :return: DataFrame ordenado por rendimiento anualizado descendente
+    """
+    table = _binance_frame(premium_index).merge(_hyperliquid_frame(meta_and_ctxs), on='symbol', how='inner')
+    table = table.dropna(subset=['binance_rate', 'hyperliquid_rate'])
+
+    table['binance_interval_hours'] = binance_funding_intervals(table['symbol'].to_numpy(), funding_info)
+    binance_hourly = table['binance_rate'].to_numpy() / table['binance_interval_hours'].to_numpy()
+    hyperliquid_hourly = table['hyperliquid_rate'].to_numpy() / HYPERLIQUID_FUNDING_INTERVAL_HOURS
+    spread = binance_hourly - hyperliquid_hourly
+    table['binance_hourly'] = binance_hourly
+    table['hyperliquid_hourly'] = hyperliquid_hourly
+    table['spread_hourly'] = spread
+    table['annualized_yield'] = np.abs(spread) * HOURS_PER_YEAR
+    table['recommendation'] = funding_recommendation(spread)
+    table['basis'] = (table['binance_mark'].to_numpy() - table['hyperliquid_mark'].to_numpy()) / table['hyperliquid_mark'].to_numpy()
+    now = pd.Timestamp.now(tz='UTC') if now is None else now
+    table['hyperliquid_next_funding'] = now.floor('h') + pd.Timedelta(hours=HYPERLIQUID_FUNDING_INTERVAL_HOURS)
+
+    if min_spread:
+        table = table[np.abs(table['spread_hourly'].to_numpy()) >= min_spread]
+    return table.sort_values('annualized_yield', ascending=False, kind='stable')[SCAN_COLUMNS].reset_index(drop=True)
+
+
+def scan_funding_opportunities(min_spread=0.0):
+    """
+    Escanea todos los pares listados en ambos exchanges en una sola pasada.
+    :param min_spread: Spread horario absoluto mínimo (ej. 0.00001 = 0.001%/h)
+    :return: DataFrame con spreads, rendimiento anualizado y próximos pagos de funding
+    """
+    try:
+        premium_index = api_request(binance_futures_url(BINANCE_PREMIUM_INDEX_PATH))
+        meta_and_ctxs = api_request(hyperliquid_api_url('/info'), method='POST', payload={"type": "metaAndAssetCtxs"})
+        try:
+            funding_info = api_request(binance_futures_url(BINANCE_FUNDING_INFO_PATH))
+        except Exception as e:
+            # Sin intervalos por símbolo el escaneo sigue con el intervalo por defecto
+            logger.warning("No se pudo obtener fundingInfo de Binance", error=str(e))
+            funding_info = None
+        return build_funding_table(premium_index, meta_and_ctxs, min_spread=min_spread, funding_info=funding_info)
+    except Exception as e:
+        logger.error("Error al escanear oportunidades de funding", error=str(e))
+        return pd.DataFrame(columns=SCAN_COLUMNS)
@@ -0,0 +1,214 @@
+"""
+Cliente HTTP asíncrono con pool de conexiones para las APIs REST.
+
+``AsyncApiClient`` mantiene conexiones keep-alive por host, reintenta con
+backoff exponencial con jitter y agrupa llamadas idénticas en vuelo. Las
+funciones síncronas (``request_sync``) ejecutan las corrutinas en un event loop
+de fondo compartido, de modo que el código existente puede seguir llamando a
+``api_request`` sin cambios.
+
+aiohttp solo habla HTTP/1.1, así que no se negocia HTTP/2: el ahorro viene de
+reutilizar conexiones keep-alive (sin handshake TCP/TLS por llamada), no de
+multiplexar varias solicitudes sobre una sola conexión.
+"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+import aiohttp
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.metrics import API_RETRIES
+from core.rate_limiter import get_rate_limiter, request_weight
+
+DEFAULT_TIMEOUT = 10  # Timeout total por solicitud (segundos)
+MAX_CONNECTIONS_PER_HOST = 20
+KEEPALIVE_TIMEOUT = 60  # Vida de una conexión ociosa en el pool (segundos)
+BACKOFF_BASE = 0.5  # Base del backoff exponencial (segundos)
+BACKOFF_MAX = 10  # Techo del backoff (segundos)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Endpoints POST que solo leen datos y pueden agruparse o cachearse
+READ_ONLY_POST_PATHS = ('/info',)
+
+
+def is_read_only(method, url):
+    """
+    Indica si una solicitud es de solo lectura (GET o POST de consulta como /info de Hyperliquid).
+    """
+    if method.upper() == 'GET':
+        return True
+    return urlsplit(url).path.endswith(READ_ONLY_POST_PATHS)
+
+
+def request_key(method, url, payload=None):
+    """Clave canónica de una solicitud (payload serializado con claves ordenadas)."""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':')) if payload is not None else ''
+    return f"{method.upper()}:{url}:{body}"
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """
+    Retraso de reintento con backoff exponencial y jitter completo.
+    :param attempt: Número de intento fallido (desde 0)
+    :return: Segundos a esperar
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AsyncApiClient:
+    """
+    Cliente HTTP asíncrono con pool de conexiones y agrupación de solicitudes.
+    :param timeout: Timeout total por solicitud (segundos)
+    :param limit_per_host: Conexiones simultáneas máximas por host
+    :param backoff_base: Base del backoff exponencial (segundos)
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, limit_per_host=MAX_CONNECTIONS_PER_HOST, backoff_base=BACKOFF_BASE):
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.backoff_base = backoff_base
+        self._session = None
+        self._inflight = {}
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def request(self, url, method='GET', payload=None, retries=3, backoff_base=None, headers=None):
+        """
+        Realiza una solicitud HTTP y devuelve el JSON de la respuesta.
+        Las solicitudes de solo lectura idénticas en vuelo comparten una única llamada de red.
+        :param url: URL de la API
+        :param method: Método HTTP ('GET' o 'POST')
+        :param payload: Datos JSON para solicitudes POST
+        :param retries: Número de intentos
+        :param backoff_base: Base del backoff entre reintentos (segundos)
+        :param headers: Cabeceras adicionales; las solicitudes con cabeceras propias no se agrupan
+        :return: Respuesta JSON
+        """
+        if headers or not is_read_only(method, url):
+            return await self._request_with_retries(url, method, payload, retries, backoff_base, headers)
+        key = request_key(method, url, payload)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_with_retries(url, method, payload, retries, backoff_base))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: cancelar a un solicitante no cancela la llamada compartida
+        return await asyncio.shield(task)
+
+    async def _request_with_retries(self, url, method, payload, retries, backoff_base, headers=None):
+        base = self.backoff_base if backoff_base is None else backoff_base
+        session = await self._get_session()
+        bucket = get_rate_limiter(urlsplit(url).hostname)
+        weight, priority = request_weight(url, payload)
+        for attempt in range(retries):
+            try:
+                if bucket is not None:
+                    await bucket.acquire_async(weight, priority)
+                kwargs = {'json': payload} if method.upper() == 'POST' else {}
+                async with session.request(method.upper(), url, headers=headers, **kwargs) as response:
+                    if bucket is not None:
+                        bucket.observe_response(response.status, response.headers)
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                # Un error del cliente (4xx) no cambiará al reintentar
+                if e.status not in RETRYABLE_STATUS or attempt == retries - 1:
+                    raise Exception(f"Fallo tras {attempt + 1} intentos: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == retries - 1:
+                    raise Exception(f"Fallo tras {retries} intentos: {e!r}")
+            API_RETRIES.labels(urlsplit(url).hostname or '').inc()
+            await asyncio.sleep(backoff_delay(attempt, base))
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class _LoopThread:
+    """Event loop de fondo que ejecuta las corrutinas de la fachada síncrona."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="api-client-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("request_sync no puede llamarse desde el event loop del cliente; use await")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_loop_thread = None
+_client = None
+_lock = threading.Lock()
+
+
+def _get_loop_thread():
+    global _loop_thread, _client
+    if _loop_thread is None:
+        with _lock:
+            if _loop_thread is None:
+                _client = AsyncApiClient()
+                _loop_thread = _LoopThread()
+    return _loop_thread
+
+
+def get_api_client():
+    """
+    Devuelve el cliente compartido, ligado al event loop de fondo.
+    Para usarlo desde corrutinas propias, programarlas en ``get_api_loop()``.
+    """
+    _get_loop_thread()
+    return _client
+
+
+def get_api_loop():
+    """Event loop de fondo donde vive el cliente compartido."""
+    return _get_loop_thread().loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    Ejecuta una corrutina en el event loop de fondo y espera su resultado.
+    :param coro: Corrutina a ejecutar
+    :param timeout: Espera máxima (segundos)
+    """
+    return _get_loop_thread().run(coro, timeout)
+
+
+def run_background(coro):
+    """
+    Programa una corrutina en el event loop de fondo sin esperar su resultado.
+    :return: concurrent.futures.Future de la corrutina
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_api_loop())
+
+
+def request_sync(url, method='GET', payload=None, retries=3, backoff_base=None, headers=None):
+    """
+    Fachada síncrona de ``AsyncApiClient.request`` sobre el cliente compartido.
+    """
+    client = get_api_client()
+    return run_sync(client.request(url, method=method, payload=payload, retries=retries, backoff_base=backoff_base,
+                                   headers=headers))
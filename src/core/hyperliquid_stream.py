@@ -0,0 +1,141 @@
+"""
+Libro L2 y precios medios de Hyperliquid vía websocket.
+
+Modo opcional: si ``init_hyperliquid_clients`` crea ``Info`` con websocket
+(``skip_ws=False``), este módulo se suscribe a ``allMids`` y al ``l2Book`` de
+las monedas activas y guarda en memoria el último libro de cada una. Los
+precios se leen de ahí mientras estén frescos; si el stream se detiene, las
+funciones de precio vuelven al snapshot REST de ``metaAndAssetCtxs``.
+"""
+
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+STREAM_MAX_AGE = 2.0  # Antigüedad máxima de un libro o mid para usarlo (segundos)
+
+HyperliquidBook = namedtuple('HyperliquidBook', ['coin', 'bids', 'asks', 'time', 'received_at'])
+
+
+def parse_l2_book(data, received_at=None):
+    """
+    Convierte el payload de ``l2Book`` en un HyperliquidBook.
+    :param data: {'coin', 'levels': [bids, asks], 'time'} con niveles {'px', 'sz', 'n'}
+    :return: HyperliquidBook con listas de tuplas (precio, tamaño)
+    """
+    bids, asks = data['levels']
+    return HyperliquidBook(
+        coin=data['coin'],
+        bids=[(float(level['px']), float(level['sz'])) for level in bids],
+        asks=[(float(level['px']), float(level['sz'])) for level in asks],
+        time=data.get('time'),
+        received_at=time.time() if received_at is None else received_at,
+    )
+
+
+class HyperliquidMarketStream:
+    """
+    Libros y mids en memoria alimentados por las suscripciones del SDK.
+    :param hl_info: Cliente Info de Hyperliquid con websocket activo
+    """
+
+    def __init__(self, hl_info):
+        self.hl_info = hl_info
+        self._books = {}
+        self._mids = {}
+        self._mids_at = 0.0
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return getattr(self.hl_info, 'ws_manager', None) is not None
+
+    def watch(self, coin):
+        """
+        Se suscribe (una sola vez) a allMids y al l2Book de ``coin``.
+        :return: True si la suscripción está activa
+        """
+        if not self.available:
+            return False
+        with self._lock:
+            try:
+                if 'allMids' not in self._subscriptions:
+                    self._subscriptions['allMids'] = self.hl_info.subscribe({"type": "allMids"}, self.on_all_mids)
+                if coin not in self._subscriptions:
+                    self._subscriptions[coin] = self.hl_info.subscribe({"type": "l2Book", "coin": coin}, self.on_l2_book)
+            except Exception as e:
+                logger.warning("No se pudo suscribir al stream de Hyperliquid", coin=coin, error=str(e))
+                return False
+        return True
+
+    def unwatch(self, coin):
+        with self._lock:
+            subscription_id = self._subscriptions.pop(coin, None)
+        if subscription_id is not None:
+            self.hl_info.unsubscribe({"type": "l2Book", "coin": coin}, subscription_id)
+        self._books.pop(coin, None)
+
+    def on_l2_book(self, message):
+        book = parse_l2_book(message['data'])
+        self._books[book.coin] = book
+
+    def on_all_mids(self, message):
+        # Se reemplaza el dict completo: los lectores nunca ven uno a medias
+        self._mids = {coin: float(px) for coin, px in message['data']['mids'].items()}
+        self._mids_at = time.time()
+
+    def book(self, coin, max_age=STREAM_MAX_AGE):
+        """Último libro de ``coin`` o None si no existe o está desactualizado."""
+        book = self._books.get(coin)
+        if book is None or time.time() - book.received_at > max_age:
+            return None
+        return book
+
+    def mid(self, coin, max_age=STREAM_MAX_AGE):
+        """Último precio medio de ``coin`` o None si está desactualizado."""
+        if time.time() - self._mids_at > max_age:
+            return None
+        return self._mids.get(coin)
+
+    def best_prices(self, coin, is_buy, max_age=STREAM_MAX_AGE):
+        """
+        Mejor precio pasivo (bid para compras, ask para ventas) y precio medio.
+        :return: Tupla (best_price, mid) o None si el stream no tiene datos frescos
+        """
+        book = self.book(coin, max_age)
+        if book is None or not book.bids or not book.asks:
+            return None
+        bid, ask = book.bids[0][0], book.asks[0][0]
+        mid = self.mid(coin, max_age)
+        if mid is None:
+            mid = (bid + ask) / 2
+        return (bid if is_buy else ask), mid
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def get_hyperliquid_stream(hl_info):
+    """
+    Stream de mercado asociado a ``hl_info``, o None si se creó con ``skip_ws=True``.
+    """
+    if getattr(hl_info, 'ws_manager', None) is None:
+        return None
+    with _streams_lock:
+        stream = _streams.get(id(hl_info))
+        if stream is None or stream.hl_info is not hl_info:
+            stream = _streams[id(hl_info)] = HyperliquidMarketStream(hl_info)
+        return stream
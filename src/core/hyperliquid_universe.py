@@ -0,0 +1,207 @@
+"""
+Snapshot compartido del universo de Hyperliquid.
+
+Una sola llamada a ``meta_and_asset_ctxs()`` alimenta todos los helpers de
+metadatos (índice, szDecimals, minSz, precisión de precio) y de precios
+(markPx, funding), con búsquedas O(1) por nombre de activo.
+
+Reglas de precio de los perpetuos de Hyperliquid: un precio entero siempre es
+válido; si no, admite como mucho 5 cifras significativas y
+``MAX_DECIMALS - szDecimals`` decimales. La tabla de precisión de cada activo
+se calcula al cargar el snapshot y el redondeo opera sobre enteros escalados.
+"""
+
+import math
+import threading
+import time
+
+# Tiempos de vida del snapshot
+UNIVERSE_TTL = 300  # Metadatos del universo (segundos)
+ASSET_CTX_TTL = 2  # Contextos de activos: markPx, funding (segundos)
+UNKNOWN_COIN_REFRESH = 5  # Antigüedad mínima para refrescar ante un activo desconocido
+
+# Valores por defecto de los activos
+DEFAULT_SZ_DECIMALS = 8
+DEFAULT_MIN_SZ = 0.001
+
+# Reglas de precisión de precios de los perpetuos
+MAX_DECIMALS = 6  # Decimales máximos de precio (8 en spot)
+MAX_SIG_FIGS = 5  # Cifras significativas máximas de un precio no entero
+SCALED_EPSILON = 1e-9  # Tolerancia al pasar a enteros escalados (absorbe el error de la coma flotante)
+
+
+def price_steps(sz_decimals):
+    """
+    Tabla de precisión de precio de un activo.
+    :param sz_decimals: szDecimals del activo
+    :return: Tupla de (cota, escala) de mayor a menor número de decimales: un precio menor
+        que ``cota`` admite ``log10(escala)`` decimales; por encima de la última cota, solo enteros
+    """
+    max_decimals = max(0, MAX_DECIMALS - sz_decimals)
+    return tuple((10.0 ** (MAX_SIG_FIGS - decimals), 10 ** decimals) for decimals in range(max_decimals, 0, -1))
+
+
+def price_scale(asset, px):
+    """Escala (10**decimales) admitida para ``px`` según la tabla del activo."""
+    for bound, scale in asset['price_steps']:
+        if px < bound:
+            return scale
+    return 1
+
+
+def round_price(asset, px, is_buy):
+    """
+    Redondea un precio a la precisión válida del activo, hacia arriba en compras y
+    hacia abajo en ventas (nunca empeora el precio límite pedido).
+    :param asset: Metadatos de ``HyperliquidUniverse.asset``
+    :param px: Precio (> 0)
+    :param is_buy: True para compras
+    :return: Precio redondeado
+    """
+    if px <= 0:
+        raise ValueError(f"Precio no positivo: {px}")
+    scale = price_scale(asset, px)
+    scaled = px * scale
+    units = math.ceil(scaled - SCALED_EPSILON) if is_buy else math.floor(scaled + SCALED_EPSILON)
+    return units / scale
+
+
+def round_size(asset, sz):
+    """
+    Redondea un tamaño hacia abajo a los szDecimals del activo.
+    :param asset: Metadatos de ``HyperliquidUniverse.asset``
+    :param sz: Tamaño
+    :return: Tamaño redondeado
+    """
+    scale = asset['sz_scale']
+    return math.floor(sz * scale + SCALED_EPSILON) / scale
+
+
+class HyperliquidUniverse:
+    """
+    Snapshot versionado del universo de perpetuos de Hyperliquid.
+    :param ttl: Vida de los metadatos del universo (segundos)
+    :param ctx_ttl: Vida de los contextos de activos (segundos)
+    """
+
+    def __init__(self, ttl=UNIVERSE_TTL, ctx_ttl=ASSET_CTX_TTL):
+        self.ttl = ttl
+        self.ctx_ttl = ctx_ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._names = ()
+        self._ctxs = []
+        self._loaded_at = 0.0
+
+    def load(self, meta, asset_ctxs=None):
+        """
+        Reemplaza el snapshot con una respuesta de ``meta`` / ``metaAndAssetCtxs``.
+        :param meta: Diccionario con la clave 'universe'
+        :param asset_ctxs: Lista de contextos alineada con el universo
+        """
+        assets = {}
+        for idx, asset in enumerate(meta.get('universe', [])):
+            sz_decimals = asset.get('szDecimals', DEFAULT_SZ_DECIMALS)
+            assets[asset['name']] = {
+                'index': idx,
+                'name': asset['name'],
+                'sz_decimals': sz_decimals,
+                'sz_scale': 10 ** sz_decimals,
+                'min_sz': float(asset.get('minSz', DEFAULT_MIN_SZ)),
+                'px_decimals': max(0, MAX_DECIMALS - sz_decimals),
+                'price_steps': price_steps(sz_decimals),
+                'max_leverage': asset.get('maxLeverage'),
+            }
+        names = tuple(assets)
+        if names != self._names:
+            self.version += 1
+        self._assets = assets
+        self._names = names
+        self._ctxs = list(asset_ctxs or [])
+        self._loaded_at = time.monotonic()
+
+    def refresh(self, hl_info):
+        """
+        Descarga metadatos y contextos en un único round trip.
+        :param hl_info: Cliente Info de Hyperliquid
+        """
+        data = hl_info.meta_and_asset_ctxs()
+        if not isinstance(data, (list, tuple)) or len(data) < 2:
+            raise Exception(f"Formato inesperado de metaAndAssetCtxs: {type(data).__name__}")
+        self.load(data[0], data[1])
+
+    def age(self):
+        """Segundos desde la última carga (infinito si nunca se cargó)."""
+        if not self._loaded_at:
+            return float('inf')
+        return time.monotonic() - self._loaded_at
+
+    def ensure_fresh(self, hl_info, max_age=None):
+        """
+        Refresca el snapshot si es más antiguo que ``max_age``.
+        :param hl_info: Cliente Info de Hyperliquid
+        :param max_age: Antigüedad máxima aceptada (por defecto ``ttl``)
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if self.age() < max_age:
+            return
+        with self._lock:
+            # Otro hilo pudo haber refrescado mientras esperábamos el lock
+            if self.age() >= max_age:
+                self.refresh(hl_info)
+
+    def asset(self, hl_info, coin):
+        """
+        Devuelve los metadatos de un activo.
+        :param hl_info: Cliente Info de Hyperliquid
+        :param coin: Nombre del activo (ej. BTC)
+        :return: Diccionario con index, sz_decimals, min_sz y la tabla de precisión de precio
+        """
+        self.ensure_fresh(hl_info)
+        asset = self._assets.get(coin)
+        if asset is None:
+            # Puede ser un listado nuevo: refrescar una vez antes de fallar
+            self.ensure_fresh(hl_info, max_age=UNKNOWN_COIN_REFRESH)
+            asset = self._assets.get(coin)
+        if asset is None:
+            raise Exception(f"Activo {coin} no encontrado en el universo de Hyperliquid.")
+        return asset
+
+    def asset_ctx(self, hl_info, coin, max_age=None):
+        """
+        Devuelve el contexto de mercado (markPx, funding, ...) de un activo.
+        :param hl_info: Cliente Info de Hyperliquid
+        :param coin: Nombre del activo (ej. BTC)
+        :param max_age: Antigüedad máxima del contexto (por defecto ``ctx_ttl``)
+        :return: Diccionario de contexto del activo
+        """
+        self.ensure_fresh(hl_info, max_age=self.ctx_ttl if max_age is None else max_age)
+        index = self.asset(hl_info, coin)['index']
+        ctxs = self._ctxs
+        if index >= len(ctxs):
+            raise Exception(f"Contexto de mercado no disponible para {coin}")
+        return ctxs[index]
+
+    def names(self, hl_info):
+        """Nombres de todos los activos del universo."""
+        self.ensure_fresh(hl_info)
+        return list(self._names)
+
+
+_universes = {}
+_universes_lock = threading.Lock()
+
+
+def get_hyperliquid_universe(hl_info):
+    """
+    Devuelve el snapshot compartido por proceso para la red de ``hl_info``.
+    :param hl_info: Cliente Info de Hyperliquid
+    :return: Instancia de HyperliquidUniverse
+    """
+    key = getattr(hl_info, 'base_url', None)
+    universe = _universes.get(key)
+    if universe is None:
+        with _universes_lock:
+            universe = _universes.setdefault(key, HyperliquidUniverse())
+    return universe
@@ -0,0 +1,128 @@
+"""
+Logging estructurado para core y exchanges.
+
+Basado en structlog con un logger filtrante por nivel: las llamadas por debajo
+del nivel configurado no formatean nada. Los payloads grandes (respuestas
+completas de API) solo se serializan con ``log_payload`` cuando DEBUG está
+activo y la muestra lo selecciona.
+"""
+
+import importlib
+import logging
+import os
+import random
+import sys
+import weakref
+import structlog
+
+LOG_LEVEL_ENV = "PRO_HEDGE_LOG_LEVEL"
+LOG_FORMAT_ENV = "PRO_HEDGE_LOG_FORMAT"  # 'console' o 'json'
+PAYLOAD_SAMPLE_RATE_ENV = "PRO_HEDGE_LOG_PAYLOAD_SAMPLE"
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_PAYLOAD_SAMPLE_RATE = 0.01  # Fracción de payloads registrados en DEBUG
+LOG_METHODS = ('debug', 'info', 'warning', 'error', 'exception', 'critical')
+MODULE_NAMES = ('core.logger', 'src.core.logger')
+
+# Una sola instancia del módulo aunque se importe como core.logger y como src.core.logger:
+# el primer import se registra con ambos nombres y el segundo lo reutiliza desde sys.modules
+for _name in MODULE_NAMES:
+    sys.modules.setdefault(_name, sys.modules[__name__])
+    _package, _, _attr = _name.rpartition('.')
+    try:
+        setattr(importlib.import_module(_package), _attr, sys.modules[_name])
+    except ImportError:
+        pass  # Paquete aún fuera del sys.path: ``from ... import`` lo resuelve igual desde sys.modules
+
+_state = {
+    'configured': False, 'level': logging.INFO, 'payload_sample_rate': DEFAULT_PAYLOAD_SAMPLE_RATE,
+    'loggers': weakref.WeakSet(),
+}
+
+
+def configure_logging(level=None, fmt=None, payload_sample_rate=None):
+    """
+    Configura structlog para todo el proceso.
+    :param level: Nivel mínimo ('DEBUG', 'INFO', ...); por defecto PRO_HEDGE_LOG_LEVEL o INFO
+    :param fmt: 'console' o 'json'; por defecto PRO_HEDGE_LOG_FORMAT o console
+    :param payload_sample_rate: Fracción de payloads a registrar en DEBUG
+    """
+    level_name = (level or os.getenv(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL)).upper()
+    level_num = logging.getLevelName(level_name)
+    if not isinstance(level_num, int):
+        level_num = logging.INFO
+    fmt = (fmt or os.getenv(LOG_FORMAT_ENV, "console")).lower()
+    if payload_sample_rate is None:
+        payload_sample_rate = float(os.getenv(PAYLOAD_SAMPLE_RATE_ENV, DEFAULT_PAYLOAD_SAMPLE_RATE))
+
+    renderer = structlog.processors.JSONRenderer() if fmt == "json" else structlog.dev.ConsoleRenderer(colors=False)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level_num),
+        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        cache_logger_on_first_use=False,
+    )
+    _state.update(configured=True, level=level_num, payload_sample_rate=payload_sample_rate)
+    for logger in list(_state['loggers']):
+        logger.reset()
+
+
+class _ModuleLogger:
+    """
+    Logger de módulo que se resuelve contra la configuración vigente de structlog.
+    Al primer uso copia los métodos del logger ligado en la instancia, así que las llamadas
+    siguientes no pasan por el proxy; ``configure_logging`` los descarta para que la nueva
+    configuración se aplique también a los loggers creados al importar.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        bound = structlog.get_logger(self.name).bind(logger=self.name)
+        for method in LOG_METHODS:
+            setattr(self, method, getattr(bound, method))
+        return getattr(bound, attr)
+
+    def reset(self):
+        for method in LOG_METHODS:
+            self.__dict__.pop(method, None)
+
+
+def get_logger(name):
+    """
+    Devuelve un logger estructurado ligado al módulo ``name``.
+    :param name: Nombre del módulo (normalmente ``__name__``)
+    """
+    if not _state['configured']:
+        configure_logging()
+    logger = _ModuleLogger(name)
+    _state['loggers'].add(logger)
+    return logger
+
+
+def is_enabled_for(level):
+    """Indica si el nivel dado se emite con la configuración actual."""
+    return level >= _state['level']
+
+
+def log_payload(logger, event, payload, sample_rate=None, **kwargs):
+    """
+    Registra un payload completo en DEBUG, muestreado y solo si DEBUG está activo.
+    El payload se pasa sin serializar; el renderer lo formatea únicamente si se emite.
+    :param logger: Logger de ``get_logger``
+    :param event: Descripción del evento
+    :param payload: Objeto a registrar
+    :param sample_rate: Fracción de llamadas registradas (por defecto la configurada)
+    """
+    if not is_enabled_for(logging.DEBUG):
+        return
+    rate = _state['payload_sample_rate'] if sample_rate is None else sample_rate
+    if rate < 1 and random.random() >= rate:
+        return
+    logger.debug(event, payload=payload, **kwargs)
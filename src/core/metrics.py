@@ -0,0 +1,119 @@
+"""
+Métricas Prometheus de latencia de exchanges y resultado de órdenes.
+
+Todas las métricas viven en un ``CollectorRegistry`` propio, expuesto en
+``/metrics`` por ``start_metrics_server`` (o por la API local del servicio
+headless). Los nombres de endpoint se normalizan para mantener acotada la
+cardinalidad: ruta para Binance, ``info:<tipo>`` para Hyperliquid.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, start_http_server
+from prometheus_client import CONTENT_TYPE_LATEST
+
+METRICS_PORT_ENV = "PRO_HEDGE_METRICS_PORT"
+DEFAULT_METRICS_PORT = 9108
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SKEW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+SLIPPAGE_BUCKETS = (-50, -20, -10, -5, -2, 0, 2, 5, 10, 20, 50, 100)
+
+REGISTRY = CollectorRegistry()
+
+API_LATENCY = Histogram(
+    'pro_hedge_api_request_seconds', "Latencia de api_request por endpoint",
+    ['host', 'endpoint', 'method'], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+)
+API_RETRIES = Counter(
+    'pro_hedge_api_retries_total', "Reintentos HTTP del cliente compartido", ['host'], registry=REGISTRY,
+)
+API_CACHE = Counter(
+    'pro_hedge_api_cache_total', "Consultas a la caché de api_request por resultado", ['result'], registry=REGISTRY,
+)
+RATE_LIMIT_SLEEPS = Counter(
+    'pro_hedge_rate_limit_sleeps_total', "Esperas impuestas por el limitador de tasa", registry=REGISTRY,
+)
+SDK_LATENCY = Histogram(
+    'pro_hedge_sdk_call_seconds', "Latencia de llamadas de los SDK de exchange",
+    ['exchange', 'call'], buckets=LATENCY_BUCKETS, registry=REGISTRY,
+)
+ORDERS = Counter(
+    'pro_hedge_orders_total', "Órdenes enviadas por resultado", ['exchange', 'outcome'], registry=REGISTRY,
+)
+ORDER_FEES = Counter(
+    'pro_hedge_order_fees_usd_total', "Comisiones pagadas por exchange y liquidez (maker/taker)",
+    ['exchange', 'liquidity'], registry=REGISTRY,
+)
+ORDER_SLIPPAGE = Histogram(
+    'pro_hedge_order_slippage_bps', "Slippage adverso del precio medio de llenado frente al de referencia (bps)",
+    ['exchange'], buckets=SLIPPAGE_BUCKETS, registry=REGISTRY,
+)
+HEDGES = Counter(
+    'pro_hedge_hedges_total', "Hedges ejecutados por estado final", ['status'], registry=REGISTRY,
+)
+HEDGE_LEG_SKEW = Histogram(
+    'pro_hedge_leg_skew_seconds', "Desfase entre los llenados de ambas patas", buckets=SKEW_BUCKETS, registry=REGISTRY,
+)
+
+
+def endpoint_label(url, payload=None):
+    """
+    Nombre de endpoint de baja cardinalidad para una URL.
+    :return: Ruta (ej. /fapi/v1/premiumIndex) o ``info:<tipo>`` para /info de Hyperliquid
+    """
+    path = urlsplit(url).path
+    if path.endswith('/info') and isinstance(payload, dict):
+        return f"info:{payload.get('type', 'unknown')}"
+    return path or '/'
+
+
+@contextmanager
+def observe_api(url, method, payload=None):
+    """Mide la duración de una solicitud HTTP."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        API_LATENCY.labels(urlsplit(url).hostname or '', endpoint_label(url, payload), method.upper()).observe(
+            time.perf_counter() - start
+        )
+
+
+@contextmanager
+def observe_sdk(exchange, call):
+    """Mide la duración de una llamada de SDK (ej. futures_create_order)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SDK_LATENCY.labels(exchange, call).observe(time.perf_counter() - start)
+
+
+def record_slippage(exchange, is_buy, reference_price, fill_price):
+    """
+    Registra el slippage adverso en bps: positivo si el llenado fue peor que la referencia.
+    """
+    if not reference_price or not fill_price:
+        return None
+    slippage = (fill_price - reference_price) / reference_price * 10000
+    if not is_buy:
+        slippage = -slippage
+    ORDER_SLIPPAGE.labels(exchange).observe(slippage)
+    return slippage
+
+
+def render_metrics():
+    """:return: Tupla (cuerpo en formato de exposición, content type)"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port=None, addr='127.0.0.1'):
+    """
+    Sirve ``/metrics`` en un hilo propio.
+    :param port: Puerto (por defecto PRO_HEDGE_METRICS_PORT o 9108)
+    """
+    port = int(port or os.getenv(METRICS_PORT_ENV, DEFAULT_METRICS_PORT))
+    return start_http_server(port, addr=addr, registry=REGISTRY)
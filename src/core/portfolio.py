@@ -0,0 +1,186 @@
+"""
+Snapshot de cuentas y posiciones de ambos exchanges.
+
+Una sola carga consulta en paralelo ``futures_account`` y ``positionRisk`` de
+Binance y ``user_state`` de Hyperliquid, y normaliza el resultado en
+estructuras compactas indexadas por moneda. El cierre de posiciones, las
+verificaciones de margen, el servicio y el dashboard comparten el mismo
+snapshot mientras tenga menos de ``PORTFOLIO_MAX_AGE`` segundos; enviar órdenes
+lo invalida.
+"""
+
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.metrics import observe_sdk
+from exchanges.models import Position, BINANCE, HYPERLIQUID
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PORTFOLIO_MAX_AGE = 5  # Antigüedad máxima de un snapshot compartido (segundos)
+
+
+BinanceAccount = namedtuple('BinanceAccount', ['wallet_balance', 'available_balance', 'positions', 'fetched_at'])
+HyperliquidAccount = namedtuple('HyperliquidAccount', ['account_value', 'withdrawable', 'positions', 'fetched_at'])
+
+
+class PortfolioSnapshot(namedtuple('PortfolioSnapshot', ['binance', 'hyperliquid', 'errors', 'fetched_at'])):
+    """
+    Cuentas de ambos exchanges. Un exchange que falló queda en None con su error en ``errors``.
+    """
+    __slots__ = ()
+
+    def account(self, venue):
+        return self.binance if venue == BINANCE else self.hyperliquid
+
+    def position(self, venue, coin):
+        """Posición abierta de ``coin`` en ``venue``, o None."""
+        account = self.account(venue)
+        return account.positions.get(coin) if account is not None else None
+
+    def open_positions(self, venue):
+        account = self.account(venue)
+        return list(account.positions.values()) if account is not None else []
+
+    def coins(self):
+        """Monedas con posición abierta en algún exchange."""
+        return sorted({coin for venue in (BINANCE, HYPERLIQUID) for coin in
+                       (self.account(venue).positions if self.account(venue) is not None else {})})
+
+
+def parse_binance_account(account, position_risk, fetched_at=None):
+    """
+    Normaliza ``futures_account`` y ``futures_position_information``.
+    :return: BinanceAccount con las posiciones distintas de cero indexadas por moneda
+    """
+    positions = {}
+    for raw in position_risk:
+        position = Position.from_binance(raw)
+        if position.is_open:
+            positions[position.coin] = position
+    return BinanceAccount(
+        wallet_balance=float(account['totalWalletBalance']),
+        available_balance=float(account['availableBalance']),
+        positions=positions,
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+    )
+
+
+def parse_hyperliquid_state(user_state, fetched_at=None):
+    """
+    Normaliza ``user_state`` de Hyperliquid.
+    :return: HyperliquidAccount con las posiciones distintas de cero indexadas por moneda
+    """
+    positions = {}
+    for entry in user_state.get('assetPositions', []):
+        position = Position.from_hyperliquid(entry.get('position', {}))
+        if position.is_open:
+            positions[position.coin] = position
+    margin = user_state.get('marginSummary', {})
+    return HyperliquidAccount(
+        account_value=float(margin.get('accountValue', 0)),
+        withdrawable=float(user_state.get('withdrawable', 0)),
+        positions=positions,
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+    )
+
+
+def fetch_binance_account(client):
+    """Consulta en paralelo la cuenta y todas las posiciones de Binance Futures."""
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="portfolio-binance") as pool:
+        account = pool.submit(client.futures_account)
+        position_risk = pool.submit(client.futures_position_information)
+        return parse_binance_account(account.result(), position_risk.result())
+
+
+def fetch_hyperliquid_account(hl_info, hyper_address):
+    with observe_sdk(HYPERLIQUID, 'user_state'):
+        user_state = hl_info.user_state(hyper_address)
+    return parse_hyperliquid_state(user_state)
+
+
+class PortfolioStore:
+    """
+    Cuentas en memoria por cliente, compartidas dentro de una ventana de frescura.
+    Solicitudes concurrentes de la misma cuenta comparten una única consulta.
+    :param max_age: Antigüedad máxima por defecto (segundos)
+    """
+
+    def __init__(self, max_age=PORTFOLIO_MAX_AGE):
+        self.max_age = max_age
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key, owner, fetch, max_age):
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is owner and time.time() - entry[1].fetched_at <= max_age:
+                return entry[1]
+            value = fetch()
+            self._entries[key] = (owner, value)
+            return value
+
+    def binance(self, client, max_age=None):
+        """:return: BinanceAccount de ``client`` (consulta si no hay uno fresco)"""
+        return self._get((BINANCE, id(client)), client, lambda: fetch_binance_account(client), max_age)
+
+    def hyperliquid(self, hl_info, hyper_address, max_age=None):
+        """:return: HyperliquidAccount de ``hyper_address`` (consulta si no hay uno fresco)"""
+        return self._get((HYPERLIQUID, id(hl_info), hyper_address), hl_info,
+                         lambda: fetch_hyperliquid_account(hl_info, hyper_address), max_age)
+
+    def snapshot(self, client, hl_info, hyper_address, max_age=None):
+        """
+        Cuentas de ambos exchanges, refrescando en paralelo las que no estén frescas.
+        Los fallos no se guardan: quedan en ``errors`` y el exchange en None.
+        :return: PortfolioSnapshot
+        """
+        jobs = {
+            BINANCE: lambda: self.binance(client, max_age),
+            HYPERLIQUID: lambda: self.hyperliquid(hl_info, hyper_address, max_age),
+        }
+        accounts, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="portfolio") as pool:
+            futures = {venue: pool.submit(job) for venue, job in jobs.items()}
+            for venue, future in futures.items():
+                try:
+                    accounts[venue] = future.result()
+                except Exception as e:
+                    errors[venue] = str(e)
+                    logger.warning("Error al cargar la cuenta", venue=venue, error=str(e))
+        return PortfolioSnapshot(accounts.get(BINANCE), accounts.get(HYPERLIQUID), errors, time.time())
+
+    def invalidate(self):
+        """Descarta todas las cuentas en memoria (tras enviar órdenes)."""
+        self._entries.clear()
+
+
+_store = PortfolioStore()
+
+
+def get_portfolio_store():
+    """Devuelve el almacén de cuentas compartido por el proceso."""
+    return _store
+
+
+def get_portfolio_snapshot(client, hl_info, hyper_address, max_age=None):
+    """Atajo de ``get_portfolio_store().snapshot``."""
+    return _store.snapshot(client, hl_info, hyper_address, max_age)
+
+
+def invalidate_portfolio():
+    _store.invalidate()
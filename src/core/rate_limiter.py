@@ -0,0 +1,283 @@
+"""
+Limitador de tasa por pesos compartido por todo el proceso.
+
+Cada exchange tiene un token bucket con su presupuesto de peso por minuto
+(Binance: 2400 en futuros y 6000 en spot; Hyperliquid: 1200). Cada solicitud
+consume el peso que le asigna el exchange (``request_weight``), tanto si pasa
+por ``api_request`` como por los SDK (``install_binance_limiter`` e
+``install_hyperliquid_limiter``). El bucket se corrige con la cabecera
+``X-MBX-USED-WEIGHT-1M`` y se bloquea ante un 429/418 hasta ``Retry-After``.
+
+Hay dos carriles: las órdenes (``PRIORITY_ORDERS``) pueden gastar el bucket
+completo, mientras que los datos de mercado (``PRIORITY_MARKET_DATA``) dejan
+libre una reserva, de modo que un escaneo nunca retrasa una orden. Las
+corrutinas esperan con ``acquire_async`` sin bloquear el event loop.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.metrics import RATE_LIMIT_SLEEPS
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PRIORITY_ORDERS = 0
+PRIORITY_MARKET_DATA = 1
+MARKET_DATA_RESERVE = 0.2  # Fracción del bucket reservada a las órdenes
+
+BINANCE_FUTURES_WEIGHT_LIMIT = 2400  # Peso por minuto e IP (fapi)
+BINANCE_SPOT_WEIGHT_LIMIT = 6000  # Peso por minuto e IP (api)
+HYPERLIQUID_WEIGHT_LIMIT = 1200  # Peso por minuto e IP
+WEIGHT_PERIOD = 60
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+# Pesos de Binance por ruta: entero, o función de los parámetros de la solicitud
+DEPTH_WEIGHTS = ((50, 2), (100, 5), (500, 10), (1000, 20))
+BINANCE_WEIGHTS = {
+    '/fapi/v1/depth': lambda p: next((w for limit, w in DEPTH_WEIGHTS if int(p.get('limit', 500)) <= limit), 20),
+    '/fapi/v1/exchangeInfo': 1,
+    '/fapi/v1/premiumIndex': lambda p: 1 if p.get('symbol') else 10,
+    '/fapi/v1/fundingRate': 1,
+    '/fapi/v1/ticker/bookTicker': lambda p: 2 if p.get('symbol') else 5,
+    '/fapi/v1/ticker/24hr': lambda p: 1 if p.get('symbol') else 40,
+    '/fapi/v1/openOrders': lambda p: 1 if p.get('symbol') else 40,
+    '/fapi/v1/batchOrders': 5,
+    '/fapi/v2/positionRisk': 5,
+    '/fapi/v3/positionRisk': 5,
+    '/fapi/v2/account': 5,
+    '/fapi/v3/account': 5,
+    '/fapi/v2/balance': 5,
+    '/api/v3/account': 20,
+    '/api/v3/exchangeInfo': 20,
+}
+BINANCE_ORDER_PATHS = ('/fapi/v1/order', '/fapi/v1/batchOrders', '/fapi/v1/allOpenOrders')
+
+# Pesos de /info de Hyperliquid por tipo de consulta (el resto pesa 20)
+HYPERLIQUID_INFO_WEIGHTS = {
+    'l2Book': 2,
+    'allMids': 2,
+    'clearinghouseState': 2,
+    'orderStatus': 2,
+    'spotClearinghouseState': 2,
+    'exchangeStatus': 2,
+    'userRole': 60,
+}
+HYPERLIQUID_INFO_WEIGHT = 20
+HYPERLIQUID_BATCH_SIZE = 40  # Las acciones de /exchange pesan 1 + n // 40
+
+
+class TokenBucket:
+    """
+    Token bucket de pesos con carriles de prioridad.
+    :param name: Nombre del exchange (para logs)
+    :param capacity: Peso máximo por periodo
+    :param period: Periodo de recarga completa (segundos)
+    :param reserve: Fracción de la capacidad que los datos de mercado no pueden usar
+    """
+
+    def __init__(self, name, capacity, period=WEIGHT_PERIOD, reserve=MARKET_DATA_RESERVE):
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.reserve = reserve
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.waits = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, weight=1, priority=PRIORITY_MARKET_DATA):
+        """
+        Consume ``weight`` si hay presupuesto para el carril.
+        :return: 0 si se concedió, o segundos a esperar antes de reintentar
+        """
+        floor = 0.0 if priority == PRIORITY_ORDERS else self.capacity * self.reserve
+        weight = min(weight, self.capacity - floor)
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            if self.tokens - weight >= floor:
+                self.tokens -= weight
+                return 0.0
+            return (weight + floor - self.tokens) / self.rate
+
+    def acquire(self, weight=1, priority=PRIORITY_MARKET_DATA):
+        """Espera (bloqueando el hilo) hasta consumir ``weight``."""
+        while True:
+            wait = self.try_acquire(weight, priority)
+            if not wait:
+                return
+            self._record_wait(wait, weight, priority)
+            time.sleep(wait)
+
+    async def acquire_async(self, weight=1, priority=PRIORITY_MARKET_DATA):
+        """Versión asíncrona de ``acquire``: cede el event loop mientras espera."""
+        while True:
+            wait = self.try_acquire(weight, priority)
+            if not wait:
+                return
+            self._record_wait(wait, weight, priority)
+            await asyncio.sleep(wait)
+
+    def _record_wait(self, wait, weight, priority):
+        self.waits += 1
+        RATE_LIMIT_SLEEPS.inc()
+        logger.debug("Esperando presupuesto de peso", exchange=self.name, wait=wait, weight=weight, priority=priority)
+
+    def sync_used_weight(self, used):
+        """Ajusta el bucket al peso usado que informa el servidor (nunca lo aumenta)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - used)
+
+    def block(self, seconds):
+        """Suspende todas las solicitudes ``seconds`` segundos (429/418)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+        logger.warning("Límite de peso excedido; pausando solicitudes", exchange=self.name, seconds=seconds)
+
+    def observe_response(self, status, headers):
+        """
+        Corrige el bucket con la respuesta del exchange.
+        :param status: Código HTTP
+        :param headers: Cabeceras de la respuesta
+        """
+        used = headers.get(USED_WEIGHT_HEADER) if headers else None
+        if used is not None:
+            try:
+                self.sync_used_weight(float(used))
+            except ValueError:
+                pass
+        if status in (418, 429):
+            retry_after = headers.get('Retry-After') if headers else None
+            self.block(float(retry_after) if retry_after else WEIGHT_PERIOD)
+
+    def stats(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {'tokens': self.tokens, 'capacity': self.capacity, 'waits': self.waits,
+                    'blocked_for': max(0.0, self.blocked_until - time.monotonic())}
+
+
+_LIMITS = {
+    'fapi.binance.com': ('binance_futures', BINANCE_FUTURES_WEIGHT_LIMIT),
+    'api.binance.com': ('binance_spot', BINANCE_SPOT_WEIGHT_LIMIT),
+    'api.hyperliquid.xyz': ('hyperliquid', HYPERLIQUID_WEIGHT_LIMIT),
+}
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(host):
+    """
+    Bucket compartido del exchange al que pertenece ``host``.
+    :return: TokenBucket, o None si el host no tiene límite conocido (ej. el servicio local)
+    """
+    entry = _LIMITS.get(host)
+    if entry is None:
+        return None
+    name, capacity = entry
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = _buckets[name] = TokenBucket(name, capacity)
+        return bucket
+
+
+def binance_weight(path, params=None):
+    """Peso de una ruta de la API de Binance (1 si no figura en la tabla)."""
+    weight = BINANCE_WEIGHTS.get(path, 1)
+    return weight(params or {}) if callable(weight) else weight
+
+
+def hyperliquid_weight(path, payload=None):
+    """Peso de una solicitud a /info o /exchange de Hyperliquid."""
+    payload = payload or {}
+    if path.endswith('/exchange'):
+        action = payload.get('action') or {}
+        batch = action.get('orders') or action.get('cancels') or action.get('modifies') or []
+        return 1 + len(batch) // HYPERLIQUID_BATCH_SIZE
+    return HYPERLIQUID_INFO_WEIGHTS.get(payload.get('type'), HYPERLIQUID_INFO_WEIGHT)
+
+
+def request_weight(url, payload=None):
+    """
+    Peso y carril de una solicitud HTTP.
+    :return: Tupla (peso, prioridad)
+    """
+    parts = urlsplit(url)
+    if 'hyperliquid' in (parts.hostname or ''):
+        priority = PRIORITY_ORDERS if parts.path.endswith('/exchange') else PRIORITY_MARKET_DATA
+        return hyperliquid_weight(parts.path, payload), priority
+    params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+    priority = PRIORITY_ORDERS if parts.path in BINANCE_ORDER_PATHS else PRIORITY_MARKET_DATA
+    return binance_weight(parts.path, params), priority
+
+
+def install_binance_limiter(client):
+    """
+    Hace pasar todas las llamadas REST de un cliente de python-binance por el limitador.
+    :param client: Cliente de Binance
+    """
+    if getattr(client, '_weight_limited', False) is True:
+        return client
+    request = client._request
+
+    def limited_request(method, uri, signed, force_params=False, **kwargs):
+        parts = urlsplit(uri)
+        bucket = get_rate_limiter(parts.hostname)
+        if bucket is None:
+            return request(method, uri, signed, force_params, **kwargs)
+        params = dict(kwargs.get('data') or kwargs.get('params') or {})
+        priority = PRIORITY_ORDERS if parts.path in BINANCE_ORDER_PATHS else PRIORITY_MARKET_DATA
+        bucket.acquire(binance_weight(parts.path, params), priority)
+        try:
+            return request(method, uri, signed, force_params, **kwargs)
+        finally:
+            response = getattr(client, 'response', None)
+            if response is not None:
+                bucket.observe_response(response.status_code, response.headers)
+
+    client._request = limited_request
+    client._weight_limited = True
+    return client
+
+
+def install_hyperliquid_limiter(api):
+    """
+    Hace pasar los ``post`` de un cliente Info o Exchange de Hyperliquid por el limitador.
+    El Info interno de ``Exchange`` también queda limitado.
+    """
+    if api is None or getattr(api, '_weight_limited', False) is True:
+        return api
+    post = api.post
+    bucket = get_rate_limiter(urlsplit(api.base_url).hostname)
+
+    def limited_post(url_path, payload=None):
+        if bucket is not None:
+            weight = hyperliquid_weight(url_path, payload)
+            priority = PRIORITY_ORDERS if url_path.endswith('/exchange') else PRIORITY_MARKET_DATA
+            bucket.acquire(weight, priority)
+        return post(url_path, payload)
+
+    api.post = limited_post
+    api._weight_limited = True
+    install_hyperliquid_limiter(getattr(api, 'info', None))
+    return api
@@ -0,0 +1,220 @@
+"""
+Ejecución en rebanadas (TWAP/iceberg) de hedges grandes.
+
+En lugar de enviar todo ``capital * leverage`` como una orden por venue, el
+nocional objetivo se reparte en rebanadas. Cada rebanada es un
+``ejecutar_hedge`` completo (ambas patas en paralelo, con control de desfase y
+deshacer ante fallos), y la siguiente no empieza hasta que la anterior quedó
+cubierta, de modo que la exposición abierta nunca supera una rebanada. El
+tamaño sale de la profundidad visible: una fracción (``participation``) del
+nocional que hay dentro de ``band_bps`` del mejor precio en el venue menos
+profundo. El informe compara el VWAP realizado en cada venue con el precio de
+llegada.
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.api_utils import get_binance_best_price
+from core.binance_depth import get_binance_order_book
+from core.hyperliquid_stream import get_hyperliquid_stream, parse_l2_book
+from core.logger import get_logger
+from core.metrics import observe_sdk
+from core.trading_operations import verify_orders, ejecutar_hedge, HEDGE_MAX_LEG_SKEW, HEDGE_LEG_TIMEOUT
+from exchanges.binance_operations import MIN_NOTIONAL
+from exchanges.hyperliquid_operations import get_hyperliquid_best_price
+
+logger = get_logger(__name__)
+
+PARTICIPATION_RATE = 0.1  # Fracción de la profundidad visible que consume cada rebanada
+DEPTH_BAND_BPS = 10  # Banda alrededor del mejor precio que cuenta como profundidad visible
+SLICE_INTERVAL = 1.0  # Pausa entre rebanadas (segundos)
+MAX_SLICES = 50  # Tope de rebanadas; si la profundidad es escasa, las rebanadas crecen
+MIN_SLICE_NOTIONAL = 2 * MIN_NOTIONAL  # Margen sobre el mínimo de Binance tras redondear la cantidad
+DEPTH_LIMIT = 100  # Niveles del libro REST de Binance cuando no hay libro local
+
+
+def band_notional(prices, quantities, band_bps=DEPTH_BAND_BPS):
+    """
+    Nocional de los niveles a menos de ``band_bps`` del mejor precio.
+    :param prices: Precios ordenados del mejor al peor
+    :param quantities: Cantidades de cada nivel
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if not len(prices):
+        return 0.0
+    quantities = np.asarray(quantities, dtype=np.float64)
+    within = np.abs(prices - prices[0]) <= prices[0] * band_bps / 10000
+    return float(np.dot(prices[within], quantities[within]))
+
+
+def binance_depth_notional(client, symbol, side, band_bps=DEPTH_BAND_BPS):
+    """Nocional que consumiría una orden agresiva de ``side`` (BUY recorre asks) dentro de la banda."""
+    book = get_binance_order_book(symbol)
+    if book is not None and book.is_fresh():
+        snapshot = book.snapshot
+        if side == 'BUY':
+            return band_notional(snapshot.ask_px, snapshot.ask_qty, band_bps)
+        return band_notional(snapshot.bid_px, snapshot.bid_qty, band_bps)
+    order_book = client.futures_order_book(symbol=symbol, limit=DEPTH_LIMIT)
+    levels = np.array(order_book['asks'] if side == 'BUY' else order_book['bids'], dtype=np.float64).reshape(-1, 2)
+    return band_notional(levels[:, 0], levels[:, 1], band_bps)
+
+
+def hyperliquid_depth_notional(hl_info, coin, is_buy, band_bps=DEPTH_BAND_BPS):
+    """Nocional que consumiría una orden agresiva en Hyperliquid (compra recorre asks) dentro de la banda."""
+    stream = get_hyperliquid_stream(hl_info)
+    book = stream.book(coin) if stream is not None and stream.watch(coin) else None
+    if book is None:
+        with observe_sdk('hyperliquid', 'l2_snapshot'):
+            book = parse_l2_book(hl_info.l2_snapshot(coin))
+    levels = np.array(book.asks if is_buy else book.bids, dtype=np.float64).reshape(-1, 2)
+    return band_notional(levels[:, 0], levels[:, 1], band_bps)
+
+
+def plan_slice(remaining, depth_notional, participation, slices_left):
+    """
+    Nocional de la siguiente rebanada.
+    :param remaining: Nocional pendiente
+    :param depth_notional: Profundidad visible del venue menos profundo
+    :param slices_left: Rebanadas que quedan bajo MAX_SLICES
+    :return: Nocional (todo el pendiente si el resto quedaría por debajo de MIN_SLICE_NOTIONAL)
+    """
+    notional = max(participation * depth_notional, remaining / max(slices_left, 1), MIN_SLICE_NOTIONAL)
+    if remaining - notional < MIN_SLICE_NOTIONAL:
+        return remaining
+    return notional
+
+
+def slippage_bps(is_buy, arrival, vwap):
+    """Slippage adverso en bps del VWAP frente al precio de llegada (positivo = peor)."""
+    if not arrival or not vwap:
+        return None
+    slippage = (vwap - arrival) / arrival * 10000
+    return slippage if is_buy else -slippage
+
+
+def slice_fully_filled(binance_leg, hyper_leg):
+    """
+    Indica si ambas patas de una rebanada ejecutaron la cantidad planificada.
+    Las cantidades planificadas ya son el nocional de la rebanada redondeado al paso de cada venue.
+    """
+    planned = ((binance_leg.get('executed_qty', 0.0), binance_leg.get('qty', 0.0)),
+               (hyper_leg.get('filled_size', 0.0), hyper_leg.get('adjusted_size', 0.0)))
+    return all(qty > 0 and executed >= qty * (1 - 1e-9) for executed, qty in planned)
+
+
+def ejecutar_hedge_twap(client, hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage,
+                        participation=PARTICIPATION_RATE, interval=SLICE_INTERVAL, band_bps=DEPTH_BAND_BPS,
+                        max_slices=MAX_SLICES, max_leg_skew=HEDGE_MAX_LEG_SKEW, leg_timeout=HEDGE_LEG_TIMEOUT):
+    """
+    Ejecuta un hedge en rebanadas cubiertas una a una.
+    :param direction: Dirección en Binance ('long' o 'short')
+    :param capital: Capital total por pata (USDT); el nocional objetivo es ``capital * leverage``
+    :param participation: Fracción de la profundidad visible que consume cada rebanada
+    :param interval: Pausa entre rebanadas (segundos)
+    :param band_bps: Banda alrededor del mejor precio que cuenta como profundidad
+    :param max_leg_skew: Desfase máximo entre patas de cada rebanada (ver ``ejecutar_hedge``)
+    :return: Diccionario con status ('success', 'partial' o 'failed'), slices, arrival, vwap y slippage_bps por venue
+    """
+    side = 'BUY' if direction == 'long' else 'SELL'
+    is_buy_hyper = (direction == 'short')
+    coin = symbol.replace('USDT', '')
+    target = capital * leverage
+    result = {
+        'status': 'failed',
+        'symbol': symbol,
+        'direction': direction,
+        'target_notional': target,
+        'executed_notional': 0.0,
+        'arrival': {},
+        'vwap': {'binance': None, 'hyperliquid': None},
+        'slippage_bps': {'binance': None, 'hyperliquid': None},
+        'slices': [],
+        'errors': {},
+    }
+    try:
+        bid, ask = get_binance_best_price(client, symbol, 'BUY'), get_binance_best_price(client, symbol, 'SELL')
+        result['arrival'] = {'binance': (bid + ask) / 2,
+                             'hyperliquid': get_hyperliquid_best_price(hl_info, coin, is_buy_hyper)[1]}
+    except Exception as e:
+        result['errors']['arrival'] = str(e)
+        logger.error("No se pudo fijar el precio de llegada", symbol=symbol, error=str(e))
+        return result
+
+    filled = {'binance': [0.0, 0.0], 'hyperliquid': [0.0, 0.0]}  # [cantidad, nocional] por venue
+    remaining = target
+    while remaining > 1e-9:
+        try:
+            depth = min(binance_depth_notional(client, symbol, side, band_bps),
+                        hyperliquid_depth_notional(hl_info, coin, is_buy_hyper, band_bps))
+        except Exception as e:
+            result['errors']['depth'] = str(e)
+            logger.error("No se pudo leer la profundidad", symbol=symbol, error=str(e))
+            break
+        notional = plan_slice(remaining, depth, participation, max_slices - len(result['slices']))
+        slice_capital = notional / leverage
+        best_price_binance, best_price_hyper, *_ = verify_orders(
+            client, hl_info, symbol, side, slice_capital, leverage, direction
+        )
+        if not best_price_binance or not best_price_hyper:
+            result['errors']['verify'] = f"Verificación fallida en la rebanada {len(result['slices'])}"
+            break
+
+        hedge = ejecutar_hedge(client, hl_info, hl_exchange, hyper_address, symbol, direction, slice_capital,
+                               leverage, best_price_binance, best_price_hyper, max_leg_skew=max_leg_skew,
+                               leg_timeout=leg_timeout)
+        binance_leg, hyper_leg = hedge['legs']['binance'], hedge['legs']['hyperliquid']
+        fills = {
+            'binance': (binance_leg.get('executed_qty', 0.0), binance_leg.get('avg_price', 0.0)),
+            'hyperliquid': (hyper_leg.get('filled_size', 0.0), hyper_leg.get('avg_price', 0.0)),
+        }
+        result['slices'].append({
+            'index': len(result['slices']),
+            'notional': notional,
+            'depth_notional': depth,
+            'status': hedge['status'],
+            'fills': fills,
+            'leg_skew_ms': hedge['leg_skew_ms'],
+        })
+        logger.info("Rebanada del hedge terminada", symbol=symbol, index=len(result['slices']) - 1,
+                    notional=notional, depth_notional=depth, status=hedge['status'], leg_skew_ms=hedge['leg_skew_ms'])
+        if hedge['status'] != 'success':
+            # Lo ejecutado de esta rebanada ya se deshizo: no cuenta para el VWAP
+            result['errors'][f"slice_{len(result['slices']) - 1}"] = hedge['errors']
+            break
+        for venue, (qty, price) in fills.items():
+            filled[venue][0] += qty
+            filled[venue][1] += qty * price
+        if not slice_fully_filled(binance_leg, hyper_leg):
+            # Una pata corta deja exposición abierta: no se envía otra rebanada encima
+            result['executed_notional'] += min(qty * price for qty, price in fills.values())
+            result['errors'][f"slice_{len(result['slices']) - 1}"] = {
+                'fills': f"Patas desiguales: binance {fills['binance'][0]}/{binance_leg.get('qty')}, "
+                         f"hyperliquid {fills['hyperliquid'][0]}/{hyper_leg.get('adjusted_size')}"}
+            logger.error("Rebanada sin cubrir por completo; se detiene el hedge", symbol=symbol, fills=fills)
+            break
+        remaining -= notional
+        result['executed_notional'] += notional
+        if remaining > 1e-9 and interval:
+            time.sleep(interval)
+
+    for venue, is_buy in (('binance', side == 'BUY'), ('hyperliquid', is_buy_hyper)):
+        qty, quote = filled[venue]
+        vwap = quote / qty if qty else None
+        result['vwap'][venue] = vwap
+        result['slippage_bps'][venue] = slippage_bps(is_buy, result['arrival'][venue], vwap)
+    if remaining <= 1e-9:
+        result['status'] = 'success'
+    elif result['executed_notional'] > 0 or any(qty for qty, _ in filled.values()):
+        result['status'] = 'partial'
+    logger.info("Hedge en rebanadas terminado", symbol=symbol, status=result['status'], slices=len(result['slices']),
+                executed_notional=result['executed_notional'], vwap=result['vwap'], slippage_bps=result['slippage_bps'])
+    return result
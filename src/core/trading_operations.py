@@ -6,24 +6,44 @@ src_path = Path(__file__).parent.parent
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
-from core.api_utils import get_binance_best_price
-from exchanges.hyperliquid_operations import get_hyperliquid_best_price, place_hyperliquid_order, get_hyperliquid_positions, get_hyperliquid_asset_metadata
-from exchanges.binance_operations import ejecutar_binance_order, MIN_NOTIONAL
-import math
-import traceback
+from core.api_utils import get_binance_best_price, get_binance_vwap, wait_for_binance_order
+from core.hyperliquid_universe import round_size
+from exchanges.hyperliquid_operations import (
+    get_hyperliquid_best_price, place_hyperliquid_order, get_hyperliquid_asset_metadata,
+    preparar_hyperliquid_order, enviar_hyperliquid_order, enviar_hyperliquid_bulk_orders, adjust_hyperliquid_price
+)
+from exchanges.binance_operations import (
+    ejecutar_binance_order, preparar_binance_order, enviar_binance_order, cancelar_binance_order, MIN_NOTIONAL,
+    enviar_binance_batch_orders, format_binance_quantity
+)
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from exchanges.binance_operations import get_funding_rate as binance_fr
 from exchanges.hyperliquid_operations import get_funding_rate as hyperliquid_fr
+from core.funding_scanner import funding_recommendation
+from core.logger import get_logger
+from core.metrics import HEDGES, HEDGE_LEG_SKEW, observe_sdk
+from core.portfolio import get_portfolio_store
+from exchanges.models import FundingSample, Order
+
+logger = get_logger(__name__)
 
 # Constants
-FORCE_CLOSE_BUY_PRICE = 1e9  # Precio extremadamente alto para cierre forzado de compra
-FORCE_CLOSE_SELL_PRICE = 0  # Precio extremadamente bajo para cierre forzado de venta
+HEDGE_MAX_LEG_SKEW = 5.0  # Segundos máximos entre el llenado de ambas patas del hedge
+HEDGE_LEG_TIMEOUT = 30  # Espera máxima del llenado de cada pata (segundos)
+CLOSE_ALL_SLIPPAGE = 0.01  # Precio límite de los cierres IOC de Hyperliquid respecto al mark (1%)
+CLOSE_ALL_TIMEOUT = 30  # Espera máxima del llenado de cada cierre de Binance (segundos)
 
 def verify_orders(client, hl_info, symbol, side, capital, leverage, direction):
     try:
         best_price_binance = get_binance_best_price(client, symbol, side)
         qty_binance = (capital * leverage) / best_price_binance
+        # Precio del tamaño completo según la profundidad, no solo el primer nivel
+        vwap_binance = get_binance_vwap(client, symbol, side, qty_binance)
+        if vwap_binance is None:
+            raise ValueError(f"Binance: Profundidad insuficiente para {qty_binance:.6f} {symbol}.")
+        qty_binance = (capital * leverage) / vwap_binance
         notional = qty_binance * best_price_binance
         if qty_binance <= 0 or notional < MIN_NOTIONAL:
             raise ValueError(f"Binance: Notional (${notional:.2f}) debe ser ≥ {MIN_NOTIONAL} USDT.")
@@ -33,28 +53,27 @@ def verify_orders(client, hl_info, symbol, side, capital, leverage, direction):
         qty_hyper = (capital * leverage) / best_price_hyper
         if qty_hyper <= 0:
             raise ValueError("Hyperliquid: La cantidad debe ser positiva.")
-        print(f"Verificación de órdenes pasada: Precio Binance={best_price_binance}, qty={qty_binance}, Precio Hyperliquid={best_price_hyper}, qty={qty_hyper}, mark_price={mark_price}")
+        logger.info("Verificación de órdenes pasada", symbol=symbol, binance_price=best_price_binance, binance_vwap=vwap_binance, binance_qty=qty_binance, hyperliquid_price=best_price_hyper, hyperliquid_qty=qty_hyper, mark_price=mark_price)
         return best_price_binance, best_price_hyper, qty_binance, qty_hyper, mark_price
     except Exception as e:
-        print(f"Fallo en la verificación de órdenes: {e}")
+        logger.error("Fallo en la verificación de órdenes", symbol=symbol, error=str(e))
         return None, None, None, None, None
 
-def ejecutar_hyper_order(hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage, best_price):
+def preparar_hyper_order(hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage, best_price):
     try:
         coin = symbol.replace('USDT', '')
         is_buy = (direction == 'short')
         # Obtener metadatos para redondeo
         metadata = get_hyperliquid_asset_metadata(hl_info, coin)
-        sz_decimals = metadata['sz_decimals']
         min_sz = metadata['min_sz']
         # Calcular tamaño con redondeo hacia abajo
-        qty = math.floor((capital * leverage) / best_price * 10**sz_decimals) / 10**sz_decimals
+        qty = round_size(metadata, (capital * leverage) / best_price)
         if qty < min_sz:
             raise ValueError(f"Cantidad {qty} menor que el mínimo {min_sz} para {coin}.")
         
-        print(f"Preparando orden en Hyperliquid: coin={coin}, is_buy={is_buy}, qty={qty}, px={best_price}")
+        logger.debug("Preparando orden en Hyperliquid", coin=coin, is_buy=is_buy, qty=qty, price=best_price)
         
-        response = place_hyperliquid_order(
+        return preparar_hyperliquid_order(
             hl_info=hl_info,
             hl_exchange=hl_exchange,
             hyper_address=hyper_address,
@@ -64,100 +83,401 @@ def ejecutar_hyper_order(hl_info, hl_exchange, hyper_address, symbol, direction,
             leverage=leverage,
             reduce_only=False
         )
-        
-        return response, qty, best_price
     except Exception as e:
         raise Exception(f"Fallo en la orden de Hyperliquid: {e}")
 
-def cerrar_posiciones(client, hl_info, hl_exchange, hyper_address, symbol, posicion, session_state, force_close=False):
-    binance_closed = False
-    hyperliquid_closed = False
-    
-    # Cerrar posición de Binance
+def ejecutar_hyper_order(hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage, best_price):
+    order_details = preparar_hyper_order(
+        hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage, best_price
+    )
+    try:
+        response = enviar_hyperliquid_order(hl_exchange, order_details)
+    except Exception as e:
+        raise Exception(f"Fallo en la orden de Hyperliquid: {e}")
+    return response, order_details['original_size'], best_price
+
+def _binance_executed_qty(client, leg):
+    """Cantidad ejecutada de una pata de Binance, cancelando antes el remanente si no se llenó."""
+    if not leg.get('order_id') or leg.get('executed_qty', 0.0) >= leg['qty']:
+        return leg.get('executed_qty', 0.0)
+    cancelar_binance_order(client, leg)
     try:
-        position_info = client.futures_position_information(symbol=symbol)
-        if position_info:
-            r1 = position_info[0]
-            qty = abs(float(r1['positionAmt']))
-            if qty > 0:
-                close_side = 'SELL' if float(r1['positionAmt']) > 0 else 'BUY'
+        order = client.futures_get_order(symbol=leg['symbol'], orderId=leg['order_id'])
+        return float(order.get('executedQty', 0) or 0)
+    except Exception as e:
+        logger.warning("No se pudo consultar la orden de Binance", order_id=leg['order_id'], error=str(e))
+        return leg.get('executed_qty', 0.0)
+
+def _deshacer_binance_leg(client, leg):
+    qty = _binance_executed_qty(client, leg)
+    if qty <= 0:
+        return None
+    close_side = 'SELL' if leg['side'] == 'BUY' else 'BUY'
+    logger.warning("Deshaciendo pata de Binance", symbol=leg['symbol'], side=close_side, qty=qty)
+    order = client.futures_create_order(
+        symbol=leg['symbol'],
+        side=close_side,
+        type='MARKET',
+        quantity=qty,
+        reduceOnly='true'
+    )
+    return wait_for_binance_order(client, leg['symbol'], order['orderId'])
+
+def _hyper_leg_filled(leg):
+    """Indica si la pata de Hyperliquid se llenó por completo (no en reposo ni parcial)."""
+    return bool(leg.get('filled_at')) and leg.get('filled_size', 0.0) >= leg['adjusted_size'] * (1 - 1e-9)
+
+def _hyper_resting_filled_size(hl_info, hyper_address, leg):
+    """Cantidad llenada de una orden que quedó en reposo, consultada tras cancelarla."""
+    try:
+        with observe_sdk('hyperliquid', 'query_order_by_oid'):
+            status = hl_info.query_order_by_oid(hyper_address, leg['oid'])
+        order = status['order']['order']
+        return max(float(order['origSz']) - float(order['sz']), 0.0)
+    except Exception as e:
+        logger.warning("No se pudo consultar la orden de Hyperliquid", oid=leg['oid'], error=str(e))
+        return leg.get('filled_size', 0.0)
+
+def _deshacer_hyper_leg(hl_info, hl_exchange, hyper_address, leg):
+    if not leg.get('placed_at'):
+        return None
+    qty = leg.get('filled_size', leg['adjusted_size'])
+    if leg.get('oid') and not leg.get('filled_at'):
+        # Orden en reposo: cancelar el remanente y cerrar lo que llegara a llenarse
+        response = hl_exchange.cancel(leg['coin'], leg['oid'])
+        qty = _hyper_resting_filled_size(hl_info, hyper_address, leg)
+        if qty <= 0:
+            return response
+    if qty <= 0:
+        return None
+    logger.warning("Deshaciendo pata de Hyperliquid", coin=leg['coin'], qty=qty)
+    return place_hyperliquid_order(
+        hl_info=hl_info,
+        hl_exchange=hl_exchange,
+        hyper_address=hyper_address,
+        coin=leg['coin'],
+        is_buy=not leg['is_buy'],
+        sz=qty,
+        leverage=leg['leverage'],
+        reduce_only=True
+    )
+
+def ejecutar_hedge(client, hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage,
+                   best_price_binance, best_price_hyper, max_leg_skew=HEDGE_MAX_LEG_SKEW, leg_timeout=HEDGE_LEG_TIMEOUT):
+    """
+    Ejecuta ambas patas del hedge de forma concurrente.
+    Las dos patas se preparan por adelantado (filtros, margen, apalancamiento) y se envían a la vez.
+    Si una pata falla, la de Hyperliquid queda en reposo o parcial, o la de Binance no se llena dentro de
+    ``max_leg_skew`` segundos después de la otra, se cancela lo pendiente y se deshace la pata ya ejecutada.
+    :param direction: Dirección en Binance ('long' o 'short')
+    :param max_leg_skew: Desfase máximo permitido entre los llenados de ambas patas (segundos)
+    :param leg_timeout: Espera máxima del llenado de cada pata (segundos)
+    :return: Diccionario con status ('success', 'unwound', 'unwind_failed' o 'failed'), patas, tiempos y errores
+    """
+    side = 'BUY' if direction == 'long' else 'SELL'
+    result = {
+        'status': 'failed',
+        'symbol': symbol,
+        'legs': {'binance': {}, 'hyperliquid': {}},
+        'timings': {'binance': {}, 'hyperliquid': {}},
+        'leg_skew_ms': None,
+        'skew_exceeded': False,
+        'errors': {},
+        'unwind': {},
+    }
+    timings = result['timings']
+
+    def preparar(name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[name]['prepare_ms'] = (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge") as pool:
+        # 1. Preparar ambas patas en paralelo: nada se envía si alguna falla
+        futures = {
+            'binance': pool.submit(preparar, 'binance', preparar_binance_order,
+                                   client, symbol, side, capital, leverage, best_price_binance),
+            'hyperliquid': pool.submit(preparar, 'hyperliquid', preparar_hyper_order,
+                                       hl_info, hl_exchange, hyper_address, symbol, direction, capital, leverage,
+                                       best_price_hyper),
+        }
+        for name, future in futures.items():
+            try:
+                result['legs'][name] = future.result()
+            except Exception as e:
+                result['errors'][name] = str(e)
+        if result['errors']:
+            logger.error("Hedge abortado antes de enviar órdenes", symbol=symbol, errors=result['errors'])
+            HEDGES.labels(result['status']).inc()
+            return result
+
+        binance_leg = result['legs']['binance']
+        hyper_leg = result['legs']['hyperliquid']
+
+        # 2. Enviar ambas patas simultáneamente
+        submitted_at = time.perf_counter()
+        futures = {
+            pool.submit(enviar_binance_order, client, binance_leg, leg_timeout): 'binance',
+            pool.submit(enviar_hyperliquid_order, hl_exchange, hyper_leg): 'hyperliquid',
+        }
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        if pending:
+            done, pending = wait(pending, timeout=max_leg_skew)
+            if pending:
+                result['skew_exceeded'] = True
+                logger.warning("Desfase entre patas superado; cancelando la pata pendiente", symbol=symbol, max_leg_skew=max_leg_skew)
+                if 'binance' in {futures[f] for f in pending}:
+                    cancelar_binance_order(client, binance_leg)
+                wait(pending)
+
+        for future, name in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                result['errors'][name] = str(e)
+    # Las órdenes enviadas dejan obsoletas las cuentas en memoria
+    get_portfolio_store().invalidate()
+
+    # 3. Tiempos por pata
+    for name, leg in (('binance', binance_leg), ('hyperliquid', hyper_leg)):
+        if leg.get('placed_at'):
+            timings[name]['submit_ms'] = (leg['placed_at'] - submitted_at) * 1000
+        if leg.get('filled_at'):
+            timings[name]['fill_ms'] = (leg['filled_at'] - submitted_at) * 1000
+    if 'fill_ms' in timings['binance'] and 'fill_ms' in timings['hyperliquid']:
+        result['leg_skew_ms'] = abs(timings['binance']['fill_ms'] - timings['hyperliquid']['fill_ms'])
+        HEDGE_LEG_SKEW.observe(result['leg_skew_ms'] / 1000)
+
+    if 'hyperliquid' not in result['errors'] and not _hyper_leg_filled(hyper_leg):
+        # Una orden en reposo o parcial deja la pata de Binance sin cubrir
+        result['errors']['hyperliquid'] = (f"Orden de Hyperliquid sin llenar por completo "
+                                           f"({hyper_leg.get('filled_size', 0.0)}/{hyper_leg['adjusted_size']})")
+
+    if not result['errors']:
+        result['status'] = 'success'
+        HEDGES.labels(result['status']).inc()
+        return result
+
+    # 4. Deshacer lo ejecutado si alguna pata falló
+    logger.error("Fallo en el hedge; deshaciendo patas ejecutadas", symbol=symbol, errors=result['errors'])
+    result['status'] = 'unwound'
+    unwinders = {
+        'binance': lambda: _deshacer_binance_leg(client, binance_leg),
+        'hyperliquid': lambda: _deshacer_hyper_leg(hl_info, hl_exchange, hyper_address, hyper_leg),
+    }
+    for name, unwind in unwinders.items():
+        try:
+            response = unwind()
+            if response is not None:
+                result['unwind'][name] = response
+        except Exception as e:
+            result['status'] = 'unwind_failed'
+            result['unwind'][name] = {'error': str(e)}
+            logger.exception("Error al deshacer la pata", leg=name, error=str(e))
+    HEDGES.labels(result['status']).inc()
+    return result
+
+def cerrar_posiciones(client, hl_info, hl_exchange, hyper_address, symbol, posicion, session_state):
+    """
+    Cierra las posiciones de ``symbol`` en ambos exchanges.
+    Las posiciones se leen de un único snapshot recién consultado (nunca de la caché: un tamaño
+    obsoleto podría abrir la posición contraria) y el cierre se verifica con otro snapshot nuevo.
+    :return: True si ambas patas quedaron cerradas
+    """
+    store = get_portfolio_store()
+    coin = symbol.replace('USDT', '')
+    snapshot = store.snapshot(client, hl_info, hyper_address, max_age=0)
+    closed = {'binance': False, 'hyperliquid': False}
+    sent = set()
+
+    # Cerrar posición de Binance
+    if 'binance' in snapshot.errors:
+        logger.error("Error al cerrar la posición de Binance", symbol=symbol, error=snapshot.errors['binance'])
+    else:
+        try:
+            position = snapshot.position('binance', coin)
+            if position is not None:
+                close_side = 'SELL' if position.size > 0 else 'BUY'
                 close_order = client.futures_create_order(
                     symbol=symbol,
                     side=close_side,
                     type='MARKET',
-                    quantity=qty
+                    quantity=abs(position.size),
+                    reduceOnly='true'
                 )
                 final_order = wait_for_binance_order(client, symbol, close_order['orderId'])
-                if final_order['status'] != 'FILLED':
+                if not Order.from_binance(final_order).is_filled:
                     raise Exception(f"Fallo en la orden de cierre de Binance: {final_order}")
-                position_info_after = client.futures_position_information(symbol=symbol)
-                if position_info_after and abs(float(position_info_after[0]['positionAmt'])) < 1e-6:
-                    session_state.positions['binance'][symbol] = {}
-                    binance_closed = True
-                else:
-                    print("La posición de Binance no se cerró completamente.")
+                sent.add('binance')
             else:
-                binance_closed = True
-        else:
-            binance_closed = True
-    except Exception as e:
-        print(f"Error al cerrar la posición de Binance: {e}")
-        traceback.print_exc()
-    
+                closed['binance'] = True
+        except Exception as e:
+            logger.exception("Error al cerrar la posición de Binance", symbol=symbol, error=str(e))
+
     # Cerrar posición de Hyperliquid
-    try:
-        hyper_positions = get_hyperliquid_positions(hl_info, hyper_address)
-        if symbol in hyper_positions and abs(hyper_positions[symbol]['size']) > 0:
-            qty = abs(hyper_positions[symbol]['size'])
-            coin = symbol.replace('USDT', '')
-            is_buy = (hyper_positions[symbol]['size'] < 0)
-            leverage = session_state.positions['hyperliquid'].get(symbol, {}).get('leverage', 2)
-            print(f"Cerrando posición en Hyperliquid: coin={coin}, is_buy={is_buy}, qty={qty}, leverage={leverage}")
-            response = place_hyperliquid_order(
-                hl_info=hl_info,
-                hl_exchange=hl_exchange,
-                hyper_address=hyper_address,
-                coin=coin,
-                is_buy=is_buy,
-                sz=qty,
-                leverage=leverage,
-                reduce_only=True
-            )
-            new_positions = get_hyperliquid_positions(hl_info, hyper_address)
-            if symbol not in new_positions or abs(new_positions[symbol]['size']) < 1e-6:
-                session_state.positions['hyperliquid'][symbol] = {}
-                hyperliquid_closed = True
+    if 'hyperliquid' in snapshot.errors:
+        logger.error("Error al cerrar la posición de Hyperliquid", symbol=symbol, error=snapshot.errors['hyperliquid'])
+    else:
+        try:
+            position = snapshot.position('hyperliquid', coin)
+            if position is not None:
+                qty = abs(position.size)
+                is_buy = position.size < 0
+                leverage = session_state.positions['hyperliquid'].get(symbol, {}).get('leverage', 2)
+                logger.info("Cerrando posición en Hyperliquid", coin=coin, is_buy=is_buy, qty=qty, leverage=leverage)
+                place_hyperliquid_order(
+                    hl_info=hl_info,
+                    hl_exchange=hl_exchange,
+                    hyper_address=hyper_address,
+                    coin=coin,
+                    is_buy=is_buy,
+                    sz=qty,
+                    leverage=leverage,
+                    reduce_only=True
+                )
+                sent.add('hyperliquid')
             else:
-                print(f"La posición de Hyperliquid no se cerró completamente. Tamaño restante: {new_positions[symbol]['size']}")
-        else:
-            hyperliquid_closed = True
-    except Exception as e:
-        print(f"Error al cerrar la posición de Hyperliquid: {e}")
-        traceback.print_exc()
-    
-    return binance_closed and hyperliquid_closed
+                closed['hyperliquid'] = True
+        except Exception as e:
+            logger.exception("Error al cerrar la posición de Hyperliquid", symbol=symbol, error=str(e))
+
+    # Verificar ambos cierres con un único snapshot nuevo
+    if sent:
+        store.invalidate()
+        after = store.snapshot(client, hl_info, hyper_address, max_age=0)
+        for venue in sent:
+            if venue in after.errors:
+                logger.warning("No se pudo verificar el cierre", venue=venue, symbol=symbol, error=after.errors[venue])
+                continue
+            remaining = after.position(venue, coin)
+            if remaining is None:
+                session_state.positions[venue][symbol] = {}
+                closed[venue] = True
+            else:
+                logger.warning("La posición no se cerró completamente", venue=venue, symbol=symbol, remaining=remaining.size)
+
+    return closed['binance'] and closed['hyperliquid']
+
+def _binance_close_orders(positions):
+    return [{
+        'symbol': p.symbol,
+        'side': 'SELL' if p.size > 0 else 'BUY',
+        'type': 'MARKET',
+        'quantity': format_binance_quantity(abs(p.size)),
+        'reduceOnly': 'true',
+    } for p in positions]
+
+def _hyperliquid_close_orders(hl_info, positions, slippage):
+    orders = []
+    for p in positions:
+        is_buy = p.size < 0
+        limit_px = p.mark_price * (1 + slippage if is_buy else 1 - slippage)
+        orders.append({
+            'coin': p.coin,
+            'is_buy': is_buy,
+            'sz': abs(p.size),
+            'limit_px': adjust_hyperliquid_price(hl_info, limit_px, p.coin, is_buy),
+            'order_type': {'limit': {'tif': 'Ioc'}},
+            'reduce_only': True,
+        })
+    return orders
+
+def close_all_hedges(client, hl_info, hl_exchange, hyper_address, session_state=None, coins=None,
+                     slippage=CLOSE_ALL_SLIPPAGE, timeout=CLOSE_ALL_TIMEOUT):
+    """
+    Cierre de emergencia de todas las posiciones de ambos exchanges a la vez.
+    Binance recibe órdenes MARKET reduce-only por ``batchOrders`` (5 por solicitud, lotes en
+    paralelo) y Hyperliquid una sola acción con todas las órdenes IOC reduce-only; ambos
+    exchanges se envían de forma concurrente y los llenados de Binance se concilian en paralelo.
+    :param coins: Monedas a cerrar (ej. ['BTC', 'ETH']); por defecto todas
+    :param slippage: Margen del precio límite IOC de Hyperliquid respecto al mark
+    :param timeout: Espera máxima del llenado de cada orden de Binance (segundos)
+    :return: Diccionario con status ('flat', 'residual' o 'failed'), orders, errors y
+             residual (exposición restante por moneda: binance, hyperliquid y net)
+    """
+    start = time.perf_counter()
+    store = get_portfolio_store()
+    snapshot = store.snapshot(client, hl_info, hyper_address, max_age=0)
+    result = {'status': 'failed', 'orders': {'binance': [], 'hyperliquid': []}, 'errors': dict(snapshot.errors),
+              'residual': {}, 'elapsed_ms': None}
+    targets = {
+        venue: [p for p in snapshot.open_positions(venue) if coins is None or p.coin in coins]
+        for venue in ('binance', 'hyperliquid')
+    }
+    logger.warning("Cerrando todas las posiciones", binance=len(targets['binance']), hyperliquid=len(targets['hyperliquid']))
+
+    def close_binance():
+        orders = _binance_close_orders(targets['binance'])
+        placed = enviar_binance_batch_orders(client, orders)
+        accepted = [(order, p) for order, p in zip(placed, targets['binance']) if order.error is None]
+        for order, p in zip(placed, targets['binance']):
+            if order.error is not None:
+                result['errors'][f"binance:{p.coin}"] = order.error
+
+        def reconcile(item):
+            order, p = item
+            try:
+                final = Order.from_binance(wait_for_binance_order(client, p.symbol, order.order_id, timeout=timeout))
+                if not final.is_filled:
+                    result['errors'][f"binance:{p.coin}"] = f"Orden {order.order_id} en estado {final.status}"
+            except Exception as e:
+                result['errors'][f"binance:{p.coin}"] = str(e)
+
+        if accepted:
+            with ThreadPoolExecutor(max_workers=len(accepted), thread_name_prefix="close-all") as pool:
+                list(pool.map(reconcile, accepted))
+        return placed
+
+    def close_hyperliquid():
+        placed = enviar_hyperliquid_bulk_orders(hl_exchange, _hyperliquid_close_orders(hl_info, targets['hyperliquid'], slippage))
+        for order, p in zip(placed, targets['hyperliquid']):
+            if order.error is not None:
+                result['errors'][f"hyperliquid:{p.coin}"] = order.error
+        return placed
+
+    jobs = {'binance': close_binance, 'hyperliquid': close_hyperliquid}
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="close-all") as pool:
+        futures = {venue: pool.submit(job) for venue, job in jobs.items() if targets[venue]}
+        for venue, future in futures.items():
+            try:
+                result['orders'][venue] = future.result()
+            except Exception as e:
+                result['errors'][venue] = str(e)
+                logger.exception("Error en el cierre masivo", venue=venue, error=str(e))
+
+    # Conciliar: exposición restante por moneda con un único snapshot nuevo
+    store.invalidate()
+    after = store.snapshot(client, hl_info, hyper_address, max_age=0)
+    result['errors'].update({f"verify:{venue}": error for venue, error in after.errors.items()})
+    for coin in sorted({p.coin for venue_targets in targets.values() for p in venue_targets}):
+        sizes = {venue: (after.position(venue, coin).size if after.position(venue, coin) else 0.0)
+                 for venue in ('binance', 'hyperliquid')}
+        if any(sizes.values()):
+            result['residual'][coin] = dict(sizes, net=sizes['binance'] + sizes['hyperliquid'])
+        elif session_state is not None:
+            for venue in ('binance', 'hyperliquid'):
+                session_state.positions[venue].pop(f"{coin}USDT", None)
+
+    if not snapshot.errors and not after.errors and not result['residual']:
+        result['status'] = 'flat'
+    elif after.binance is not None or after.hyperliquid is not None:
+        result['status'] = 'residual'
+    result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+    logger.warning("Cierre masivo terminado", status=result['status'], residual=result['residual'], elapsed_ms=result['elapsed_ms'])
+    return result
 
 def check_all_positions(binance_client, hl_exchange, hl_info, hyper_address):
     try:
         if not binance_client or not hl_exchange or not hl_info:
             return "❌ No se pueden verificar posiciones: Clientes no inicializados."
 
-        # Verificar posiciones en Binance
-        binance_positions = []
-        try:
-            positions = binance_client.futures_position_information()
-            binance_positions = [p for p in positions if float(p['positionAmt']) != 0]
-        except Exception as e:
-            print(f"❌ Error al obtener posiciones de Binance: {e}")
-
-        # Verificar posiciones en Hyperliquid
-        hyper_positions = []
-        try:
-            user_state = hl_info.user_state(hyper_address)
-            if user_state and 'assetPositions' in user_state:
-                hyper_positions = [p for p in user_state['assetPositions'] if float(p['position']) != 0]
-        except Exception as e:
-            print(f"❌ Error al obtener posiciones de Hyperliquid: {e}")
+        snapshot = get_portfolio_store().snapshot(binance_client, hl_info, hyper_address)
+        for venue, error in snapshot.errors.items():
+            logger.error("Error al obtener posiciones", venue=venue, error=error)
+        binance_positions = snapshot.open_positions('binance')
+        hyper_positions = snapshot.open_positions('hyperliquid')
 
         # Preparar mensaje de respuesta
         if not binance_positions and not hyper_positions:
@@ -168,12 +488,12 @@ def check_all_positions(binance_client, hl_exchange, hl_info, hyper_address):
         if binance_positions:
             mensaje += "Binance:\n"
             for pos in binance_positions:
-                mensaje += f"- {pos['symbol']}: {pos['positionAmt']} @ {pos['entryPrice']}\n"
+                mensaje += f"- {pos.symbol}: {pos.size} @ {pos.entry_price}\n"
         
         if hyper_positions:
             mensaje += "\nHyperliquid:\n"
             for pos in hyper_positions:
-                mensaje += f"- {pos['coin']}: {pos['position']} @ {pos['entryPrice']}\n"
+                mensaje += f"- {pos.coin}: {pos.size} @ {pos.entry_price}\n"
 
         return mensaje
 
@@ -193,7 +513,7 @@ def evaluate_funding_opportunity(symbol, threshold=0.001):
         if not binance_data:
             return {"status": "error", "message": "No se pudo obtener la tasa de funding de Binance"}
         
-        binance_rate = float(binance_data[-1]["fundingRate"]) * 100  # Convertir a porcentaje
+        binance_rate = FundingSample.from_binance(binance_data[-1]).rate * 100  # Convertir a porcentaje
         hyperliquid_data = hyperliquid_fr(symbol.replace("USDT", ""))
         hyperliquid_rate = float(hyperliquid_data.get("rate", 0)) * 100  # Convertir a porcentaje
 
@@ -202,11 +522,11 @@ def evaluate_funding_opportunity(symbol, threshold=0.001):
 
         # Ajustar el umbral a porcentaje (por ejemplo, 0.001 * 100 = 0.1%)
         if abs(diff) > threshold * 100:
+            # Short en el venue que paga más funding, long en el otro
+            recommendation = str(funding_recommendation(diff))
             if diff > 0:
-                recommendation = "Abrir Long en Binance, Short en Hyperliquid"
                 opportunity = "Tasa de funding más alta en Binance"
             else:
-                recommendation = "Abrir Short en Binance, Long en Hyperliquid"
                 opportunity = "Tasa de funding más alta en Hyperliquid"
             
             return {
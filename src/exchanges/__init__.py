@@ -6,8 +6,20 @@ Exchange-specific operations and utilities
 
 __all__ = [
     "get_funding_rate",
+    "get_funding_history",
     "ejecutar_binance_order",
+    "preparar_binance_order",
+    "enviar_binance_order",
+    "enviar_binance_batch_orders",
     "get_hyperliquid_best_price",
     "place_hyperliquid_order",
-    "get_hyperliquid_positions"
+    "preparar_hyperliquid_order",
+    "enviar_hyperliquid_order",
+    "enviar_hyperliquid_bulk_orders",
+    "get_hyperliquid_positions",
+    "get_hyperliquid_fills",
+    "Position",
+    "Order",
+    "Fill",
+    "FundingSample"
 ] 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from binance.exceptions import BinanceAPIException
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Agregar el directorio src al path
@@ -10,26 +11,50 @@ if str(src_path) not in sys.path:
 
 from core.api_utils import get_binance_filters, round_down_by_step, wait_for_binance_order, get_binance_best_price
 from core.api_utils import api_request
+from core.endpoints import binance_futures_url
+from core.binance_filters import is_filter_rejection, refresh_binance_filters
+from core.clock_sync import get_binance_clock, is_timestamp_error
+from core.logger import get_logger
+from core.metrics import ORDERS, observe_sdk, record_slippage
+from core.portfolio import get_portfolio_store
+from exchanges.models import Order, symbol_to_coin
+from exchanges.binance_router import (
+    route_binance_order, binance_execution_mode, maker_deadline, EXECUTION_MAKER
+)
+
+logger = get_logger(__name__)
 
 # Binance constants
 MIN_NOTIONAL = 10  # Valor notional mínimo en USDT para Binance
+BATCH_ORDER_SIZE = 5  # Órdenes máximas por solicitud a /fapi/v1/batchOrders
 
-def get_funding_rate(symbol, limit=1):
+def get_funding_rate(symbol, limit=1, start_time=None, end_time=None, use_cache=True):
     """
     Obtiene el historial de tasas de funding para un símbolo en Binance.
     :param symbol: Símbolo del par (ej. BTCUSDT)
     :param limit: Número de registros a obtener (máx 1000)
+    :param start_time: Marca temporal inicial en ms (inclusive)
+    :param end_time: Marca temporal final en ms (inclusive)
+    :param use_cache: Usar la caché de api_request
     :return: Lista de tasas de funding
     """
-    url = f"https://fapi.binance.com/fapi/v1/fundingRate?symbol={symbol}&limit={limit}"
+    url = binance_futures_url(f"/fapi/v1/fundingRate?symbol={symbol}&limit={limit}")
+    if start_time is not None:
+        url += f"&startTime={int(start_time)}"
+    if end_time is not None:
+        url += f"&endTime={int(end_time)}"
     try:
-        data = api_request(url)
+        data = api_request(url, use_cache=use_cache)
         return data
     except Exception as e:
-        print(f"Error al obtener funding rate de Binance: {e}")
+        logger.error("Error al obtener funding rate de Binance", symbol=symbol, error=str(e))
         return []
     
-def ejecutar_binance_order(client, symbol, side, capital, leverage, best_price):
+def preparar_binance_order(client, symbol, side, capital, leverage, best_price):
+    """
+    Calcula y valida la pata de Binance sin enviarla: filtros, cantidad, margen y apalancamiento.
+    :return: Diccionario con la pata lista para ``enviar_binance_order``
+    """
     try:
         filters = get_binance_filters(client, symbol)
         tick_size = filters['tickSize']
@@ -39,9 +64,13 @@ def ejecutar_binance_order(client, symbol, side, capital, leverage, best_price):
         notional = qty * best_price
         if qty <= 0:
             raise ValueError(f"Cantidad calculada es cero o negativa: {qty}")
-        # Verificar margen disponible
-        account_info = client.futures_account()
-        available_balance = float(account_info['availableBalance'])
+        if filters.get('maxQty') and qty > filters['maxQty']:
+            raise ValueError(f"Cantidad {qty} excede el máximo permitido {filters['maxQty']} para {symbol}.")
+        if notional < filters.get('minNotional', MIN_NOTIONAL):
+            raise ValueError(f"Notional (${notional:.2f}) menor que el mínimo {filters.get('minNotional', MIN_NOTIONAL)} USDT.")
+        # Verificar margen disponible (cuenta compartida con el resto de componentes)
+        account = get_portfolio_store().binance(client)
+        available_balance = account.available_balance
         margin_required = notional / leverage
         if margin_required > available_balance:
             raise Exception(f"Margen insuficiente. Requerido: {margin_required}, Disponible: {available_balance}")
@@ -54,29 +83,162 @@ def ejecutar_binance_order(client, symbol, side, capital, leverage, best_price):
             if 'No need to change margin type' not in str(e):
                 raise e
         client.futures_change_leverage(symbol=symbol, leverage=leverage)
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=side,
+        position = account.positions.get(symbol_to_coin(symbol))
+        return {
+            'symbol': symbol,
+            'side': side,
+            'qty': qty,
+            'price': adjusted_price,
+            'best_price': best_price,
+            'target_notional': capital * leverage,
+            'order_id': None,
+            'executed_qty': 0.0,
+            # Posición previa: la verificación tras el llenado compara el cambio, no el total
+            'position_before': position.size if position is not None else 0.0,
+        }
+    except Exception as e:
+        raise Exception(f"Fallo en la orden de Binance: {e}")
+
+def _create_limit_order(client, leg):
+    with observe_sdk('binance', 'futures_create_order'):
+        return client.futures_create_order(
+            symbol=leg['symbol'],
+            side=leg['side'],
             type='LIMIT',
-            quantity=qty,
-            price=str(adjusted_price),
+            quantity=leg['qty'],
+            price=str(leg['price']),
             timeInForce='GTC'
         )
-        print(f"Orden colocada en Binance: {order}")
-        final_order = wait_for_binance_order(client, symbol, order['orderId'])
-        if final_order['status'] != 'FILLED':
+
+def _enviar_limit_order(client, leg, timeout):
+    """Coloca la pata como GTC en el mejor precio y espera su llenado; :return: (orden, orden final)"""
+    symbol = leg['symbol']
+    try:
+        order = _create_limit_order(client, leg)
+    except BinanceAPIException as e:
+        if is_timestamp_error(e):
+            # Reloj desfasado respecto al servidor: resincronizar y reintentar una vez
+            logger.warning("Orden rechazada por timestamp; resincronizando reloj", symbol=symbol, code=e.code)
+            get_binance_clock().sync()
+        elif is_filter_rejection(e):
+            # Los filtros en caché quedaron desactualizados: refrescar y reintentar una vez
+            logger.warning("Orden rechazada por filtros; refrescando filtros", symbol=symbol, code=e.code)
+            refresh_binance_filters(client)
+            filters = get_binance_filters(client, symbol)
+            leg['price'] = round_down_by_step(leg['best_price'], filters['tickSize'])
+            leg['qty'] = round_down_by_step(leg['target_notional'] / leg['best_price'], filters['stepSize'])
+        else:
+            ORDERS.labels('binance', 'rejected').inc()
+            raise
+        order = _create_limit_order(client, leg)
+    leg['order_id'] = order['orderId']
+    leg['placed_at'] = time.perf_counter()
+    get_portfolio_store().invalidate()  # El saldo y las posiciones en memoria ya no son válidos
+    logger.info("Orden colocada en Binance", symbol=symbol, order_id=order['orderId'], side=leg['side'], qty=leg['qty'], price=leg['price'])
+    final_order = wait_for_binance_order(client, symbol, order['orderId'], timeout=timeout)
+    if Order.from_binance(final_order).is_filled:
+        # Solo un llenado real cuenta para el desfase entre patas (no CANCELED ni EXPIRED)
+        leg['filled_at'] = time.perf_counter()
+    return order, final_order
+
+def enviar_binance_order(client, leg, timeout=30, mode=None):
+    """
+    Envía una pata preparada, espera su llenado y verifica la posición resultante.
+    Actualiza ``leg`` con order_id, executed_qty, avg_price, placed_at y filled_at (perf_counter).
+    :param client: Cliente de Binance
+    :param leg: Pata devuelta por ``preparar_binance_order``
+    :param timeout: Tiempo máximo de espera del llenado (segundos)
+    :param mode: 'limit' (GTC en el mejor precio) o 'maker' (post-only con repricing y cruce al
+        vencer el plazo, ver ``exchanges.binance_router``); por defecto BINANCE_EXECUTION
+    :return: Orden colocada (en modo maker, la última orden hija)
+    """
+    symbol = leg['symbol']
+    side = leg['side']
+    mode = mode or binance_execution_mode()
+    try:
+        if mode == EXECUTION_MAKER:
+            try:
+                order = final_order = route_binance_order(client, leg, deadline=min(maker_deadline(), timeout))
+            finally:
+                get_portfolio_store().invalidate()
+            filled = leg['executed_qty'] >= leg['qty'] - 1e-9
+            avg_price = leg['avg_price']
+            logger.info("Pata de Binance enrutada", symbol=symbol, side=side, qty=leg['qty'],
+                        executed_qty=leg['executed_qty'], avg_price=avg_price, fees=leg['fees'],
+                        slices=len(leg['slices']))
+        else:
+            order, final_order = _enviar_limit_order(client, leg, timeout)
+            final = Order.from_binance(final_order)
+            leg['executed_qty'], leg['avg_price'] = final.executed_qty, final.avg_price
+            filled, avg_price = final.is_filled, final.avg_price
+        if not filled:
+            ORDERS.labels('binance', 'unfilled').inc()
             raise Exception(f"Fallo al llenar la orden de Binance: {final_order}")
+        ORDERS.labels('binance', 'filled').inc()
+        record_slippage('binance', side == 'BUY', leg['best_price'], avg_price)
         # Verificar posición
+        qty = leg['qty']
         position_info = client.futures_position_information(symbol=symbol)
         if position_info:
             position_info = position_info[0]
-            actual_qty = abs(float(position_info['positionAmt']))
-            expected_qty = qty if side == 'BUY' else -qty
-            print(f"Verificación de posición: Qty esperada={expected_qty}, Qty actual={actual_qty}")
-            if abs(actual_qty - abs(expected_qty)) > 1e-6:
-                raise Exception(f"Discrepancia en el tamaño de la posición: Esperado {abs(expected_qty)}, obtenido {actual_qty}")
+            actual_qty = float(position_info['positionAmt'])
+            expected_qty = leg.get('position_before', 0.0) + (qty if side == 'BUY' else -qty)
+            logger.debug("Verificación de posición", symbol=symbol, expected_qty=expected_qty, actual_qty=actual_qty)
+            if abs(abs(actual_qty) - abs(expected_qty)) > 1e-6:
+                raise Exception(f"Discrepancia en el tamaño de la posición: Esperado {abs(expected_qty)}, obtenido {abs(actual_qty)}")
         else:
-            print("No hay información de posición disponible. Asumiendo posición abierta.")
-        return order, qty, best_price
+            logger.warning("No hay información de posición disponible; asumiendo posición abierta", symbol=symbol)
+        return order
     except Exception as e:
         raise Exception(f"Fallo en la orden de Binance: {e}")
+
+def cancelar_binance_order(client, leg):
+    """
+    Cancela la orden de una pata si todavía está abierta.
+    :return: True si se envió la cancelación
+    """
+    if not leg.get('order_id'):
+        return False
+    try:
+        client.futures_cancel_order(symbol=leg['symbol'], orderId=leg['order_id'])
+        return True
+    except Exception as e:
+        logger.warning("No se pudo cancelar la orden de Binance", order_id=leg['order_id'], error=str(e))
+        return False
+
+def format_binance_quantity(qty):
+    """Cantidad como texto decimal sin notación científica (ej. 1e-05 -> '0.00001')."""
+    return format(qty, 'f').rstrip('0').rstrip('.') or '0'
+
+def enviar_binance_batch_orders(client, orders):
+    """
+    Envía órdenes con ``futures_place_batch_order`` en lotes de BATCH_ORDER_SIZE, todos en paralelo.
+    :param orders: Lista de órdenes (parámetros de /fapi/v1/batchOrders, valores como texto)
+    :return: Lista de Order alineada con ``orders`` (status REJECTED y ``error`` si fue rechazada)
+    """
+    batches = [orders[i:i + BATCH_ORDER_SIZE] for i in range(0, len(orders), BATCH_ORDER_SIZE)]
+
+    def send(batch):
+        try:
+            with observe_sdk('binance', 'futures_place_batch_order'):
+                return client.futures_place_batch_order(batchOrders=[dict(order) for order in batch])
+        except Exception as e:
+            logger.error("Lote de órdenes rechazado por Binance", size=len(batch), error=str(e))
+            return [{'code': getattr(e, 'code', None), 'msg': str(e)}] * len(batch)
+
+    results = []
+    if not batches:
+        return results
+    with ThreadPoolExecutor(max_workers=len(batches), thread_name_prefix="binance-batch") as pool:
+        for batch, batch_results in zip(batches, pool.map(send, batches)):
+            for order, raw in zip(batch, batch_results):
+                results.append(Order.from_binance(dict(raw, symbol=raw.get('symbol', order.get('symbol')))))
+    for order in results:
+        if order.error is not None:
+            ORDERS.labels('binance', 'rejected').inc()
+    return results
+
+def ejecutar_binance_order(client, symbol, side, capital, leverage, best_price):
+    leg = preparar_binance_order(client, symbol, side, capital, leverage, best_price)
+    order = enviar_binance_order(client, leg)
+    return order, leg['qty'], best_price
@@ -0,0 +1,222 @@
+"""
+Router maker-first de la pata de Binance.
+
+Publica la orden como GTX (post-only) en el mejor precio de su propio lado del
+libro (bid para BUY, ask para SELL), la reprecia cuando el libro local se aleja
+de ella y, vencido el plazo, cruza el remanente con IOC (precio límite acotado)
+o MARKET. Cada orden hija queda registrada como un ``RouteSlice`` con su
+comisión y su latencia de llenado.
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from binance.exceptions import BinanceAPIException
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.api_utils import get_binance_filters, get_binance_best_price, round_by_step, round_down_by_step
+from core.api_utils import wait_for_binance_order
+from core.binance_user_stream import get_binance_order_tracker, TERMINAL_STATUSES
+from core.logger import get_logger
+from core.metrics import ORDER_FEES, observe_sdk
+
+logger = get_logger(__name__)
+
+# Modos de ejecución de la pata de Binance
+EXECUTION_ENV = "BINANCE_EXECUTION"  # 'limit' (GTC en el mejor precio) o 'maker'
+MAKER_DEADLINE_ENV = "BINANCE_MAKER_DEADLINE"
+EXECUTION_LIMIT = 'limit'
+EXECUTION_MAKER = 'maker'
+
+FALLBACK_IOC = 'IOC'
+FALLBACK_MARKET = 'MARKET'
+MAKER_DEADLINE = 3.0  # Segundos publicando post-only antes de cruzar (menor que HEDGE_MAX_LEG_SKEW)
+REPRICE_INTERVAL = 0.1  # Frecuencia de comprobación del libro y de la orden (segundos)
+TAKER_MAX_SLIPPAGE = 0.001  # Límite del IOC respecto al mejor precio contrario (10 bps)
+TAKER_TIMEOUT = 10  # Espera máxima del llenado de la orden taker (segundos)
+MAKER_FEE_RATE = 0.0002  # Comisiones estimadas si el user stream no informa la real
+TAKER_FEE_RATE = 0.0005
+UNKNOWN_ORDER = -2011  # La orden ya no está abierta al cancelarla
+
+RouteSlice = namedtuple('RouteSlice', ['order_id', 'liquidity', 'order_type', 'price', 'qty', 'executed_qty',
+                                       'avg_price', 'fee', 'status', 'latency_ms'])
+
+
+def binance_execution_mode():
+    """Modo de ejecución configurado en BINANCE_EXECUTION ('limit' si falta o no es válido)."""
+    mode = os.getenv(EXECUTION_ENV, EXECUTION_LIMIT).strip().lower()
+    return mode if mode in (EXECUTION_LIMIT, EXECUTION_MAKER) else EXECUTION_LIMIT
+
+
+def maker_deadline():
+    """Plazo del modo maker configurado en BINANCE_MAKER_DEADLINE (segundos)."""
+    try:
+        return float(os.getenv(MAKER_DEADLINE_ENV, MAKER_DEADLINE))
+    except ValueError:
+        return MAKER_DEADLINE
+
+
+def _remaining(leg, step):
+    """Cantidad pendiente redondeada al paso del símbolo."""
+    return round(round_down_by_step(leg['qty'] - leg['executed_qty'] + step * 1e-6, step), 8)
+
+
+def _create_order(client, leg, qty, order_type, price=None, tif=None):
+    params = dict(symbol=leg['symbol'], side=leg['side'], type=order_type, quantity=qty)
+    if price is not None:
+        params.update(price=str(price), timeInForce=tif)
+    with observe_sdk('binance', 'futures_create_order'):
+        return client.futures_create_order(**params)
+
+
+def _poll_order(client, symbol, order_id, timeout):
+    """Estado de una orden tras esperar como mucho ``timeout``: user stream si está conectado, si no REST."""
+    tracker = get_binance_order_tracker(client)
+    if tracker is not None and tracker.connected:
+        order = tracker.wait(order_id, timeout) or tracker.get(order_id)
+        if order is not None:
+            return order
+    elif timeout > 0:
+        time.sleep(timeout)
+    return client.futures_get_order(symbol=symbol, orderId=order_id)
+
+
+def _cancel_order(client, symbol, order_id):
+    """Cancela una orden y devuelve su estado final (ya llenada si la cancelación llegó tarde)."""
+    try:
+        return client.futures_cancel_order(symbol=symbol, orderId=order_id)
+    except BinanceAPIException as e:
+        if e.code != UNKNOWN_ORDER:
+            raise
+        return client.futures_get_order(symbol=symbol, orderId=order_id)
+
+
+def _slice_fee(client, order_id, executed_qty, avg_price, liquidity):
+    """Comisión real de los llenados del user stream o, sin ellos, estimada con la tarifa base."""
+    tracker = get_binance_order_tracker(client)
+    fills = tracker.fills(order_id) if tracker is not None and tracker.connected else []
+    if fills:
+        return sum(fill.fee for fill in fills)
+    return executed_qty * avg_price * (MAKER_FEE_RATE if liquidity == 'maker' else TAKER_FEE_RATE)
+
+
+def _record_slice(client, leg, order, liquidity, price, qty, sent_at):
+    executed = float(order.get('executedQty') or 0)
+    avg_price = float(order.get('avgPrice') or 0) or (price or 0.0)
+    fee = _slice_fee(client, order['orderId'], executed, avg_price, liquidity) if executed > 0 else 0.0
+    latency_ms = (time.perf_counter() - sent_at) * 1000
+    route_slice = RouteSlice(order['orderId'], liquidity, order.get('type', ''), price, qty, executed,
+                             avg_price if executed > 0 else 0.0, fee, order['status'], latency_ms)
+    leg['slices'].append(route_slice)
+    leg['executed_qty'] = round(leg['executed_qty'] + executed, 8)
+    leg['fees'] += fee
+    if executed > 0:
+        leg['filled_at'] = time.perf_counter()
+        ORDER_FEES.labels('binance', liquidity).inc(fee)
+    logger.info("Orden hija de Binance terminada", symbol=leg['symbol'], order_id=order['orderId'],
+                liquidity=liquidity, status=order['status'], price=price, executed_qty=executed, fee=fee,
+                latency_ms=round(latency_ms, 1))
+    return route_slice
+
+
+def _settle_live_order(client, leg, live):
+    order_id, liquidity, price, qty, sent_at = live
+    try:
+        order = _cancel_order(client, leg['symbol'], order_id)
+        _record_slice(client, leg, order, liquidity, price, qty, sent_at)
+        leg['order_id'] = None
+    except Exception as e:
+        # Se conserva order_id para que quien deshaga la pata consulte la orden
+        logger.warning("No se pudo cancelar la orden hija de Binance", order_id=order_id, error=str(e))
+
+
+def _work_maker_order(client, leg, order, price, tick, deadline_at, reprice_interval):
+    """
+    Mantiene una orden post-only hasta que termina, el mejor precio se aleja de ella o vence el plazo.
+    :return: Tupla (orden final, True si la canceló el router)
+    """
+    symbol, side = leg['symbol'], leg['side']
+    while order['status'] not in TERMINAL_STATUSES:
+        order = _poll_order(client, symbol, order['orderId'],
+                            min(reprice_interval, max(0.0, deadline_at - time.perf_counter())))
+        if order['status'] in TERMINAL_STATUSES:
+            break
+        touch = get_binance_best_price(client, symbol, side)
+        if abs(touch - price) >= tick / 2 or time.perf_counter() >= deadline_at:
+            return _cancel_order(client, symbol, order['orderId']), True
+    return order, False
+
+
+def route_binance_order(client, leg, deadline=MAKER_DEADLINE, fallback=FALLBACK_IOC,
+                        reprice_interval=REPRICE_INTERVAL):
+    """
+    Ejecuta una pata de ``preparar_binance_order`` en modo maker-first.
+    Actualiza ``leg`` con executed_qty, avg_price, fees, slices (RouteSlice), placed_at y filled_at;
+    ``order_id`` apunta a la orden hija viva para que pueda cancelarse desde fuera.
+    :param deadline: Segundos publicando post-only antes de cruzar el remanente
+    :param fallback: 'IOC' (límite acotado por TAKER_MAX_SLIPPAGE) o 'MARKET'
+    :param reprice_interval: Frecuencia de comprobación del libro (segundos)
+    :return: Última orden hija
+    :raises Exception: Si una orden hija se cancela desde fuera
+    """
+    symbol, side = leg['symbol'], leg['side']
+    filters = get_binance_filters(client, symbol)
+    tick, step = filters['tickSize'], filters['stepSize']
+    leg.update(executed_qty=0.0, fees=0.0, slices=[], placed_at=None)
+    started = time.perf_counter()
+    order = live = None
+    try:
+        # 1. Post-only en el mejor precio propio, repreciando mientras dure el plazo
+        while time.perf_counter() - started < deadline:
+            remaining = _remaining(leg, step)
+            if remaining <= 0:
+                break
+            price = round_by_step(get_binance_best_price(client, symbol, side), tick)
+            sent_at = time.perf_counter()
+            order = _create_order(client, leg, remaining, 'LIMIT', price, 'GTX')
+            live = (order['orderId'], 'maker', price, remaining, sent_at)
+            leg['order_id'] = order['orderId']
+            leg['placed_at'] = leg['placed_at'] or sent_at
+            order, cancelled = _work_maker_order(client, leg, order, price, tick, started + deadline,
+                                                 reprice_interval)
+            live = None
+            _record_slice(client, leg, order, 'maker', price, remaining, sent_at)
+            if order['status'] == 'CANCELED' and not cancelled:
+                raise Exception(f"Orden {order['orderId']} cancelada externamente")
+
+        # 2. Cruzar el remanente al vencer el plazo
+        remaining = _remaining(leg, step)
+        if remaining > 0:
+            sent_at = time.perf_counter()
+            if fallback == FALLBACK_MARKET:
+                price = None
+                order = _create_order(client, leg, remaining, 'MARKET')
+            else:
+                opposite = get_binance_best_price(client, symbol, 'SELL' if side == 'BUY' else 'BUY')
+                limit = opposite * (1 + TAKER_MAX_SLIPPAGE if side == 'BUY' else 1 - TAKER_MAX_SLIPPAGE)
+                price = round_by_step(limit, tick)
+                order = _create_order(client, leg, remaining, 'LIMIT', price, 'IOC')
+            live = (order['orderId'], 'taker', price, remaining, sent_at)
+            leg['order_id'] = order['orderId']
+            leg['placed_at'] = leg['placed_at'] or sent_at
+            if order['status'] not in TERMINAL_STATUSES:
+                order = wait_for_binance_order(client, symbol, order['orderId'], timeout=TAKER_TIMEOUT)
+            live = None
+            _record_slice(client, leg, order, 'taker', price, remaining, sent_at)
+            logger.info("Plazo maker vencido; remanente cruzado", symbol=symbol, fallback=fallback,
+                        qty=remaining, executed_qty=float(order.get('executedQty') or 0))
+    finally:
+        if live is not None:
+            # Un error dejó viva una orden hija: cancelarla y contabilizar lo ejecutado
+            _settle_live_order(client, leg, live)
+        else:
+            leg['order_id'] = None  # Lo ejecutado ya está acumulado en executed_qty
+        executed_notional = sum(s.executed_qty * s.avg_price for s in leg['slices'])
+        leg['avg_price'] = executed_notional / leg['executed_qty'] if leg['executed_qty'] else 0.0
+    return order
@@ -1,7 +1,5 @@
-import math
-import traceback
-import json
 import sys
+import time
 from pathlib import Path
 
 # Agregar el directorio src al path
@@ -10,9 +8,15 @@ if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
 from core.api_utils import api_request
-# Hyperliquid constants
-DEFAULT_TICK_SIZE = 0.1  # Tamaño de tick predeterminado para otros activos
-BTC_TICK_SIZE = 1.0  # Tamaño de tick hardcoded para BTC (asset=0)
+from core.endpoints import hyperliquid_api_url
+from core.hyperliquid_universe import get_hyperliquid_universe, round_price, round_size
+from core.hyperliquid_stream import get_hyperliquid_stream
+from core.logger import get_logger, log_payload
+from core.metrics import ORDERS, observe_sdk, record_slippage
+from core.portfolio import get_portfolio_store
+from exchanges.models import Fill, Order, Position
+
+logger = get_logger(__name__)
 
 def get_funding_rate(coin):
     """
@@ -20,58 +24,60 @@ def get_funding_rate(coin):
     :param coin: Símbolo del activo (ej. BTC)
     :return: Diccionario con la tasa de funding
     """
-    url = "https://api.hyperliquid.xyz/info"
+    url = hyperliquid_api_url('/info')
     payload = {"type": "metaAndAssetCtxs"}
     try:
         data = api_request(url, method='POST', payload=payload)
-        # Imprimir la respuesta completa para depuración
-        print(f"Respuesta completa de la API: {json.dumps(data, indent=2)}")
+        log_payload(logger, "Respuesta metaAndAssetCtxs", data, coin=coin)
         
         if not isinstance(data, (list, tuple)) or len(data) < 2:
-            print(f"Formato de datos inesperado: {data}")
+            logger.warning("Formato de datos inesperado en metaAndAssetCtxs", data_type=type(data).__name__)
             return {"rate": 0}
         
         meta, asset_ctxs = data[0], data[1]
         
-        # Imprimir meta y asset_ctxs para inspección
-        print(f"meta: {json.dumps(meta, indent=2)}")
-        print(f"asset_ctxs: {json.dumps(asset_ctxs, indent=2)}")
-        
-        # Intentar encontrar el activo en meta['universe']
-        if 'universe' in meta:
-            for asset in meta['universe']:
-                if asset.get('name') == coin:
-                    asset_index = meta['universe'].index(asset)
-                    if asset_index < len(asset_ctxs):
-                        asset_data = asset_ctxs[asset_index]
-                        return {"rate": float(asset_data.get('funding', 0))}
+        # Buscar el activo en meta['universe'] en una sola pasada
+        for asset_index, asset in enumerate(meta.get('universe', [])):
+            if asset.get('name') == coin:
+                if asset_index < len(asset_ctxs):
+                    return {"rate": float(asset_ctxs[asset_index].get('funding', 0))}
+                break
         
-        print(f"No se encontró el activo {coin} en meta['universe']")
+        logger.warning("Activo no encontrado en el universo de Hyperliquid", coin=coin)
         return {"rate": 0}
     except Exception as e:
-        print(f"Error al obtener funding rate de Hyperliquid: {e}")
+        logger.error("Error al obtener funding rate de Hyperliquid", coin=coin, error=str(e))
         return {"rate": 0}
     
+def get_funding_history(coin, start_time, end_time=None, use_cache=True):
+    """
+    Obtiene el historial de funding horario de un activo en Hyperliquid.
+    :param coin: Símbolo del activo (ej. BTC)
+    :param start_time: Marca temporal inicial en ms (inclusive)
+    :param end_time: Marca temporal final en ms (opcional)
+    :param use_cache: Usar la caché de api_request
+    :return: Lista de registros {coin, fundingRate, premium, time} (máx 500 por llamada)
+    """
+    url = hyperliquid_api_url('/info')
+    payload = {"type": "fundingHistory", "coin": coin, "startTime": int(start_time)}
+    if end_time is not None:
+        payload["endTime"] = int(end_time)
+    try:
+        data = api_request(url, method='POST', payload=payload, use_cache=use_cache)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logger.error("Error al obtener historial de funding de Hyperliquid", coin=coin, error=str(e))
+        return []
+
 def get_hyperliquid_asset_metadata(hl_info, coin):
     try:
-        data = hl_info.meta()
-        for asset in data["universe"]:
-            if asset["name"] == coin:
-                return {
-                    'sz_decimals': asset.get('szDecimals', 8),
-                    'min_sz': float(asset.get('minSz', 0.001))
-                }
-        raise Exception(f"Activo {coin} no encontrado en el universo de Hyperliquid.")
+        return get_hyperliquid_universe(hl_info).asset(hl_info, coin)
     except Exception as e:
         raise Exception(f"Fallo al obtener metadatos del activo para {coin}: {e}")
 
 def get_hyperliquid_asset_index(hl_info, coin):
     try:
-        data = hl_info.meta()
-        for idx, asset in enumerate(data["universe"]):
-            if asset["name"] == coin:
-                return idx
-        raise Exception(f"Activo {coin} no encontrado en el universo de Hyperliquid.")
+        return get_hyperliquid_universe(hl_info).asset(hl_info, coin)['index']
     except Exception as e:
         raise Exception(f"Fallo al obtener el índice del activo para {coin}: {e}")
 
@@ -81,48 +87,45 @@ def adjust_hyperliquid_size(hl_info, coin, sz):
         min_sz = metadata['min_sz']
         sz_decimals = metadata['sz_decimals']
         if sz < min_sz:
-            print(f"Tamaño {sz} por debajo del mínimo {min_sz} para {coin}. Ajustando al mínimo.")
+            logger.info("Tamaño por debajo del mínimo; ajustando al mínimo", coin=coin, size=sz, min_sz=min_sz)
             sz = min_sz
-        sz = math.floor(sz * 10**sz_decimals) / 10**sz_decimals  # Redondeo hacia abajo
-        print(f"Tamaño ajustado para {coin}: {sz} (decimales: {sz_decimals}, mín: {min_sz})")
+        sz = round_size(metadata, sz)  # Redondeo hacia abajo
+        logger.debug("Tamaño ajustado", coin=coin, size=sz, sz_decimals=sz_decimals, min_sz=min_sz)
         return sz
     except Exception as e:
-        print(f"Fallo al ajustar el tamaño de Hyperliquid: {e}")
+        logger.error("Fallo al ajustar el tamaño de Hyperliquid", coin=coin, error=str(e))
         raise
 
 def adjust_hyperliquid_price(hl_info, px, coin, is_buy):
     try:
         if px is None:
             return None
-        asset_index = get_hyperliquid_asset_index(hl_info, coin)
-        tick_size = BTC_TICK_SIZE if asset_index == 0 else DEFAULT_TICK_SIZE
-        px_rounded = math.floor(px / tick_size) * tick_size if not is_buy else math.ceil(px / tick_size) * tick_size
-        decimal_places = len(str(tick_size).split('.')[1]) if '.' in str(tick_size) else 0
-        px_rounded = round(px_rounded, decimal_places)
-        remainder = px_rounded % tick_size
-        print(f"Ajuste de precio para {coin} (asset={asset_index}): Original={px}, Tamaño de Tick={tick_size}, Ajustado={px_rounded}, Resto (debe ser 0)={remainder}")
-        if remainder != 0:
-            print(f"El precio ajustado {px_rounded} no es divisible por el tamaño de tick {tick_size}.")
+        metadata = get_hyperliquid_asset_metadata(hl_info, coin)
+        # 5 cifras significativas y como mucho MAX_DECIMALS - szDecimals decimales
+        px_rounded = round_price(metadata, px, is_buy)
+        logger.debug("Ajuste de precio", coin=coin, asset=metadata['index'], original=px, adjusted=px_rounded)
         return px_rounded
     except Exception as e:
-        print(f"Fallo al ajustar el precio de Hyperliquid: {e}")
+        logger.error("Fallo al ajustar el precio de Hyperliquid", coin=coin, error=str(e))
         raise
 
 def check_hyperliquid_margin(hl_info, hyper_address, notional_value, leverage):
     try:
-        user_state = hl_info.user_state(hyper_address)
-        withdrawable = float(user_state.get('withdrawable', 0))
+        withdrawable = get_portfolio_store().hyperliquid(hl_info, hyper_address).withdrawable
         required_margin = notional_value / leverage
-        print(f"Verificación de margen: Notional={notional_value}, Apalancamiento={leverage}, Margen Requerido={required_margin}")
-        print(f"Retirable={withdrawable}")
+        logger.debug("Verificación de margen", notional=notional_value, leverage=leverage, required_margin=required_margin, withdrawable=withdrawable)
         if required_margin > withdrawable:
             raise Exception(f"Margen insuficiente para colocar la orden. Requerido: {required_margin}, Disponible: {withdrawable}")
         return True
     except Exception as e:
-        print(f"Error al verificar el margen de Hyperliquid: {e}")
+        logger.error("Error al verificar el margen de Hyperliquid", error=str(e))
         raise
 
-def place_hyperliquid_order(hl_info, hl_exchange, hyper_address, coin, is_buy, sz, leverage, reduce_only):
+def preparar_hyperliquid_order(hl_info, hl_exchange, hyper_address, coin, is_buy, sz, leverage, reduce_only):
+    """
+    Ajusta tamaño y precio, verifica margen y configura apalancamiento sin enviar la orden.
+    :return: Diccionario con la orden lista para ``enviar_hyperliquid_order``
+    """
     try:
         if not hl_exchange:
             raise Exception("Cliente de intercambio de Hyperliquid no inicializado.")
@@ -140,16 +143,16 @@ def place_hyperliquid_order(hl_info, hl_exchange, hyper_address, coin, is_buy, s
             notional_value = sz_adjusted * px_adjusted
             check_hyperliquid_margin(hl_info, hyper_address, notional_value, leverage)
         else:
-            print("Órden reduce_only detectada. Omitiendo verificación de margen.")
+            logger.debug("Orden reduce_only; se omite la verificación de margen", coin=coin)
         
         # Configurar apalancamiento
         try:
             hl_exchange.update_leverage(name=coin, leverage=leverage, is_cross=True)
-            print(f"Apalancamiento establecido a {leverage}x para {coin}")
+            logger.debug("Apalancamiento establecido", coin=coin, leverage=leverage)
         except Exception as e:
-            print(f"Fallo al establecer apalancamiento: {e}. Usando predeterminado.")
+            logger.warning("Fallo al establecer apalancamiento; usando predeterminado", coin=coin, error=str(e))
         
-        order_details = {
+        return {
             "coin": coin,
             "is_buy": is_buy,
             "original_size": sz,
@@ -157,69 +160,141 @@ def place_hyperliquid_order(hl_info, hl_exchange, hyper_address, coin, is_buy, s
             "adjusted_price": px_adjusted,
             "order_type": order_type,
             "reduce_only": reduce_only,
-            "leverage": leverage
+            "leverage": leverage,
+            "reference_price": mark_price
         }
-        print(f"Intentando orden en Hyperliquid: {order_details}")
-        
-        response = hl_exchange.order(
-            name=coin,
-            is_buy=is_buy,
-            sz=sz_adjusted,
-            limit_px=px_adjusted,
-            order_type=order_type,
-            reduce_only=reduce_only
+    except Exception as e:
+        logger.exception("Fallo al preparar la orden de Hyperliquid", coin=coin, error=str(e))
+        raise
+
+def enviar_hyperliquid_order(hl_exchange, order_details):
+    """
+    Envía una orden preparada por ``preparar_hyperliquid_order``.
+    Actualiza ``order_details`` con filled_size, avg_price, oid, placed_at y, solo si la orden se llenó,
+    filled_at (perf_counter). Una orden en reposo deja filled_size en 0 y sin filled_at.
+    :return: Respuesta de Hyperliquid
+    """
+    try:
+        logger.info(
+            "Enviando orden a Hyperliquid",
+            coin=order_details["coin"],
+            is_buy=order_details["is_buy"],
+            size=order_details["adjusted_size"],
+            price=order_details["adjusted_price"],
+            reduce_only=order_details["reduce_only"],
         )
         
-        print(f"Respuesta de Hyperliquid: {response}")
+        with observe_sdk('hyperliquid', 'order'):
+            response = hl_exchange.order(
+                name=order_details["coin"],
+                is_buy=order_details["is_buy"],
+                sz=order_details["adjusted_size"],
+                limit_px=order_details["adjusted_price"],
+                order_type=order_details["order_type"],
+                reduce_only=order_details["reduce_only"]
+            )
+        order_details["placed_at"] = time.perf_counter()
+        get_portfolio_store().invalidate()  # El saldo y las posiciones en memoria ya no son válidos
+        
+        logger.debug("Respuesta de Hyperliquid", response=response)
         
+        request = {"coin": order_details["coin"], "is_buy": order_details["is_buy"],
+                   "sz": order_details["adjusted_size"], "limit_px": order_details["adjusted_price"]}
         statuses = response.get('response', {}).get('data', {}).get('statuses', [])
         for status in statuses:
-            if 'error' in status:
-                raise Exception(f"Orden rechazada: {status['error']}")
+            order = Order.from_hyperliquid(request, status)
+            order_details["oid"] = order.order_id
+            order_details["filled_size"] = order.executed_qty
+            order_details["avg_price"] = order.avg_price
+            if order.error is not None:
+                ORDERS.labels('hyperliquid', 'rejected').inc()
+                raise Exception(f"Orden rechazada: {order.error}")
+            if order.is_filled:
+                order_details["filled_at"] = order_details["placed_at"]
+                ORDERS.labels('hyperliquid', 'filled').inc()
+                record_slippage('hyperliquid', order_details["is_buy"], order_details.get("reference_price"), order.avg_price)
+            else:
+                ORDERS.labels('hyperliquid', 'resting').inc()
         
         return response
     except Exception as e:
-        print(f"Fallo en la orden de Hyperliquid: {e}")
-        traceback.print_exc()
+        logger.exception("Fallo en la orden de Hyperliquid", coin=order_details.get("coin"), error=str(e))
         raise
 
+def enviar_hyperliquid_bulk_orders(hl_exchange, orders):
+    """
+    Envía varias órdenes en una sola acción firmada (``bulk_orders``).
+    :param orders: Lista de dicts con coin, is_buy, sz, limit_px, order_type y reduce_only
+    :return: Lista de Order alineada con ``orders``
+    """
+    if not orders:
+        return []
+    try:
+        with observe_sdk('hyperliquid', 'bulk_orders'):
+            response = hl_exchange.bulk_orders(orders)
+    except Exception as e:
+        logger.exception("Fallo en el lote de órdenes de Hyperliquid", size=len(orders), error=str(e))
+        statuses = [{'error': str(e)}] * len(orders)
+    else:
+        if response.get('status') == 'ok':
+            statuses = response.get('response', {}).get('data', {}).get('statuses', [])
+        else:
+            statuses = [{'error': str(response.get('response', response))}] * len(orders)
+    statuses = statuses + [{'error': "Sin estado en la respuesta"}] * (len(orders) - len(statuses))
+    results = [Order.from_hyperliquid(order, status) for order, status in zip(orders, statuses)]
+    for order in results:
+        outcome = 'rejected' if order.error is not None else 'filled' if order.is_filled else 'resting'
+        ORDERS.labels('hyperliquid', outcome).inc()
+    return results
+
+def place_hyperliquid_order(hl_info, hl_exchange, hyper_address, coin, is_buy, sz, leverage, reduce_only):
+    order_details = preparar_hyperliquid_order(
+        hl_info, hl_exchange, hyper_address, coin, is_buy, sz, leverage, reduce_only
+    )
+    return enviar_hyperliquid_order(hl_exchange, order_details)
+
 def get_hyperliquid_best_price(hl_info, coin, is_buy):
+    """
+    Mejor precio y precio de referencia de ``coin``.
+    Con stream activo: mejor bid/ask del l2Book y mid de allMids, en memoria.
+    Sin stream o con datos desactualizados: markPx ±0.1% del snapshot REST.
+    :return: Tupla (best_price, mark_price)
+    """
+    stream = get_hyperliquid_stream(hl_info)
+    if stream is not None and stream.watch(coin):
+        prices = stream.best_prices(coin, is_buy)
+        if prices is not None:
+            logger.debug("Mejor precio en Hyperliquid (stream)", coin=coin, is_buy=is_buy, best_price=prices[0], mid=prices[1])
+            return prices
     try:
-        data = hl_info.meta_and_asset_ctxs()
-        meta = data[0]
-        asset_ctxs = data[1]
-        asset_index = None
-        for idx, asset in enumerate(meta["universe"]):
-            if asset["name"] == coin:
-                asset_index = idx
-                break
-        if asset_index is None:
-            raise Exception(f"Activo {coin} no encontrado en Hyperliquid")
-        asset_data = asset_ctxs[asset_index]
+        asset_data = get_hyperliquid_universe(hl_info).asset_ctx(hl_info, coin)
         mark_price = float(asset_data["markPx"])
         best_price = mark_price * (0.999 if is_buy else 1.001)
-        print(f"Cálculo del mejor precio en Hyperliquid: mark_price={mark_price}, is_buy={is_buy}, best_price={best_price}")
+        logger.debug("Mejor precio en Hyperliquid", coin=coin, mark_price=mark_price, is_buy=is_buy, best_price=best_price)
         return best_price, mark_price
     except Exception as e:
-        print(f"Error al obtener el mejor precio de Hyperliquid: {e}")
+        logger.error("Error al obtener el mejor precio de Hyperliquid", coin=coin, error=str(e))
         raise
 
 def get_hyperliquid_positions(hl_info, hyper_address):
     try:
-        user_state = hl_info.user_state(hyper_address)
-        positions = user_state.get('assetPositions', [])
-        formatted_positions = {}
-        for pos in positions:
-            position_data = pos.get('position', {})
-            coin = position_data.get('coin') + 'USDT'
-            size = float(position_data.get('szi', 0))
-            formatted_positions[coin] = {
-                'size': size,
-                'entry_price': float(position_data.get('entryPx', 0)),
-                'direction': 'Long' if size > 0 else 'Short'
-            }
-        return formatted_positions
+        with observe_sdk('hyperliquid', 'user_state'):
+            user_state = hl_info.user_state(hyper_address)
+        positions = (Position.from_hyperliquid(p.get('position', {})) for p in user_state.get('assetPositions', []))
+        return {position.symbol: position for position in positions}
     except Exception as e:
-        print(f"Error al obtener posiciones de Hyperliquid: {e}")
-        traceback.print_exc()
+        logger.exception("Error al obtener posiciones de Hyperliquid", error=str(e))
         return {}
+
+def get_hyperliquid_fills(hl_info, hyper_address, start_time=None, end_time=None):
+    """
+    Llenados recientes de la cuenta (``user_fills`` o ``user_fills_by_time``).
+    :param start_time: Inicio en ms; si se omite, los últimos llenados que devuelva la API
+    :return: Lista de Fill
+    """
+    with observe_sdk('hyperliquid', 'user_fills'):
+        if start_time is None:
+            raw = hl_info.user_fills(hyper_address)
+        else:
+            raw = hl_info.user_fills_by_time(hyper_address, start_time, end_time)
+    return [Fill.from_hyperliquid(fill) for fill in raw]
@@ -0,0 +1,194 @@
+"""
+Registros tipados de posiciones, órdenes, llenados y funding.
+
+Las respuestas de los exchanges llegan como dicts con números en texto; se
+convierten una sola vez en la frontera (``from_binance`` / ``from_hyperliquid``)
+a dataclasses inmutables con ``__slots__``, de modo que el resto del código lee
+atributos ya numéricos sin repetir ``float()`` ni crear dicts por refresco.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+BINANCE = 'binance'
+HYPERLIQUID = 'hyperliquid'
+POSITION_EPSILON = 1e-9  # Tamaños menores se consideran posición cerrada
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else 0.0
+
+
+def symbol_to_coin(symbol):
+    """'BTCUSDT' -> 'BTC'."""
+    return symbol[:-4] if symbol.endswith('USDT') else symbol
+
+
+@dataclass(frozen=True, slots=True)
+class Position:
+    """Posición abierta; ``size`` es positivo en largos y negativo en cortos."""
+    venue: str
+    coin: str
+    symbol: str
+    size: float
+    entry_price: float
+    mark_price: float = 0.0
+    unrealized_pnl: float = 0.0
+    leverage: Optional[int] = None
+
+    @property
+    def direction(self):
+        return 'Long' if self.size > 0 else 'Short'
+
+    @property
+    def is_open(self):
+        return abs(self.size) > POSITION_EPSILON
+
+    @classmethod
+    def from_binance(cls, raw):
+        """Desde un elemento de ``futures_position_information`` (positionRisk)."""
+        return cls(
+            venue=BINANCE,
+            coin=symbol_to_coin(raw['symbol']),
+            symbol=raw['symbol'],
+            size=float(raw['positionAmt']),
+            entry_price=_float(raw.get('entryPrice')),
+            mark_price=_float(raw.get('markPrice')),
+            unrealized_pnl=_float(raw.get('unRealizedProfit')),
+            leverage=int(float(raw['leverage'])) if raw.get('leverage') else None,
+        )
+
+    @classmethod
+    def from_hyperliquid(cls, raw):
+        """Desde ``assetPositions[i]['position']`` de ``user_state``."""
+        size = _float(raw.get('szi'))
+        leverage = raw.get('leverage')
+        return cls(
+            venue=HYPERLIQUID,
+            coin=raw['coin'],
+            symbol=raw['coin'] + 'USDT',
+            size=size,
+            entry_price=_float(raw.get('entryPx')),
+            mark_price=_float(raw.get('positionValue')) / abs(size) if size else 0.0,
+            unrealized_pnl=_float(raw.get('unrealizedPnl')),
+            leverage=int(leverage['value']) if isinstance(leverage, dict) and 'value' in leverage else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Order:
+    """Estado de una orden enviada."""
+    venue: str
+    symbol: str
+    order_id: Optional[int]
+    side: Optional[str]
+    status: str
+    qty: float = 0.0
+    price: float = 0.0
+    executed_qty: float = 0.0
+    avg_price: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def is_filled(self):
+        return self.status == 'FILLED'
+
+    @classmethod
+    def from_binance(cls, raw):
+        """Desde ``futures_create_order`` / ``futures_get_order`` o un lote de ``batchOrders``."""
+        if 'code' in raw and 'orderId' not in raw:
+            return cls(BINANCE, raw.get('symbol', ''), None, raw.get('side'), 'REJECTED', error=raw.get('msg'))
+        return cls(
+            venue=BINANCE,
+            symbol=raw.get('symbol', ''),
+            order_id=raw.get('orderId'),
+            side=raw.get('side'),
+            status=raw.get('status', 'NEW'),
+            qty=_float(raw.get('origQty')),
+            price=_float(raw.get('price')),
+            executed_qty=_float(raw.get('executedQty')),
+            avg_price=_float(raw.get('avgPrice')),
+        )
+
+    @classmethod
+    def from_hyperliquid(cls, request, status):
+        """
+        Desde la orden enviada y su estado en la respuesta de ``order``/``bulk_orders``.
+        :param request: Dict con coin, is_buy, sz y limit_px
+        :param status: {'filled': ...}, {'resting': ...} o {'error': ...}
+        """
+        common = dict(venue=HYPERLIQUID, symbol=request['coin'], side='BUY' if request['is_buy'] else 'SELL',
+                      qty=float(request['sz']), price=float(request['limit_px']))
+        if 'filled' in status:
+            filled = status['filled']
+            return cls(order_id=filled.get('oid'), status='FILLED', executed_qty=_float(filled.get('totalSz')),
+                       avg_price=_float(filled.get('avgPx')), **common)
+        if 'resting' in status:
+            return cls(order_id=status['resting'].get('oid'), status='NEW', **common)
+        return cls(order_id=None, status='REJECTED', error=str(status.get('error')), **common)
+
+
+@dataclass(frozen=True, slots=True)
+class Fill:
+    """Un llenado (trade) individual."""
+    venue: str
+    symbol: str
+    order_id: Optional[int]
+    side: str
+    qty: float
+    price: float
+    fee: float
+    time: int
+    is_maker: bool = False
+
+    @classmethod
+    def from_binance_update(cls, event):
+        """Desde un ORDER_TRADE_UPDATE con ``x == 'TRADE'``; None si el evento no es un llenado."""
+        o = event['o']
+        if o.get('x') != 'TRADE':
+            return None
+        return cls(
+            venue=BINANCE,
+            symbol=o.get('s'),
+            order_id=o.get('i'),
+            side=o.get('S'),
+            qty=_float(o.get('l')),
+            price=_float(o.get('L')),
+            fee=_float(o.get('n')),
+            time=int(o.get('T') or event.get('T') or event.get('E') or 0),
+            is_maker=bool(o.get('m')),
+        )
+
+    @classmethod
+    def from_hyperliquid(cls, raw):
+        """Desde un elemento de ``user_fills``."""
+        return cls(
+            venue=HYPERLIQUID,
+            symbol=raw['coin'],
+            order_id=raw.get('oid'),
+            side='BUY' if raw.get('side') == 'B' else 'SELL',
+            qty=_float(raw.get('sz')),
+            price=_float(raw.get('px')),
+            fee=_float(raw.get('fee')),
+            time=int(raw.get('time', 0)),
+            is_maker=not raw.get('crossed', True),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FundingSample:
+    """Tasa de funding de un intervalo."""
+    venue: str
+    symbol: str
+    time: int
+    rate: float
+
+    @classmethod
+    def from_binance(cls, raw):
+        """Desde un elemento de /fapi/v1/fundingRate."""
+        return cls(BINANCE, raw['symbol'], int(raw['fundingTime']), float(raw['fundingRate']))
+
+    @classmethod
+    def from_hyperliquid(cls, raw):
+        """Desde un elemento de ``fundingHistory``."""
+        return cls(HYPERLIQUID, raw['coin'], int(raw['time']), float(raw['fundingRate']))
@@ -0,0 +1,11 @@
+"""
+Headless arbitrage service
+"""
+
+# Los imports se manejan dinámicamente para evitar problemas de imports circulares
+
+__all__ = [
+    "HedgeDaemon",
+    "fetch_daemon",
+    "main"
+]
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Servicio headless de arbitraje de funding.
+
+Un proceso asyncio de larga duración es dueño de los clientes de ambos
+exchanges, del escáner de funding, de las posiciones y de la evaluación de la
+estrategia. Los bucles corren con independencia de las sesiones del navegador
+y el dashboard lee el estado por una API HTTP local, de modo que refrescar la
+UI no cuesta ninguna llamada a los exchanges.
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import math
+import os
+import signal
+import sys
+import time
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+from aiohttp import web
+from dotenv import load_dotenv
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.api_utils import init_binance_client, init_hyperliquid_clients
+from core.funding_scanner import scan_funding_opportunities
+from core.trading_operations import (
+    verify_orders, ejecutar_hedge, cerrar_posiciones, close_all_hedges, evaluate_funding_opportunity
+)
+from core.portfolio import get_portfolio_snapshot
+from core.slicer import ejecutar_hedge_twap, PARTICIPATION_RATE
+from core.http_client import request_sync
+from core.clock_sync import get_binance_clock
+from core.metrics import render_metrics
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DAEMON_URL_ENV = "PRO_HEDGE_DAEMON_URL"
+DAEMON_TOKEN_ENV = "PRO_HEDGE_DAEMON_TOKEN"
+TOKEN_HEADER = "X-Pro-Hedge-Token"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SCAN_INTERVAL = 60  # Escaneo de funding (segundos)
+POSITIONS_INTERVAL = 15  # Refresco de posiciones (segundos)
+STRATEGY_INTERVAL = 60  # Evaluación de los símbolos vigilados (segundos)
+DIRECTIONS = ('long', 'short')  # Dirección de la pata de Binance
+
+
+def _encode(obj):
+    return asdict(obj) if is_dataclass(obj) else str(obj)
+
+
+def _direction(value):
+    """Dirección validada: cualquier otro valor abriría ambas patas del mismo lado."""
+    direction = str(value).lower()
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction debe ser 'long' o 'short': {value}")
+    return direction
+
+
+def _json(data, status=200):
+    return web.json_response(data, status=status, dumps=lambda obj: json.dumps(obj, default=_encode))
+
+
+class HedgeDaemon:
+    """
+    Estado y bucles del servicio.
+    :param credentials: Diccionario con binance_api_key, binance_secret, hyper_private_key, hyper_address
+    :param symbols: Símbolos vigilados por el bucle de estrategia (ej. ['BTCUSDT'])
+    :param threshold: Umbral de evaluate_funding_opportunity
+    :param token: Secreto compartido de los endpoints de trading; por defecto PRO_HEDGE_DAEMON_TOKEN.
+                  Sin token, /hedge, /close y /close_all quedan deshabilitados
+    """
+
+    def __init__(self, credentials, symbols=(), threshold=0.001, scan_interval=SCAN_INTERVAL,
+                 positions_interval=POSITIONS_INTERVAL, strategy_interval=STRATEGY_INTERVAL, token=None):
+        self.credentials = credentials
+        self.token = token if token is not None else os.getenv(DAEMON_TOKEN_ENV, '')
+        self.symbols = list(symbols)
+        self.threshold = threshold
+        self.intervals = {
+            'scanner': scan_interval,
+            'positions': positions_interval,
+            'strategy': strategy_interval,
+        }
+        self.client = None
+        self.hl_info = None
+        self.hl_exchange = None
+        self.session = SimpleNamespace(positions={'binance': {}, 'hyperliquid': {}})
+        self.state = {
+            'status': 'starting',
+            'started_at': time.time(),
+            'funding': [],
+            'positions': {'binance': [], 'hyperliquid': []},
+            'signals': {},
+            'history': [],
+            'updated_at': {},
+            'errors': {},
+        }
+        self._tasks = []
+        self._trade_lock = asyncio.Lock()
+
+    @property
+    def ready(self):
+        return self.client is not None and self.hl_info is not None
+
+    async def start(self):
+        """Inicializa los clientes una sola vez y arranca los bucles."""
+        creds = self.credentials
+        self.client = await asyncio.to_thread(init_binance_client, creds['binance_api_key'], creds['binance_secret'])
+        _, self.hl_info, self.hl_exchange = await asyncio.to_thread(init_hyperliquid_clients, creds['hyper_private_key'])
+        self.state['status'] = 'running' if self.ready else 'degraded'
+        loops = {'scanner': self.scan, 'positions': self.refresh_positions}
+        if self.symbols:
+            loops['strategy'] = self.evaluate
+        for name, job in loops.items():
+            self._tasks.append(asyncio.create_task(self._every(name, job), name=f"daemon-{name}"))
+        logger.info("Servicio iniciado", status=self.state['status'], loops=list(loops))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.state['status'] = 'stopped'
+
+    async def _every(self, name, job):
+        while True:
+            try:
+                await asyncio.to_thread(job)
+                self.state['updated_at'][name] = time.time()
+                self.state['errors'].pop(name, None)
+            except Exception as e:
+                self.state['errors'][name] = str(e)
+                logger.exception("Error en el bucle del servicio", loop=name, error=str(e))
+            await asyncio.sleep(self.intervals[name])
+
+    # --- Trabajos síncronos (se ejecutan en hilos) -----------------------
+
+    def scan(self):
+        table = scan_funding_opportunities()
+        self.state['funding'] = json.loads(table.to_json(orient='records', date_format='iso'))
+
+    def refresh_positions(self):
+        if not self.ready:
+            return
+        snapshot = get_portfolio_snapshot(self.client, self.hl_info, self.credentials['hyper_address'])
+        if snapshot.errors:
+            raise Exception(f"Error al cargar cuentas: {snapshot.errors}")
+        self.state['positions'] = {venue: snapshot.open_positions(venue) for venue in ('binance', 'hyperliquid')}
+
+    def evaluate(self):
+        self.state['signals'] = {
+            symbol: evaluate_funding_opportunity(symbol, threshold=self.threshold) for symbol in self.symbols
+        }
+
+    def open_hedge(self, symbol, direction, capital, leverage, twap=False, participation=PARTICIPATION_RATE):
+        if twap:
+            # Rebanadas cubiertas una a una, dimensionadas por la profundidad visible
+            hedge = ejecutar_hedge_twap(
+                self.client, self.hl_info, self.hl_exchange, self.credentials['hyper_address'],
+                symbol, direction, capital, leverage, participation=participation
+            )
+            self.state['history'].append({'timestamp': time.time(), 'type': 'open', 'symbol': symbol,
+                                          'direction': direction, 'status': hedge['status'],
+                                          'slices': len(hedge['slices'])})
+            return hedge
+        side = 'BUY' if direction == 'long' else 'SELL'
+        best_price_binance, best_price_hyper, *_ = verify_orders(
+            self.client, self.hl_info, symbol, side, capital, leverage, direction
+        )
+        if not best_price_binance or not best_price_hyper:
+            return {'status': 'failed', 'errors': {'verify': "Error al verificar órdenes"}}
+        hedge = ejecutar_hedge(
+            self.client, self.hl_info, self.hl_exchange, self.credentials['hyper_address'],
+            symbol, direction, capital, leverage, best_price_binance, best_price_hyper
+        )
+        self.state['history'].append({'timestamp': time.time(), 'type': 'open', 'symbol': symbol,
+                                      'direction': direction, 'status': hedge['status']})
+        return hedge
+
+    def close_hedge(self, symbol, direction):
+        closed = cerrar_posiciones(
+            self.client, self.hl_info, self.hl_exchange, self.credentials['hyper_address'],
+            symbol, direction, self.session
+        )
+        self.state['history'].append({'timestamp': time.time(), 'type': 'close', 'symbol': symbol, 'closed': closed})
+        return {'status': 'success' if closed else 'partial'}
+
+    def close_all(self, coins=None):
+        result = close_all_hedges(self.client, self.hl_info, self.hl_exchange, self.credentials['hyper_address'],
+                                  self.session, coins=coins)
+        self.state['history'].append({'timestamp': time.time(), 'type': 'close_all', 'status': result['status'],
+                                      'residual': result['residual']})
+        return result
+
+    # --- API local -------------------------------------------------------
+
+    async def handle_health(self, request):
+        return _json({
+            'status': self.state['status'],
+            'uptime': time.time() - self.state['started_at'],
+            'clock': get_binance_clock().metrics(),
+        })
+
+    async def handle_metrics(self, request):
+        body, content_type = render_metrics()
+        return web.Response(body=body, headers={'Content-Type': content_type})
+
+    async def handle_state(self, request):
+        return _json(self.state)
+
+    async def handle_section(self, request):
+        return _json(self.state[request.match_info['section']])
+
+    def authorize(self, request):
+        """
+        Comprueba una solicitud de trading: token compartido, cuerpo JSON y origen propio.
+        Un formulario o fetch ``text/plain`` desde otra web del navegador del operador no pasa ninguna de las tres.
+        :return: Respuesta de error, o None si la solicitud está autorizada
+        """
+        if not self.token:
+            return _json({'error': f"Endpoints de trading deshabilitados: defina {DAEMON_TOKEN_ENV}"}, status=403)
+        if not hmac.compare_digest(request.headers.get(TOKEN_HEADER, '').encode(), self.token.encode()):
+            return _json({'error': "Token inválido"}, status=401)
+        origin = request.headers.get('Origin')
+        if origin and urlsplit(origin).netloc != request.host:
+            return _json({'error': f"Origen no permitido: {origin}"}, status=403)
+        if request.content_type != 'application/json':
+            return _json({'error': "El cuerpo debe ser application/json"}, status=415)
+        return None
+
+    def trade_call(self, path, body):
+        """
+        Traduce el cuerpo de una solicitud de trading a la llamada correspondiente.
+        :return: Tupla (función, args, kwargs)
+        :raises KeyError: Si falta un campo obligatorio
+        :raises ValueError: Si un campo no tiene el tipo o el rango esperado
+        """
+        if not isinstance(body, dict):
+            raise ValueError("El cuerpo debe ser un objeto JSON")
+        if path == '/hedge':
+            capital, leverage = float(body['capital']), int(body['leverage'])
+            if not math.isfinite(capital) or capital <= 0:
+                raise ValueError(f"capital debe ser un número positivo: {body['capital']}")
+            if leverage < 1:
+                raise ValueError(f"leverage debe ser al menos 1: {body['leverage']}")
+            slicing = {}
+            if body.get('twap'):
+                participation = float(body.get('participation', PARTICIPATION_RATE))
+                if not 0 < participation <= 1:
+                    raise ValueError(f"participation debe estar en (0, 1]: {body.get('participation')}")
+                slicing = {'twap': True, 'participation': participation}
+            args = (str(body['symbol']), _direction(body['direction']), capital, leverage)
+            return self.open_hedge, args, slicing
+        if path == '/close_all':
+            coins = body.get('coins')
+            if coins is not None and not isinstance(coins, list):
+                raise ValueError("coins debe ser una lista")
+            return self.close_all, (coins,), {}
+        return self.close_hedge, (str(body['symbol']), _direction(body.get('direction', 'long'))), {}
+
+    async def handle_trade(self, request):
+        error = self.authorize(request)
+        if error is not None:
+            return error
+        if not self.ready:
+            return _json({'error': "Clientes no inicializados"}, status=503)
+        try:
+            func, args, kwargs = self.trade_call(request.path, await request.json())
+        except KeyError as e:
+            return _json({'error': f"Falta el campo {e}"}, status=400)
+        except (ValueError, TypeError) as e:  # JSON malformado o campos con tipo inválido
+            return _json({'error': f"Solicitud inválida: {e}"}, status=400)
+        async with self._trade_lock:
+            result = await asyncio.to_thread(func, *args, **kwargs)
+        await asyncio.to_thread(self.refresh_positions)
+        return _json(result)
+
+    def build_app(self):
+        app = web.Application()
+        app.router.add_get('/health', self.handle_health)
+        app.router.add_get('/metrics', self.handle_metrics)
+        app.router.add_get('/state', self.handle_state)
+        app.router.add_get('/{section:funding|positions|signals|history}', self.handle_section)
+        app.router.add_post('/hedge', self.handle_trade)
+        app.router.add_post('/close', self.handle_trade)
+        app.router.add_post('/close_all', self.handle_trade)
+        return app
+
+
+def fetch_daemon(path, base_url=None, method='GET', payload=None, token=None):
+    """
+    Consulta la API local del servicio (sin caché).
+    :param path: Ruta (ej. '/funding')
+    :param base_url: URL del servicio; por defecto PRO_HEDGE_DAEMON_URL
+    :param token: Secreto de los endpoints de trading; por defecto PRO_HEDGE_DAEMON_TOKEN
+    :return: Respuesta JSON, o None si no hay servicio configurado o no responde
+    """
+    base_url = base_url or os.getenv(DAEMON_URL_ENV)
+    if not base_url:
+        return None
+    token = token or os.getenv(DAEMON_TOKEN_ENV)
+    headers = {TOKEN_HEADER: token} if token else None
+    try:
+        return request_sync(f"{base_url.rstrip('/')}{path}", method=method, payload=payload, retries=1,
+                            headers=headers)
+    except Exception as e:
+        logger.warning("El servicio no responde", url=base_url, path=path, error=str(e))
+        return None
+
+
+async def serve(daemon, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Arranca el servicio y su API local hasta recibir SIGINT/SIGTERM."""
+    runner = web.AppRunner(daemon.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    await daemon.start()
+    logger.info("API local escuchando", host=host, port=port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await daemon.stop()
+        await runner.cleanup()
+
+
+def main(argv=None):
+    """Entry point del servicio headless (pro-hedge-daemon)."""
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Servicio headless de Pro Hedge Trading")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--symbols', default='', help="Símbolos vigilados, separados por comas (ej. BTCUSDT,ETHUSDT)")
+    parser.add_argument('--threshold', type=float, default=0.001)
+    parser.add_argument('--scan-interval', type=float, default=SCAN_INTERVAL)
+    args = parser.parse_args(argv)
+
+    credentials = {
+        'binance_api_key': os.getenv('BINANCE_API_KEY', ''),
+        'binance_secret': os.getenv('BINANCE_SECRET', ''),
+        'hyper_private_key': os.getenv('HYPER_PRIVATE_KEY', ''),
+        'hyper_address': os.getenv('HYPER_ADDRESS', ''),
+    }
+    missing = [name for name, value in credentials.items() if not value]
+    if missing:
+        parser.error(f"Faltan credenciales en el entorno: {', '.join(missing)}")
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+    daemon = HedgeDaemon(credentials, symbols=symbols, threshold=args.threshold, scan_interval=args.scan_interval)
+    asyncio.run(serve(daemon, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Deterministic exchange simulator for offline testing and benchmarks
+"""
+
+# Los imports se manejan dinámicamente para evitar problemas de imports circulares
+
+__all__ = [
+    "MatchingEngine",
+    "SimConfig",
+    "SimulatorServer",
+    "main"
+]
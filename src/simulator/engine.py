@@ -0,0 +1,481 @@
+"""
+Motor de emparejamiento determinista del simulador de exchanges.
+
+Mantiene un libro sintético por moneda (niveles fijos alrededor de un precio
+medio), las órdenes, los llenados y las cuentas de Binance Futures y de
+Hyperliquid. Todas las decisiones aleatorias (latencia, llenados parciales y
+rechazos) salen de generadores sembrados con ``SimConfig.seed``: la misma
+secuencia de solicitudes produce siempre los mismos resultados.
+
+El motor no es thread-safe; el servidor lo usa desde su único event loop.
+"""
+
+import itertools
+import math
+import random
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from exchanges.models import BINANCE, HYPERLIQUID
+
+EPSILON = 1e-9
+HYPERLIQUID_MAX_DECIMALS = 6  # Decimales máximos de precio en perpetuos (menos szDecimals)
+HYPERLIQUID_SIG_FIGS = 5  # Cifras significativas máximas de un precio no entero
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+# Comisiones (maker, taker)
+FEES = {
+    BINANCE: (0.0002, 0.0005),
+    HYPERLIQUID: (0.0001, 0.00035),
+}
+
+MarketSpec = namedtuple('MarketSpec', ['coin', 'mid', 'tick_size', 'step_size', 'sz_decimals', 'funding_rate',
+                                       'max_leverage'])
+
+DEFAULT_MARKETS = (
+    MarketSpec('BTC', 65000.0, 0.1, 0.001, 5, 0.0001, 50),
+    MarketSpec('ETH', 3000.0, 0.01, 0.001, 4, 0.0001, 50),
+    MarketSpec('SOL', 150.0, 0.01, 1.0, 2, 0.0001, 20),
+)
+
+
+class SimulatorReject(Exception):
+    """
+    Rechazo de una orden en el simulador.
+    :param code: Código de error de Binance equivalente
+    :param message: Mensaje (el servidor lo adapta al formato de cada exchange)
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@dataclass
+class SimConfig:
+    """
+    Parámetros del simulador.
+    :param seed: Semilla de las decisiones aleatorias
+    :param latency_ms: Latencia base añadida a cada solicitud
+    :param jitter_ms: Latencia extra uniforme en [0, jitter_ms]
+    :param partial_fill_rate: Probabilidad de que una orden agresiva se llene solo en parte
+    :param partial_fill_ratio: Fracción llenada al instante en un llenado parcial
+    :param reject_rate: Probabilidad de rechazar una orden por margen
+    :param binance_weight_limit: Peso por minuto antes de responder 429 en Binance
+    :param hyperliquid_weight_limit: Peso por minuto antes de responder 429 en Hyperliquid
+    :param clock_offset_ms: Desfase del reloj del servidor respecto al local
+    :param tick_interval: Intervalo con que se completan los llenados pendientes (segundos)
+    """
+    seed: int = 0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    partial_fill_rate: float = 0.0
+    partial_fill_ratio: float = 0.5
+    reject_rate: float = 0.0
+    binance_weight_limit: int = 2400
+    hyperliquid_weight_limit: int = 1200
+    clock_offset_ms: int = 0
+    tick_interval: float = 0.1
+    spread_bps: float = 1.0
+    level_bps: float = 1.0
+    book_levels: int = 20
+    level_notional: float = 100_000.0
+    initial_balance: float = 100_000.0
+    default_leverage: int = 20
+    markets: tuple = field(default=DEFAULT_MARKETS)
+
+
+def decimals(step):
+    """Decimales de un tamaño de tick o de paso (0.001 -> 3)."""
+    exponent = Decimal(repr(step)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def is_multiple(value, step):
+    return abs(value / step - round(value / step)) < 1e-6
+
+
+def hyperliquid_tick(mid, sz_decimals):
+    """Tick efectivo de un perpetuo de Hyperliquid: 5 cifras significativas y MAX_DECIMALS - szDecimals."""
+    return max(10.0 ** (math.floor(math.log10(mid)) - (HYPERLIQUID_SIG_FIGS - 1)),
+               10.0 ** -(HYPERLIQUID_MAX_DECIMALS - sz_decimals))
+
+
+def is_valid_hyperliquid_price(px, sz_decimals):
+    """Regla de precios de Hyperliquid: enteros siempre; si no, ≤5 cifras significativas y ≤6-szDecimals decimales."""
+    value = Decimal(str(px)).normalize()
+    if value == value.to_integral_value():
+        return True
+    sign, digits, exponent = value.as_tuple()
+    return -exponent <= HYPERLIQUID_MAX_DECIMALS - sz_decimals and len(digits) <= HYPERLIQUID_SIG_FIGS
+
+
+@dataclass(slots=True)
+class SimOrder:
+    """Orden viva o terminada del simulador."""
+    venue: str
+    order_id: int
+    coin: str
+    side: str
+    qty: float
+    price: Optional[float]
+    order_type: str
+    tif: str
+    reduce_only: bool
+    client_id: Optional[str]
+    created_at: int
+    status: str = 'NEW'
+    executed_qty: float = 0.0
+    cum_quote: float = 0.0
+    updated_at: int = 0
+    taker: bool = True
+    reason: Optional[str] = None
+
+    @property
+    def is_buy(self):
+        return self.side == 'BUY'
+
+    @property
+    def remaining(self):
+        return max(0.0, round(self.qty - self.executed_qty, 10))
+
+    @property
+    def avg_price(self):
+        return self.cum_quote / self.executed_qty if self.executed_qty else 0.0
+
+    @property
+    def is_open(self):
+        return self.status in OPEN_STATUSES
+
+
+@dataclass(slots=True)
+class SimFill:
+    """Llenado individual del simulador."""
+    venue: str
+    trade_id: int
+    order_id: int
+    coin: str
+    side: str
+    qty: float
+    price: float
+    fee: float
+    time: int
+    is_maker: bool
+    closed_pnl: float
+    start_position: float
+
+
+class SimAccount:
+    """Cuenta de un exchange: saldo, posiciones (tamaño con signo, precio de entrada) y apalancamiento."""
+
+    def __init__(self, balance, default_leverage):
+        self.balance = balance
+        self.positions = {}
+        self.leverage = {}
+        self.margin_type = {}
+        self.default_leverage = default_leverage
+
+    def leverage_of(self, coin):
+        return self.leverage.get(coin, self.default_leverage)
+
+    def apply_fill(self, coin, signed_qty, price, fee):
+        """
+        Actualiza posición y saldo con un llenado.
+        :return: PnL realizado por la parte que reduce la posición
+        """
+        size, entry = self.positions.get(coin, (0.0, 0.0))
+        new_size = round(size + signed_qty, 10)
+        realized = 0.0
+        if size == 0 or size * signed_qty > 0:
+            entry = (abs(size) * entry + abs(signed_qty) * price) / abs(new_size)
+        else:
+            closed = min(abs(signed_qty), abs(size))
+            realized = closed * (price - entry) * (1 if size > 0 else -1)
+            if new_size * size < 0:
+                entry = price  # La posición cambió de lado
+        self.balance += realized - fee
+        if abs(new_size) < EPSILON:
+            self.positions.pop(coin, None)
+        else:
+            self.positions[coin] = (new_size, entry)
+        return realized
+
+    def unrealized_pnl(self, mids):
+        return sum(size * (mids[coin] - entry) for coin, (size, entry) in self.positions.items())
+
+    def margin_used(self, mids):
+        return sum(abs(size) * mids[coin] / self.leverage_of(coin) for coin, (size, _) in self.positions.items())
+
+    def available(self, mids):
+        return self.balance + self.unrealized_pnl(mids) - self.margin_used(mids)
+
+
+class MatchingEngine:
+    """
+    Libros sintéticos, órdenes y cuentas de ambos exchanges.
+    :param config: SimConfig
+    """
+
+    def __init__(self, config=None):
+        self.config = config or SimConfig()
+        self.markets = {spec.coin: spec for spec in self.config.markets}
+        self.mids = {spec.coin: float(spec.mid) for spec in self.config.markets}
+        self.funding = {venue: {spec.coin: spec.funding_rate for spec in self.config.markets}
+                        for venue in (BINANCE, HYPERLIQUID)}
+        self.update_ids = {coin: 1 for coin in self.markets}
+        self.accounts = {venue: SimAccount(self.config.initial_balance, self.config.default_leverage)
+                         for venue in (BINANCE, HYPERLIQUID)}
+        self.orders = {}
+        self.fills = {BINANCE: [], HYPERLIQUID: []}
+        self.listeners = []
+        self._open = []
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        # Generadores separados: las lecturas no alteran la secuencia de llenados y rechazos
+        self._order_rng = random.Random(self.config.seed)
+        self._latency_rng = random.Random(self.config.seed + 1)
+
+    # --- Utilidades -------------------------------------------------------
+
+    def now(self):
+        """Hora del servidor en ms (incluye ``clock_offset_ms``)."""
+        return int(time.time() * 1000) + self.config.clock_offset_ms
+
+    def latency(self):
+        """Siguiente latencia simulada (segundos)."""
+        jitter = self._latency_rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000
+
+    def market(self, coin):
+        spec = self.markets.get(coin)
+        if spec is None:
+            raise SimulatorReject(-1121, "Invalid symbol.")
+        return spec
+
+    def tick_size(self, venue, coin):
+        spec = self.market(coin)
+        if venue == HYPERLIQUID:
+            return hyperliquid_tick(self.mids[coin], spec.sz_decimals)
+        return spec.tick_size
+
+    def step_size(self, venue, coin):
+        spec = self.market(coin)
+        return 10.0 ** -spec.sz_decimals if venue == HYPERLIQUID else spec.step_size
+
+    def _emit(self, kind, *args):
+        for listener in list(self.listeners):
+            listener(kind, *args)
+
+    # --- Libro sintético --------------------------------------------------
+
+    def book(self, venue, coin, depth=None):
+        """
+        Libro L2 actual: niveles separados ``level_bps`` a partir de un spread de ``spread_bps``.
+        :return: Tupla (bids, asks) de listas [(precio, cantidad)], mejores primero
+        """
+        config = self.config
+        mid = self.mids[coin]
+        tick = self.tick_size(venue, coin)
+        step = self.step_size(venue, coin)
+        price_decimals = decimals(tick)
+        half = max(tick, mid * config.spread_bps / 2e4)
+        gap = max(tick, round(mid * config.level_bps / 1e4 / tick) * tick)
+        best_bid = math.floor((mid - half) / tick) * tick
+        best_ask = math.ceil((mid + half) / tick) * tick
+        qty = max(step, math.floor(config.level_notional / mid / step) * step)
+        qty = round(qty, decimals(step))
+        levels = config.book_levels if depth is None else min(depth, config.book_levels)
+        bids = [(round(best_bid - i * gap, price_decimals), qty) for i in range(levels)]
+        asks = [(round(best_ask + i * gap, price_decimals), qty) for i in range(levels)]
+        return bids, asks
+
+    def set_mid(self, coin, price):
+        """
+        Mueve el precio medio de ``coin`` y ejecuta las órdenes en reposo que queden cruzadas.
+        :return: Órdenes que cambiaron
+        """
+        self.market(coin)
+        self.mids[coin] = float(price)
+        self.update_ids[coin] += 1
+        self._emit('book', coin)
+        return self.tick(coin)
+
+    def set_funding(self, venue, coin, rate):
+        self.market(coin)
+        self.funding[venue][coin] = rate
+
+    # --- Órdenes ----------------------------------------------------------
+
+    def submit(self, venue, coin, side, qty, order_type='LIMIT', price=None, tif='GTC', reduce_only=False,
+               client_id=None):
+        """
+        Valida y ejecuta una orden.
+        :param side: 'BUY' o 'SELL'
+        :param order_type: 'LIMIT' o 'MARKET'
+        :param tif: 'GTC', 'IOC' o 'GTX' (post-only; se expira si cruzaría el libro)
+        :return: SimOrder con su estado tras el emparejamiento inicial
+        :raises SimulatorReject: Si la orden no pasa la validación
+        """
+        spec = self.market(coin)
+        account = self.accounts[venue]
+        qty = float(qty)
+        price = None if order_type == 'MARKET' else float(price)
+        step = self.step_size(venue, coin)
+        if qty <= 0 or not is_multiple(qty, step):
+            raise SimulatorReject(-1111, "Precision is over the maximum defined for this asset.")
+        if price is not None:
+            if price <= 0:
+                raise SimulatorReject(-4003, "Price less than or equal to zero.")
+            if venue == HYPERLIQUID and not is_valid_hyperliquid_price(price, spec.sz_decimals):
+                raise SimulatorReject(-4014, "Order has invalid price.")
+            if venue == BINANCE and not is_multiple(price, spec.tick_size):
+                raise SimulatorReject(-4014, "Price not increased by tick size.")
+
+        if reduce_only:
+            size = account.positions.get(coin, (0.0, 0.0))[0]
+            if size == 0 or (size > 0) == (side == 'BUY'):
+                raise SimulatorReject(-2022, "ReduceOnly Order is rejected.")
+            qty = min(qty, abs(size))
+        else:
+            reference = price if price is not None else self.mids[coin]
+            if qty * reference / account.leverage_of(coin) > account.available(self.mids):
+                raise SimulatorReject(-2019, "Margin is insufficient.")
+        if self._order_rng.random() < self.config.reject_rate:
+            raise SimulatorReject(-2019, "Margin is insufficient.")
+        partial = self._order_rng.random() < self.config.partial_fill_rate
+
+        now = self.now()
+        order = SimOrder(venue, next(self._order_ids), coin, side, qty, price, order_type, tif, reduce_only,
+                         client_id, now, updated_at=now)
+        self.orders[(venue, order.order_id)] = order
+        self._emit('order', order, None)
+
+        marketable = self._marketable(order)
+        if tif == 'GTX' and marketable:
+            self._finish(order, 'EXPIRED', reason='post_only')
+            return order
+        order.taker = marketable
+        if marketable:
+            limit = None
+            if partial:
+                limit = max(step, math.floor(order.qty * self.config.partial_fill_ratio / step) * step)
+                limit = round(min(limit, order.qty), decimals(step))
+            self._match(order, limit)
+            if partial and order.remaining > EPSILON and tif != 'IOC':
+                # El resto se completa en el siguiente tick del servidor
+                self._open.append(order)
+                return order
+        if order.remaining <= EPSILON:
+            return order
+        if tif == 'IOC' or (order_type == 'MARKET' and not partial):
+            self._finish(order, 'EXPIRED')
+        else:
+            self._open.append(order)
+        return order
+
+    def cancel(self, venue, order_id):
+        """:raises SimulatorReject: Si la orden no existe o ya terminó"""
+        order = self.orders.get((venue, order_id))
+        if order is None or not order.is_open:
+            raise SimulatorReject(-2011, "Unknown order sent.")
+        self._finish(order, 'CANCELED')
+        return order
+
+    def get(self, venue, order_id):
+        order = self.orders.get((venue, order_id))
+        if order is None:
+            raise SimulatorReject(-2013, "Order does not exist.")
+        return order
+
+    def open_orders(self, venue, coin=None):
+        return [o for o in self._open if o.venue == venue and o.is_open and (coin is None or o.coin == coin)]
+
+    def tick(self, coin=None):
+        """
+        Completa llenados pendientes: restos de órdenes agresivas y órdenes en reposo cruzadas.
+        :return: Órdenes que cambiaron
+        """
+        changed = []
+        for order in list(self._open):
+            if not order.is_open:
+                self._open.remove(order)
+                continue
+            if coin is not None and order.coin != coin:
+                continue
+            if order.taker or order.order_type == 'MARKET':
+                before = order.executed_qty
+                self._match(order)
+                if order.remaining > EPSILON and order.order_type == 'MARKET':
+                    self._finish(order, 'EXPIRED')
+                if order.executed_qty != before or not order.is_open:
+                    changed.append(order)
+            elif self._marketable(order):
+                # Orden maker cruzada por el precio: se llena a su propio precio
+                self._fill(order, order.remaining, order.price, is_maker=True)
+                changed.append(order)
+            if not order.is_open:
+                self._open.remove(order)
+        return changed
+
+    def _marketable(self, order):
+        if order.order_type == 'MARKET':
+            return True
+        bids, asks = self.book(order.venue, order.coin, depth=1)
+        if order.is_buy:
+            return bool(asks) and order.price >= asks[0][0]
+        return bool(bids) and order.price <= bids[0][0]
+
+    def _match(self, order, max_qty=None):
+        """Recorre el libro contrario hasta el precio límite (o ``max_qty``)."""
+        bids, asks = self.book(order.venue, order.coin)
+        target = order.remaining if max_qty is None else min(max_qty, order.remaining)
+        for px, size in (asks if order.is_buy else bids):
+            if target <= EPSILON:
+                break
+            if order.price is not None and (px > order.price if order.is_buy else px < order.price):
+                break
+            take = round(min(size, target), 10)
+            self._fill(order, take, px, is_maker=False)
+            target = round(target - take, 10)
+
+    def _fill(self, order, qty, price, is_maker):
+        account = self.accounts[order.venue]
+        fee = qty * price * FEES[order.venue][0 if is_maker else 1]
+        start_position = account.positions.get(order.coin, (0.0, 0.0))[0]
+        realized = account.apply_fill(order.coin, qty if order.is_buy else -qty, price, fee)
+        order.executed_qty = round(order.executed_qty + qty, 10)
+        order.cum_quote += qty * price
+        order.updated_at = self.now()
+        order.status = 'FILLED' if order.remaining <= EPSILON else 'PARTIALLY_FILLED'
+        fill = SimFill(order.venue, next(self._trade_ids), order.order_id, order.coin, order.side, qty, price, fee,
+                       order.updated_at, is_maker, realized, start_position)
+        self.fills[order.venue].append(fill)
+        self._emit('order', order, fill)
+
+    def _finish(self, order, status, reason=None):
+        order.status = status
+        order.reason = reason
+        order.updated_at = self.now()
+        self._emit('order', order, None)
+
+    # --- Cuentas ----------------------------------------------------------
+
+    def set_leverage(self, venue, coin, leverage):
+        spec = self.market(coin)
+        if not 1 <= int(leverage) <= spec.max_leverage:
+            raise SimulatorReject(-4028, "Leverage is not valid")
+        self.accounts[venue].leverage[coin] = int(leverage)
+
+    def account(self, venue):
+        return self.accounts[venue]
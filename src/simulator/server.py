@@ -0,0 +1,821 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita Binance Futures y Hyperliquid.
+
+Sirve en un solo puerto las rutas REST de Binance (``/fapi``, ``/api``), su
+stream de usuario y de profundidad (``/ws/<stream>``), y la API de Hyperliquid
+(``/info``, ``/exchange`` y el websocket ``/ws``). Los clientes reales se
+dirigen a él con ``BINANCE_FUTURES_URL``, ``BINANCE_STREAM_URL`` y
+``HYPERLIQUID_API_URL`` (ver ``SimulatorServer.env``). Cada solicitud paga la
+latencia simulada y el peso que cobraría el exchange real; al superar el límite
+por minuto se responde 429 con ``Retry-After``. Las firmas no se verifican,
+pero sí el ``timestamp`` contra ``recvWindow``.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import signal
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl
+from aiohttp import web, WSMsgType
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.endpoints import BINANCE_FUTURES_URL_ENV, BINANCE_STREAM_URL_ENV, HYPERLIQUID_API_URL_ENV
+from core.rate_limiter import binance_weight, hyperliquid_weight, WEIGHT_PERIOD
+from core.logger import get_logger
+from exchanges.models import BINANCE, HYPERLIQUID, symbol_to_coin
+from simulator.engine import MatchingEngine, SimConfig, SimulatorReject
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8899
+LISTEN_KEY = "simulated-listen-key"
+DEFAULT_RECV_WINDOW = 5000
+BINANCE_FUNDING_INTERVAL = 8 * 3600 * 1000
+HYPERLIQUID_FUNDING_INTERVAL = 3600 * 1000
+MAX_BATCH_ORDERS = 5
+MAX_FUNDING_RECORDS = {BINANCE: 1000, HYPERLIQUID: 500}
+MAX_USER_FILLS = 2000
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+# Mensajes de Hyperliquid para los rechazos del motor
+HYPERLIQUID_ERRORS = {
+    -2019: "Insufficient margin to place order.",
+    -2022: "Reduce only order would increase position.",
+    -1111: "Order has invalid size.",
+    -4014: "Order has invalid price.",
+}
+
+
+def fmt(value):
+    """Número como texto decimal sin notación científica ni ceros sobrantes."""
+    return format(round(float(value), 10), 'f').rstrip('0').rstrip('.') or '0'
+
+
+class WeightWindow:
+    """
+    Peso consumido en la ventana de un minuto en curso, como cuenta Binance.
+    :param limit: Peso máximo por ventana
+    """
+
+    def __init__(self, limit, period=WEIGHT_PERIOD):
+        self.limit = limit
+        self.period = period
+        self.window = None
+        self.used = 0
+
+    def consume(self, weight, now):
+        """
+        :param now: Hora del servidor en segundos
+        :return: 0 si se admite la solicitud, o segundos hasta la siguiente ventana
+        """
+        window = int(now // self.period)
+        if window != self.window:
+            self.window, self.used = window, 0
+        self.used += weight
+        if self.used > self.limit:
+            return math.ceil(self.period - now % self.period)
+        return 0
+
+
+class BinanceError(Exception):
+    def __init__(self, code, msg, status=400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+
+class SimulatorServer:
+    """
+    Aplicación aiohttp del simulador sobre un MatchingEngine.
+    :param config: SimConfig (latencia, llenados parciales, rechazos, límites de peso)
+    :param host: Interfaz de escucha
+    :param port: Puerto (0 elige uno libre)
+    """
+
+    def __init__(self, config=None, host=DEFAULT_HOST, port=0):
+        self.engine = MatchingEngine(config)
+        self.host = host
+        self.port = port
+        self.windows = {
+            BINANCE: WeightWindow(self.engine.config.binance_weight_limit),
+            HYPERLIQUID: WeightWindow(self.engine.config.hyperliquid_weight_limit),
+        }
+        self.requests = {BINANCE: 0, HYPERLIQUID: 0}
+        self.rate_limited = {BINANCE: 0, HYPERLIQUID: 0}
+        self._user_streams = set()
+        self._depth_streams = {}
+        self._hyperliquid_streams = {}
+        self._books = {}
+        self._sockets = set()
+        self._runner = None
+        self._tick_task = None
+        self._loop = None
+        self._thread = None
+        self.engine.listeners.append(self._on_engine_event)
+        self._binance_routes = {
+            ('GET', 'api', 'ping'): lambda params: {},
+            ('GET', 'api', 'time'): self.binance_time,
+            ('GET', 'api', 'account'): self.binance_spot_account,
+            ('GET', 'fapi', 'ping'): lambda params: {},
+            ('GET', 'fapi', 'time'): self.binance_time,
+            ('GET', 'fapi', 'exchangeInfo'): self.binance_exchange_info,
+            ('GET', 'fapi', 'depth'): self.binance_depth,
+            ('GET', 'fapi', 'ticker/price'): self.binance_ticker,
+            ('GET', 'fapi', 'premiumIndex'): self.binance_premium_index,
+            ('GET', 'fapi', 'fundingRate'): self.binance_funding_rate,
+            ('GET', 'fapi', 'fundingInfo'): lambda params: [],  # Todos los mercados liquidan cada 8 horas
+            ('GET', 'fapi', 'leverageBracket'): self.binance_leverage_bracket,
+            ('POST', 'fapi', 'leverage'): self.binance_change_leverage,
+            ('POST', 'fapi', 'marginType'): self.binance_change_margin_type,
+            ('POST', 'fapi', 'order'): self.binance_new_order,
+            ('GET', 'fapi', 'order'): self.binance_get_order,
+            ('DELETE', 'fapi', 'order'): self.binance_cancel_order,
+            ('POST', 'fapi', 'batchOrders'): self.binance_batch_orders,
+            ('GET', 'fapi', 'openOrders'): self.binance_open_orders,
+            ('GET', 'fapi', 'account'): self.binance_account,
+            ('GET', 'fapi', 'positionRisk'): self.binance_position_risk,
+            ('POST', 'fapi', 'listenKey'): lambda params: {'listenKey': LISTEN_KEY},
+            ('PUT', 'fapi', 'listenKey'): lambda params: {},
+            ('DELETE', 'fapi', 'listenKey'): lambda params: {},
+        }
+        self._info_routes = {
+            'meta': lambda payload: self.hyperliquid_meta(),
+            'spotMeta': lambda payload: {'universe': [], 'tokens': []},
+            'metaAndAssetCtxs': self.hyperliquid_meta_and_asset_ctxs,
+            'allMids': lambda payload: self.hyperliquid_all_mids(),
+            'l2Book': lambda payload: self.hyperliquid_l2_book(payload['coin']),
+            'clearinghouseState': self.hyperliquid_clearinghouse_state,
+            'userFills': self.hyperliquid_user_fills,
+            'userFillsByTime': self.hyperliquid_user_fills,
+            'fundingHistory': self.hyperliquid_funding_history,
+            'openOrders': self.hyperliquid_open_orders,
+            'orderStatus': self.hyperliquid_order_status,
+        }
+
+    # --- Ciclo de vida ----------------------------------------------------
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def env(self):
+        """Variables de entorno que dirigen los clientes de ``core`` a este servidor."""
+        return {
+            BINANCE_FUTURES_URL_ENV: self.url,
+            BINANCE_STREAM_URL_ENV: f"ws://{self.host}:{self.port}/ws",
+            HYPERLIQUID_API_URL_ENV: self.url,
+        }
+
+    def build_app(self):
+        app = web.Application()
+        app.router.add_route('*', '/fapi/{version}/{endpoint:.+}', self.handle_binance)
+        app.router.add_route('*', '/api/{version}/{endpoint:.+}', self.handle_binance)
+        app.router.add_get('/ws/{stream}', self.handle_binance_stream)
+        app.router.add_post('/info', self.handle_info)
+        app.router.add_post('/exchange', self.handle_exchange)
+        app.router.add_get('/ws', self.handle_hyperliquid_stream)
+        return app
+
+    async def start_async(self):
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        self._tick_task = asyncio.create_task(self._tick_loop())
+        logger.info("Simulador de exchanges escuchando", url=self.url)
+        return self
+
+    async def stop_async(self):
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def start(self):
+        """Arranca el servidor en un hilo propio (para pruebas y benchmarks síncronos)."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start_async())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop_async())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="exchange-simulator", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def call(self, fn, *args, **kwargs):
+        """Ejecuta ``fn`` en el hilo del servidor (el motor no es thread-safe) y devuelve su resultado."""
+        if self._loop is None or threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+
+        async def run():
+            return fn(*args, **kwargs)
+
+        return asyncio.run_coroutine_threadsafe(run(), self._loop).result()
+
+    def set_mid(self, coin, price):
+        """Mueve el precio medio de ``coin`` (desde cualquier hilo)."""
+        return self.call(self.engine.set_mid, coin, price)
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.engine.config.tick_interval)
+            try:
+                self.engine.tick()
+            except Exception as e:
+                logger.error("Error en el tick del simulador", error=str(e))
+
+    # --- Eventos hacia los websockets -------------------------------------
+
+    def _on_engine_event(self, kind, *args):
+        if kind == 'order':
+            order, fill = args
+            if order.venue == BINANCE and self._user_streams:
+                message = json.dumps(self.binance_order_update(order, fill))
+                for queue in self._user_streams:
+                    queue.put_nowait(message)
+        elif kind == 'book':
+            coin = args[0]
+            self._publish_depth(coin)
+            for queue, subscriptions in self._hyperliquid_streams.items():
+                if ('l2Book', coin) in subscriptions:
+                    queue.put_nowait(json.dumps({'channel': 'l2Book', 'data': self.hyperliquid_l2_book(coin)}))
+                if ('allMids',) in subscriptions:
+                    queue.put_nowait(json.dumps({'channel': 'allMids', 'data': {'mids': self.hyperliquid_all_mids()}}))
+
+    def _publish_depth(self, coin):
+        previous_id, previous = self._books.get(coin, (None, None))
+        update_id = self.engine.update_ids[coin]
+        bids, asks = self.engine.book(BINANCE, coin)
+        self._books[coin] = (update_id, (bids, asks))
+        streams = self._depth_streams.get(coin)
+        if not streams:
+            return
+        if previous is None:
+            previous_id, previous = update_id - 1, ([], [])
+        sides = []
+        for old, new in zip(previous, (bids, asks)):
+            prices = {p for p, _ in new}
+            sides.append([[fmt(p), fmt(q)] for p, q in new] + [[fmt(p), '0'] for p, _ in old if p not in prices])
+        now = self.engine.now()
+        # U = pu = id anterior: el primer evento siempre cubre el lastUpdateId del snapshot REST
+        event = {'e': 'depthUpdate', 'E': now, 'T': now, 's': coin + 'USDT', 'U': previous_id, 'u': update_id,
+                 'pu': previous_id, 'b': sides[0], 'a': sides[1]}
+        message = json.dumps(event)
+        for queue in streams:
+            queue.put_nowait(message)
+
+    async def _pump(self, ws, queue):
+        while True:
+            await ws.send_str(await queue.get())
+
+    async def handle_binance_stream(self, request):
+        stream = request.match_info['stream']
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        queue = asyncio.Queue()
+        if stream == LISTEN_KEY:
+            registry = self._user_streams
+            registry.add(queue)
+        elif '@depth' in stream:
+            coin = symbol_to_coin(stream.split('@')[0].upper())
+            registry = self._depth_streams.setdefault(coin, set())
+            registry.add(queue)
+            self._books.setdefault(coin, (self.engine.update_ids[coin], self.engine.book(BINANCE, coin)))
+        else:
+            await ws.close()
+            return ws
+        self._sockets.add(ws)
+        pump = asyncio.create_task(self._pump(ws, queue))
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            pump.cancel()
+            registry.discard(queue)
+            self._sockets.discard(ws)
+        return ws
+
+    async def handle_hyperliquid_stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        await ws.send_str("Websocket connection established.")
+        queue = asyncio.Queue()
+        subscriptions = self._hyperliquid_streams[queue] = set()
+        pump = asyncio.create_task(self._pump(ws, queue))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                method = message.get('method')
+                if method == 'ping':
+                    queue.put_nowait(json.dumps({'channel': 'pong'}))
+                    continue
+                subscription = message.get('subscription', {})
+                key = ('allMids',) if subscription.get('type') == 'allMids' else ('l2Book', subscription.get('coin'))
+                queue.put_nowait(json.dumps({'channel': 'subscriptionResponse', 'data': message}))
+                if method == 'unsubscribe':
+                    subscriptions.discard(key)
+                elif method == 'subscribe':
+                    subscriptions.add(key)
+                    if key[0] == 'allMids':
+                        data = {'mids': self.hyperliquid_all_mids()}
+                    else:
+                        data = self.hyperliquid_l2_book(key[1])
+                    queue.put_nowait(json.dumps({'channel': key[0], 'data': data}))
+        finally:
+            pump.cancel()
+            self._hyperliquid_streams.pop(queue, None)
+            self._sockets.discard(ws)
+        return ws
+
+    # --- Admisión: latencia y peso ----------------------------------------
+
+    async def _admit(self, venue, weight):
+        """:return: Segundos de Retry-After si la solicitud excede el límite, o 0"""
+        self.requests[venue] += 1
+        latency = self.engine.latency()
+        if latency:
+            await asyncio.sleep(latency)
+        retry_after = self.windows[venue].consume(weight, self.engine.now() / 1000)
+        if retry_after:
+            self.rate_limited[venue] += 1
+        return retry_after
+
+    # --- Binance REST -----------------------------------------------------
+
+    async def handle_binance(self, request):
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(parse_qsl(await request.text()))
+        prefix = request.path.split('/')[1]
+        endpoint = request.match_info['endpoint']
+        retry_after = await self._admit(BINANCE, binance_weight(request.path, params))
+        headers = {USED_WEIGHT_HEADER: str(self.windows[BINANCE].used)}
+        if retry_after:
+            headers['Retry-After'] = str(retry_after)
+            return web.json_response({'code': -1003, 'msg': "Too many requests; current limit is exceeded."},
+                                     status=429, headers=headers)
+        route = self._binance_routes.get((request.method, prefix, endpoint))
+        if route is None:
+            return web.json_response({'code': -5000, 'msg': "Path not found"}, status=404, headers=headers)
+        try:
+            if 'signature' in params:
+                self._check_timestamp(params)
+            data = route(params)
+        except BinanceError as e:
+            return web.json_response({'code': e.code, 'msg': e.msg}, status=e.status, headers=headers)
+        except SimulatorReject as e:
+            return web.json_response({'code': e.code, 'msg': e.message}, status=400, headers=headers)
+        return web.json_response(data, headers=headers)
+
+    def _check_timestamp(self, params):
+        server_time = self.engine.now()
+        timestamp = int(params.get('timestamp', 0))
+        recv_window = int(params.get('recvWindow', DEFAULT_RECV_WINDOW))
+        if timestamp >= server_time + 1000 or server_time - timestamp > recv_window:
+            raise BinanceError(-1021, "Timestamp for this request is outside of the recvWindow.")
+
+    def _coin(self, params):
+        symbol = params.get('symbol')
+        if not symbol:
+            raise BinanceError(-1102, "Mandatory parameter 'symbol' was not sent, was empty/null, or malformed.")
+        coin = symbol_to_coin(symbol.upper())
+        self.engine.market(coin)
+        return coin
+
+    def binance_order(self, order):
+        return {
+            'orderId': order.order_id,
+            'symbol': order.coin + 'USDT',
+            'status': order.status,
+            'clientOrderId': order.client_id or f"sim-{order.order_id}",
+            'price': fmt(order.price or 0),
+            'avgPrice': fmt(order.avg_price),
+            'origQty': fmt(order.qty),
+            'executedQty': fmt(order.executed_qty),
+            'cumQuote': fmt(order.cum_quote),
+            'timeInForce': order.tif,
+            'type': order.order_type,
+            'origType': order.order_type,
+            'reduceOnly': order.reduce_only,
+            'closePosition': False,
+            'side': order.side,
+            'positionSide': 'BOTH',
+            'stopPrice': '0',
+            'workingType': 'CONTRACT_PRICE',
+            'priceProtect': False,
+            'time': order.created_at,
+            'updateTime': order.updated_at,
+        }
+
+    def binance_order_update(self, order, fill=None):
+        """Evento ORDER_TRADE_UPDATE del user data stream."""
+        execution = 'TRADE' if fill is not None else order.status
+        return {
+            'e': 'ORDER_TRADE_UPDATE',
+            'E': order.updated_at,
+            'T': order.updated_at,
+            'o': {
+                's': order.coin + 'USDT', 'c': order.client_id or f"sim-{order.order_id}", 'S': order.side,
+                'o': order.order_type, 'f': order.tif, 'q': fmt(order.qty), 'p': fmt(order.price or 0),
+                'ap': fmt(order.avg_price), 'sp': '0', 'x': execution, 'X': order.status, 'i': order.order_id,
+                'l': fmt(fill.qty if fill else 0), 'z': fmt(order.executed_qty), 'L': fmt(fill.price if fill else 0),
+                'n': fmt(fill.fee if fill else 0), 'N': 'USDT', 'T': order.updated_at,
+                't': fill.trade_id if fill else 0, 'm': bool(fill and fill.is_maker), 'R': order.reduce_only,
+                'ps': 'BOTH', 'rp': fmt(fill.closed_pnl if fill else 0),
+            },
+        }
+
+    def binance_time(self, params):
+        return {'serverTime': self.engine.now()}
+
+    def binance_spot_account(self, params):
+        return {'canTrade': True, 'accountType': 'SPOT',
+                'balances': [{'asset': 'USDT', 'free': '0', 'locked': '0'}]}
+
+    def binance_exchange_info(self, params):
+        symbols = []
+        for spec in self.engine.markets.values():
+            tick, step = fmt(spec.tick_size), fmt(spec.step_size)
+            symbols.append({
+                'symbol': spec.coin + 'USDT', 'pair': spec.coin + 'USDT', 'contractType': 'PERPETUAL',
+                'status': 'TRADING', 'baseAsset': spec.coin, 'quoteAsset': 'USDT', 'marginAsset': 'USDT',
+                'pricePrecision': 8, 'quantityPrecision': 8,
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'tickSize': tick, 'minPrice': tick, 'maxPrice': '10000000'},
+                    {'filterType': 'LOT_SIZE', 'stepSize': step, 'minQty': step, 'maxQty': '100000'},
+                    {'filterType': 'MARKET_LOT_SIZE', 'stepSize': step, 'minQty': step, 'maxQty': '10000'},
+                    {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+                ],
+            })
+        return {'timezone': 'UTC', 'serverTime': self.engine.now(), 'rateLimits': [], 'symbols': symbols}
+
+    def binance_depth(self, params):
+        coin = self._coin(params)
+        bids, asks = self.engine.book(BINANCE, coin, depth=int(params.get('limit', 500)))
+        now = self.engine.now()
+        return {'lastUpdateId': self.engine.update_ids[coin], 'E': now, 'T': now,
+                'bids': [[fmt(p), fmt(q)] for p, q in bids], 'asks': [[fmt(p), fmt(q)] for p, q in asks]}
+
+    def _each_symbol(self, params, build):
+        if params.get('symbol'):
+            return build(self._coin(params))
+        return [build(coin) for coin in self.engine.markets]
+
+    def binance_ticker(self, params):
+        return self._each_symbol(params, lambda coin: {
+            'symbol': coin + 'USDT', 'price': fmt(self.engine.mids[coin]), 'time': self.engine.now()})
+
+    def binance_premium_index(self, params):
+        now = self.engine.now()
+        next_funding = (now // BINANCE_FUNDING_INTERVAL + 1) * BINANCE_FUNDING_INTERVAL
+        return self._each_symbol(params, lambda coin: {
+            'symbol': coin + 'USDT', 'markPrice': fmt(self.engine.mids[coin]),
+            'indexPrice': fmt(self.engine.mids[coin]), 'estimatedSettlePrice': fmt(self.engine.mids[coin]),
+            'lastFundingRate': fmt(self.engine.funding[BINANCE][coin]), 'interestRate': '0.0001',
+            'nextFundingTime': next_funding, 'time': now})
+
+    def _funding_times(self, venue, interval, start_time, end_time, limit):
+        end_time = min(int(end_time), self.engine.now()) if end_time else self.engine.now()
+        limit = min(limit, MAX_FUNDING_RECORDS[venue])
+        if start_time is not None:
+            first = -(-int(start_time) // interval) * interval
+            return [t for t in range(first, end_time + 1, interval)][:limit]
+        last = end_time // interval * interval
+        return [last - i * interval for i in reversed(range(limit))]
+
+    def binance_funding_rate(self, params):
+        coin = self._coin(params)
+        times = self._funding_times(BINANCE, BINANCE_FUNDING_INTERVAL, params.get('startTime'),
+                                    params.get('endTime'), int(params.get('limit', 100)))
+        rate = fmt(self.engine.funding[BINANCE][coin])
+        return [{'symbol': coin + 'USDT', 'fundingTime': t, 'fundingRate': rate,
+                 'markPrice': fmt(self.engine.mids[coin])} for t in times]
+
+    def binance_leverage_bracket(self, params):
+        coins = [self._coin(params)] if params.get('symbol') else list(self.engine.markets)
+        return [{'symbol': coin + 'USDT', 'notionalCoef': 1.0,
+                 'brackets': [{'bracket': 1, 'initialLeverage': self.engine.markets[coin].max_leverage,
+                               'notionalCap': 1000000, 'notionalFloor': 0, 'maintMarginRatio': 0.004, 'cum': 0.0}]}
+                for coin in coins]
+
+    def binance_change_leverage(self, params):
+        coin = self._coin(params)
+        self.engine.set_leverage(BINANCE, coin, int(params['leverage']))
+        return {'leverage': int(params['leverage']), 'maxNotionalValue': '1000000', 'symbol': coin + 'USDT'}
+
+    def binance_change_margin_type(self, params):
+        coin = self._coin(params)
+        margin_types = self.engine.account(BINANCE).margin_type
+        margin_type = params.get('marginType', '').upper()
+        if margin_types.get(coin, 'CROSSED') == margin_type:
+            raise BinanceError(-4046, "No need to change margin type.")
+        margin_types[coin] = margin_type
+        return {'code': 200, 'msg': 'success'}
+
+    def _submit_binance(self, params):
+        coin = self._coin(params)
+        order_type = params.get('type', '').upper()
+        if order_type not in ('LIMIT', 'MARKET'):
+            raise BinanceError(-1116, "Invalid orderType.")
+        if order_type == 'LIMIT' and ('price' not in params or 'timeInForce' not in params):
+            raise BinanceError(-1102, "Mandatory parameter 'price' or 'timeInForce' was not sent.")
+        order = self.engine.submit(
+            BINANCE, coin, params.get('side', '').upper(), params.get('quantity', 0), order_type,
+            price=params.get('price'), tif=params.get('timeInForce', 'GTC').upper(),
+            reduce_only=str(params.get('reduceOnly', 'false')).lower() == 'true',
+            client_id=params.get('newClientOrderId'),
+        )
+        return self.binance_order(order)
+
+    def binance_new_order(self, params):
+        return self._submit_binance(params)
+
+    def binance_batch_orders(self, params):
+        orders = json.loads(params.get('batchOrders', '[]'))
+        if len(orders) > MAX_BATCH_ORDERS:
+            raise BinanceError(-4079, "Invalid batchOrders size.")
+        results = []
+        for order in orders:
+            try:
+                results.append(self._submit_binance({k: str(v) for k, v in order.items()}))
+            except (BinanceError, SimulatorReject) as e:
+                results.append({'code': e.code, 'msg': str(e)})
+        return results
+
+    def binance_get_order(self, params):
+        self._coin(params)
+        return self.binance_order(self.engine.get(BINANCE, int(params.get('orderId', 0))))
+
+    def binance_cancel_order(self, params):
+        self._coin(params)
+        return self.binance_order(self.engine.cancel(BINANCE, int(params.get('orderId', 0))))
+
+    def binance_open_orders(self, params):
+        coin = self._coin(params) if params.get('symbol') else None
+        return [self.binance_order(order) for order in self.engine.open_orders(BINANCE, coin)]
+
+    def _binance_position(self, coin):
+        account = self.engine.account(BINANCE)
+        size, entry = account.positions.get(coin, (0.0, 0.0))
+        mark = self.engine.mids[coin]
+        return {'symbol': coin + 'USDT', 'positionSide': 'BOTH', 'positionAmt': fmt(size), 'entryPrice': fmt(entry),
+                'markPrice': fmt(mark), 'unRealizedProfit': fmt(size * (mark - entry)),
+                'notional': fmt(size * mark), 'leverage': str(account.leverage_of(coin)),
+                'marginType': account.margin_type.get(coin, 'cross').lower(), 'updateTime': self.engine.now()}
+
+    def binance_account(self, params):
+        account = self.engine.account(BINANCE)
+        mids = self.engine.mids
+        upnl = account.unrealized_pnl(mids)
+        available = fmt(account.available(mids))
+        return {
+            'totalWalletBalance': fmt(account.balance), 'totalUnrealizedProfit': fmt(upnl),
+            'totalMarginBalance': fmt(account.balance + upnl), 'availableBalance': available,
+            'maxWithdrawAmount': available,
+            'assets': [{'asset': 'USDT', 'walletBalance': fmt(account.balance), 'availableBalance': available}],
+            'positions': [self._binance_position(coin) for coin in account.positions],
+        }
+
+    def binance_position_risk(self, params):
+        if params.get('symbol'):
+            return [self._binance_position(self._coin(params))]
+        return [self._binance_position(coin) for coin in self.engine.account(BINANCE).positions]
+
+    # --- Hyperliquid ------------------------------------------------------
+
+    async def handle_info(self, request):
+        payload = await request.json()
+        retry_after = await self._admit(HYPERLIQUID, hyperliquid_weight('/info', payload))
+        if retry_after:
+            return web.json_response(None, status=429, headers={'Retry-After': str(retry_after)})
+        route = self._info_routes.get(payload.get('type'))
+        if route is None:
+            return web.json_response(None, status=422)
+        try:
+            return web.json_response(route(payload))
+        except SimulatorReject as e:
+            return web.json_response({'code': e.code, 'msg': e.message}, status=400)
+
+    def hyperliquid_meta(self):
+        return {'universe': [{'name': spec.coin, 'szDecimals': spec.sz_decimals, 'maxLeverage': spec.max_leverage,
+                              'onlyIsolated': False} for spec in self.engine.markets.values()]}
+
+    def hyperliquid_meta_and_asset_ctxs(self, payload):
+        ctxs = []
+        for coin in self.engine.markets:
+            mid = fmt(self.engine.mids[coin])
+            bids, asks = self.engine.book(HYPERLIQUID, coin, depth=1)
+            ctxs.append({'funding': fmt(self.engine.funding[HYPERLIQUID][coin]), 'openInterest': '1000',
+                         'prevDayPx': mid, 'dayNtlVlm': '1000000', 'premium': '0', 'oraclePx': mid, 'markPx': mid,
+                         'midPx': mid, 'impactPxs': [fmt(bids[0][0]), fmt(asks[0][0])]})
+        return [self.hyperliquid_meta(), ctxs]
+
+    def hyperliquid_all_mids(self):
+        return {coin: fmt(mid) for coin, mid in self.engine.mids.items()}
+
+    def hyperliquid_l2_book(self, coin):
+        bids, asks = self.engine.book(HYPERLIQUID, coin)
+        return {'coin': coin, 'time': self.engine.now(),
+                'levels': [[{'px': fmt(p), 'sz': fmt(q), 'n': 1} for p, q in side] for side in (bids, asks)]}
+
+    def hyperliquid_clearinghouse_state(self, payload):
+        account = self.engine.account(HYPERLIQUID)
+        mids = self.engine.mids
+        positions = []
+        for coin, (size, entry) in account.positions.items():
+            value = abs(size) * mids[coin]
+            positions.append({'type': 'oneWay', 'position': {
+                'coin': coin, 'szi': fmt(size), 'entryPx': fmt(entry), 'positionValue': fmt(value),
+                'unrealizedPnl': fmt(size * (mids[coin] - entry)), 'returnOnEquity': '0', 'liquidationPx': None,
+                'marginUsed': fmt(value / account.leverage_of(coin)), 'maxLeverage': self.engine.markets[coin].max_leverage,
+                'leverage': {'type': 'cross', 'value': account.leverage_of(coin)}}})
+        account_value = account.balance + account.unrealized_pnl(mids)
+        summary = {'accountValue': fmt(account_value), 'totalNtlPos': fmt(sum(abs(s) * mids[c] for c, (s, _) in
+                                                                                account.positions.items())),
+                   'totalRawUsd': fmt(account.balance), 'totalMarginUsed': fmt(account.margin_used(mids))}
+        return {'marginSummary': summary, 'crossMarginSummary': summary, 'crossMaintenanceMarginUsed': '0',
+                'withdrawable': fmt(max(0.0, account.available(mids))), 'assetPositions': positions,
+                'time': self.engine.now()}
+
+    def _hyperliquid_fill(self, fill):
+        opening = fill.start_position == 0 or (fill.start_position > 0) == (fill.side == 'BUY')
+        direction = ('Open ' if opening else 'Close ') + (
+            ('Long' if fill.side == 'BUY' else 'Short') if opening else ('Long' if fill.side == 'SELL' else 'Short'))
+        return {'coin': fill.coin, 'px': fmt(fill.price), 'sz': fmt(fill.qty), 'side': 'B' if fill.side == 'BUY' else 'A',
+                'time': fill.time, 'startPosition': fmt(fill.start_position), 'dir': direction,
+                'closedPnl': fmt(fill.closed_pnl), 'hash': f"0x{fill.trade_id:064x}", 'oid': fill.order_id,
+                'crossed': not fill.is_maker, 'fee': fmt(fill.fee), 'tid': fill.trade_id, 'feeToken': 'USDC'}
+
+    def hyperliquid_user_fills(self, payload):
+        fills = self.engine.fills[HYPERLIQUID]
+        if payload.get('type') == 'userFillsByTime':
+            start, end = int(payload.get('startTime', 0)), payload.get('endTime')
+            selected = [f for f in fills if f.time >= start and (end is None or f.time <= int(end))]
+            return [self._hyperliquid_fill(f) for f in selected[:MAX_USER_FILLS]]
+        return [self._hyperliquid_fill(f) for f in reversed(fills[-MAX_USER_FILLS:])]
+
+    def hyperliquid_funding_history(self, payload):
+        coin = payload['coin']
+        self.engine.market(coin)
+        times = self._funding_times(HYPERLIQUID, HYPERLIQUID_FUNDING_INTERVAL, payload.get('startTime', 0),
+                                    payload.get('endTime'), MAX_FUNDING_RECORDS[HYPERLIQUID])
+        rate = fmt(self.engine.funding[HYPERLIQUID][coin])
+        return [{'coin': coin, 'fundingRate': rate, 'premium': '0', 'time': t} for t in times]
+
+    def _hyperliquid_open_order(self, order):
+        return {'coin': order.coin, 'side': 'B' if order.is_buy else 'A', 'limitPx': fmt(order.price or 0),
+                'sz': fmt(order.remaining), 'oid': order.order_id, 'timestamp': order.created_at,
+                'origSz': fmt(order.qty)}
+
+    def hyperliquid_open_orders(self, payload):
+        return [self._hyperliquid_open_order(order) for order in self.engine.open_orders(HYPERLIQUID)]
+
+    def hyperliquid_order_status(self, payload):
+        try:
+            order = self.engine.get(HYPERLIQUID, int(payload.get('oid', 0)))
+        except SimulatorReject:
+            return {'status': 'unknownOid'}
+        status = 'open' if order.is_open else order.status.lower()
+        return {'status': 'order', 'order': {'order': self._hyperliquid_open_order(order), 'status': status,
+                                             'statusTimestamp': order.updated_at}}
+
+    async def handle_exchange(self, request):
+        payload = await request.json()
+        retry_after = await self._admit(HYPERLIQUID, hyperliquid_weight('/exchange', payload))
+        if retry_after:
+            return web.json_response(None, status=429, headers={'Retry-After': str(retry_after)})
+        action = payload.get('action', {})
+        handler = {
+            'order': self.hyperliquid_orders,
+            'cancel': self.hyperliquid_cancel,
+            'updateLeverage': self.hyperliquid_update_leverage,
+        }.get(action.get('type'))
+        if handler is None:
+            return web.json_response({'status': 'err', 'response': f"Unsupported action: {action.get('type')}"})
+        return web.json_response(handler(action))
+
+    def _asset_coin(self, asset):
+        coins = list(self.engine.markets)
+        if not 0 <= asset < len(coins):
+            raise SimulatorReject(-1121, f"Invalid asset {asset}")
+        return coins[asset]
+
+    def _hyperliquid_order_status(self, wire):
+        asset = wire.get('a')
+        limit = wire.get('t', {}).get('limit')
+        if limit is None:
+            return {'error': f"Trigger orders are not supported by the simulator. asset={asset}"}
+        tif = {'Gtc': 'GTC', 'Ioc': 'IOC', 'Alo': 'GTX'}.get(limit.get('tif'), 'GTC')
+        try:
+            order = self.engine.submit(HYPERLIQUID, self._asset_coin(asset), 'BUY' if wire.get('b') else 'SELL',
+                                       wire.get('s'), 'LIMIT', price=wire.get('p'), tif=tif,
+                                       reduce_only=bool(wire.get('r')), client_id=wire.get('c'))
+        except SimulatorReject as e:
+            return {'error': f"{HYPERLIQUID_ERRORS.get(e.code, e.message)} asset={asset}"}
+        if order.status == 'FILLED' or (order.status == 'EXPIRED' and order.executed_qty):
+            return {'filled': {'totalSz': fmt(order.executed_qty), 'avgPx': fmt(order.avg_price),
+                               'oid': order.order_id}}
+        if order.status == 'EXPIRED':
+            bids, asks = self.engine.book(HYPERLIQUID, order.coin, depth=1)
+            if order.reason == 'post_only':
+                return {'error': f"Post only order would have immediately matched, bbo was "
+                                 f"{fmt(bids[0][0])}@{fmt(asks[0][0])}. asset={asset}"}
+            return {'error': f"Order could not immediately match against any resting orders. asset={asset}"}
+        return {'resting': {'oid': order.order_id}}
+
+    def hyperliquid_orders(self, action):
+        statuses = [self._hyperliquid_order_status(wire) for wire in action.get('orders', [])]
+        return {'status': 'ok', 'response': {'type': 'order', 'data': {'statuses': statuses}}}
+
+    def hyperliquid_cancel(self, action):
+        statuses = []
+        for cancel in action.get('cancels', []):
+            try:
+                self.engine.cancel(HYPERLIQUID, int(cancel.get('o', 0)))
+                statuses.append('success')
+            except SimulatorReject:
+                statuses.append({'error': f"Order was never placed, already canceled, or filled. "
+                                          f"asset={cancel.get('a')}"})
+        return {'status': 'ok', 'response': {'type': 'cancel', 'data': {'statuses': statuses}}}
+
+    def hyperliquid_update_leverage(self, action):
+        try:
+            self.engine.set_leverage(HYPERLIQUID, self._asset_coin(action.get('asset')), action.get('leverage'))
+        except SimulatorReject as e:
+            return {'status': 'err', 'response': e.message}
+        return {'status': 'ok', 'response': {'type': 'default'}}
+
+
+async def serve(server):
+    """Arranca el simulador hasta recibir SIGINT/SIGTERM."""
+    await server.start_async()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await server.stop_async()
+
+
+def main(argv=None):
+    """Entry point del simulador (pro-hedge-simulator)."""
+    parser = argparse.ArgumentParser(description="Simulador local de Binance Futures y Hyperliquid")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--partial-fill-rate', type=float, default=0.0)
+    parser.add_argument('--reject-rate', type=float, default=0.0)
+    parser.add_argument('--clock-offset-ms', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = SimConfig(seed=args.seed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                       partial_fill_rate=args.partial_fill_rate, reject_rate=args.reject_rate,
+                       clock_offset_ms=args.clock_offset_ms)
+    server = SimulatorServer(config, host=args.host, port=args.port)
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    asyncio.run(serve(server))
+
+
+if __name__ == "__main__":
+    main()
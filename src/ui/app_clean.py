@@ -15,16 +15,13 @@ from pathlib import Path
 src_path = Path(__file__).parent.parent
 sys.path.insert(0, str(src_path))
 
-from core.api_utils import (
-    init_binance_client, check_binance_api, get_current_price,
-    validate_hyperliquid_credentials, init_hyperliquid_clients,
-    check_hyperliquid_api, get_hyperliquid_pairs
-)
-from exchanges.hyperliquid_operations import get_hyperliquid_positions
+from ui.data import credentials_key, get_clients, load_account_snapshot, load_pairs, invalidate_account_data
 from core.trading_operations import (
-    verify_orders, ejecutar_binance_order, ejecutar_hyper_order,
-    cerrar_posiciones, check_all_positions, evaluate_funding_opportunity
+    verify_orders, ejecutar_hedge,
+    cerrar_posiciones, close_all_hedges, check_all_positions, evaluate_funding_opportunity
 )
+from core.funding_scanner import scan_funding_opportunities
+from service.daemon import fetch_daemon
 
 # Cargar variables de entorno
 load_dotenv()
@@ -115,13 +112,22 @@ hl_info = None
 hl_exchange = None
 
 if config_complete:
-    client = init_binance_client(
-        st.session_state.config['binance_api_key'], 
-        st.session_state.config['binance_secret']
-    )
-    hl_info, hl_exchange = init_hyperliquid_clients(
+    # Clientes en caché por hash de credenciales: no se recrean en cada rerun
+    cred_key = credentials_key(
+        st.session_state.config['binance_api_key'],
+        st.session_state.config['binance_secret'],
         st.session_state.config['hyper_private_key']
     )
+    try:
+        clients = get_clients(
+            cred_key,
+            st.session_state.config['binance_api_key'],
+            st.session_state.config['binance_secret'],
+            st.session_state.config['hyper_private_key']
+        )
+        client, hl_info, hl_exchange = clients.binance, clients.hl_info, clients.hl_exchange
+    except Exception as e:
+        st.error(f"❌ Error al inicializar clientes: {e}")
 
 # Panel principal
 col1, col2 = st.columns([2, 1])
@@ -131,7 +137,7 @@ with col1:
     
     # Selección de par
     if client:
-        pairs = get_hyperliquid_pairs(hl_info) if hl_info else ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+        pairs = load_pairs(cred_key, hl_info) if hl_info else ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
         pair = st.selectbox("Par de Trading", pairs, index=0)
     else:
         pair = st.selectbox("Par de Trading", ['BTCUSDT'], index=0)
@@ -171,6 +177,17 @@ with col1:
         else:
             st.error("❌ No se pueden evaluar las tasas: APIs no configuradas")
 
+    # Escáner de funding para todos los pares compartidos
+    if st.button("🔎 Escanear Funding (todos los pares)", use_container_width=True):
+        with st.spinner("Escaneando oportunidades de funding..."):
+            # Con el servicio headless activo, la tabla ya está calculada
+            daemon_funding = fetch_daemon('/funding')
+            scan = pd.DataFrame(daemon_funding) if daemon_funding is not None else scan_funding_opportunities()
+            if scan.empty:
+                st.info("No se encontraron pares compartidos entre ambos exchanges")
+            else:
+                st.dataframe(scan.head(25), use_container_width=True)
+
     # Botones de trading
     col_btn1, col_btn2 = st.columns(2)
     
@@ -185,28 +202,34 @@ with col1:
                         )
                         
                         if best_price_binance and best_price_hyper:
-                            # Ejecutar órdenes
-                            r2, qty_hyper, entry_price_hyper = ejecutar_hyper_order(
-                                hl_info, hl_exchange, st.session_state.config['hyper_address'],
-                                pair, posicion.lower(), capital_usdt, leverage, best_price_hyper
-                            )
-                            r1, qty_binance, entry_price_binance = ejecutar_binance_order(
-                                client, pair, side, capital_usdt, leverage, best_price_binance
+                            # Ejecutar ambas patas de forma concurrente
+                            hedge = ejecutar_hedge(
+                                client, hl_info, hl_exchange, st.session_state.config['hyper_address'],
+                                pair, posicion.lower(), capital_usdt, leverage,
+                                best_price_binance, best_price_hyper
                             )
                             
-                            # Guardar en historial
-                            st.session_state.history.append({
-                                "Timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                "Type": "Open",
-                                "Pair": pair,
-                                "Direction": posicion,
-                                "Capital": capital_usdt,
-                                "Leverage": leverage,
-                                "Binance_Qty": qty_binance,
-                                "Hyperliquid_Qty": qty_hyper
-                            })
-                            
-                            st.success("✅ Hedge ejecutado exitosamente")
+                            invalidate_account_data()
+                            if hedge['status'] == 'success':
+                                # Guardar en historial
+                                st.session_state.history.append({
+                                    "Timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                    "Type": "Open",
+                                    "Pair": pair,
+                                    "Direction": posicion,
+                                    "Capital": capital_usdt,
+                                    "Leverage": leverage,
+                                    "Binance_Qty": hedge['legs']['binance']['qty'],
+                                    "Hyperliquid_Qty": hedge['legs']['hyperliquid']['adjusted_size'],
+                                    "Leg_Skew_ms": hedge['leg_skew_ms']
+                                })
+                                
+                                st.success(f"✅ Hedge ejecutado exitosamente (desfase entre patas: {hedge['leg_skew_ms']:.0f} ms)")
+                            elif hedge['status'] == 'failed':
+                                st.error(f"❌ Hedge no enviado: {hedge['errors']}")
+                            else:
+                                st.error(f"❌ Hedge fallido ({hedge['status']}): {hedge['errors']}")
+                            st.json(hedge['timings'])
                         else:
                             st.error("❌ Error al verificar órdenes")
                     except Exception as e:
@@ -221,8 +244,9 @@ with col1:
                     try:
                         success = cerrar_posiciones(
                             client, hl_info, hl_exchange, st.session_state.config['hyper_address'],
-                            pair, posicion.lower(), st.session_state, force_close=False
+                            pair, posicion.lower(), st.session_state
                         )
+                        invalidate_account_data()
                         if success:
                             st.success("✅ Hedge cerrado exitosamente")
                         else:
@@ -232,68 +256,73 @@ with col1:
             else:
                 st.error("❌ APIs no configuradas")
 
+    if st.button("🧯 Cerrar Todo (emergencia)", use_container_width=True):
+        if client and hl_info:
+            with st.spinner("Cerrando todas las posiciones..."):
+                flatten = close_all_hedges(
+                    client, hl_info, hl_exchange, st.session_state.config['hyper_address'], st.session_state
+                )
+                invalidate_account_data()
+                if flatten['status'] == 'flat':
+                    st.success(f"✅ Todas las posiciones cerradas en {flatten['elapsed_ms'] / 1000:.1f} s")
+                else:
+                    st.error(f"❌ Cierre incompleto ({flatten['status']}): {flatten['errors']}")
+                    if flatten['residual']:
+                        st.dataframe(pd.DataFrame.from_dict(flatten['residual'], orient='index'), use_container_width=True)
+        else:
+            st.error("❌ APIs no configuradas")
+
 with col2:
     st.subheader("💰 Balance de Cuentas")
     
+    snapshot = None
     if client and hl_info:
-        try:
-            # Balance Binance
-            account = client.futures_account()
-            binance_balance = float(account['totalWalletBalance'])
-            st.metric("Binance", f"${binance_balance:,.2f}")
-            
-            # Balance Hyperliquid  
-            user_state = hl_info.user_state(st.session_state.config['hyper_address'])
-            if user_state and 'marginSummary' in user_state:
-                hyper_balance = float(user_state['marginSummary'].get('accountValue', 0))
-                st.metric("Hyperliquid", f"${hyper_balance:,.2f}")
-            else:
-                st.metric("Hyperliquid", "No disponible")
-                
-        except Exception as e:
-            st.error(f"❌ Error al obtener balances: {e}")
+        # Balances y posiciones en una sola carga concurrente con TTL
+        snapshot = load_account_snapshot(cred_key, st.session_state.config['hyper_address'], clients)
+        if snapshot['binance_balance'] is not None:
+            st.metric("Binance", f"${snapshot['binance_balance']:,.2f}")
+        else:
+            st.error(f"❌ Error al obtener balances: {snapshot['errors'].get('binance')}")
+        if snapshot['hyper_balance'] is not None:
+            st.metric("Hyperliquid", f"${snapshot['hyper_balance']:,.2f}")
+        else:
+            st.metric("Hyperliquid", "No disponible")
 
 # Posiciones abiertas
 st.subheader("📊 Posiciones Abiertas")
 tab1, tab2 = st.tabs(["Binance", "Hyperliquid"])
 
 with tab1:
-    if client:
-        try:
-            positions = client.futures_position_information(symbol=pair)
-            open_positions = [pos for pos in positions if float(pos['positionAmt']) != 0]
+    if snapshot:
+        if 'binance' in snapshot['errors']:
+            st.error(f"❌ Error: {snapshot['errors']['binance']}")
+        else:
+            open_positions = snapshot['binance_positions']
             
             if open_positions:
                 for pos in open_positions:
-                    qty = float(pos['positionAmt'])
-                    entry_price = float(pos['entryPrice'])
-                    direction = 'Long' if qty > 0 else 'Short'
-                    
                     col_pos1, col_pos2, col_pos3 = st.columns(3)
-                    col_pos1.metric("Cantidad", f"{abs(qty):.4f}")
-                    col_pos2.metric("Precio Entrada", f"${entry_price:,.2f}")
-                    col_pos3.metric("Dirección", direction)
+                    col_pos1.metric(f"Cantidad {pos.symbol}", f"{abs(pos.size):.4f}")
+                    col_pos2.metric("Precio Entrada", f"${pos.entry_price:,.2f}")
+                    col_pos3.metric("Dirección", pos.direction)
             else:
                 st.info("No hay posiciones abiertas en Binance")
-        except Exception as e:
-            st.error(f"❌ Error: {e}")
 
 with tab2:
-    if hl_info:
-        try:
-            positions = get_hyperliquid_positions(hl_info, st.session_state.config['hyper_address'])
+    if snapshot:
+        if 'hyperliquid' in snapshot['errors']:
+            st.error(f"❌ Error: {snapshot['errors']['hyperliquid']}")
+        else:
+            positions = snapshot['hyper_positions']
             
             if positions:
-                for symbol, pos in positions.items():
-                    if pos['size'] != 0:
-                        col_pos1, col_pos2, col_pos3 = st.columns(3)
-                        col_pos1.metric("Cantidad", f"{abs(pos['size']):.4f}")
-                        col_pos2.metric("Precio Entrada", f"${pos['entry_price']:,.2f}")
-                        col_pos3.metric("Dirección", pos['direction'])
+                for pos in positions:
+                    col_pos1, col_pos2, col_pos3 = st.columns(3)
+                    col_pos1.metric(f"Cantidad {pos.symbol}", f"{abs(pos.size):.4f}")
+                    col_pos2.metric("Precio Entrada", f"${pos.entry_price:,.2f}")
+                    col_pos3.metric("Dirección", pos.direction)
             else:
                 st.info("No hay posiciones abiertas en Hyperliquid")
-        except Exception as e:
-            st.error(f"❌ Error: {e}")
 
 # Historial de trades
 if st.session_state.history:
@@ -0,0 +1,89 @@
+"""
+Ciclo de vida de clientes y carga de datos del dashboard.
+
+Streamlit re-ejecuta ``app.py`` completo en cada interacción. Los clientes se
+guardan en un registro por hash de credenciales (``st.cache_resource``), de modo
+que solo se crean una vez por juego de claves, y los datos de cuenta se leen
+con cargadores ``st.cache_data`` con TTL sobre el snapshot de cuentas compartido
+(``core.portfolio``). Escribir en un campo numérico ya no dispara llamadas a los
+exchanges.
+"""
+
+import hashlib
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import streamlit as st
+
+# Agregar el directorio src al path
+src_path = Path(__file__).parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from core.api_utils import init_binance_client, init_hyperliquid_clients, get_hyperliquid_pairs
+from core.portfolio import get_portfolio_snapshot
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+ACCOUNT_TTL = 10  # Balances y posiciones (segundos)
+PAIRS_TTL = 300  # Lista de pares (segundos)
+
+ExchangeClients = namedtuple('ExchangeClients', ['binance', 'wallet', 'hl_info', 'hl_exchange'])
+
+
+def credentials_key(*credentials):
+    """Hash estable de las credenciales; nunca se guardan las claves como clave de caché."""
+    return hashlib.sha256("\x00".join(credentials).encode()).hexdigest()
+
+
+@st.cache_resource(show_spinner="Conectando con los exchanges...")
+def get_clients(cred_key, _binance_api_key, _binance_secret, _hyper_private_key):
+    """
+    Crea los clientes una sola vez por juego de credenciales.
+    Los argumentos con ``_`` no forman parte de la clave de caché: solo ``cred_key``.
+    Si alguno falla se lanza una excepción, de modo que el fallo no queda en caché.
+    :return: ExchangeClients
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        binance_future = executor.submit(init_binance_client, _binance_api_key, _binance_secret)
+        hyper_future = executor.submit(init_hyperliquid_clients, _hyper_private_key)
+        client = binance_future.result()
+        wallet, hl_info, hl_exchange = hyper_future.result()
+    if client is None or hl_info is None:
+        raise Exception("No se pudieron inicializar los clientes de los exchanges")
+    return ExchangeClients(client, wallet, hl_info, hl_exchange)
+
+
+def fetch_account_snapshot(clients, hyper_address):
+    """
+    Balances y posiciones de ambos exchanges desde el snapshot de cuentas compartido.
+    :return: Diccionario con binance_balance, hyper_balance, binance_positions,
+             hyper_positions (listas de Position) y errors (por exchange)
+    """
+    snapshot = get_portfolio_snapshot(clients.binance, clients.hl_info, hyper_address)
+    return {
+        'binance_balance': snapshot.binance.wallet_balance if snapshot.binance else None,
+        'hyper_balance': snapshot.hyperliquid.account_value if snapshot.hyperliquid else None,
+        'binance_positions': snapshot.open_positions('binance'),
+        'hyper_positions': snapshot.open_positions('hyperliquid'),
+        'errors': snapshot.errors,
+    }
+
+
+@st.cache_data(ttl=ACCOUNT_TTL, show_spinner=False)
+def load_account_snapshot(cred_key, hyper_address, _clients):
+    """Versión en caché (TTL) de ``fetch_account_snapshot`` por credenciales."""
+    return fetch_account_snapshot(_clients, hyper_address)
+
+
+@st.cache_data(ttl=PAIRS_TTL, show_spinner=False)
+def load_pairs(cred_key, _hl_info):
+    """Pares disponibles en Hyperliquid, refrescados cada PAIRS_TTL segundos."""
+    return get_hyperliquid_pairs(_hl_info)
+
+
+def invalidate_account_data():
+    """Descarta balances y posiciones en caché (tras abrir o cerrar un hedge)."""
+    load_account_snapshot.clear()
@@ -0,0 +1,24 @@
+"""
+Shared fixtures for the test suite
+"""
+
+import pytest
+from src.simulator.engine import SimConfig
+from src.simulator.server import SimulatorServer
+from src.core.portfolio import invalidate_portfolio
+
+
+@pytest.fixture
+def simulator(request, monkeypatch):
+    """
+    Simulator on a free port with every client pointed at it.
+    Seed and other SimConfig fields come from ``@pytest.mark.simulator(seed=...)``.
+    """
+    marker = request.node.get_closest_marker('simulator')
+    options = dict(tick_interval=0.01, **(marker.kwargs if marker else {}))
+    with SimulatorServer(SimConfig(**options)) as server:
+        for name, value in server.env().items():
+            monkeypatch.setenv(name, value)
+        invalidate_portfolio()
+        yield server
+    invalidate_portfolio()
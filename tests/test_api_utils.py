@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from src.core.api_utils import (
     api_request,
+    api_cache,
     validate_hyperliquid_credentials,
     round_down_by_step
 )
@@ -14,6 +15,9 @@ from src.core.api_utils import (
 class TestAPIUtils:
     """Test cases for API utility functions"""
 
+    def setup_method(self):
+        api_cache.clear()
+
     def test_round_down_by_step(self):
         """Test round_down_by_step function"""
         assert round_down_by_step(1.234, 0.1) == 1.2
@@ -37,21 +41,32 @@ class TestAPIUtils:
         is_valid, message = validate_hyperliquid_credentials(invalid_address, valid_private_key)
         assert is_valid is False
 
-    @patch('src.core.api_utils.requests.get')
-    def test_api_request_success(self, mock_get):
+    @patch('src.core.api_utils.request_sync')
+    def test_api_request_success(self, mock_request):
         """Test successful API request"""
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"success": True}
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = {"success": True}
         
         result = api_request("https://test.com")
         assert result == {"success": True}
+        mock_request.assert_called_once_with(
+            "https://test.com", method='GET', payload=None, retries=3, backoff_base=0.5
+        )
+
+    @patch('src.core.api_utils.request_sync')
+    def test_api_request_caches_read_only_post(self, mock_request):
+        """Test that read-only /info POSTs are served from cache"""
+        mock_request.return_value = [{"universe": []}, []]
+        payload = {"type": "metaAndAssetCtxs"}
+        
+        api_request("https://api.hyperliquid.xyz/info", method='POST', payload=payload)
+        result = api_request("https://api.hyperliquid.xyz/info", method='POST', payload=dict(payload))
+        assert result == [{"universe": []}, []]
+        assert mock_request.call_count == 1
 
-    @patch('src.core.api_utils.requests.get')
-    def test_api_request_failure(self, mock_get):
+    @patch('src.core.api_utils.request_sync')
+    def test_api_request_failure(self, mock_request):
         """Test API request failure"""
-        mock_get.side_effect = Exception("Network error")
+        mock_request.side_effect = Exception("Network error")
         
         with pytest.raises(Exception):
             api_request("https://test.com", retries=1) 
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Unit tests for the vectorized funding backtester
+"""
+
+import numpy as np
+import pytest
+from src.core.backtest import forward_fill, positions_from_signal, run_backtest, sweep_thresholds, load_funding_panel, HOUR_MS
+from src.core.funding_history import FundingHistoryStore
+
+nan = np.nan
+
+
+class TestBacktest:
+    def test_forward_fill_keeps_leading_nans(self):
+        values = np.array([[nan, 1.0], [2.0, nan], [nan, 3.0]])
+        filled = forward_fill(values)
+        assert np.isnan(filled[0, 0])
+        np.testing.assert_array_equal(filled[1:], [[2.0, 1.0], [2.0, 3.0]])
+
+    def test_positions_follow_evaluate_rule_with_hysteresis(self):
+        diff = np.array([0.0, 0.002, 0.0008, 0.0001, -0.003])[:, None]
+        # Binance más alto -> short en Binance (-1); Hyperliquid más alto -> long en Binance (+1)
+        np.testing.assert_array_equal(positions_from_signal(diff, 0.001)[:, 0], [0, -1, 0, 0, 1])
+        np.testing.assert_array_equal(positions_from_signal(diff, 0.001, exit_threshold=0.0005)[:, 0], [0, -1, -1, 0, 1])
+
+    def test_run_backtest_accounts_funding_and_costs(self):
+        # Binance paga 0.3% en t=0 y t=2; Hyperliquid 0 → señal -1 (short Binance) desde t=0
+        binance = np.array([0.003, nan, 0.003, nan])
+        hyper = np.array([0.0, 0.0, 0.0, 0.0])
+        result = run_backtest(binance, hyper, threshold=0.001, notional=100, fee_rate=0.001, slippage=0.0)
+        np.testing.assert_array_equal(result['position'][:, 0], [0, -1, -1, -1])
+        # Short Binance cobra su funding en t=2: la regla gana el spread
+        assert result['funding_pnl'][0] == pytest.approx(0.3)
+        assert result['trades'][0] == 2  # apertura y cierre final
+        assert result['turnover'][0] == pytest.approx(400)
+        assert result['costs'][0] == pytest.approx(0.4)
+        assert result['total_pnl'][0] == pytest.approx(result['equity'][-1, 0])
+
+    def test_run_backtest_many_symbols_matches_single(self):
+        rng = np.random.default_rng(0)
+        binance = rng.normal(0, 0.002, (200, 50))
+        hyper = rng.normal(0, 0.002, (200, 50))
+        batch = run_backtest(binance, hyper, threshold=0.002)
+        single = run_backtest(binance[:, 7], hyper[:, 7], threshold=0.002)
+        assert batch['total_pnl'][7] == pytest.approx(single['total_pnl'][0])
+
+    def test_sweep_thresholds_parallel_matches_inline(self):
+        rng = np.random.default_rng(1)
+        binance = rng.normal(0, 0.002, (100, 5))
+        hyper = rng.normal(0, 0.002, (100, 5))
+        grid = [0.0005, 0.001, 0.002]
+        inline = sweep_thresholds(binance, hyper, grid, max_workers=1).sort_values('threshold')
+        parallel = sweep_thresholds(binance, hyper, grid, max_workers=2).sort_values('threshold')
+        np.testing.assert_allclose(inline['total_pnl'], parallel['total_pnl'])
+        assert len(parallel) == 3
+
+    def test_load_funding_panel_aligns_store(self, tmp_path):
+        store = FundingHistoryStore(tmp_path)
+        store.append('binance', 'BTCUSDT', [(8 * HOUR_MS + 3, 0.0001)])
+        store.append('hyperliquid', 'BTC', [(h * HOUR_MS, 0.00001) for h in range(10)])
+        times, binance, hyper = load_funding_panel(['BTCUSDT'], 0, 9 * HOUR_MS, store=store)
+        assert len(times) == 10
+        assert binance[8, 0] == 0.0001 and np.isnan(binance[7, 0])
+        assert not np.isnan(hyper).any()
@@ -0,0 +1,61 @@
+"""
+Unit tests for the benchmark harness and its regression gate
+"""
+
+import json
+from unittest.mock import patch
+from benchmarks.harness import BenchmarkCase, measure, measure_median, compare, save_results, load_results
+
+
+def make_case(func, **kwargs):
+    fields = dict(name='case', func=func, setup=None, wrap=None, rounds=20, tolerance=0.5)
+    fields.update(kwargs)
+    return BenchmarkCase(**fields)
+
+
+class TestMeasure:
+    def test_reports_percentiles_and_allocations(self):
+        case = make_case(lambda ctx, arg: [0] * 50_000)
+        result = measure(case, ctx=None, warmup=1)
+        assert result.rounds == 20
+        assert 0 < result.p50_us <= result.p99_us
+        assert result.ops_per_sec > 0
+        assert result.peak_kib >= 50_000 * 8 / 1024 * 0.9
+
+    def test_setup_result_is_passed_and_not_timed(self):
+        seen = []
+        case = make_case(lambda ctx, arg: seen.append(arg), setup=lambda ctx: ctx * 2, rounds=3)
+        measure(case, ctx=21, warmup=0)
+        assert seen and set(seen) == {42}
+
+
+class TestRegressionGate:
+    def test_flags_only_metrics_beyond_tolerance(self, tmp_path):
+        case = make_case(lambda ctx, arg: None)
+        result = measure(case, ctx=None, rounds=5, warmup=0)
+        path = save_results([result], tmp_path / 'baseline.json')
+        assert 'python' in json.loads(path.read_text())['metadata']
+        baseline = load_results(path)
+
+        assert compare([result], baseline) == []
+        baseline = {'case': dict(baseline['case'], p50_us=100.0)}
+        slower = result._replace(p50_us=200.0)
+        regressions = compare([slower], baseline, tolerance=0.5)
+        assert [(r.name, r.metric) for r in regressions] == [('case', 'p50_us')]
+        assert compare([slower], baseline, tolerance=1.5) == []
+        assert compare([slower._replace(name='unknown')], baseline) == []
+
+    def test_small_absolute_changes_are_noise(self):
+        case = make_case(lambda ctx, arg: None)
+        result = measure(case, ctx=None, rounds=5, warmup=0)._replace(p50_us=2.8, peak_kib=0.5)
+        baseline = {'case': dict(result._asdict(), p50_us=1.3, peak_kib=0.1)}
+        assert compare([result], baseline) == []
+        regressions = compare([result], baseline, min_delta={})
+        assert sorted(r.metric for r in regressions) == ['p50_us', 'peak_kib']
+
+    def test_repeats_keep_median_p50(self):
+        case = make_case(lambda ctx, arg: None, rounds=1)
+        result = measure(case, ctx=None, warmup=0)
+        runs = [result._replace(p50_us=p50) for p50 in (3.0, 1.0, 2.0)]
+        with patch('benchmarks.harness.measure', side_effect=runs):
+            assert measure_median(case, ctx=None, repeats=3).p50_us == 2.0
@@ -0,0 +1,105 @@
+"""
+Unit tests for the local Binance order book
+"""
+
+import json
+import threading
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.core.binance_depth import BinanceOrderBook, vwap_for_quantity
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["99.0", "1.0"], ["98.0", "2.0"]],
+    "asks": [["101.0", "1.0"], ["102.0", "3.0"]],
+}
+
+
+def depth_update(first, last, previous, bids=(), asks=()):
+    return json.dumps({
+        "e": "depthUpdate", "E": 1700000000000, "s": "BTCUSDT",
+        "U": first, "u": last, "pu": previous, "b": list(bids), "a": list(asks),
+    })
+
+
+@pytest.fixture
+def book():
+    client = MagicMock()
+    client.futures_order_book.return_value = SNAPSHOT
+    return BinanceOrderBook(client, "BTCUSDT")
+
+
+class TestBinanceOrderBook:
+    def test_vwap_for_quantity(self):
+        prices = np.array([101.0, 102.0])
+        qtys = np.array([1.0, 3.0])
+        assert vwap_for_quantity(prices, qtys, 0.5) == pytest.approx(101.0)
+        assert vwap_for_quantity(prices, qtys, 2.0) == pytest.approx(101.5)
+        assert vwap_for_quantity(prices, qtys, 5.0) is None
+
+    def test_snapshot_then_sequenced_deltas(self, book):
+        # Evento anterior al snapshot: se descarta tras cargarlo
+        book.handle_message(depth_update(90, 95, 89, bids=[["99.0", "5.0"]]))
+        book.wait_resync(timeout=5)
+        assert book.client.futures_order_book.call_count == 1
+        assert not book.synced
+
+        book.handle_message(depth_update(98, 105, 95, bids=[["99.5", "1.0"]], asks=[["101.0", "0"]]))
+        assert book.synced
+        assert book.best_bid_ask() == (99.5, 102.0)
+
+        book.handle_message(depth_update(106, 110, 105, asks=[["100.5", "2.0"]]))
+        assert book.best_bid_ask() == (99.5, 100.5)
+        assert book.vwap('BUY', 3.0) == pytest.approx((100.5 * 2 + 102.0) / 3)
+        assert book.vwap('SELL', 1.0) == pytest.approx(99.5)
+        assert book.is_fresh()
+
+    def test_gap_triggers_resync(self, book, monkeypatch):
+        monkeypatch.setattr('src.core.binance_depth.RESYNC_BACKOFF', 0)
+        book._resync_delay = 0
+        book.handle_message(depth_update(98, 105, 95))
+        book.wait_resync(timeout=5)
+        assert book.synced
+        book.client.futures_order_book.return_value = dict(SNAPSHOT, lastUpdateId=120)
+        # pu no coincide con el último u aplicado
+        book.handle_message(depth_update(115, 121, 114, bids=[["99.2", "1.0"]]))
+        book.wait_resync(timeout=5)
+        assert book.resyncs == 1
+        assert book.client.futures_order_book.call_count == 2
+        # El evento que cubre el nuevo lastUpdateId se reaplica desde el buffer
+        assert book.synced
+        assert book.best_bid_ask()[0] == 99.2
+
+    def test_empty_book_is_not_fresh(self, book):
+        assert not book.is_fresh()
+        assert book.best_bid_ask() == (None, None)
+        assert book.vwap('BUY', 1.0) is None
+
+    def test_resync_runs_off_the_stream_thread_once(self, book):
+        release = threading.Event()
+
+        def slow_snapshot(**kwargs):
+            release.wait(5)
+            return dict(SNAPSHOT, lastUpdateId=104)
+
+        book.client.futures_order_book.side_effect = slow_snapshot
+        # Mientras el snapshot está en vuelo, los mensajes no bloquean ni lanzan más llamadas REST
+        for first in range(98, 110, 2):
+            book.handle_message(depth_update(first, first + 1, first - 1))
+        assert book.client.futures_order_book.call_count == 1
+        assert not book.synced
+        release.set()
+        book.wait_resync(timeout=5)
+        # Los deltas en buffer posteriores al snapshot se reaplicaron
+        assert book.synced and book.snapshot.last_update_id == 109
+
+    def test_failed_snapshot_backs_off(self, book):
+        book.client.futures_order_book.side_effect = Exception("429")
+        book.handle_message(depth_update(98, 105, 95))
+        book.wait_resync(timeout=5)
+        book.handle_message(depth_update(106, 110, 105))
+        book.handle_message(depth_update(111, 115, 110))
+        assert book.client.futures_order_book.call_count == 1
+        assert book._resync_delay > 0.5
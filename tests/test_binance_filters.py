@@ -0,0 +1,70 @@
+"""
+Unit tests for the Binance filter index
+"""
+
+from unittest.mock import MagicMock
+from binance.exceptions import BinanceAPIException
+from src.core.binance_filters import (
+    BinanceFilterIndex,
+    parse_symbol_filters,
+    is_filter_rejection
+)
+
+
+EXCHANGE_INFO = {
+    "symbols": [
+        {
+            "symbol": "BTCUSDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.10", "minPrice": "556.80", "maxPrice": "4529764"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "1000"},
+                {"filterType": "MIN_NOTIONAL", "notional": "100"},
+                {"filterType": "PERCENT_PRICE", "multiplierUp": "1.0500", "multiplierDown": "0.9500"},
+            ],
+        },
+        {
+            "symbol": "ETHUSDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001"},
+            ],
+        },
+    ]
+}
+
+
+def make_filter_error(code):
+    response = MagicMock()
+    response.text = '{"code": %d, "msg": "Filter failure"}' % code
+    return BinanceAPIException(response, 400, response.text)
+
+
+class TestBinanceFilterIndex:
+    """Test cases for BinanceFilterIndex"""
+
+    def test_parse_symbol_filters(self):
+        """Test flattening of a symbol's filter list"""
+        filters = parse_symbol_filters(EXCHANGE_INFO["symbols"][0])
+        assert filters["tickSize"] == 0.1
+        assert filters["stepSize"] == 0.001
+        assert filters["maxQty"] == 1000.0
+        assert filters["minNotional"] == 100.0
+        assert filters["multiplierUp"] == 1.05
+
+    def test_lookup_uses_single_download(self):
+        """Test that lookups after the first build stay in memory"""
+        client = MagicMock()
+        client.futures_exchange_info.return_value = EXCHANGE_INFO
+        index = BinanceFilterIndex()
+
+        index.refresh(client)
+        assert index.get("ETHUSDT")["tickSize"] == 0.01
+        assert index.get("BTCUSDT")["stepSize"] == 0.001
+        assert index.get("DOGEUSDT") is None
+        assert client.futures_exchange_info.call_count == 1
+
+    def test_is_filter_rejection(self):
+        """Test detection of filter rejection errors"""
+        assert is_filter_rejection(make_filter_error(-4014))
+        assert not is_filter_rejection(make_filter_error(-2019))
+        assert not is_filter_rejection(Exception("Network error"))
@@ -0,0 +1,77 @@
+"""
+Integration tests for the maker-first Binance router against the exchange simulator
+"""
+
+import threading
+import time
+import pytest
+from src.core.api_utils import create_binance_client, get_binance_best_price
+from src.exchanges.binance_operations import preparar_binance_order, enviar_binance_order
+from src.exchanges.binance_router import (
+    route_binance_order, binance_execution_mode, MAKER_FEE_RATE, TAKER_FEE_RATE, EXECUTION_ENV
+)
+
+
+def make_leg(client, qty=0.004, side='BUY'):
+    return {'symbol': 'BTCUSDT', 'side': side, 'qty': qty, 'best_price': get_binance_best_price(client, 'BTCUSDT', side),
+            'order_id': None, 'executed_qty': 0.0}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.mark.simulator(seed=3)
+class TestBinanceRouter:
+    def test_resting_post_only_fills_as_maker(self, simulator):
+        client = create_binance_client('sim-key-maker', 'sim-secret')
+        leg = make_leg(client)
+        worker = threading.Thread(target=route_binance_order, args=(client, leg),
+                                  kwargs={'deadline': 5, 'reprice_interval': 0.02})
+        worker.start()
+        wait_for(lambda: leg.get('order_id'))
+        simulator.set_mid('BTC', 64900)
+        worker.join(timeout=5)
+
+        assert leg['executed_qty'] == 0.004
+        assert [s.liquidity for s in leg['slices']] == ['maker']
+        maker = leg['slices'][0]
+        assert maker.status == 'FILLED' and maker.latency_ms > 0
+        assert maker.fee == pytest.approx(0.004 * maker.avg_price * MAKER_FEE_RATE)
+        assert leg['order_id'] is None
+        assert simulator.engine.fills['binance'][-1].is_maker
+
+    def test_reprices_then_crosses_after_deadline(self, simulator):
+        client = create_binance_client('sim-key-taker', 'sim-secret')
+        leg = make_leg(client)
+        first_bid = leg['best_price']
+        worker = threading.Thread(target=route_binance_order, args=(client, leg),
+                                  kwargs={'deadline': 0.6, 'reprice_interval': 0.02})
+        worker.start()
+        wait_for(lambda: leg.get('order_id'))
+        simulator.set_mid('BTC', 65100)  # El bid se aleja por encima de la orden publicada
+        worker.join(timeout=5)
+
+        liquidity = [s.liquidity for s in leg['slices']]
+        assert liquidity[-1] == 'taker' and liquidity.count('maker') >= 2
+        assert leg['slices'][1].price > first_bid
+        taker = leg['slices'][-1]
+        assert taker.status == 'FILLED' and taker.order_type == 'LIMIT'
+        assert taker.fee == pytest.approx(0.004 * taker.avg_price * TAKER_FEE_RATE)
+        assert leg['executed_qty'] == 0.004
+        assert simulator.engine.accounts['binance'].positions['BTC'][0] == pytest.approx(0.004)
+
+    def test_execution_mode_routes_prepared_leg(self, simulator, monkeypatch):
+        monkeypatch.setenv(EXECUTION_ENV, 'maker')
+        assert binance_execution_mode() == 'maker'
+        client = create_binance_client('sim-key-mode', 'sim-secret')
+        ask = get_binance_best_price(client, 'BTCUSDT', 'SELL')
+        leg = preparar_binance_order(client, 'BTCUSDT', 'SELL', 100, 5, ask)
+        enviar_binance_order(client, leg, timeout=0.3)
+
+        assert leg['slices'] and leg['executed_qty'] == leg['qty']
+        assert leg['fees'] == pytest.approx(sum(s.fee for s in leg['slices']))
+        assert simulator.engine.accounts['binance'].positions['BTC'][0] == pytest.approx(-leg['qty'])
@@ -0,0 +1,105 @@
+"""
+Unit tests for the Binance user data stream order tracker
+"""
+
+import json
+import queue
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from websockets.sync.server import serve
+from src.core.binance_user_stream import BinanceOrderTracker
+from src.core.api_utils import wait_for_binance_order
+
+
+def order_update(order_id, status, executed_qty):
+    return json.dumps({
+        "e": "ORDER_TRADE_UPDATE",
+        "E": 1700000000000,
+        "T": 1700000000000,
+        "o": {
+            "s": "BTCUSDT", "i": order_id, "S": "BUY", "o": "LIMIT", "X": status,
+            "p": "65000", "ap": "65000", "q": "0.01", "z": executed_qty,
+        },
+    })
+
+
+@pytest.fixture
+def user_stream():
+    """Local stand-in for the Binance user data stream"""
+    paths = []
+    outbox = queue.Queue()
+    closing = threading.Event()
+
+    def handler(ws):
+        paths.append(ws.request.path)
+        while not closing.is_set():
+            try:
+                ws.send(outbox.get(timeout=0.05))
+            except queue.Empty:
+                continue
+
+    with serve(handler, "127.0.0.1", 0) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.socket.getsockname()[1]
+        yield f"ws://127.0.0.1:{port}/ws", paths, outbox
+        closing.set()
+        server.shutdown()
+
+
+class TestBinanceOrderTracker:
+    """Test cases for BinanceOrderTracker"""
+
+    def test_handle_message_resolves_order(self):
+        """Test that a terminal update resolves waiters"""
+        tracker = BinanceOrderTracker(MagicMock())
+        tracker.connected = True
+        tracker.handle_message(order_update(7, "NEW", "0"))
+        assert tracker.wait(7, timeout=0) is None
+
+        tracker.handle_message(order_update(7, "FILLED", "0.01"))
+        order = tracker.wait(7, timeout=0)
+        assert order["status"] == "FILLED"
+        assert order["executedQty"] == "0.01"
+
+    def test_trade_updates_are_recorded_as_fills(self):
+        """Test that TRADE executions are kept as typed fills"""
+        tracker = BinanceOrderTracker(MagicMock())
+        event = json.loads(order_update(9, "FILLED", "0.01"))
+        event["o"].update({"x": "TRADE", "l": "0.01", "L": "65010", "n": "0.13", "m": False})
+        tracker.handle_message(json.dumps(event))
+        tracker.handle_message(order_update(10, "NEW", "0"))
+        fills = tracker.fills()
+        assert [(f.order_id, f.qty, f.price) for f in fills] == [(9, 0.01, 65010.0)]
+        assert tracker.fills(order_id=10) == []
+
+    def test_stream_against_local_server(self, user_stream):
+        """Test listenKey subscription and fill resolution over a websocket"""
+        url, paths, outbox = user_stream
+        client = MagicMock()
+        client.futures_stream_get_listen_key.return_value = "test-listen-key"
+        tracker = BinanceOrderTracker(client, ws_url=url).start()
+        try:
+            assert tracker.wait_connected(timeout=5)
+            outbox.put(order_update(42, "NEW", "0"))
+            outbox.put(order_update(42, "FILLED", "0.01"))
+            order = tracker.wait(42, timeout=5)
+            assert order is not None
+            assert order["orderId"] == 42
+            assert paths == ["/ws/test-listen-key"]
+        finally:
+            tracker.stop()
+
+    def test_wait_polls_rest_while_stream_is_silent(self):
+        """A fill the stream never reports is picked up by the periodic REST check, well before the timeout"""
+        client = MagicMock()
+        client.futures_get_order.side_effect = [{'orderId': 5, 'status': 'NEW'}, {'orderId': 5, 'status': 'FILLED'}]
+        tracker = BinanceOrderTracker(client)
+        tracker.connected = True
+        with patch('src.core.api_utils.get_binance_order_tracker', return_value=tracker), \
+                patch.object(tracker, 'wait', wraps=tracker.wait) as wait:
+            order = wait_for_binance_order(client, 'BTCUSDT', 5, timeout=30, poll_interval=0.01)
+        assert order['status'] == 'FILLED'
+        assert client.futures_get_order.call_count == 2
+        assert all(call.args[1] <= 0.05 for call in wait.call_args_list)
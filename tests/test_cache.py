@@ -0,0 +1,69 @@
+"""
+Unit tests for the API response cache
+"""
+
+import threading
+from unittest.mock import patch
+from src.core import api_utils
+from src.core.cache import TTLCache, cache_policy, FRESH, STALE
+
+
+class TestTTLCache:
+    """Test cases for TTLCache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = TTLCache(max_size=2)
+        cache.set("a", 1, ttl=60, now=0)
+        cache.set("b", 2, ttl=60, now=0)
+        cache.lookup("a", now=1)
+        cache.set("c", 3, ttl=60, now=1)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_and_stale_window(self):
+        """Test fresh, stale and expired lookups"""
+        cache = TTLCache()
+        cache.set("k", "v", ttl=1, stale_ttl=2, now=0)
+
+        assert cache.lookup("k", now=0.5) == (FRESH, "v")
+        assert cache.lookup("k", now=2) == (STALE, "v")
+        assert cache.lookup("k", now=4) == (None, None)
+        assert len(cache) == 0
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["stale_hits"] == 1
+        assert stats["expirations"] == 1
+        assert stats["misses"] == 1
+
+    def test_cache_policy(self):
+        """Test per-endpoint TTL selection"""
+        info = "https://api.hyperliquid.xyz/info"
+        assert cache_policy('POST', info, {"type": "metaAndAssetCtxs"}).ttl == 1
+        assert cache_policy('POST', info, {"type": "fundingHistory", "coin": "BTC"}).ttl == 8 * 3600
+        assert cache_policy('POST', "https://api.hyperliquid.xyz/exchange", {"type": "order"}) is None
+        assert cache_policy('GET', "https://fapi.binance.com/fapi/v1/time") is None
+        history = "https://fapi.binance.com/fapi/v1/fundingRate?symbol=BTCUSDT&startTime=0"
+        assert cache_policy('GET', history).ttl == 8 * 3600
+        assert cache_policy('GET', "https://fapi.binance.com/fapi/v1/fundingRate?symbol=BTCUSDT").ttl == 60
+
+    def test_concurrent_stale_hits_revalidate_once(self):
+        """Test that stale hits from many threads schedule a single background refresh"""
+        policy = cache_policy('GET', "https://fapi.binance.com/fapi/v1/premiumIndex")
+        start = threading.Barrier(8)
+
+        def hit():
+            start.wait()
+            api_utils._revalidate("stale-key", "https://fapi.binance.com/fapi/v1/premiumIndex", 'GET', None, policy)
+
+        with patch.object(api_utils, 'run_background', side_effect=lambda coro: coro.close()) as run:
+            threads = [threading.Thread(target=hit) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert run.call_count == 1
+        api_utils._revalidating.discard("stale-key")
@@ -0,0 +1,50 @@
+"""
+Unit tests for the Binance clock-offset tracker
+"""
+
+from unittest.mock import MagicMock, patch
+import pytest
+from binance.exceptions import BinanceAPIException
+from src.core.clock_sync import BinanceClockSync, estimate_offset, is_timestamp_error
+
+
+class TestClockSync:
+    def test_estimate_offset_compensates_rtt(self):
+        # Servidor adelantado 500 ms; la muestra lenta (RTT 400 ms) es asimétrica y se descarta
+        samples = [
+            (1000, 1520, 1040),
+            (2000, 2522, 2044),
+            (3000, 3900, 3400),
+            (4000, 4518, 4036),
+        ]
+        offset, rtt = estimate_offset(samples)
+        assert offset == pytest.approx(500, abs=2)
+        assert rtt == pytest.approx(38)
+
+    def test_sync_updates_attached_clients(self):
+        clock = BinanceClockSync(samples=3)
+        client = MagicMock()
+        clock.attach(client)
+        with patch.object(clock, 'sample', side_effect=[(0, 250, 10), (100, 350, 110), (200, 460, 220)]):
+            assert clock.sync() == 245
+        assert client.timestamp_offset == 245
+        assert clock.wait_synced(0)
+
+        late = MagicMock()
+        clock.attach(late)
+        assert late.timestamp_offset == 245
+        metrics = clock.metrics()
+        assert metrics['sync_count'] == 1 and metrics['clients'] == 2
+
+    def test_sync_failure_keeps_previous_offset(self):
+        clock = BinanceClockSync(samples=2)
+        clock.offset = 100
+        with patch.object(clock, 'sample', side_effect=Exception("timeout")):
+            assert clock.sync() is None
+        assert clock.offset == 100
+        assert clock.failures == 1
+
+    def test_is_timestamp_error(self):
+        response = MagicMock(status_code=400, text='{"code": -1021, "msg": "Timestamp outside recvWindow"}')
+        assert is_timestamp_error(BinanceAPIException(response, 400, response.text))
+        assert not is_timestamp_error(ValueError("x"))
@@ -0,0 +1,162 @@
+"""
+Unit tests for the headless arbitrage service
+"""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from src.service.daemon import HedgeDaemon, fetch_daemon, TOKEN_HEADER
+
+CREDENTIALS = {'binance_api_key': 'k', 'binance_secret': 's', 'hyper_private_key': '0x1', 'hyper_address': '0xabc'}
+TOKEN = 'daemon-secret'
+AUTH = {TOKEN_HEADER: TOKEN}
+
+
+async def with_client(daemon, scenario):
+    client = TestClient(TestServer(daemon.build_app()))
+    await client.start_server()
+    try:
+        return await scenario(client)
+    finally:
+        await client.close()
+
+
+class TestHedgeDaemon:
+    def test_scan_job_serves_funding_without_exchange_calls(self):
+        daemon = HedgeDaemon(CREDENTIALS)
+        table = pd.DataFrame([{'symbol': 'BTCUSDT', 'annualized_yield': 0.12,
+                               'binance_next_funding': pd.Timestamp('2024-01-01', tz='UTC')}])
+        with patch('src.service.daemon.scan_funding_opportunities', return_value=table) as scan:
+            daemon.scan()
+
+            async def scenario(client):
+                first = await (await client.get('/funding')).json()
+                second = await (await client.get('/funding')).json()
+                return first, second
+
+            first, second = asyncio.run(with_client(daemon, scenario))
+        assert scan.call_count == 1
+        assert first == second
+        assert first[0]['symbol'] == 'BTCUSDT'
+
+    def test_trade_requires_initialized_clients(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+
+        async def scenario(client):
+            response = await client.post('/hedge', json={'symbol': 'BTCUSDT'}, headers=AUTH)
+            health = await (await client.get('/health')).json()
+            return response.status, health
+
+        status, health = asyncio.run(with_client(daemon, scenario))
+        assert status == 503
+        assert health['status'] == 'starting'
+
+    def test_hedge_endpoint_runs_open_hedge(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+        daemon.client, daemon.hl_info = MagicMock(), MagicMock()
+        daemon.client.futures_account.return_value = {'totalWalletBalance': '0', 'availableBalance': '0'}
+        daemon.client.futures_position_information.return_value = []
+        daemon.hl_info.user_state.return_value = {}
+        daemon.open_hedge = MagicMock(return_value={'status': 'success'})
+
+        async def scenario(client):
+            response = await client.post('/hedge', json={'symbol': 'BTCUSDT', 'direction': 'Long', 'capital': 100, 'leverage': 2}, headers=AUTH)
+            missing = await client.post('/hedge', json={'symbol': 'BTCUSDT'}, headers=AUTH)
+            return await response.json(), missing.status
+
+        result, missing_status = asyncio.run(with_client(daemon, scenario))
+        assert result == {'status': 'success'}
+        assert missing_status == 400
+        daemon.open_hedge.assert_called_once_with('BTCUSDT', 'long', 100.0, 2)
+
+    def test_hedge_endpoint_forwards_twap_options(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+        daemon.client, daemon.hl_info = MagicMock(), MagicMock()
+        daemon.open_hedge = MagicMock(return_value={'status': 'partial'})
+
+        async def scenario(client):
+            response = await client.post('/hedge', json={'symbol': 'ETHUSDT', 'direction': 'short', 'capital': 500,
+                                                         'leverage': 5, 'twap': True, 'participation': 0.05},
+                                         headers=AUTH)
+            return await response.json()
+
+        assert asyncio.run(with_client(daemon, scenario)) == {'status': 'partial'}
+        daemon.open_hedge.assert_called_once_with('ETHUSDT', 'short', 500.0, 5, twap=True, participation=0.05)
+
+    def test_trade_endpoints_reject_cross_site_and_malformed_requests(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+        daemon.client, daemon.hl_info = MagicMock(), MagicMock()
+        daemon.open_hedge = MagicMock(return_value={'status': 'success'})
+        order = '{"symbol": "BTCUSDT", "direction": "long", "capital": 100, "leverage": 2}'
+        json_type = {'Content-Type': 'application/json'}
+
+        async def scenario(client):
+            requests = [
+                client.post('/hedge', data=order, headers=json_type),
+                client.post('/hedge', data=order, headers={**AUTH, 'Content-Type': 'text/plain'}),
+                client.post('/hedge', data=order, headers={**AUTH, **json_type, 'Origin': 'https://evil.example'}),
+                client.post('/hedge', data='{"symbol": ', headers={**AUTH, **json_type}),
+                client.post('/hedge', json={'symbol': 'BTCUSDT', 'direction': 'long', 'capital': 'mucho', 'leverage': 2},
+                            headers=AUTH),
+            ]
+            return [(await response).status for response in requests]
+
+        assert asyncio.run(with_client(daemon, scenario)) == [401, 415, 403, 400, 400]
+        daemon.open_hedge.assert_not_called()
+
+    def test_trade_call_rejects_out_of_range_fields(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+        order = {'symbol': 'BTCUSDT', 'direction': 'long', 'capital': 100, 'leverage': 2}
+        invalid = [
+            {'direction': 'buy'},
+            {'capital': -100},
+            {'capital': 'nan'},
+            {'capital': 'inf'},
+            {'leverage': 0},
+            {'twap': True, 'participation': 0},
+            {'twap': True, 'participation': 1.5},
+        ]
+        for fields in invalid:
+            with pytest.raises(ValueError):
+                daemon.trade_call('/hedge', {**order, **fields})
+        with pytest.raises(ValueError):
+            daemon.trade_call('/close', {'symbol': 'BTCUSDT', 'direction': 'sell'})
+        _, args, kwargs = daemon.trade_call('/hedge', {**order, 'direction': 'SHORT', 'twap': True, 'participation': 1})
+        assert args == ('BTCUSDT', 'short', 100.0, 2) and kwargs == {'twap': True, 'participation': 1.0}
+
+    def test_hedge_endpoint_rejects_invalid_direction(self):
+        daemon = HedgeDaemon(CREDENTIALS, token=TOKEN)
+        daemon.client, daemon.hl_info = MagicMock(), MagicMock()
+        daemon.open_hedge = MagicMock(return_value={'status': 'success'})
+
+        async def scenario(client):
+            response = await client.post('/hedge', json={'symbol': 'BTCUSDT', 'direction': 'buy', 'capital': 100,
+                                                         'leverage': 2}, headers=AUTH)
+            return response.status
+
+        assert asyncio.run(with_client(daemon, scenario)) == 400
+        daemon.open_hedge.assert_not_called()
+
+    def test_trade_endpoints_disabled_without_token(self, monkeypatch):
+        monkeypatch.delenv('PRO_HEDGE_DAEMON_TOKEN', raising=False)
+        daemon = HedgeDaemon(CREDENTIALS)
+        daemon.client, daemon.hl_info = MagicMock(), MagicMock()
+
+        async def scenario(client):
+            return (await client.post('/close_all', json={}, headers={TOKEN_HEADER: ''})).status
+
+        assert asyncio.run(with_client(daemon, scenario)) == 403
+
+    def test_fetch_daemon_without_url(self, monkeypatch):
+        monkeypatch.delenv('PRO_HEDGE_DAEMON_URL', raising=False)
+        assert fetch_daemon('/funding') is None
+
+    def test_fetch_daemon_sends_token(self, monkeypatch):
+        monkeypatch.setenv('PRO_HEDGE_DAEMON_URL', 'http://127.0.0.1:8765/')
+        monkeypatch.setenv('PRO_HEDGE_DAEMON_TOKEN', TOKEN)
+        with patch('src.service.daemon.request_sync', return_value={'status': 'success'}) as request:
+            assert fetch_daemon('/close_all', method='POST', payload={}) == {'status': 'success'}
+        request.assert_called_once_with('http://127.0.0.1:8765/close_all', method='POST', payload={}, retries=1,
+                                        headers=AUTH)
@@ -0,0 +1,52 @@
+"""
+Unit tests for the funding history store
+"""
+
+from unittest.mock import patch
+import numpy as np
+from src.core.funding_history import FundingHistoryStore
+
+HOUR = 3600 * 1000
+
+
+def binance_page(times):
+    return [{"symbol": "BTCUSDT", "fundingTime": t, "fundingRate": f"{t / 1e12:.6f}", "markPrice": "50000"} for t in times]
+
+
+class TestFundingHistoryStore:
+    def test_sync_fetches_only_after_last_timestamp(self, tmp_path):
+        store = FundingHistoryStore(tmp_path)
+        with patch('src.core.funding_history.binance_funding_rate', return_value=binance_page([0, 8 * HOUR])) as fetch:
+            assert store.sync('binance', 'BTCUSDT', since=0, now=10 * HOUR) == 2
+        assert fetch.call_args.kwargs['start_time'] == 0
+
+        with patch('src.core.funding_history.binance_funding_rate', return_value=binance_page([16 * HOUR])) as fetch:
+            assert store.sync('binance', 'BTCUSDT', now=20 * HOUR) == 1
+        assert fetch.call_args.kwargs['start_time'] == 8 * HOUR + 1
+        assert fetch.call_args.kwargs['use_cache'] is False
+        assert store.last_timestamp('binance', 'BTCUSDT') == 16 * HOUR
+
+    def test_sync_paginates_full_pages(self, tmp_path):
+        store = FundingHistoryStore(tmp_path)
+        pages = [
+            [{"coin": "BTC", "fundingRate": "0.0001", "premium": "0", "time": i * HOUR} for i in range(500)],
+            [{"coin": "BTC", "fundingRate": "0.0002", "premium": "0", "time": 500 * HOUR}],
+        ]
+        with patch('src.core.funding_history.hyperliquid_funding_history', side_effect=pages) as fetch:
+            assert store.sync('hyperliquid', 'BTC', since=0, now=600 * HOUR) == 501
+        assert fetch.call_count == 2
+        assert fetch.call_args.kwargs['start_time'] == 499 * HOUR + 1
+
+    def test_query_returns_numpy_range(self, tmp_path):
+        store = FundingHistoryStore(tmp_path)
+        store.append('hyperliquid', 'BTC', [(3 * HOUR, 0.3), (1 * HOUR, 0.1), (2 * HOUR, 0.2)])
+        assert store.append('hyperliquid', 'BTC', [(2 * HOUR, 0.9)]) == 0
+
+        series = store.query('hyperliquid', 'BTC', start=2 * HOUR)
+        assert series.time.dtype == np.int64
+        assert series.time.tolist() == [2 * HOUR, 3 * HOUR]
+        np.testing.assert_allclose(series.rate, [0.2, 0.3])
+
+    def test_query_missing_symbol_is_empty(self, tmp_path):
+        series = FundingHistoryStore(tmp_path).query('binance', 'ETHUSDT')
+        assert len(series.time) == 0 and len(series.rate) == 0
@@ -0,0 +1,83 @@
+"""
+Unit tests for the cross-exchange funding scanner
+"""
+
+import pandas as pd
+from unittest.mock import patch
+from src.core.funding_scanner import build_funding_table, scan_funding_opportunities, funding_recommendation
+from src.core.funding_scanner import LONG_BINANCE, SHORT_BINANCE
+from src.core.trading_operations import evaluate_funding_opportunity
+
+
+PREMIUM_INDEX = [
+    {"symbol": "BTCUSDT", "markPrice": "65000", "lastFundingRate": "0.00010000", "nextFundingTime": 1700006400000},
+    {"symbol": "ETHUSDT", "markPrice": "3200", "lastFundingRate": "-0.00008000", "nextFundingTime": 1700006400000},
+    {"symbol": "BNBUSDT", "markPrice": "600", "lastFundingRate": "0.00010000", "nextFundingTime": 1700006400000},
+    {"symbol": "BTCUSDC", "markPrice": "65010", "lastFundingRate": "0.00050000", "nextFundingTime": 1700006400000},
+]
+META_AND_CTXS = [
+    {"universe": [{"name": "BTC"}, {"name": "ETH"}, {"name": "HYPE"}]},
+    [
+        {"funding": "0.0000125", "markPx": "64950"},
+        {"funding": "0.00002", "markPx": "3201"},
+        {"funding": "0.0001", "markPx": "30"},
+    ],
+]
+
+
+class TestFundingScanner:
+    """Test cases for the funding scanner"""
+
+    def test_joins_shared_universe(self):
+        """Test that only pairs listed on both venues are returned"""
+        table = build_funding_table(PREMIUM_INDEX, META_AND_CTXS, now=pd.Timestamp("2023-11-14 22:13", tz="UTC"))
+        assert list(table["symbol"]) == ["ETHUSDT", "BTCUSDT"]
+
+        eth = table.iloc[0]
+        assert eth["coin"] == "ETH"
+        assert abs(eth["spread_hourly"] - (-0.00001 - 0.00002)) < 1e-12
+        assert abs(eth["annualized_yield"] - 0.00003 * 24 * 365) < 1e-9
+        # Binance paga menos que Hyperliquid: long en Binance, short (cobra) en Hyperliquid
+        assert eth["recommendation"] == "Abrir Long en Binance, Short en Hyperliquid"
+        assert eth["hyperliquid_next_funding"] == pd.Timestamp("2023-11-14 23:00", tz="UTC")
+
+    def test_min_spread_filter(self):
+        """Test filtering by absolute hourly spread"""
+        table = build_funding_table(PREMIUM_INDEX, META_AND_CTXS, min_spread=0.00002)
+        assert list(table["symbol"]) == ["ETHUSDT"]
+
+    def test_binance_interval_from_funding_info(self):
+        """Test that symbols with a 4h interval are normalized by 4, the rest by 8"""
+        funding_info = [{"symbol": "ETHUSDT", "fundingIntervalHours": 4}, {"symbol": "BTCUSDT"}]
+        table = build_funding_table(PREMIUM_INDEX, META_AND_CTXS, funding_info=funding_info).set_index("symbol")
+        assert table.loc["ETHUSDT", "binance_interval_hours"] == 4
+        assert table.loc["BTCUSDT", "binance_interval_hours"] == 8
+        assert abs(table.loc["ETHUSDT", "binance_hourly"] - (-0.00002)) < 1e-12
+        assert abs(table.loc["BTCUSDT", "binance_hourly"] - 0.0000125) < 1e-12
+
+    @patch('src.core.funding_scanner.api_request')
+    def test_scan_fetches_funding_info_once(self, mock_request):
+        """Test that a full scan issues one call per venue plus one fundingInfo call"""
+        mock_request.side_effect = [PREMIUM_INDEX, META_AND_CTXS, [{"symbol": "ETHUSDT", "fundingIntervalHours": 1}]]
+        table = scan_funding_opportunities()
+        assert len(table) == 2
+        assert mock_request.call_count == 3
+        assert mock_request.call_args_list[2].args[0].endswith("/fapi/v1/fundingInfo")
+        assert table.set_index("symbol").loc["ETHUSDT", "binance_interval_hours"] == 1
+
+    @patch('src.core.funding_scanner.api_request')
+    def test_scan_falls_back_to_eight_hours(self, mock_request):
+        """Test that a failed fundingInfo call keeps the scan with the default interval"""
+        mock_request.side_effect = [PREMIUM_INDEX, META_AND_CTXS, Exception("HTTP 503")]
+        table = scan_funding_opportunities()
+        assert list(table["binance_interval_hours"]) == [8, 8]
+
+    def test_recommendation_shorts_the_higher_rate(self):
+        """Test that the recommended side collects the spread instead of paying it"""
+        assert list(funding_recommendation([0.0002, -0.0002])) == [SHORT_BINANCE, LONG_BINANCE]
+        with patch('src.core.trading_operations.binance_fr', return_value=[{'symbol': 'BTCUSDT', 'fundingTime': 0,
+                                                                              'fundingRate': '0.003'}]), \
+                patch('src.core.trading_operations.hyperliquid_fr', return_value={'rate': '0.0001'}):
+            result = evaluate_funding_opportunity('BTCUSDT')
+        assert result['status'] == 'opportunity'
+        assert result['recommendation'] == SHORT_BINANCE
@@ -0,0 +1,84 @@
+"""
+Unit tests for the async connection-pooled API client
+"""
+
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.core.http_client import AsyncApiClient, backoff_delay, is_read_only, request_key
+
+
+async def with_server(handler, scenario):
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    client = AsyncApiClient(backoff_base=0.001)
+    try:
+        return await scenario(client, server)
+    finally:
+        await client.close()
+        await server.close()
+
+
+class TestAsyncApiClient:
+    """Test cases for AsyncApiClient"""
+
+    def test_coalesces_identical_requests(self):
+        """Test that identical in-flight reads share one network call"""
+        hits = []
+
+        async def handler(request):
+            hits.append(request.path)
+            await asyncio.sleep(0.05)
+            return web.json_response({"ok": True})
+
+        async def scenario(client, server):
+            url = str(server.make_url("/fapi/v1/premiumIndex"))
+            return await asyncio.gather(*[client.request(url) for _ in range(5)])
+
+        results = asyncio.run(with_server(handler, scenario))
+        assert results == [{"ok": True}] * 5
+        assert len(hits) == 1
+
+    def test_retries_server_errors(self):
+        """Test that 5xx responses are retried with backoff"""
+        hits = []
+
+        async def handler(request):
+            hits.append(await request.json())
+            if len(hits) < 3:
+                return web.json_response({"error": "busy"}, status=503)
+            return web.json_response([{"universe": []}, []])
+
+        async def scenario(client, server):
+            url = str(server.make_url("/info"))
+            return await client.request(url, method='POST', payload={"type": "metaAndAssetCtxs"})
+
+        assert asyncio.run(with_server(handler, scenario)) == [{"universe": []}, []]
+        assert len(hits) == 3
+
+    def test_client_errors_are_not_retried(self):
+        """Test that 4xx responses fail without retrying"""
+        hits = []
+
+        async def handler(request):
+            hits.append(request.path)
+            return web.json_response({"code": -1121}, status=400)
+
+        async def scenario(client, server):
+            try:
+                await client.request(str(server.make_url("/fapi/v1/fundingRate")))
+            except Exception as e:
+                return str(e)
+
+        assert "400" in asyncio.run(with_server(handler, scenario))
+        assert len(hits) == 1
+
+    def test_helpers(self):
+        """Test request classification, keys and backoff bounds"""
+        assert is_read_only('GET', "https://fapi.binance.com/fapi/v1/time")
+        assert is_read_only('POST', "https://api.hyperliquid.xyz/info")
+        assert not is_read_only('POST', "https://api.hyperliquid.xyz/exchange")
+        assert request_key('POST', "u", {"b": 1, "a": 2}) == request_key('post', "u", {"a": 2, "b": 1})
+        assert all(0 <= backoff_delay(attempt, 0.5, 2) <= 2 for attempt in range(10))
@@ -0,0 +1,68 @@
+"""
+Unit tests for the Hyperliquid market stream
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+from src.core.hyperliquid_stream import HyperliquidMarketStream, get_hyperliquid_stream
+from src.exchanges.hyperliquid_operations import get_hyperliquid_best_price
+
+
+def l2_message(coin, bid, ask):
+    return {"channel": "l2Book", "data": {
+        "coin": coin, "time": 1700000000000,
+        "levels": [[{"px": str(bid), "sz": "1.5", "n": 2}], [{"px": str(ask), "sz": "2.0", "n": 1}]],
+    }}
+
+
+class FakeInfo:
+    """Info con websocket: guarda los callbacks de suscripción"""
+
+    def __init__(self):
+        self.ws_manager = object()
+        self.callbacks = {}
+
+    def subscribe(self, subscription, callback):
+        self.callbacks[subscription.get("coin", subscription["type"])] = callback
+        return len(self.callbacks)
+
+
+class TestHyperliquidMarketStream:
+    def test_skip_ws_has_no_stream(self):
+        hl_info = MagicMock()
+        hl_info.ws_manager = None
+        assert get_hyperliquid_stream(hl_info) is None
+
+    def test_watch_subscribes_once(self):
+        hl_info = FakeInfo()
+        stream = HyperliquidMarketStream(hl_info)
+        assert stream.watch("BTC") and stream.watch("BTC")
+        assert set(hl_info.callbacks) == {"allMids", "BTC"}
+
+    def test_best_prices_from_book_and_mids(self):
+        hl_info = FakeInfo()
+        stream = HyperliquidMarketStream(hl_info)
+        stream.watch("BTC")
+        assert stream.best_prices("BTC", True) is None
+
+        hl_info.callbacks["BTC"](l2_message("BTC", 64990, 65010))
+        assert stream.best_prices("BTC", True) == (64990.0, 65000.0)
+        hl_info.callbacks["allMids"]({"channel": "allMids", "data": {"mids": {"BTC": "65001"}}})
+        assert stream.best_prices("BTC", False) == (65010.0, 65001.0)
+
+    def test_stale_book_is_ignored(self):
+        stream = HyperliquidMarketStream(FakeInfo())
+        stream.on_l2_book(l2_message("ETH", 3000, 3001))
+        stream._books["ETH"] = stream._books["ETH"]._replace(received_at=time.time() - 60)
+        assert stream.book("ETH") is None
+
+    def test_best_price_falls_back_to_rest_when_stale(self):
+        hl_info = FakeInfo()
+        universe = MagicMock()
+        universe.asset_ctx.return_value = {"markPx": "100.0"}
+        with patch('src.exchanges.hyperliquid_operations.get_hyperliquid_universe', return_value=universe):
+            best, mark = get_hyperliquid_best_price(hl_info, "SOL", True)
+            assert mark == 100.0
+            hl_info.callbacks["SOL"](l2_message("SOL", 99.5, 100.5))
+            assert get_hyperliquid_best_price(hl_info, "SOL", True) == (99.5, 100.0)
+        assert universe.asset_ctx.call_count == 1
@@ -0,0 +1,137 @@
+"""
+Unit tests for the shared Hyperliquid universe snapshot
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from src.core.hyperliquid_universe import (
+    HyperliquidUniverse,
+    round_price,
+    round_size
+)
+
+
+META = {
+    "universe": [
+        {"name": "BTC", "szDecimals": 5, "maxLeverage": 50},
+        {"name": "ETH", "szDecimals": 4, "maxLeverage": 50},
+        {"name": "SOL", "szDecimals": 2, "maxLeverage": 20},
+    ]
+}
+CTXS = [
+    {"markPx": "65000.0", "funding": "0.0000125"},
+    {"markPx": "3200.5", "funding": "0.00001"},
+    {"markPx": "150.25", "funding": "-0.00002"},
+]
+
+
+def make_hl_info():
+    hl_info = MagicMock()
+    hl_info.base_url = "https://test.hyperliquid"
+    hl_info.meta_and_asset_ctxs.return_value = [META, CTXS]
+    return hl_info
+
+
+class TestHyperliquidUniverse:
+    """Test cases for HyperliquidUniverse"""
+
+    def test_asset_lookup(self):
+        """Test metadata lookup by coin name"""
+        hl_info = make_hl_info()
+        universe = HyperliquidUniverse()
+
+        eth = universe.asset(hl_info, "ETH")
+        assert eth["index"] == 1
+        assert eth["sz_decimals"] == 4
+        assert eth["px_decimals"] == 2
+        assert universe.asset(hl_info, "BTC")["px_decimals"] == 1
+
+    def test_single_round_trip(self):
+        """Test that metadata and price lookups share one download"""
+        hl_info = make_hl_info()
+        universe = HyperliquidUniverse()
+
+        universe.asset(hl_info, "SOL")
+        ctx = universe.asset_ctx(hl_info, "SOL")
+        universe.asset(hl_info, "SOL")
+        assert ctx["markPx"] == "150.25"
+        assert hl_info.meta_and_asset_ctxs.call_count == 1
+        hl_info.meta.assert_not_called()
+
+    def test_stale_context_refresh(self):
+        """Test that price contexts refresh after their TTL"""
+        hl_info = make_hl_info()
+        universe = HyperliquidUniverse(ctx_ttl=0)
+
+        universe.asset_ctx(hl_info, "BTC")
+        universe.asset_ctx(hl_info, "BTC")
+        assert hl_info.meta_and_asset_ctxs.call_count == 2
+        assert universe.version == 1
+
+    def test_unknown_coin(self):
+        """Test lookup of a coin missing from the universe"""
+        hl_info = make_hl_info()
+        universe = HyperliquidUniverse()
+
+        with pytest.raises(Exception):
+            universe.asset(hl_info, "DOGE")
+
+    def test_version_bumps_on_listing(self):
+        """Test that a new listing bumps the snapshot version"""
+        universe = HyperliquidUniverse()
+        universe.load(META, CTXS)
+        universe.load(META, CTXS)
+        assert universe.version == 1
+
+        listed = {"universe": META["universe"] + [{"name": "HYPE", "szDecimals": 2}]}
+        universe.load(listed)
+        assert universe.version == 2
+
+
+class TestPricePrecision:
+    """Test cases for the per-asset price and size rounding"""
+
+    def make_assets(self):
+        universe = HyperliquidUniverse()
+        universe.load({"universe": META["universe"] + [{"name": "kPEPE", "szDecimals": 0}]})
+        return {name: universe._assets[name] for name in ("BTC", "ETH", "SOL", "kPEPE")}
+
+    def test_significant_figures_and_decimals(self):
+        """Test the 5 significant figure and MAX_DECIMALS - szDecimals limits"""
+        assets = self.make_assets()
+        assert round_price(assets["BTC"], 65033.37, True) == 65034
+        assert round_price(assets["BTC"], 65033.37, False) == 65033
+        assert round_price(assets["ETH"], 3001.55, True) == 3001.6
+        assert round_price(assets["SOL"], 150.257, False) == 150.25
+        assert round_price(assets["kPEPE"], 0.01234567, True) == 0.012346
+        assert round_price(assets["kPEPE"], 0.01234567, False) == 0.012345
+        assert round_price(assets["BTC"], 123456.7, False) == 123456
+
+    def test_exact_prices_are_kept(self):
+        """Test that valid prices survive floating point noise unchanged"""
+        assets = self.make_assets()
+        for px in (3001.5, 0.1 + 0.2, 150.29, 1.0005 * 2000):
+            assert round_price(assets["SOL"], round(px, 2), True) == round(px, 2)
+            assert round_price(assets["SOL"], round(px, 2), False) == round(px, 2)
+        assert round_size({"sz_scale": 100}, 0.29) == 0.29
+        assert round_size({"sz_scale": 1000}, 0.0019999) == 0.001
+
+    def test_matches_simulator_price_rule(self):
+        """Test rounded prices against the simulator's validity check"""
+        import random
+        from src.simulator.engine import is_valid_hyperliquid_price
+
+        rng = random.Random(0)
+        assets = self.make_assets()
+        for _ in range(2000):
+            asset = assets[rng.choice(list(assets))]
+            px = 10 ** rng.uniform(-5, 6)
+            for is_buy in (True, False):
+                rounded = round_price(asset, px, is_buy)
+                assert is_valid_hyperliquid_price(rounded, asset["sz_decimals"])
+                assert (rounded >= px) if is_buy else (rounded <= px)
+
+    def test_rejects_non_positive_price(self):
+        """Test that a non-positive price is an error"""
+        with pytest.raises(ValueError):
+            round_price(self.make_assets()["BTC"], 0, True)
@@ -0,0 +1,49 @@
+"""
+Unit tests for the structured logger
+"""
+
+from unittest.mock import MagicMock
+from src.core.logger import configure_logging, log_payload, is_enabled_for, get_logger
+import logging
+
+
+class TestLogger:
+    def teardown_method(self):
+        configure_logging(level='INFO')
+
+    def test_payload_not_logged_above_debug(self):
+        configure_logging(level='INFO')
+        logger = MagicMock()
+        log_payload(logger, "payload", {"big": list(range(10))}, sample_rate=1)
+        logger.debug.assert_not_called()
+        assert not is_enabled_for(logging.DEBUG)
+
+    def test_payload_logged_at_debug_when_sampled(self):
+        configure_logging(level='DEBUG')
+        logger = MagicMock()
+        log_payload(logger, "payload", {"a": 1}, sample_rate=1, coin="BTC")
+        logger.debug.assert_called_once_with("payload", payload={"a": 1}, coin="BTC")
+
+    def test_payload_skipped_when_not_sampled(self):
+        configure_logging(level='DEBUG')
+        logger = MagicMock()
+        log_payload(logger, "payload", {"a": 1}, sample_rate=0)
+        logger.debug.assert_not_called()
+
+    def test_reconfiguring_applies_to_existing_loggers(self, capsys):
+        configure_logging(level='INFO')
+        logger = get_logger('tests.reconfigure')
+        logger.debug("oculto")
+        configure_logging(level='DEBUG')
+        logger.debug("visible", coin="BTC")
+        out = capsys.readouterr().out
+        assert "oculto" not in out
+        assert "visible" in out and "tests.reconfigure" in out
+        assert is_enabled_for(logging.DEBUG)
+
+    def test_single_module_under_both_import_paths(self):
+        import src.core.trading_operations  # noqa: F401 - importa core.logger por el path de src
+        import sys
+        assert sys.modules['core.logger'] is sys.modules['src.core.logger']
+        configure_logging(level='DEBUG')
+        assert sys.modules['core.logger'].is_enabled_for(logging.DEBUG)
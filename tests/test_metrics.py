@@ -0,0 +1,81 @@
+"""
+Unit tests for the Prometheus metrics surface
+"""
+
+import asyncio
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.metrics import (
+    REGISTRY, endpoint_label, observe_api, observe_sdk, record_slippage, render_metrics
+)
+from src.service.daemon import HedgeDaemon
+
+
+def sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestEndpointLabel:
+    def test_binance_path(self):
+        assert endpoint_label("https://fapi.binance.com/fapi/v1/premiumIndex?symbol=BTCUSDT") == '/fapi/v1/premiumIndex'
+
+    def test_hyperliquid_info_type(self):
+        url = "https://api.hyperliquid.xyz/info"
+        assert endpoint_label(url, {'type': 'metaAndAssetCtxs'}) == 'info:metaAndAssetCtxs'
+        assert endpoint_label(url) == '/info'
+
+
+class TestObservers:
+    def test_observe_api_records_latency_even_on_error(self):
+        labels = {'host': 'api.hyperliquid.xyz', 'endpoint': 'info:allMids', 'method': 'POST'}
+        before = sample('pro_hedge_api_request_seconds_count', labels)
+        with observe_api("https://api.hyperliquid.xyz/info", 'post', {'type': 'allMids'}):
+            pass
+        with pytest.raises(RuntimeError):
+            with observe_api("https://api.hyperliquid.xyz/info", 'post', {'type': 'allMids'}):
+                raise RuntimeError("boom")
+        assert sample('pro_hedge_api_request_seconds_count', labels) == before + 2
+
+    def test_observe_sdk(self):
+        labels = {'exchange': 'binance', 'call': 'futures_create_order'}
+        before = sample('pro_hedge_sdk_call_seconds_count', labels)
+        with observe_sdk('binance', 'futures_create_order'):
+            pass
+        assert sample('pro_hedge_sdk_call_seconds_count', labels) == before + 1
+
+
+class TestSlippage:
+    def test_adverse_fill_is_positive_on_both_sides(self):
+        assert record_slippage('binance', True, 100.0, 100.1) == pytest.approx(10)
+        assert record_slippage('binance', False, 100.0, 99.9) == pytest.approx(10)
+
+    def test_price_improvement_is_negative(self):
+        assert record_slippage('hyperliquid', True, 100.0, 99.95) == pytest.approx(-5)
+
+    def test_missing_prices_are_ignored(self):
+        assert record_slippage('hyperliquid', True, None, 100.0) is None
+        assert record_slippage('binance', True, 100.0, 0) is None
+
+
+class TestExposition:
+    def test_render_metrics(self):
+        body, content_type = render_metrics()
+        assert content_type.startswith('text/plain')
+        assert b'pro_hedge_orders_total' in body
+
+    def test_daemon_serves_metrics(self):
+        daemon = HedgeDaemon({})
+
+        async def scenario():
+            client = TestClient(TestServer(daemon.build_app()))
+            await client.start_server()
+            try:
+                response = await client.get('/metrics')
+                return response.status, response.headers['Content-Type'], await response.text()
+            finally:
+                await client.close()
+
+        status, content_type, text = asyncio.run(scenario())
+        assert status == 200
+        assert content_type.startswith('text/plain')
+        assert 'pro_hedge_hedges_total' in text
@@ -0,0 +1,67 @@
+"""
+Unit tests for the typed exchange records
+"""
+
+import dataclasses
+import pytest
+from src.exchanges.models import Position, Order, Fill, FundingSample
+
+
+class TestPosition:
+    def test_from_binance(self):
+        position = Position.from_binance({'symbol': 'ETHUSDT', 'positionAmt': '-0.500', 'entryPrice': '3000.5',
+                                          'markPrice': '2990', 'unRealizedProfit': '5.25', 'leverage': '5'})
+        assert (position.coin, position.size, position.entry_price, position.leverage) == ('ETH', -0.5, 3000.5, 5)
+        assert position.direction == 'Short'
+        assert position.is_open
+
+    def test_from_hyperliquid(self):
+        position = Position.from_hyperliquid({'coin': 'SOL', 'szi': '2', 'entryPx': '150', 'positionValue': '310',
+                                              'leverage': {'type': 'cross', 'value': 4}})
+        assert (position.symbol, position.mark_price, position.leverage, position.direction) == ('SOLUSDT', 155.0, 4, 'Long')
+        assert not Position.from_hyperliquid({'coin': 'SOL', 'szi': '0'}).is_open
+
+    def test_records_are_slotted_and_immutable(self):
+        position = Position('binance', 'BTC', 'BTCUSDT', 1.0, 65000.0)
+        assert not hasattr(position, '__dict__')
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            position.size = 2.0
+
+
+class TestOrder:
+    def test_from_binance(self):
+        order = Order.from_binance({'symbol': 'BTCUSDT', 'orderId': 7, 'side': 'BUY', 'status': 'FILLED',
+                                    'origQty': '0.010', 'price': '0', 'executedQty': '0.010', 'avgPrice': '65001.5'})
+        assert order.is_filled
+        assert (order.order_id, order.executed_qty, order.avg_price) == (7, 0.01, 65001.5)
+
+    def test_binance_batch_rejection(self):
+        order = Order.from_binance({'code': -2022, 'msg': 'ReduceOnly Order is rejected.'})
+        assert (order.status, order.error) == ('REJECTED', 'ReduceOnly Order is rejected.')
+
+    def test_from_hyperliquid_statuses(self):
+        request = {'coin': 'BTC', 'is_buy': False, 'sz': 0.01, 'limit_px': 64000}
+        filled = Order.from_hyperliquid(request, {'filled': {'oid': 3, 'totalSz': '0.01', 'avgPx': '64100'}})
+        resting = Order.from_hyperliquid(request, {'resting': {'oid': 4}})
+        rejected = Order.from_hyperliquid(request, {'error': 'Insufficient margin'})
+        assert (filled.side, filled.executed_qty, filled.avg_price) == ('SELL', 0.01, 64100.0)
+        assert (resting.status, resting.order_id, resting.executed_qty) == ('NEW', 4, 0.0)
+        assert (rejected.status, rejected.error) == ('REJECTED', 'Insufficient margin')
+
+
+class TestFillAndFunding:
+    def test_fill_from_binance_update(self):
+        event = {'e': 'ORDER_TRADE_UPDATE', 'T': 1700000000000, 'o': {
+            's': 'BTCUSDT', 'i': 9, 'S': 'SELL', 'x': 'TRADE', 'l': '0.004', 'L': '65010', 'n': '0.1', 'm': True}}
+        fill = Fill.from_binance_update(event)
+        assert (fill.order_id, fill.qty, fill.price, fill.fee, fill.is_maker) == (9, 0.004, 65010.0, 0.1, True)
+        assert Fill.from_binance_update({'o': {'x': 'NEW'}}) is None
+
+    def test_fill_from_hyperliquid(self):
+        fill = Fill.from_hyperliquid({'coin': 'ETH', 'oid': 1, 'side': 'B', 'sz': '0.5', 'px': '3000',
+                                      'fee': '0.3', 'time': 1700000000000, 'crossed': True})
+        assert (fill.side, fill.qty, fill.is_maker) == ('BUY', 0.5, False)
+
+    def test_funding_samples(self):
+        assert FundingSample.from_binance({'symbol': 'BTCUSDT', 'fundingTime': 1, 'fundingRate': '0.0001'}).rate == 0.0001
+        assert FundingSample.from_hyperliquid({'coin': 'BTC', 'time': 2, 'fundingRate': '-0.00002'}).time == 2
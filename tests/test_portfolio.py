@@ -0,0 +1,115 @@
+"""
+Unit tests for the shared portfolio snapshot
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pytest
+from src.core.portfolio import PortfolioStore, parse_binance_account, parse_hyperliquid_state
+from src.core.trading_operations import cerrar_posiciones, check_all_positions
+
+ACCOUNT = {'totalWalletBalance': '1000', 'availableBalance': '750.5'}
+POSITION_RISK = [
+    {'symbol': 'BTCUSDT', 'positionAmt': '0.010', 'entryPrice': '65000', 'markPrice': '65100',
+     'unRealizedProfit': '1', 'leverage': '3'},
+    {'symbol': 'ETHUSDT', 'positionAmt': '0', 'entryPrice': '0', 'markPrice': '3000'},
+]
+USER_STATE = {
+    'marginSummary': {'accountValue': '500'},
+    'withdrawable': '320',
+    'assetPositions': [
+        {'position': {'coin': 'BTC', 'szi': '-0.01', 'entryPx': '65050', 'positionValue': '651',
+                      'unrealizedPnl': '-0.5', 'leverage': {'type': 'cross', 'value': 3}}},
+    ],
+}
+
+
+def make_clients():
+    client = MagicMock()
+    client.futures_account.return_value = ACCOUNT
+    client.futures_position_information.return_value = POSITION_RISK
+    hl_info = MagicMock()
+    hl_info.user_state.return_value = USER_STATE
+    return client, hl_info
+
+
+class TestParsing:
+    def test_binance_positions_keyed_by_coin(self):
+        account = parse_binance_account(ACCOUNT, POSITION_RISK, fetched_at=1.0)
+        assert account.available_balance == 750.5
+        assert list(account.positions) == ['BTC']
+        btc = account.positions['BTC']
+        assert (btc.size, btc.mark_price, btc.leverage, btc.direction) == (0.01, 65100.0, 3, 'Long')
+
+    def test_hyperliquid_positions_keyed_by_coin(self):
+        account = parse_hyperliquid_state(USER_STATE, fetched_at=1.0)
+        assert (account.account_value, account.withdrawable) == (500.0, 320.0)
+        btc = account.positions['BTC']
+        assert btc.symbol == 'BTCUSDT'
+        assert btc.mark_price == pytest.approx(65100)
+        assert btc.direction == 'Short'
+
+
+class TestPortfolioStore:
+    def test_snapshot_is_shared_within_freshness_window(self):
+        client, hl_info = make_clients()
+        store = PortfolioStore(max_age=60)
+        snapshot = store.snapshot(client, hl_info, '0xabc')
+        assert store.binance(client).available_balance == 750.5
+        assert store.hyperliquid(hl_info, '0xabc').withdrawable == 320.0
+        assert snapshot.coins() == ['BTC']
+        assert client.futures_account.call_count == 1
+        assert client.futures_position_information.call_count == 1
+        assert hl_info.user_state.call_count == 1
+
+        store.invalidate()
+        store.snapshot(client, hl_info, '0xabc')
+        assert hl_info.user_state.call_count == 2
+
+    def test_failed_venue_is_reported_and_not_cached(self):
+        client, hl_info = make_clients()
+        hl_info.user_state.side_effect = [Exception("timeout"), USER_STATE]
+        store = PortfolioStore(max_age=60)
+        snapshot = store.snapshot(client, hl_info, '0xabc')
+        assert snapshot.hyperliquid is None
+        assert snapshot.errors == {'hyperliquid': 'timeout'}
+        assert snapshot.position('hyperliquid', 'BTC') is None
+        assert store.snapshot(client, hl_info, '0xabc').position('hyperliquid', 'BTC').size == -0.01
+
+
+class TestClosing:
+    def test_cerrar_posiciones_reads_once_and_verifies_once(self):
+        client, hl_info = make_clients()
+        client.futures_position_information.side_effect = [POSITION_RISK, []]
+        hl_info.user_state.side_effect = [USER_STATE, {'marginSummary': {'accountValue': '500'}}]
+        client.futures_create_order.return_value = {'orderId': 1}
+        session = SimpleNamespace(positions={'binance': {}, 'hyperliquid': {}})
+        with patch('src.core.trading_operations.wait_for_binance_order', return_value={'status': 'FILLED'}), \
+                patch('src.core.trading_operations.place_hyperliquid_order') as place:
+            closed = cerrar_posiciones(client, hl_info, MagicMock(), '0xabc', 'BTCUSDT', 'long', session)
+        assert closed is True
+        client.futures_create_order.assert_called_once_with(symbol='BTCUSDT', side='SELL', type='MARKET', quantity=0.01,
+                                                            reduceOnly='true')
+        assert place.call_args.kwargs['is_buy'] is True
+        assert client.futures_position_information.call_count == 2
+        assert hl_info.user_state.call_count == 2
+
+    def test_cerrar_posiciones_ignores_cached_sizes(self):
+        client, hl_info = make_clients()
+        stale = [dict(POSITION_RISK[0], positionAmt='0.030')]
+        client.futures_position_information.side_effect = [stale, POSITION_RISK, []]
+        hl_info.user_state.side_effect = [USER_STATE, USER_STATE, {'marginSummary': {'accountValue': '500'}}]
+        client.futures_create_order.return_value = {'orderId': 1}
+        session = SimpleNamespace(positions={'binance': {}, 'hyperliquid': {}})
+        with patch('src.core.trading_operations.get_portfolio_store', return_value=PortfolioStore()) as store, \
+                patch('src.core.trading_operations.wait_for_binance_order', return_value={'status': 'FILLED'}), \
+                patch('src.core.trading_operations.place_hyperliquid_order'):
+            store.return_value.snapshot(client, hl_info, '0xabc')  # Tamaño ya obsoleto en la caché
+            assert cerrar_posiciones(client, hl_info, MagicMock(), '0xabc', 'BTCUSDT', 'long', session) is True
+        assert client.futures_create_order.call_args.kwargs['quantity'] == 0.01
+
+    def test_check_all_positions_uses_snapshot(self):
+        client, hl_info = make_clients()
+        message = check_all_positions(client, MagicMock(), hl_info, '0xabc')
+        assert "BTCUSDT: 0.01 @ 65000.0" in message
+        assert "BTC: -0.01 @ 65050.0" in message
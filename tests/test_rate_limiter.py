@@ -0,0 +1,97 @@
+"""
+Unit tests for the weight-aware rate limiter
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from src.core.rate_limiter import (
+    TokenBucket, PRIORITY_ORDERS, PRIORITY_MARKET_DATA, request_weight, binance_weight,
+    hyperliquid_weight, install_binance_limiter, install_hyperliquid_limiter, get_rate_limiter
+)
+
+
+class TestWeights:
+    def test_binance_depth_weight_depends_on_limit(self):
+        assert binance_weight('/fapi/v1/depth', {'limit': '20'}) == 2
+        assert binance_weight('/fapi/v1/depth', {'limit': 100}) == 5
+        assert binance_weight('/fapi/v1/depth', {'limit': 1000}) == 20
+        assert binance_weight('/fapi/v2/positionRisk') == 5
+        assert binance_weight('/fapi/v1/unknown') == 1
+
+    def test_request_weight_parses_query_and_lane(self):
+        assert request_weight("https://fapi.binance.com/fapi/v1/depth?symbol=BTCUSDT&limit=500") == (10, PRIORITY_MARKET_DATA)
+        assert request_weight("https://fapi.binance.com/fapi/v1/premiumIndex") == (10, PRIORITY_MARKET_DATA)
+        assert request_weight("https://fapi.binance.com/fapi/v1/order") == (1, PRIORITY_ORDERS)
+
+    def test_hyperliquid_weights(self):
+        assert hyperliquid_weight('/info', {'type': 'l2Book', 'coin': 'BTC'}) == 2
+        assert hyperliquid_weight('/info', {'type': 'metaAndAssetCtxs'}) == 20
+        assert hyperliquid_weight('/exchange', {'action': {'type': 'order', 'orders': [{}] * 85}}) == 3
+        assert request_weight("https://api.hyperliquid.xyz/exchange", {'action': {}}) == (1, PRIORITY_ORDERS)
+
+
+class TestTokenBucket:
+    def test_market_data_leaves_reserve_for_orders(self):
+        bucket = TokenBucket('test', capacity=100, reserve=0.2)
+        assert bucket.try_acquire(80, PRIORITY_MARKET_DATA) == 0
+        assert bucket.try_acquire(1, PRIORITY_MARKET_DATA) > 0
+        assert bucket.try_acquire(20, PRIORITY_ORDERS) == 0
+
+    def test_wait_time_matches_refill_rate(self):
+        bucket = TokenBucket('test', capacity=60, period=60, reserve=0)
+        bucket.try_acquire(60, PRIORITY_ORDERS)
+        assert bucket.try_acquire(5, PRIORITY_ORDERS) == pytest.approx(5, abs=0.05)
+
+    def test_used_weight_header_only_lowers_budget(self):
+        bucket = TokenBucket('test', capacity=2400)
+        bucket.observe_response(200, {'X-MBX-USED-WEIGHT-1M': '2000'})
+        assert bucket.stats()['tokens'] == pytest.approx(400, abs=1)
+        bucket.observe_response(200, {'X-MBX-USED-WEIGHT-1M': '10'})
+        assert bucket.stats()['tokens'] == pytest.approx(400, abs=1)
+
+    def test_429_blocks_every_lane(self):
+        bucket = TokenBucket('test', capacity=100)
+        bucket.observe_response(429, {'Retry-After': '3'})
+        assert bucket.try_acquire(1, PRIORITY_ORDERS) == pytest.approx(3, abs=0.05)
+
+    def test_acquire_async_yields_instead_of_blocking(self):
+        bucket = TokenBucket('test', capacity=100, period=1, reserve=0)
+        bucket.try_acquire(100, PRIORITY_ORDERS)
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(bucket.acquire_async(10, PRIORITY_ORDERS), ticker())
+
+        asyncio.run(scenario())
+        assert len(ticks) == 3
+        assert bucket.waits >= 1
+
+
+class TestInstall:
+    def test_binance_client_calls_consume_weight_and_read_headers(self):
+        client = MagicMock()
+        client.response = SimpleNamespace(status_code=200, headers={'X-MBX-USED-WEIGHT-1M': '5'})
+        original = client._request
+        install_binance_limiter(client)
+        install_binance_limiter(client)  # idempotente
+        bucket = get_rate_limiter('fapi.binance.com')
+        client._request('get', 'https://fapi.binance.com/fapi/v2/positionRisk', True, data={'symbol': 'BTCUSDT'})
+        original.assert_called_once_with('get', 'https://fapi.binance.com/fapi/v2/positionRisk', True, False,
+                                         data={'symbol': 'BTCUSDT'})
+        assert bucket.stats()['tokens'] == pytest.approx(bucket.capacity - 5, abs=0.5)
+
+    def test_hyperliquid_exchange_and_inner_info_are_limited(self):
+        info = SimpleNamespace(base_url='https://api.hyperliquid.xyz', post=MagicMock(return_value={}))
+        exchange = SimpleNamespace(base_url='https://api.hyperliquid.xyz', post=MagicMock(return_value={}), info=info)
+        original = exchange.post
+        install_hyperliquid_limiter(exchange)
+        assert exchange._weight_limited and info._weight_limited
+        assert exchange.post('/exchange', {'action': {'type': 'order', 'orders': [{}]}}) == {}
+        original.assert_called_once_with('/exchange', {'action': {'type': 'order', 'orders': [{}]}})
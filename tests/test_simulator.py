@@ -0,0 +1,107 @@
+"""
+Unit and integration tests for the exchange simulator
+"""
+
+from types import SimpleNamespace
+import pytest
+from binance.exceptions import BinanceAPIException
+from eth_account import Account
+from src.simulator.engine import MatchingEngine, SimConfig, SimulatorReject, is_valid_hyperliquid_price
+from src.core.api_utils import create_binance_client, init_hyperliquid_clients, get_binance_best_price
+from src.core.binance_user_stream import BinanceOrderTracker
+from src.core.trading_operations import cerrar_posiciones
+from src.exchanges.binance_operations import ejecutar_binance_order
+from src.exchanges.hyperliquid_operations import place_hyperliquid_order, get_hyperliquid_fills
+
+
+class TestMatchingEngine:
+    def test_same_seed_same_outcomes(self):
+        def run():
+            engine = MatchingEngine(SimConfig(seed=7, reject_rate=0.3, partial_fill_rate=0.5))
+            outcomes = []
+            for _ in range(20):
+                try:
+                    order = engine.submit('binance', 'BTC', 'BUY', 0.002, 'MARKET')
+                    outcomes.append((order.status, order.executed_qty))
+                except SimulatorReject as e:
+                    outcomes.append(e.code)
+            return outcomes
+
+        outcomes = run()
+        assert outcomes == run()
+        assert -2019 in outcomes and ('PARTIALLY_FILLED', 0.001) in outcomes
+
+    def test_post_only_expires_and_resting_order_fills_as_maker(self):
+        engine = MatchingEngine()
+        bids, asks = engine.book('binance', 'BTC', depth=1)
+        crossing = engine.submit('binance', 'BTC', 'BUY', 0.01, price=asks[0][0], tif='GTX')
+        assert (crossing.status, crossing.reason) == ('EXPIRED', 'post_only')
+
+        resting = engine.submit('binance', 'BTC', 'BUY', 0.01, price=bids[0][0], tif='GTX')
+        assert resting.status == 'NEW'
+        engine.set_mid('BTC', 64900)
+        assert (resting.status, resting.avg_price) == ('FILLED', bids[0][0])
+        assert engine.fills['binance'][-1].is_maker
+
+    def test_reduce_only_and_hyperliquid_price_rules(self):
+        engine = MatchingEngine()
+        with pytest.raises(SimulatorReject) as rejected:
+            engine.submit('hyperliquid', 'ETH', 'SELL', 0.1, 'MARKET', reduce_only=True)
+        assert rejected.value.code == -2022
+        assert is_valid_hyperliquid_price(65033, 5) and is_valid_hyperliquid_price(3001.5, 4)
+        assert not is_valid_hyperliquid_price(3001.55, 4)
+        with pytest.raises(SimulatorReject):
+            engine.submit('hyperliquid', 'BTC', 'BUY', 0.001, price=65033.5)
+
+
+@pytest.mark.simulator(seed=1)
+class TestSimulatorServer:
+    def test_hedge_legs_and_close_through_real_clients(self, simulator):
+        client = create_binance_client('sim-key-hedge', 'sim-secret')
+        wallet = Account.create()
+        _, hl_info, hl_exchange = init_hyperliquid_clients(wallet.key.hex(), streaming=False)
+        address = wallet.address
+
+        ask = get_binance_best_price(client, 'BTCUSDT', 'SELL')
+        _, qty, _ = ejecutar_binance_order(client, 'BTCUSDT', 'BUY', 100, 5, ask)
+        place_hyperliquid_order(hl_info, hl_exchange, address, 'BTC', False, qty, 5, False)
+        assert simulator.engine.accounts['binance'].positions['BTC'][0] == qty
+        assert simulator.engine.accounts['hyperliquid'].positions['BTC'][0] == -qty
+        assert get_hyperliquid_fills(hl_info, address)[0].side == 'SELL'
+
+        session = SimpleNamespace(positions={'binance': {}, 'hyperliquid': {}})
+        assert cerrar_posiciones(client, hl_info, hl_exchange, address, 'BTCUSDT', 'long', session) is True
+        assert simulator.engine.accounts['binance'].positions == {}
+        assert simulator.engine.accounts['hyperliquid'].positions == {}
+
+    def test_user_stream_reports_partial_then_full_fill(self, simulator):
+        simulator.engine.config.partial_fill_rate = 1.0
+        client = create_binance_client('sim-key-stream', 'sim-secret')
+        tracker = BinanceOrderTracker(client).start()
+        try:
+            for _ in range(100):
+                if tracker.connected:
+                    break
+                tracker._stop.wait(0.02)
+            order = client.futures_create_order(symbol='BTCUSDT', side='SELL', type='MARKET', quantity=0.004)
+            assert order['status'] == 'PARTIALLY_FILLED'
+            final = tracker.wait(order['orderId'], timeout=5)
+            assert (final['status'], final['executedQty']) == ('FILLED', '0.004')
+            assert len(tracker.fills(order['orderId'])) == 2
+        finally:
+            tracker.stop()
+
+    def test_rate_limit_and_timestamp_errors(self, simulator):
+        client = create_binance_client('sim-key-errors', 'sim-secret')
+        simulator.engine.config.clock_offset_ms = 60_000
+        with pytest.raises(BinanceAPIException) as stale:
+            client.futures_account()
+        assert stale.value.code == -1021
+
+        simulator.windows['binance'].limit = 3
+        with pytest.raises(BinanceAPIException) as limited:
+            for _ in range(5):
+                client.futures_exchange_info()
+        assert (limited.value.status_code, limited.value.code) == (429, -1003)
+        assert int(client.response.headers['Retry-After']) > 0
+        assert simulator.rate_limited['binance'] == 1
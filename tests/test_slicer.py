@@ -0,0 +1,101 @@
+"""
+Unit and simulator tests for the TWAP/iceberg hedge slicer
+"""
+
+import threading
+from unittest.mock import patch, MagicMock
+import pytest
+from eth_account import Account
+from src.core.api_utils import create_binance_client, init_hyperliquid_clients
+from src.exchanges.binance_router import EXECUTION_ENV
+from src.core.slicer import band_notional, plan_slice, slippage_bps, ejecutar_hedge_twap, MIN_SLICE_NOTIONAL
+
+
+class TestSlicePlanning:
+    def test_band_notional_counts_levels_near_touch(self):
+        prices = [100.0, 100.05, 100.2]
+        assert band_notional(prices, [1, 2, 5], band_bps=10) == pytest.approx(100 + 200.1)
+        assert band_notional([], [], band_bps=10) == 0.0
+
+    def test_slice_follows_depth_and_absorbs_small_remainder(self):
+        assert plan_slice(1000, depth_notional=2000, participation=0.1, slices_left=50) == 200
+        # Poca profundidad: el tope de rebanadas manda
+        assert plan_slice(1000, depth_notional=10, participation=0.1, slices_left=4) == 250
+        # El resto no bajaría del mínimo: se envía todo
+        assert plan_slice(210, depth_notional=2000, participation=0.1, slices_left=50) == 210
+        assert plan_slice(5, depth_notional=2000, participation=0.1, slices_left=50) == 5
+        assert MIN_SLICE_NOTIONAL >= 10
+
+    def test_slippage_sign(self):
+        assert slippage_bps(True, 100.0, 100.1) == pytest.approx(10)
+        assert slippage_bps(False, 100.0, 100.1) == pytest.approx(-10)
+        assert slippage_bps(True, 100.0, None) is None
+
+
+@patch('src.core.slicer.verify_orders', return_value=(2000.0, 2000.0, None, None, None))
+@patch('src.core.slicer.hyperliquid_depth_notional', return_value=1e6)
+@patch('src.core.slicer.binance_depth_notional', return_value=1e6)
+@patch('src.core.slicer.get_hyperliquid_best_price', return_value=(2000.0, 2000.0))
+@patch('src.core.slicer.get_binance_best_price', return_value=2000.0)
+def test_short_leg_stops_slicing(*_):
+    """A 'success' hedge whose Hyperliquid leg did not fill must not count as a hedged slice"""
+    hedge = {'status': 'success', 'errors': {}, 'leg_skew_ms': None, 'legs': {
+        'binance': {'qty': 0.05, 'executed_qty': 0.05, 'avg_price': 2000.0},
+        'hyperliquid': {'adjusted_size': 0.05, 'filled_size': 0.0, 'avg_price': 0.0},
+    }}
+    with patch('src.core.slicer.ejecutar_hedge', return_value=hedge) as run:
+        result = ejecutar_hedge_twap(MagicMock(), MagicMock(), MagicMock(), '0xabc', 'ETHUSDT', 'long', 100, 5,
+                                     participation=0.0002, interval=0)
+    run.assert_called_once()
+    assert result['status'] == 'partial'
+    assert result['executed_notional'] == 0
+    assert result['vwap']['binance'] == 2000.0
+    assert 'slice_0' in result['errors']
+
+
+@pytest.fixture
+def crossing_flow(simulator):
+    """Background flow that trades through every resting Binance ETH order so passive GTC legs fill"""
+    stop = threading.Event()
+    fills = simulator.engine.fills
+
+    def run():
+        while not stop.wait(0.01):
+            # El mid es común a ambos venues: cruzar solo cuando la pata IOC de Hyperliquid ya se llenó
+            if len(fills['hyperliquid']) <= len(fills['binance']):
+                continue
+            for order in simulator.call(simulator.engine.open_orders, 'binance', 'ETH'):
+                if order.price is not None:
+                    # El mid pasa 5 bps más allá de la orden (la cruza) y vuelve: el precio no deriva
+                    mid = simulator.engine.mids['ETH']
+                    simulator.set_mid('ETH', order.price * (0.9995 if order.is_buy else 1.0005))
+                    simulator.set_mid('ETH', mid)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+
+@pytest.mark.simulator(seed=5)
+def test_slices_stay_hedged_and_report_vwap(simulator, crossing_flow, monkeypatch):
+    # Ruta limit: la pata de Binance reposa como GTC en el bid y se llena cuando el flujo la cruza
+    monkeypatch.setenv(EXECUTION_ENV, 'limit')
+    client = create_binance_client('sim-key-twap', 'sim-secret')
+    wallet, hl_info, hl_exchange = init_hyperliquid_clients(Account.create().key.hex(), streaming=False)
+    # ~1M de profundidad visible en la banda; 0.0001 de participación -> rebanadas de ~100 USDT
+    result = ejecutar_hedge_twap(client, hl_info, hl_exchange, wallet.address, 'ETHUSDT', 'long', 60, 5,
+                                 participation=0.0001, interval=0)
+
+    assert result['status'] == 'success', result['errors']
+    assert len(result['slices']) == 3
+    assert sum(s['notional'] for s in result['slices']) == pytest.approx(300)
+    binance_qty = simulator.engine.accounts['binance'].positions['ETH'][0]
+    hyper_qty = simulator.engine.accounts['hyperliquid'].positions['ETH'][0]
+    assert binance_qty > 0 and hyper_qty == pytest.approx(-binance_qty, rel=0.01)
+    for venue in ('binance', 'hyperliquid'):
+        assert result['vwap'][venue] == pytest.approx(result['arrival'][venue], rel=0.002)
+        assert result['slippage_bps'][venue] is not None
+    # Las tres patas de Binance se llenaron en reposo, no cruzando el libro
+    assert [fill.is_maker for fill in simulator.engine.fills['binance']] == [True] * 3
@@ -0,0 +1,212 @@
+"""
+Unit tests for trading operations
+"""
+
+import time
+from unittest.mock import patch, MagicMock
+from src.core.trading_operations import ejecutar_hedge, close_all_hedges
+from src.exchanges.binance_operations import enviar_binance_batch_orders, format_binance_quantity
+
+
+def binance_leg():
+    return {
+        'symbol': 'BTCUSDT', 'side': 'BUY', 'qty': 0.01, 'price': 65000.0,
+        'best_price': 65000.0, 'target_notional': 650.0, 'order_id': None, 'executed_qty': 0.0
+    }
+
+
+def hyper_leg():
+    return {
+        'coin': 'BTC', 'is_buy': False, 'original_size': 0.01, 'adjusted_size': 0.01,
+        'adjusted_price': 65000.0, 'reduce_only': False, 'leverage': 2
+    }
+
+
+def fill_binance(client, leg, timeout=30):
+    leg['order_id'] = 1
+    leg['placed_at'] = leg['filled_at'] = time.perf_counter()
+    leg['executed_qty'] = leg['qty']
+    return {'orderId': 1}
+
+
+def fill_hyper(hl_exchange, leg):
+    leg['placed_at'] = leg['filled_at'] = time.perf_counter()
+    leg['filled_size'] = leg['adjusted_size']
+    return {'status': 'ok'}
+
+
+def run_hedge(**kwargs):
+    return ejecutar_hedge(
+        MagicMock(), MagicMock(), MagicMock(), '0xabc', 'BTCUSDT', 'long', 100, 2,
+        65000.0, 65000.0, **kwargs
+    )
+
+
+@patch('src.core.trading_operations.preparar_hyper_order', side_effect=lambda *a: hyper_leg())
+@patch('src.core.trading_operations.preparar_binance_order', side_effect=lambda *a: binance_leg())
+class TestEjecutarHedge:
+    """Test cases for the concurrent hedge executor"""
+
+    @patch('src.core.trading_operations.enviar_hyperliquid_order', side_effect=fill_hyper)
+    @patch('src.core.trading_operations.enviar_binance_order', side_effect=fill_binance)
+    def test_both_legs_filled(self, mock_binance, mock_hyper, *_):
+        """Test that both legs are submitted and timed"""
+        result = run_hedge()
+        assert result['status'] == 'success'
+        assert result['leg_skew_ms'] is not None
+        assert 'prepare_ms' in result['timings']['binance']
+        assert 'fill_ms' in result['timings']['hyperliquid']
+
+    @patch('src.core.trading_operations._deshacer_binance_leg', return_value={'status': 'FILLED'})
+    @patch('src.core.trading_operations.enviar_hyperliquid_order', side_effect=Exception("Orden rechazada"))
+    @patch('src.core.trading_operations.enviar_binance_order', side_effect=fill_binance)
+    def test_unwinds_filled_leg(self, mock_binance, mock_hyper, mock_unwind, *_):
+        """Test that the filled leg is unwound when the other fails"""
+        result = run_hedge()
+        assert result['status'] == 'unwound'
+        assert 'hyperliquid' in result['errors']
+        mock_unwind.assert_called_once()
+
+    @patch('src.core.trading_operations.enviar_hyperliquid_order')
+    @patch('src.core.trading_operations.enviar_binance_order')
+    def test_preparation_failure_sends_nothing(self, mock_binance, mock_hyper, mock_prep_binance, *_):
+        """Test that no order is sent when a leg fails validation"""
+        mock_prep_binance.side_effect = Exception("Margen insuficiente")
+        result = run_hedge()
+        assert result['status'] == 'failed'
+        mock_binance.assert_not_called()
+        mock_hyper.assert_not_called()
+
+    @patch('src.core.trading_operations._deshacer_binance_leg', return_value={'status': 'FILLED'})
+    @patch('src.core.trading_operations.enviar_binance_order', side_effect=fill_binance)
+    def test_resting_hyperliquid_leg_is_cancelled_and_unwound(self, mock_binance, mock_unwind, *_):
+        """Test that a resting Hyperliquid order is not reported as a hedged leg"""
+        hl_info, hl_exchange = MagicMock(), MagicMock()
+        hl_info.query_order_by_oid.return_value = {'status': 'order', 'order': {
+            'order': {'origSz': '0.01', 'sz': '0.01'}, 'status': 'canceled'}}
+
+        def rest_hyper(exchange, leg):
+            leg['placed_at'], leg['oid'], leg['filled_size'] = time.perf_counter(), 7, 0.0
+            return {'status': 'ok'}
+
+        with patch('src.core.trading_operations.enviar_hyperliquid_order', side_effect=rest_hyper):
+            result = ejecutar_hedge(MagicMock(), hl_info, hl_exchange, '0xabc', 'BTCUSDT', 'long', 100, 2,
+                                    65000.0, 65000.0)
+        assert result['status'] == 'unwound'
+        assert 'hyperliquid' in result['errors']
+        assert result['leg_skew_ms'] is None and 'fill_ms' not in result['timings']['hyperliquid']
+        hl_exchange.cancel.assert_called_once_with('BTC', 7)
+        hl_exchange.order.assert_not_called()
+        mock_unwind.assert_called_once()
+
+    @patch('src.core.trading_operations._deshacer_binance_leg', return_value=None)
+    @patch('src.core.trading_operations._deshacer_hyper_leg', return_value={'status': 'ok'})
+    @patch('src.core.trading_operations.enviar_hyperliquid_order', side_effect=fill_hyper)
+    def test_cancelled_binance_leg_has_no_fill_time(self, mock_hyper, mock_unwind, mock_binance_unwind, *_):
+        """Test that a cancelled Binance order is not timed as a fill"""
+        client = MagicMock()
+        client.futures_create_order.return_value = {'orderId': 1}
+        client.futures_get_order.return_value = {'orderId': 1, 'symbol': 'BTCUSDT', 'side': 'BUY',
+                                                 'status': 'CANCELED', 'executedQty': '0'}
+        with patch.dict('os.environ', {'BINANCE_EXECUTION': 'limit'}):
+            result = ejecutar_hedge(client, MagicMock(), MagicMock(), '0xabc', 'BTCUSDT', 'long', 100, 2,
+                                    65000.0, 65000.0)
+        assert result['status'] == 'unwound'
+        assert 'binance' in result['errors']
+        assert 'submit_ms' in result['timings']['binance'] and 'fill_ms' not in result['timings']['binance']
+        assert result['leg_skew_ms'] is None
+        mock_unwind.assert_called_once()
+
+    @patch('src.core.trading_operations._deshacer_binance_leg', return_value=None)
+    @patch('src.core.trading_operations._deshacer_hyper_leg', return_value={'status': 'ok'})
+    @patch('src.core.trading_operations.cancelar_binance_order')
+    @patch('src.core.trading_operations.enviar_hyperliquid_order', side_effect=fill_hyper)
+    def test_skew_budget_cancels_slow_leg(self, mock_hyper, mock_cancel, mock_unwind, mock_binance_unwind, *_):
+        """Test that a slow Binance leg is cancelled once the skew budget is spent"""
+        def slow_binance(client, leg, timeout=30):
+            leg['order_id'] = 1
+            while not mock_cancel.called:
+                time.sleep(0.01)
+            raise Exception("Fallo al llenar la orden de Binance: CANCELED")
+
+        with patch('src.core.trading_operations.enviar_binance_order', side_effect=slow_binance):
+            result = run_hedge(max_leg_skew=0.05)
+        assert result['skew_exceeded'] is True
+        assert result['status'] == 'unwound'
+        mock_cancel.assert_called_once()
+        mock_unwind.assert_called_once()
+        assert 'binance' not in result['unwind']
+
+
+def position_risk(*amounts):
+    return [{'symbol': f"C{i}USDT", 'positionAmt': str(amt), 'entryPrice': '10', 'markPrice': '10'}
+            for i, amt in enumerate(amounts)]
+
+
+def user_state(*sizes):
+    return {'marginSummary': {'accountValue': '100'}, 'withdrawable': '100', 'assetPositions': [
+        {'position': {'coin': f"C{i}", 'szi': str(sz), 'entryPx': '10', 'positionValue': str(abs(sz) * 10)}}
+        for i, sz in enumerate(sizes)
+    ]}
+
+
+class TestCloseAllHedges:
+    def test_batches_binance_orders_in_fives(self):
+        client = MagicMock()
+        client.futures_place_batch_order.side_effect = lambda batchOrders: [
+            {'orderId': i} for i, _ in enumerate(batchOrders)
+        ]
+        orders = [{'symbol': f"C{i}USDT"} for i in range(12)]
+        placed = enviar_binance_batch_orders(client, orders)
+        sizes = sorted(len(call.kwargs['batchOrders']) for call in client.futures_place_batch_order.call_args_list)
+        assert sizes == [2, 5, 5]
+        assert len(placed) == 12
+
+    def test_format_quantity(self):
+        assert format_binance_quantity(0.00001) == '0.00001'
+        assert format_binance_quantity(12.5) == '12.5'
+
+    @patch('src.core.trading_operations.adjust_hyperliquid_price', side_effect=lambda info, px, coin, is_buy: round(px, 2))
+    @patch('src.core.trading_operations.wait_for_binance_order', return_value={'status': 'FILLED'})
+    def test_flattens_both_venues(self, *_):
+        client, hl_info, hl_exchange = MagicMock(), MagicMock(), MagicMock()
+        client.futures_account.return_value = {'totalWalletBalance': '100', 'availableBalance': '100'}
+        client.futures_position_information.side_effect = [position_risk(1, -2, 0.5), position_risk(0, 0, 0)]
+        client.futures_place_batch_order.side_effect = lambda batchOrders: [
+            {'orderId': i} for i, _ in enumerate(batchOrders)
+        ]
+        hl_info.user_state.side_effect = [user_state(-1, 2), user_state()]
+        hl_exchange.bulk_orders.return_value = {'status': 'ok', 'response': {'data': {'statuses': [
+            {'filled': {'oid': 1, 'totalSz': '1', 'avgPx': '10'}}, {'filled': {'oid': 2, 'totalSz': '2', 'avgPx': '10'}}
+        ]}}}
+
+        result = close_all_hedges(client, hl_info, hl_exchange, '0xabc')
+
+        assert result['status'] == 'flat'
+        assert result['residual'] == {}
+        batch = client.futures_place_batch_order.call_args.kwargs['batchOrders']
+        assert [(o['symbol'], o['side'], o['quantity'], o['reduceOnly']) for o in batch] == [
+            ('C0USDT', 'SELL', '1', 'true'), ('C1USDT', 'BUY', '2', 'true'), ('C2USDT', 'SELL', '0.5', 'true')
+        ]
+        hl_orders = hl_exchange.bulk_orders.call_args.args[0]
+        assert [(o['coin'], o['is_buy'], o['limit_px'], o['reduce_only']) for o in hl_orders] == [
+            ('C0', True, 10.1, True), ('C1', False, 9.9, True)
+        ]
+
+    @patch('src.core.trading_operations.adjust_hyperliquid_price', side_effect=lambda info, px, coin, is_buy: px)
+    @patch('src.core.trading_operations.wait_for_binance_order', return_value={'status': 'FILLED'})
+    def test_reports_residual_exposure_per_coin(self, *_):
+        client, hl_info, hl_exchange = MagicMock(), MagicMock(), MagicMock()
+        client.futures_account.return_value = {'totalWalletBalance': '100', 'availableBalance': '100'}
+        client.futures_position_information.side_effect = [position_risk(1), position_risk(0)]
+        client.futures_place_batch_order.return_value = [{'orderId': 1}]
+        hl_info.user_state.side_effect = [user_state(-1), user_state(-1)]
+        hl_exchange.bulk_orders.return_value = {'status': 'ok', 'response': {'data': {'statuses': [
+            {'error': 'Reduce only order would increase position'}
+        ]}}}
+
+        result = close_all_hedges(client, hl_info, hl_exchange, '0xabc')
+
+        assert result['status'] == 'residual'
+        assert result['residual'] == {'C0': {'binance': 0.0, 'hyperliquid': -1.0, 'net': -1.0}}
+        assert result['errors'] == {'hyperliquid:C0': 'Reduce only order would increase position'}
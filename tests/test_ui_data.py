@@ -0,0 +1,49 @@
+"""
+Unit tests for the dashboard data layer
+"""
+
+from unittest.mock import MagicMock
+from src.ui.data import ExchangeClients, credentials_key, fetch_account_snapshot
+
+
+class TestDashboardData:
+    def test_credentials_key_is_stable_and_opaque(self):
+        key = credentials_key("api", "secret", "0xkey")
+        assert key == credentials_key("api", "secret", "0xkey")
+        assert key != credentials_key("api", "secret2", "0xkey")
+        assert "secret" not in key
+
+    def test_fetch_account_snapshot(self):
+        binance = MagicMock()
+        binance.futures_account.return_value = {'totalWalletBalance': '1500.5', 'availableBalance': '1200'}
+        binance.futures_position_information.return_value = [
+            {'symbol': 'BTCUSDT', 'positionAmt': '0.01', 'entryPrice': '65000'},
+            {'symbol': 'ETHUSDT', 'positionAmt': '0', 'entryPrice': '0'},
+        ]
+        hl_info = MagicMock()
+        hl_info.user_state.return_value = {
+            'marginSummary': {'accountValue': '800'},
+            'assetPositions': [
+                {'position': {'coin': 'BTC', 'szi': '-0.01', 'entryPx': '65010', 'positionValue': '650'}},
+                {'position': {'coin': 'ETH', 'szi': '0', 'entryPx': '0'}},
+            ],
+        }
+        clients = ExchangeClients(binance, None, hl_info, MagicMock())
+        snapshot = fetch_account_snapshot(clients, '0xabc')
+        assert snapshot['binance_balance'] == 1500.5
+        assert snapshot['hyper_balance'] == 800.0
+        assert [p.symbol for p in snapshot['binance_positions']] == ['BTCUSDT']
+        assert [(p.symbol, p.direction) for p in snapshot['hyper_positions']] == [('BTCUSDT', 'Short')]
+        assert snapshot['errors'] == {}
+
+    def test_fetch_account_snapshot_reports_partial_failures(self):
+        binance = MagicMock()
+        binance.futures_account.side_effect = Exception("timeout")
+        binance.futures_position_information.return_value = []
+        hl_info = MagicMock()
+        hl_info.user_state.return_value = {'marginSummary': {'accountValue': '800'}}
+        snapshot = fetch_account_snapshot(ExchangeClients(binance, None, hl_info, None), '0xabc')
+        assert snapshot['binance_balance'] is None
+        assert snapshot['binance_positions'] == []
+        assert snapshot['hyper_balance'] == 800.0
+        assert snapshot['errors'] == {'binance': 'timeout'}